@@ -3,13 +3,12 @@ from __future__ import annotations
 from datetime import datetime, timedelta
 import json
 import os
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from backend.api.session_summary import build_session_summary
-from backend.db import models
+from backend.db import session_analytics
 from backend.db.connection import get_db
 from modules.llm import analyze_text
 from modules.self_optimizer import apply_self_optimization  # noqa: F401  # placeholder for future use
@@ -30,14 +29,6 @@ def _parse_date(value: Optional[str]) -> Optional[datetime]:
         raise HTTPException(status_code=400, detail="Invalid date format. Use ISO 8601.") from exc
 
 
-def _classify_emotion(score: float) -> str:
-    if score >= 4.0:
-        return "positive"
-    if score >= 3.0:
-        return "neutral"
-    return "negative"
-
-
 def generate_self_analysis_report(analysis_data: Dict[str, Any]) -> str:
     """
     Build a Markdown self-analysis report with sections:
@@ -83,84 +74,63 @@ def generate_self_analysis_report(analysis_data: Dict[str, Any]) -> str:
     return report_content
 
 
-@router.get("/analyze_sessions")
-def analyze_sessions(
-    start_date: Optional[str] = Query(None, description="ISO8601 start date"),
-    end_date: Optional[str] = Query(None, description="ISO8601 end date"),
-    window_days: Optional[int] = Query(None, ge=1, le=180, description="Lookback window in days"),
-    db: Session = Depends(get_db),
-):
+def _resolve_window(start_date: Optional[str], end_date: Optional[str], window_days: Optional[int]):
     start_dt = _parse_date(start_date)
     end_dt = _parse_date(end_date)
 
     if window_days and not end_dt:
-        end_dt = datetime.utcnow()
+        # Relative windows end at the next whole minute, so requests within a minute
+        # resolve to the same window (and cache entry) while still covering "now".
+        end_dt = datetime.utcnow().replace(second=0, microsecond=0) + timedelta(minutes=1)
     if window_days and not start_dt and end_dt:
         start_dt = end_dt - timedelta(days=window_days)
+    return start_dt, end_dt
+
 
-    query = db.query(models.SessionLog).order_by(models.SessionLog.created_at.asc())
+def _analyzed_period(start_dt: Optional[datetime], end_dt: Optional[datetime]) -> str:
+    return f"{start_dt.isoformat() if start_dt else 'start'} to {end_dt.isoformat() if end_dt else 'end'}"
 
-    if start_dt:
-        query = query.filter(models.SessionLog.created_at >= start_dt)
-    if end_dt:
-        query = query.filter(models.SessionLog.created_at <= end_dt)
+
+@router.get("/analyze_sessions")
+def analyze_sessions(
+    start_date: Optional[str] = Query(None, description="ISO8601 start date"),
+    end_date: Optional[str] = Query(None, description="ISO8601 end date"),
+    window_days: Optional[int] = Query(None, ge=1, le=180, description="Lookback window in days"),
+    detail_limit: int = Query(1000, ge=0, le=10000, description="Max scores/comments returned (most recent)"),
+    db: Session = Depends(get_db),
+):
+    start_dt, end_dt = _resolve_window(start_date, end_date, window_days)
+
+    def compute() -> Dict[str, Any]:
+        summary = session_analytics.session_summary(db, start_dt, end_dt)
+        return {
+            "average_score": summary["average_score"],
+            "scores": session_analytics.recent_scores(db, start_dt, end_dt, limit=detail_limit),
+            "comments": session_analytics.evaluation_comments(db, start_dt, end_dt, limit=detail_limit),
+            "total_sessions": summary["total_sessions"],
+            "analyzed_period": _analyzed_period(start_dt, end_dt),
+            "series": summary["series"],
+            "trend": summary["trend"],
+            "recent_sessions": session_analytics.recent_sessions(db, start_dt, end_dt),
+            "emotion_summary": summary["emotion_summary"],
+        }
 
     try:
-        sessions: List[models.SessionLog] = query.all()
+        # Keyed on the resolved window, so a relative window moves with its end time.
+        return session_analytics.cached(("analyze_sessions", start_dt, end_dt, detail_limit), compute)
     except Exception:
-        analyzed_period = f"{start_dt.isoformat() if start_dt else 'start'} to {end_dt.isoformat() if end_dt else 'end'}"
         return {
             "average_score": 0.0,
             "scores": [],
             "comments": [],
             "total_sessions": 0,
-            "analyzed_period": analyzed_period,
+            "analyzed_period": _analyzed_period(start_dt, end_dt),
             "series": [],
             "trend": {"delta": 0.0, "direction": "flat"},
             "recent_sessions": [],
             "emotion_summary": {},
         }
 
-    scores: List[float] = [
-        float(s.evaluation_score)
-        for s in sessions
-        if isinstance(getattr(s, "evaluation_score", None), (int, float))
-    ]
-    comments = [s.evaluation_comment for s in sessions if getattr(s, "evaluation_comment", None)]
-
-    summary = build_session_summary(sessions)
-
-    emotion_summary = {"positive": 0, "neutral": 0, "negative": 0}
-    for score in scores:
-        emotion_summary[_classify_emotion(score)] += 1
-
-    recent_sessions: List[Dict[str, Any]] = []
-    for s in sorted(
-        sessions, key=lambda x: getattr(x, "created_at", datetime.min) or datetime.min, reverse=True
-    )[:10]:
-        recent_sessions.append(
-            {
-                "id": getattr(s, "id", None),
-                "created_at": s.created_at.isoformat() if getattr(s, "created_at", None) else None,
-                "score": getattr(s, "evaluation_score", None),
-                "comment": getattr(s, "evaluation_comment", None),
-            }
-        )
-
-    analyzed_period = f"{start_dt.isoformat() if start_dt else 'start'} to {end_dt.isoformat() if end_dt else 'end'}"
-
-    return {
-        "average_score": summary["average_score"],
-        "scores": scores,
-        "comments": comments,
-        "total_sessions": summary["total_sessions"],
-        "analyzed_period": analyzed_period,
-        "series": summary["series"],
-        "trend": summary["trend"],
-        "recent_sessions": recent_sessions,
-        "emotion_summary": emotion_summary,
-    }
-
 
 @router.get("/generate_self_analysis_report")
 def generate_report_endpoint(
@@ -173,48 +143,31 @@ def generate_report_endpoint(
     Generates a self-analysis report and persists it under /reports/self_analysis
     in both Markdown and HTML formats.
     """
-    start_dt = _parse_date(start_date)
-    end_dt = _parse_date(end_date)
-
-    if window_days and not end_dt:
-        end_dt = datetime.utcnow()
-    if window_days and not start_dt and end_dt:
-        start_dt = end_dt - timedelta(days=window_days)
-
-    query = db.query(models.SessionLog).order_by(models.SessionLog.created_at.asc())
-    if start_dt:
-        query = query.filter(models.SessionLog.created_at >= start_dt)
-    if end_dt:
-        query = query.filter(models.SessionLog.created_at <= end_dt)
-
-    sessions: List[models.SessionLog] = query.all()
-    if not sessions:
+    start_dt, end_dt = _resolve_window(start_date, end_date, window_days)
+    summary = session_analytics.cached(
+        ("session_summary", start_dt, end_dt),
+        lambda: session_analytics.session_summary(db, start_dt, end_dt),
+    )
+    if not summary["total_sessions"]:
         return {
             "summary": "No sessions available for analysis.",
             "insight": "Try again after more conversations have been logged.",
         }
 
-    summary = build_session_summary(sessions)
-    scores: List[float] = [
-        float(s.evaluation_score)
-        for s in sessions
-        if isinstance(getattr(s, "evaluation_score", None), (int, float))
-    ]
-    emotion_summary = {"positive": 0, "neutral": 0, "negative": 0}
-    for score in scores:
-        emotion_summary[_classify_emotion(score)] += 1
-
-    analyzed_period = f"{start_dt.isoformat() if start_dt else 'start'} to {end_dt.isoformat() if end_dt else 'end'}"
     analysis_data: Dict[str, Any] = {
-        "analyzed_period": analyzed_period,
+        "analyzed_period": _analyzed_period(start_dt, end_dt),
         "total_sessions": summary["total_sessions"],
         "avg_evaluation_score": summary["average_score"],
         "trend": summary["trend"],
         "series": summary["series"],
-        "emotion_summary": emotion_summary,
+        "emotion_summary": summary["emotion_summary"],
     }
 
-    evaluation_comments = [s.evaluation_comment for s in sessions if s.evaluation_comment]
+    # Only the first MAX_SUMMARY_LENGTH characters are sent, so the earliest comments suffice
+    # (each non-empty comment contributes at least two characters with its newline).
+    evaluation_comments = session_analytics.evaluation_comments(
+        db, start_dt, end_dt, limit=MAX_SUMMARY_LENGTH // 2, newest=False
+    )
     insight = "No evaluation comments available for meta-analysis."
     if evaluation_comments:
         comments_text = "\n".join(evaluation_comments)[:MAX_SUMMARY_LENGTH]
@@ -1,26 +1,92 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+import json
 import logging
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 
 # Assuming orchestrator is in the Python path
 from orchestrator.main import run_context_evolution_cycle
+from orchestrator.job_queue import TERMINAL_STATUSES, JobQueue, QueueFullError
 
 router = APIRouter()
 
+# Cycles run on a bounded worker pool (CHAT_JOB_WORKERS / CHAT_JOB_QUEUE_SIZE) so a slow
+# LLM call never blocks the event loop serving other endpoints.
+chat_jobs = JobQueue(run_context_evolution_cycle, name="chat")
+
+
+@router.on_event("shutdown")
+def _stop_chat_jobs():
+    chat_jobs.shutdown()
+
+
 class ChatRequest(BaseModel):
     user_input: str
 
 class ChatResponse(BaseModel):
     ai_response: str
+    job_id: Optional[str] = None
+    status: Optional[str] = None
 
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, status_code=202)
 async def chat_endpoint(request: ChatRequest):
     logging.info(f"Received chat message: {request.user_input}")
     try:
-        # This is a fire-and-forget call now
-        run_context_evolution_cycle(request.user_input)
-        ai_response = "Processing your request."
-        return ChatResponse(ai_response=ai_response)
+        job = chat_jobs.submit(request.user_input)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Chat queue is full: {e}", headers={"Retry-After": "5"})
     except Exception as e:
         logging.error(f"Error handling chat message: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
+    return ChatResponse(ai_response="Processing your request.", job_id=job.id, status=job.status)
+
+
+@router.get("/chat/queue")
+async def chat_queue_stats():
+    """Worker and backlog counters for the chat job queue."""
+    return chat_jobs.stats()
+
+
+@router.get("/chat/{job_id}")
+async def chat_job_status(job_id: str):
+    job = chat_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@router.get("/chat/{job_id}/stream")
+async def chat_job_stream(job_id: str, request: Request):
+    """Server-sent events: one `data:` frame per FeedbackLoop stage until the job finishes."""
+    job = chat_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_generator():
+        backlog, events = job.subscribe(asyncio.get_running_loop())
+        try:
+            for event in backlog:
+                yield _sse(event)
+            finished = any(event["stage"] in TERMINAL_STATUSES for event in backlog)
+            while not finished:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield b": keep-alive\n\n"
+                    continue
+                yield _sse(event)
+                finished = event["stage"] in TERMINAL_STATUSES
+        finally:
+            job.unsubscribe(events)
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+def _sse(event: dict) -> bytes:
+    payload = f"id: {event['seq']}\nevent: {event['stage']}\ndata: " + json.dumps(event, ensure_ascii=False, default=str) + "\n\n"
+    return payload.encode("utf-8")
@@ -1,28 +1,66 @@
-"""Continuum streaming endpoint."""
+"""Continuum streaming endpoint.
+
+Clients get one snapshot of the newest sessions, then a delta per saved session
+from modules.continuum_feed; all clients share the feed's cached snapshot. Every
+event carries an id, so a reconnecting EventSource resumes via Last-Event-ID.
+"""
 
 from __future__ import annotations
 
-import asyncio
 import json
+import os
+from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, Request
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
-from modules.continuum_core import ContinuumCore
+from modules.continuum_feed import continuum_feed
 
 router = APIRouter(prefix="/continuum", tags=["Continuum"])
 
-core = ContinuumCore()
+HEARTBEAT_SECONDS = float(os.getenv("CONTINUUM_HEARTBEAT_SECONDS", "15"))
+
+
+def _frame(event_id: str, payload: dict) -> bytes:
+    return f"id: {event_id}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+async def _snapshot_frame():
+    # The first snapshot queries session_logs; keep that off the event loop.
+    seq, sessions = await run_in_threadpool(continuum_feed.snapshot)
+    return seq, _frame(continuum_feed.event_id(seq), {"event": "continuum", "data": sessions})
 
 
-async def stream_generator():
-    while True:
-        snapshot = {"event": "continuum", "data": core.stream_state()}
-        payload = "data: " + json.dumps(snapshot, ensure_ascii=False) + "\n\n"
-        yield payload.encode("utf-8")
-        await asyncio.sleep(3)
+async def stream_generator(request: Request, last_event_id: Optional[str] = None):
+    missed = continuum_feed.events_since(last_event_id)
+    if missed is None:
+        last_seq, frame = await _snapshot_frame()
+        yield frame
+    else:
+        last_seq = continuum_feed.parse_event_id(last_event_id)
+        for seq, entry in missed:
+            yield _frame(continuum_feed.event_id(seq), {"event": "continuum_delta", "data": entry})
+            last_seq = seq
+    while not await request.is_disconnected():
+        events = await continuum_feed.wait(last_seq, HEARTBEAT_SECONDS)
+        if events is None:
+            # Fell behind the feed's ring; start over from a snapshot.
+            last_seq, frame = await _snapshot_frame()
+            yield frame
+            continue
+        if not events:
+            yield b": heartbeat\n\n"
+            continue
+        for seq, entry in events:
+            yield _frame(continuum_feed.event_id(seq), {"event": "continuum_delta", "data": entry})
+            last_seq = seq
 
 
 @router.get("/stream")
-def continuum_stream():
-    return StreamingResponse(stream_generator(), media_type="text/event-stream")
+async def continuum_stream(request: Request, last_event_id: Optional[str] = Header(None)):
+    return StreamingResponse(
+        stream_generator(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
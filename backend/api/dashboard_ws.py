@@ -1,6 +1,4 @@
-import asyncio
 import aiohttp
-import json
 import os
 import logging
 from datetime import datetime
@@ -13,6 +11,8 @@ from modules.metacognition import get_latest_introspection_log, get_cognitive_gr
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
 from typing import List, Dict, Any
 
+from backend.modules.broadcast_hub import SampledTopic
+
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
@@ -27,8 +27,9 @@ class ConnectionManager:
         logger.info(f"WebSocket connected: {websocket.client}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected: {websocket.client}")
+        if websocket in self.active_connections:
+            self.active_connections.remove(websocket)
+            logger.info(f"WebSocket disconnected: {websocket.client}")
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         await websocket.send_text(message)
@@ -81,50 +82,58 @@ def get_system_metrics_data(): # Changed to synchronous
     }
     return metrics
 
-# --- WebSocket Endpoint ---
-@router.websocket("/ws/dashboard")
-async def websocket_endpoint(websocket: WebSocket):
+DEFAULT_EMOTION_STATE = {
+    "joy": 0.5, "anger": 0.1, "sadness": 0.2,
+    "happiness": 0.7, "fear": 0.05, "calm": 0.8
+}
+
+# --- Shared producers: one sample + one json.dumps per tick, however many clients ---
+async def sample_dashboard():
+    return [
+        await get_persona_state_data(),
+        get_introspection_log_data(),
+        get_system_metrics_data(),
+    ]
+
+async def sample_emotion():
+    persona_state = await get_current_persona_state()
+    # Fallback to placeholder if not found
+    return [persona_state.get("detailed_emotion_state", DEFAULT_EMOTION_STATE)]
+
+dashboard_topic = SampledTopic("dashboard", sample_dashboard, interval=1.0)
+# /ws/emotion frames are bare emotion dicts with no "type", so unchanged states are skipped instead.
+emotion_topic = SampledTopic("emotion", sample_emotion, interval=0.5, delta_frames=False)
+
+async def _wait_disconnect(websocket: WebSocket):
+    # These sockets are push-only; anything the client sends is ignored.
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+async def _stream_topic(websocket: WebSocket, topic: SampledTopic):
     await manager.connect(websocket)
     try:
-        while True:
-            # Send persona state
-            persona_state_data = await get_persona_state_data() # Added await
-            await manager.send_personal_message(json.dumps(persona_state_data), websocket)
-
-            # Send introspection log
-            introspection_log_data = get_introspection_log_data() # Removed await
-            await manager.send_personal_message(json.dumps(introspection_log_data), websocket)
-
-            # Send system metrics
-            system_metrics_data = get_system_metrics_data() # Removed await
-            await manager.send_personal_message(json.dumps(system_metrics_data), websocket)
-
-            await asyncio.sleep(1) # Send updates every 1 second
+        if await topic.stream(websocket.send_text, _wait_disconnect(websocket)):
+            logger.info(f"WebSocket {websocket.client} disconnected from {topic.name}.")
+        else:
+            # The hub cut this client off for not keeping up.
+            await websocket.close(code=1013)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        logger.info(f"WebSocket {websocket.client} disconnected.")
+        logger.info(f"WebSocket {websocket.client} disconnected from {topic.name}.")
     except Exception as e:
-        logger.error(f"WebSocket error for {websocket.client}: {e}", exc_info=True)
+        logger.error(f"WebSocket error for {websocket.client} on {topic.name}: {e}", exc_info=True)
+    finally:
         manager.disconnect(websocket)
 
-# --- Emotion WebSocket Endpoint ---
+# --- WebSocket Endpoints ---
+@router.websocket("/ws/dashboard")
+async def websocket_endpoint(websocket: WebSocket):
+    await _stream_topic(websocket, dashboard_topic)
+
 @router.websocket("/ws/emotion")
 async def websocket_emotion_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
-    try:
-        while True:
-            # Fetch current emotion state from persona_manager
-            persona_state = await get_current_persona_state()
-            current_emotion = persona_state.get("detailed_emotion_state", {
-                "joy": 0.5, "anger": 0.1, "sadness": 0.2,
-                "happiness": 0.7, "fear": 0.05, "calm": 0.8
-            }) # Fallback to placeholder if not found
-
-            await manager.send_personal_message(json.dumps(current_emotion), websocket)
-            await asyncio.sleep(0.5) # Send updates more frequently for emotions
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        logger.info(f"Emotion WebSocket {websocket.client} disconnected.")
-    except Exception as e:
-        logger.error(f"Emotion WebSocket error for {websocket.client}: {e}", exc_info=True)
-        manager.disconnect(websocket)
\ No newline at end of file
+    await _stream_topic(websocket, emotion_topic)
+
+@router.get("/ws/stats")
+async def websocket_stats():
+    """Subscriber counts and sent/dropped frame counters per broadcast topic."""
+    return {"dashboard": dashboard_topic.stats(), "emotion": emotion_topic.stats()}
@@ -3,6 +3,7 @@ from pydantic import BaseModel, Field
 from typing import Optional
 # from orchestrator.main import run_orchestrator_workflow # Temporarily disabled for v2.2 refactoring
 from backend.db.connection import SessionLocal
+from backend.db import session_analytics
 from backend.db.models import SessionLog
 from sqlalchemy.orm import Session
 
@@ -30,6 +31,7 @@ async def evaluate_session(request: EvaluationRequest):
         session_log.evaluation_score = request.evaluation_score
         session_log.evaluation_comment = request.evaluation_comment
         db.commit()
+        session_analytics.invalidate()
         db.refresh(session_log)
 
         response_message = "Feedback saved successfully."
@@ -6,10 +6,17 @@ from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
+from modules.async_rag_engine import AsyncRAGEngine
 from modules.rag_engine import RAGEngine
 
 router = APIRouter()
 rag = RAGEngine()
+async_rag = AsyncRAGEngine(rag)
+
+
+@router.on_event("shutdown")
+async def _close_async_rag():
+    await async_rag.aclose()
 
 
 class KnowledgeIngestRequest(BaseModel):
@@ -39,22 +46,27 @@ def log_interaction(log_data: dict):
 
 
 @router.get("/knowledge")
-def list_knowledge(
+async def list_knowledge(
     limit: int = Query(10, ge=1, le=100),
     page: int = Query(1, ge=1),
     order_by: str = Query("created_at"),
     sort_direction: str = Query("desc"),
     source_filter: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """Qdrant蜀・・逋ｻ骭ｲ貂医∩遏･隴倅ｸ隕ｧ繧貞叙蠕・"""
     offset = (page - 1) * limit
     descending = sort_direction.lower() != "asc"
-    result = rag.list_embeddings(
-        limit=limit,
-        offset=offset,
-        order_by=order_by if order_by in {"created_at", "score"} else "created_at",
-        descending=descending,
-    )
+    try:
+        result = await async_rag.list_embeddings(
+            limit=limit,
+            offset=offset,
+            order_by=order_by if order_by in {"created_at", "score"} else "created_at",
+            descending=descending,
+            cursor=cursor,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     log_interaction(
         {
             "type": "knowledge_list",
@@ -76,24 +88,28 @@ def list_knowledge(
 
 
 @router.get("/knowledge/search")
-def search_knowledge(
+async def search_knowledge(
     q: str = Query(..., description="讀懃ｴ｢繧ｯ繧ｨ繝ｪ"),
     limit: int = Query(10, ge=1, le=100),
     page: int = Query(1, ge=1),
     order_by: str = Query("score"),
     sort_direction: str = Query("desc"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
 ):
     """Qdrant縺ｫ蟇ｾ縺吶ｋ鬘樔ｼｼ讀懃ｴ｢"""
     offset = (page - 1) * limit
     descending = sort_direction.lower() != "asc"
     try:
-        response = rag.search(
+        response = await async_rag.search(
             query=q,
             limit=limit,
             offset=offset,
             order_by=order_by if order_by in {"score", "created_at"} else "score",
             descending=descending,
+            cursor=cursor,
         )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         log_interaction(
             {
@@ -120,14 +136,26 @@ def search_knowledge(
     return response
 
 
+@router.get("/knowledge/cache")
+def knowledge_cache_stats():
+    """Embedding cache hit/miss counters for the query encoder."""
+    return rag.embedding_cache_stats()
+
+
+@router.get("/knowledge/pool")
+def knowledge_pool_health():
+    """PostgreSQL pool health and checkout wait metrics for RAG text retrieval."""
+    return rag.pg_health()
+
+
 @router.post("/knowledge/ingest")
-def ingest_knowledge(request: KnowledgeIngestRequest):
+async def ingest_knowledge(request: KnowledgeIngestRequest):
     cleaned = request.text.strip()
     if not cleaned:
         raise HTTPException(status_code=400, detail="Input text cannot be empty.")
 
     try:
-        result = rag.ingest_text(
+        result = await async_rag.ingest_text(
             cleaned,
             source=request.source,
             treat_as_chat=request.treat_as_chat,
@@ -171,9 +199,9 @@ def ingest_knowledge(request: KnowledgeIngestRequest):
 
 
 @router.get("/knowledge/{id}")
-def get_knowledge_detail(id: str):
+async def get_knowledge_detail(id: str):
     """迚ｹ螳唔D縺ｮ遏･隴倩ｩｳ邏ｰ繧貞叙蠕・"""
-    entry = rag.get_by_id(id)
+    entry = await async_rag.get_by_id(id)
     if not entry:
         raise HTTPException(status_code=404, detail="Entry not found")
     return entry
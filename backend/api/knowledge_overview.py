@@ -31,25 +31,24 @@ def _collect_embeddings(max_items: int) -> List[dict]:
     """
     items: List[dict] = []
     page_size = 200
-    offset = 0
+    cursor = None
 
     while len(items) < max_items:
         remaining = max_items - len(items)
         batch_limit = min(page_size, remaining)
         batch = rag.list_embeddings(
             limit=batch_limit,
-            offset=offset,
             order_by="created_at",
             descending=False,
+            cursor=cursor,
         )
         batch_items = batch.get("items", [])
         if not batch_items:
             break
         items.extend(batch_items)
-        # When scroll runs out of results it will return fewer items than requested
-        if len(batch_items) < batch_limit:
+        cursor = batch.get("next_cursor")
+        if not cursor:
             break
-        offset += batch_limit
     return items
 
 
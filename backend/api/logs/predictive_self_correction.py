@@ -4,8 +4,8 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 import json
-import os
 from typing import List, Optional
+from modules.event_log import EventLog
 from modules.log_manager import log_manager
 
 router = APIRouter(prefix="/logs")
@@ -26,13 +26,8 @@ async def get_predictive_self_correction_logs():
     """
     Retrieves all entries from the predictive self-correction log.
     """
-    if not os.path.exists(PREDICTIVE_LOG_PATH):
-        log_manager.info(f"Predictive self-correction log file not found at {PREDICTIVE_LOG_PATH}")
-        return []
-
     try:
-        with open(PREDICTIVE_LOG_PATH, 'r', encoding='utf-8') as f:
-            logs = json.load(f)
+        logs = EventLog.for_path(PREDICTIVE_LOG_PATH).read_all()
         normalized = []
         for entry in logs:
             if not isinstance(entry, dict):
@@ -7,7 +7,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy import and_, func
 
 from backend.db.connection import get_db
+from backend.db.metrics_rollup import BUCKET_STEPS, latency_percentile, query_buckets, truncate
 from backend.db.models import SessionLog
+from backend.middleware.metrics_logger import metrics_writer
 
 router = APIRouter(prefix="/metrics/v0_1", tags=["Metrics"])
 
@@ -19,6 +21,8 @@ THRESHOLDS = {
     "score_5_ratio": 0.3,
 }
 
+MAX_TIMESERIES_POINTS = 2000
+
 
 def _window_start(hours: int) -> datetime:
     return datetime.utcnow() - timedelta(hours=hours)
@@ -89,39 +93,50 @@ def summary(
     return summary
 
 
+@router.get("/writer")
+def writer_stats():
+    """Queue depth and submitted/dropped/written/failed counters of the request-metrics writer."""
+    return metrics_writer.stats()
+
+
 @router.get("/timeseries")
 def timeseries(
     hours: int = 24,
     path: Optional[str] = None,
+    bucket: str = "hour",
     db=Depends(get_db),
 ):
+    """One point per bucket (minute, hour or day) over the last ``hours``, oldest first.
+
+    Read from the metrics_rollup table in a single grouped query; the last point is
+    the current, still-filling bucket.
+    """
+    if bucket not in BUCKET_STEPS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {sorted(BUCKET_STEPS)}")
+    step = BUCKET_STEPS[bucket]
     now = datetime.utcnow()
-    points: List[Dict[str, Any]] = []
+    last_bucket = truncate(now, bucket)
+    window_start = truncate(now - timedelta(hours=hours) + step, bucket)
+    if (last_bucket - window_start) // step >= MAX_TIMESERIES_POINTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TIMESERIES_POINTS} points per request.")
+    aggregates = query_buckets(db, window_start, last_bucket + step, bucket=bucket, path=path)
 
-    for delta in range(hours):
-        window_end = now - timedelta(hours=delta)
-        window_start = window_end - timedelta(hours=1)
-        subset = db.query(SessionLog).filter(
-            SessionLog.created_at >= window_start,
-            SessionLog.created_at < window_end,
-        )
-        subset = _apply_path_filter(subset, path)
-        count = subset.count()
-
-        avg_response_query = db.query(func.avg(SessionLog.response_time_ms)).filter(
-            SessionLog.created_at >= window_start,
-            SessionLog.created_at < window_end,
-        )
-        avg_response_query = _apply_path_filter(avg_response_query, path)
-        avg_response = avg_response_query.scalar() or 0
-
-        success = _count_success(subset)
-        regen_attempts = subset.filter(SessionLog.regeneration_attempts > 0).count()
-        regen_success = subset.filter(SessionLog.regeneration_success.is_(True)).count()
+    points: List[Dict[str, Any]] = []
+    current = window_start
+    while current <= last_bucket:
+        data = aggregates.get(current, {})
+        count = data.get("count", 0)
+        success = data.get("success", 0)
+        regen_attempts = data.get("regen_attempts", 0)
+        regen_success = data.get("regen_success", 0)
+        p95 = latency_percentile(data, 0.95)
         points.append(
             {
-                "hour": window_start.strftime("%H:00"),
-                "avg_response_time_sec": _round(avg_response / 1000),
+                "hour": current.strftime("%H:00") if bucket == "hour" else current.strftime("%m-%d %H:%M"),
+                "bucket_start": current.isoformat(),
+                "avg_response_time_sec": _round(data.get("latency_sum_ms", 0) / count / 1000) if count else 0,
+                "p95_response_time_sec": _round(p95 / 1000) if p95 is not None else 0,
+                "max_response_time_sec": _round(data.get("latency_max_ms", 0) / 1000),
                 "success_rate": _round(success / count) if count else 0,
                 "regeneration_success_rate": _round(regen_success / regen_attempts) if regen_attempts else 0,
                 "failure_rate": _round(1 - (success / count)) if count else 0,
@@ -129,5 +144,6 @@ def timeseries(
                 "regen_attempts": regen_attempts,
             }
         )
+        current += step
 
-    return {"points": list(reversed(points))}
+    return {"points": points, "bucket": bucket}
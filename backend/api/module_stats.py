@@ -8,8 +8,7 @@ import psutil
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from backend.api.session_summary import build_session_summary
-from backend.db import models
+from backend.db import session_analytics
 from backend.db.connection import get_db
 
 router = APIRouter()
@@ -73,7 +72,9 @@ def _build_module_stats(system_metrics: Dict[str, float], summary: Dict[str, obj
 @router.get("/module_stats")
 def module_stats(db: Session = Depends(get_db)):
     system_metrics = _get_system_metrics()
-    session_summary = build_session_summary(db.query(models.SessionLog).all())
+    session_summary = session_analytics.cached(
+        ("session_summary", None, None), lambda: session_analytics.session_summary(db)
+    )
     module_stats_list = _build_module_stats(system_metrics, session_summary)
     logger.debug("Compiled module stats for UI-v1.0 dashboard.")
     return {
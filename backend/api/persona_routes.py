@@ -10,6 +10,8 @@ from pydantic import BaseModel
 from datetime import datetime
 import json, os
 
+from modules.memory_store import MemoryStore
+
 router = APIRouter(prefix="/persona", tags=["Persona"])
 
 # ---- データモデル ---- #
@@ -30,7 +32,6 @@ class PersonaState(BaseModel):
 
 # ---- 疑似DBパス ---- #
 PERSONA_STATE_FILE = "data/persona_state.json"
-MEMORY_SNAPSHOT_FILE = "data/memory_log.json"
 
 # ---- API定義 ---- #
 
@@ -54,16 +55,8 @@ async def update_persona_state(state: PersonaState):
 @router.get("/memory_snapshot")
 async def get_memory_snapshot():
     """記憶スナップショット一覧を取得"""
-    if not os.path.exists(MEMORY_SNAPSHOT_FILE):
-        # Create an empty list if the file doesn't exist
-        return []
-    with open(MEMORY_SNAPSHOT_FILE, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError:
-            return [] # Return empty list if file is empty or malformed
     # 最新10件を返す
-    return data[-10:] if isinstance(data, list) else [data]
+    return MemoryStore().recent_sessions(limit=10)
 
 @router.get("/context_sync")
 async def get_context_sync_status():
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict, List
 
 from fastapi import APIRouter, HTTPException
 
+from modules.event_log import EventLog
+
 router = APIRouter()
 
 PREDICTIVE_LOG = Path("logs/predictive_self_correction.json")
@@ -13,17 +14,8 @@ SELF_HEALING_LOG = Path("logs/self_healing_daemon.log")
 
 
 def _load_predictive_alerts(limit: int = 20) -> List[Dict[str, Any]]:
-    if not PREDICTIVE_LOG.exists():
-        return []
-    try:
-        data = json.loads(PREDICTIVE_LOG.read_text(encoding="utf-8"))
-        if not isinstance(data, list):
-            return []
-    except json.JSONDecodeError:
-        return []
-
     alerts: List[Dict[str, Any]] = []
-    for entry in data[-limit:]:
+    for entry in EventLog.for_path(str(PREDICTIVE_LOG)).tail(limit):
         if not isinstance(entry, dict):
             continue
         prob = float(entry.get("pred_prob") or entry.get("predicted_probability") or 0)
@@ -1,15 +1,18 @@
 # path: backend/api/sessions.py
-# version: v0.31
-from fastapi import APIRouter, Depends, HTTPException
+# version: v0.32
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import base64
 import os
 import json
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, or_
 from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from backend.db.connection import get_db
+from backend.db.connection import SessionLocal, get_db
+from backend.db import session_analytics
 from backend.db.models import SessionLog
 from backend.dev_recorder import _get_commit_hash, _get_env_snapshot
 
@@ -17,6 +20,11 @@ router = APIRouter()
 
 LOGS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "logs")
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PREVIEW_LENGTH = 200
+EXPORT_CHUNK_SIZE = 1000
+
 # Pydantic Models (Schemas)
 class SessionLogCreate(BaseModel):
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -42,12 +50,87 @@ class SessionLogResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class SessionSummary(BaseModel):
+    id: str
+    created_at: Optional[datetime] = None
+    user_input_preview: Optional[str] = None
+    evaluation_score: Optional[float] = None
+    has_comment: bool = False
+    status_code: Optional[int] = None
+
+class SessionPage(BaseModel):
+    items: List[SessionSummary]
+    next_cursor: Optional[str] = None
+
+# Keyset pagination: pages are ordered by (created_at, id) descending, served by
+# ix_session_logs_created_at_id; the cursor is the key of the last row returned.
+def encode_cursor(created_at: datetime, session_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), session_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, session_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(session_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _summary_columns():
+    return (
+        SessionLog.id,
+        SessionLog.created_at,
+        func.substr(SessionLog.user_input, 1, PREVIEW_LENGTH).label("user_input_preview"),
+        SessionLog.evaluation_score,
+        (func.coalesce(func.length(SessionLog.evaluation_comment), 0) > 0).label("has_comment"),
+        SessionLog.status_code,
+    )
+
+def _keyset_query(db: Session, columns, cursor: Optional[str] = None, since: Optional[datetime] = None):
+    query = db.query(*columns).filter(SessionLog.created_at.isnot(None))
+    if since is not None:
+        query = query.filter(SessionLog.created_at >= since)
+    if cursor:
+        created_at, session_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            SessionLog.created_at < created_at,
+            and_(SessionLog.created_at == created_at, SessionLog.id < session_id),
+        ))
+    return query.order_by(desc(SessionLog.created_at), desc(SessionLog.id))
+
 # API Endpoints
-@router.get("/sessions", response_model=List[SessionLogResponse])
-async def get_sessions(db: Session = Depends(get_db)):
-    """Fetches all session logs, ordered by most recent first."""
-    sessions = db.query(SessionLog).order_by(desc(SessionLog.created_at)).all()
-    return sessions
+@router.get("/sessions", response_model=SessionPage)
+async def get_sessions(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Lists session summaries, most recent first, one page at a time. Pass the
+    returned next_cursor to fetch the following page; full payloads come from
+    /sessions/{id}.
+    """
+    rows = _keyset_query(db, _summary_columns(), cursor).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+
+def _export_lines(full: bool, since: Optional[datetime]):
+    columns = [getattr(SessionLog, column.name) for column in SessionLog.__table__.columns] if full else _summary_columns()
+    db = SessionLocal()
+    try:
+        for row in _keyset_query(db, columns, since=since).yield_per(EXPORT_CHUNK_SIZE):
+            yield json.dumps(row._asdict(), ensure_ascii=False, default=str) + "\n"
+    finally:
+        db.close()
+
+@router.get("/sessions/export")
+async def export_sessions(full: bool = False, since: Optional[datetime] = None):
+    """Streams every session (or those created since ``since``) as NDJSON, most recent first."""
+    # The generator opens its own session: it runs after the request's dependencies are torn down.
+    return StreamingResponse(_export_lines(full, since), media_type="application/x-ndjson")
 
 @router.get("/sessions/{session_id}", response_model=SessionLogResponse)
 async def get_session(session_id: str, db: Session = Depends(get_db)):
@@ -63,6 +146,7 @@ async def create_session_log(session_data: SessionLogCreate, db: Session = Depen
         db_session_log = SessionLog(**session_data.dict())
         db.add(db_session_log)
         db.commit()
+        session_analytics.invalidate()
         db.refresh(db_session_log)
         return db_session_log
     except Exception as e:
@@ -86,6 +170,7 @@ async def update_session_evaluation(
 
     try:
         db.commit()
+        session_analytics.invalidate()
         db.refresh(session_log)
         log_evaluation_event(
             session_id=str(session_id),
@@ -47,6 +47,17 @@ async def play_stage():
     return {"status": "playing"}
 
 
+@router.post("/api/stage/prewarm")
+async def prewarm_stage():
+    """Synthesizes the whole timeline into the TTS audio cache ahead of playback."""
+    log_manager.info("[StageController] Prewarm request received.")
+    try:
+        summary = await director.prewarm_timeline("data/timeline.json")
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Timeline not found.")
+    return {"status": "prewarmed", **summary, "cache": tts_manager.cache_stats()}
+
+
 @router.post("/api/stage/stop")
 async def stop_stage():
     log_manager.info("[StageController] Stop request received.")
@@ -0,0 +1,15 @@
+"""Configuration version and reload counters from modules.config_service."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from modules.config_service import config_service
+
+router = APIRouter(tags=["System"], prefix="/system")
+
+
+@router.get("/config")
+def get_config_status() -> dict:
+    """Current config version plus per-source load time, reload and error counts."""
+    return config_service.status()
@@ -48,3 +48,8 @@ async def generate_tts_endpoint(payload: TTSRequest):
         "fallback_used": fallback_used,
         "error_code": error_code,
     }
+
+@router.get("/tts/cache")
+async def get_tts_cache_stats():
+    """Hit/miss counters and size of the on-disk TTS audio cache."""
+    return tts_manager.cache_stats()
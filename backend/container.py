@@ -1,12 +1,13 @@
 # path: backend/container.py
-# version: 1.0
+# version: 1.1
 """
 This module provides a centralized container for managing and injecting dependencies (services, managers)
 across the SSP application. It ensures that components are instantiated consistently
 and can be easily replaced for testing purposes.
 """
 import os
-from functools import lru_cache
+import threading
+from functools import wraps
 from qdrant_client import QdrantClient
 
 from orchestrator.context_manager import ContextManager
@@ -18,44 +19,64 @@ from orchestrator.feedback_loop_integration import FeedbackLoop
 from orchestrator.learner import Learner
 from orchestrator.impact_analyzer import ImpactAnalyzer
 from orchestrator.auto_repair_engine import AutoRepairEngine
+from orchestrator.meta_contract_engine import MetaContractEngine
 from modules.alert_dispatcher import AlertDispatcher
 from modules.auto_fix_executor import AutoFixExecutor
 from modules.log_manager import log_manager
 
-# Using lru_cache(maxsize=None) as a simple way to create singletons
-# The function will be executed only once, and its result will be cached.
+# Components are built once per process and shared by every request. The lock is
+# re-entrant because getters resolve their own dependencies through other getters.
+_singleton_lock = threading.RLock()
 
-@lru_cache(maxsize=None)
+
+def singleton(factory):
+    """Thread-safe replacement for lru_cache(maxsize=None) on zero-argument getters."""
+    instance = []
+
+    @wraps(factory)
+    def getter():
+        if instance:
+            return instance[0]
+        with _singleton_lock:
+            if not instance:
+                instance.append(factory())
+            return instance[0]
+
+    getter.cache_clear = instance.clear
+    return getter
+
+
+@singleton
 def get_qdrant_client() -> QdrantClient:
     log_manager.info("Initializing QdrantClient...")
     return QdrantClient(url=os.getenv("QDRANT_URL", "http://127.0.0.1:6333"))
 
-@lru_cache(maxsize=None)
+@singleton
 def get_context_manager() -> ContextManager:
     log_manager.info("Initializing ContextManager...")
     return ContextManager(history_path="logs/context_history.json")
 
-@lru_cache(maxsize=None)
+@singleton
 def get_contract_registry() -> ContractRegistry:
     log_manager.info("Initializing ContractRegistry...")
     return ContractRegistry()
 
-@lru_cache(maxsize=None)
+@singleton
 def get_recovery_policy_manager() -> RecoveryPolicyManager:
     log_manager.info("Initializing RecoveryPolicyManager...")
     return RecoveryPolicyManager()
 
-@lru_cache(maxsize=None)
+@singleton
 def get_insight_monitor() -> InsightMonitor:
     log_manager.info("Initializing InsightMonitor...")
     return InsightMonitor(get_context_manager(), get_recovery_policy_manager())
 
-@lru_cache(maxsize=None)
+@singleton
 def get_learner() -> Learner:
     log_manager.info("Initializing Learner...")
     return Learner(get_context_manager(), get_qdrant_client())
 
-@lru_cache(maxsize=None)
+@singleton
 def get_feedback_loop() -> FeedbackLoop:
     log_manager.info("Initializing FeedbackLoop...")
     return FeedbackLoop(
@@ -65,31 +86,38 @@ def get_feedback_loop() -> FeedbackLoop:
         get_recovery_policy_manager()
     )
 
-@lru_cache(maxsize=None)
+@singleton
 def get_alert_dispatcher() -> AlertDispatcher:
     log_manager.info("Initializing AlertDispatcher...")
     return AlertDispatcher()
 
-@lru_cache(maxsize=None)
+@singleton
 def get_auto_fix_executor() -> AutoFixExecutor:
     log_manager.info("Initializing AutoFixExecutor...")
     return AutoFixExecutor()
 
-@lru_cache(maxsize=None)
+@singleton
 def get_context_validator() -> ContextValidator:
     log_manager.info("Initializing ContextValidator...")
-    return ContextValidator(get_contract_registry())
+    return ContextValidator(get_context_manager(), get_contract_registry())
 
-@lru_cache(maxsize=None)
+@singleton
 def get_impact_analyzer() -> ImpactAnalyzer:
     log_manager.info("Initializing ImpactAnalyzer...")
     return ImpactAnalyzer(get_context_manager(), get_contract_registry())
 
-@lru_cache(maxsize=None)
+@singleton
 def get_auto_repair_engine() -> AutoRepairEngine:
     log_manager.info("Initializing AutoRepairEngine...")
     return AutoRepairEngine(get_context_manager())
 
+@singleton
+def get_meta_contract_engine() -> MetaContractEngine:
+    log_manager.info("Initializing MetaContractEngine...")
+    engine = MetaContractEngine()
+    engine.load_contracts()
+    return engine
+
 class AppContainer:
     """A central access point for all dependencies."""
     @property
@@ -140,5 +168,9 @@ class AppContainer:
     def auto_repair_engine(self) -> AutoRepairEngine:
         return get_auto_repair_engine()
 
+    @property
+    def meta_contract_engine(self) -> MetaContractEngine:
+        return get_meta_contract_engine()
+
 # Global container instance
 container = AppContainer()
@@ -1,5 +1,5 @@
 # path: backend/db/connection.py
-# version: v0.30
+# version: v0.31
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,7 +12,9 @@ from pathlib import Path # Add this import
 import json # Add this import
 from modules.config_manager import load_environment # Import the new function
 from modules.log_manager import log_manager # Import log_manager
-from backend.db.models import SessionLog, Sample, Base, DevLog, RoadmapItem, AwarenessSnapshot, InternalDialogue # Import SessionLog, Sample, Base, DevLog, and RoadmapItem models
+from backend.db import session_analytics
+from modules.continuum_feed import continuum_feed, entry_from_session_log
+from backend.db.models import SessionLog, Sample, Base, DevLog, RoadmapItem, AwarenessSnapshot, InternalDialogue, MetricsRollup # Import SessionLog, Sample, Base, DevLog, and RoadmapItem models
 
 # Load environment variables
 config = load_environment()
@@ -23,8 +25,20 @@ DATABASE_URL = (
     f"{config['POSTGRES_HOST']}:{config['POSTGRES_PORT']}/{config['POSTGRES_DB']}"
 )
 
+
+def pool_options() -> dict:
+    """Connection pool settings shared by every engine that talks to ssp_memory."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_POOL_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
 # Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+engine = create_engine(DATABASE_URL, **pool_options())
 
 # Create a SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -71,6 +85,8 @@ def save_session_to_db(session_log_dict: dict):
         
         db.merge(log_entry) # Use merge to handle both insert and update
         db.commit()
+        session_analytics.invalidate()
+        continuum_feed.publish(entry_from_session_log(model_data))
         log_manager.info(f"✅ セッションログをPostgreSQLに保存/更新しました (id={log_entry.id})")
     except Exception as e:
         db.rollback()
@@ -150,9 +166,12 @@ def update_session_logs_table():
             connection.execute(text("ALTER TABLE session_logs ADD COLUMN IF NOT EXISTS log_persist_failed INTEGER DEFAULT 0"))
             connection.execute(text("ALTER TABLE session_logs ADD COLUMN IF NOT EXISTS regeneration_attempts INTEGER DEFAULT 0"))
             connection.execute(text("ALTER TABLE session_logs ADD COLUMN IF NOT EXISTS regeneration_success BOOLEAN DEFAULT FALSE"))
+            connection.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_session_logs_created_at_id ON session_logs (created_at, id)"
+            ))
             # Commit the transaction to make the changes persistent
             connection.commit()
-            log_manager.info("Updated table session_logs with new columns.")
+            log_manager.info("Updated table session_logs with new columns and indexes.")
     except Exception as e:
         log_manager.exception(f"Failed to update session_logs table: {e}")
 
@@ -208,6 +227,14 @@ def ensure_internal_dialogue_table():
     except Exception as e:
         log_manager.exception(f"Failed to ensure internal_dialogues table: {e}")
 
+def ensure_metrics_rollup_table():
+    """Ensures the metrics_rollup table exists."""
+    try:
+        MetricsRollup.__table__.create(engine, checkfirst=True)
+        log_manager.info("Ensured metrics_rollup table exists.")
+    except Exception as e:
+        log_manager.exception(f"Failed to ensure metrics_rollup table: {e}")
+
 if __name__ == "__main__":
     log_manager.info("Running connection.py example usage.")
     test_connection()
@@ -216,3 +243,4 @@ if __name__ == "__main__":
     update_roadmap_items_table()
     ensure_awareness_snapshot_table()
     ensure_internal_dialogue_table()
+    ensure_metrics_rollup_table()
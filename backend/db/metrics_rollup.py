@@ -0,0 +1,265 @@
+# path: backend/db/metrics_rollup.py
+# version: v1.0
+"""Time-bucketed request metrics.
+
+Every request logged by the metrics middleware is folded into one per-minute and
+one per-hour row of ``metrics_rollup`` keyed by path, using additive upserts so
+concurrent workers never lose counts. Dashboards read any window back with a
+single ``GROUP BY date_trunc(...)`` query instead of scanning session_logs.
+"""
+
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+
+from backend.db.models import MetricsRollup, SessionLog
+from modules.log_manager import log_manager
+
+# (column, inclusive upper bound in ms); the last bucket is open-ended.
+LATENCY_BUCKETS = (
+    ("latency_le_100ms", 100),
+    ("latency_le_250ms", 250),
+    ("latency_le_500ms", 500),
+    ("latency_le_1000ms", 1000),
+    ("latency_le_2500ms", 2500),
+    ("latency_le_5000ms", 5000),
+    ("latency_gt_5000ms", None),
+)
+COUNTER_COLUMNS = ("count", "success", "latency_sum_ms", "regen_attempts", "regen_success", "log_persist_failed") + tuple(
+    column for column, _ in LATENCY_BUCKETS
+)
+
+# Rollup granularity each query bucket reads from.
+BUCKET_SOURCES = {"minute": "minute", "hour": "hour", "day": "hour"}
+BUCKET_STEPS = {"minute": timedelta(minutes=1), "hour": timedelta(hours=1), "day": timedelta(days=1)}
+_SQLITE_FORMATS = {"minute": "%Y-%m-%d %H:%M:00", "hour": "%Y-%m-%d %H:00:00", "day": "%Y-%m-%d 00:00:00"}
+
+MINUTE_RETENTION_HOURS = int(os.getenv("METRICS_ROLLUP_MINUTE_RETENTION_HOURS", "48"))
+_PRUNE_INTERVAL_SECONDS = 600
+_last_prune = 0.0
+
+
+def truncate(moment: datetime, bucket: str) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if bucket == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if bucket == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if bucket == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unsupported bucket: {bucket}")
+
+
+def _latency_column(latency_ms: int) -> str:
+    for column, bound in LATENCY_BUCKETS:
+        if bound is None or latency_ms <= bound:
+            return column
+    return LATENCY_BUCKETS[-1][0]
+
+
+def aggregate_samples(samples: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Folds request samples into rollup rows. A sample has created_at, path,
+    status_code, response_time_ms and optionally regeneration_attempts,
+    regeneration_success and log_persist_failed.
+    """
+    rows: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+    for sample in samples:
+        created_at = sample.get("created_at") or datetime.utcnow()
+        status_code = sample.get("status_code") or 0
+        latency_ms = int(sample.get("response_time_ms") or 0)
+        for granularity in ("minute", "hour"):
+            key = (granularity, truncate(created_at, granularity), sample.get("path") or "unknown")
+            row = rows.get(key)
+            if row is None:
+                row = {"granularity": key[0], "bucket_start": key[1], "path": key[2],
+                       "latency_min_ms": latency_ms, "latency_max_ms": latency_ms}
+                row.update({column: 0 for column in COUNTER_COLUMNS})
+                rows[key] = row
+            row["count"] += 1
+            row["success"] += 1 if 200 <= status_code < 400 else 0
+            row["latency_sum_ms"] += latency_ms
+            row["latency_min_ms"] = min(row["latency_min_ms"], latency_ms)
+            row["latency_max_ms"] = max(row["latency_max_ms"], latency_ms)
+            row[_latency_column(latency_ms)] += 1
+            row["regen_attempts"] += 1 if (sample.get("regeneration_attempts") or 0) > 0 else 0
+            row["regen_success"] += 1 if sample.get("regeneration_success") else 0
+            row["log_persist_failed"] += 1 if (sample.get("log_persist_failed") or 0) > 0 else 0
+    return list(rows.values())
+
+
+def _upsert_statement(dialect: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        least, greatest = func.least, func.greatest
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        # SQLite's two-argument min()/max() are scalar functions.
+        least, greatest = func.min, func.max
+    else:
+        return None
+    table = MetricsRollup.__table__
+    statement = insert(table)
+    excluded = statement.excluded
+    updates = {column: table.c[column] + excluded[column] for column in COUNTER_COLUMNS}
+    updates["latency_min_ms"] = least(func.coalesce(table.c.latency_min_ms, excluded.latency_min_ms), excluded.latency_min_ms)
+    updates["latency_max_ms"] = greatest(func.coalesce(table.c.latency_max_ms, excluded.latency_max_ms), excluded.latency_max_ms)
+    return statement.on_conflict_do_update(index_elements=["granularity", "bucket_start", "path"], set_=updates)
+
+
+def apply_samples(session, samples: Iterable[Dict[str, Any]]) -> int:
+    """Adds samples to the rollup inside ``session`` (the caller commits). Returns the rows touched."""
+    rows = aggregate_samples(samples)
+    if not rows:
+        return 0
+    statement = _upsert_statement(session.get_bind().dialect.name)
+    if statement is not None:
+        session.execute(statement, rows)
+    else:
+        # Dialects without ON CONFLICT: read-modify-write, adequate for a single writer.
+        for row in rows:
+            existing = session.get(MetricsRollup, (row["granularity"], row["bucket_start"], row["path"]))
+            if existing is None:
+                session.add(MetricsRollup(**row))
+                continue
+            for column in COUNTER_COLUMNS:
+                setattr(existing, column, getattr(existing, column) + row[column])
+            existing.latency_min_ms = min(existing.latency_min_ms, row["latency_min_ms"])
+            existing.latency_max_ms = max(existing.latency_max_ms, row["latency_max_ms"])
+    _maybe_prune(session)
+    return len(rows)
+
+
+def _maybe_prune(session):
+    global _last_prune
+    now = time.monotonic()
+    if now - _last_prune < _PRUNE_INTERVAL_SECONDS:
+        return
+    _last_prune = now
+    cutoff = datetime.utcnow() - timedelta(hours=MINUTE_RETENTION_HOURS)
+    session.query(MetricsRollup).filter(
+        MetricsRollup.granularity == "minute", MetricsRollup.bucket_start < cutoff
+    ).delete(synchronize_session=False)
+
+
+def _bucket_expression(session, bucket: str):
+    if session.get_bind().dialect.name == "sqlite":
+        return func.strftime(_SQLITE_FORMATS[bucket], MetricsRollup.bucket_start)
+    return func.date_trunc(bucket, MetricsRollup.bucket_start)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def query_buckets(session, start: datetime, end: datetime, bucket: str = "hour",
+                  path: Optional[str] = None) -> Dict[datetime, Dict[str, Any]]:
+    """Aggregates for every ``bucket`` in [start, end) that has data, in one query."""
+    if bucket not in BUCKET_SOURCES:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    bucket_expression = _bucket_expression(session, bucket).label("bucket")
+    columns = [func.sum(getattr(MetricsRollup, column)).label(column) for column in COUNTER_COLUMNS]
+    query = session.query(
+        bucket_expression,
+        *columns,
+        func.min(MetricsRollup.latency_min_ms).label("latency_min_ms"),
+        func.max(MetricsRollup.latency_max_ms).label("latency_max_ms"),
+    ).filter(
+        MetricsRollup.granularity == BUCKET_SOURCES[bucket],
+        MetricsRollup.bucket_start >= truncate(start, BUCKET_SOURCES[bucket]),
+        MetricsRollup.bucket_start < end,
+    )
+    if path:
+        query = query.filter(MetricsRollup.path.ilike(f"{path}%"))
+    results = {}
+    for row in query.group_by(bucket_expression).all():
+        data = row._asdict()
+        results[_as_datetime(data.pop("bucket"))] = {key: value or 0 for key, value in data.items()}
+    return results
+
+
+def latency_percentile(aggregate: Dict[str, Any], fraction: float) -> Optional[int]:
+    """Upper bound (ms) of the histogram bucket holding the given fraction of requests."""
+    count = aggregate.get("count") or 0
+    if not count:
+        return None
+    target = count * fraction
+    seen = 0
+    for column, bound in LATENCY_BUCKETS:
+        seen += aggregate.get(column) or 0
+        if seen >= target:
+            return bound if bound is not None else aggregate.get("latency_max_ms")
+    return aggregate.get("latency_max_ms")
+
+
+def route_normalizer(route_templates: Iterable[str]) -> Callable[[str], str]:
+    """
+    Maps a logged ``"METHOD /raw/path"`` to ``"METHOD /route/{template}"`` like the
+    metrics middleware does live. Templates are tried in order, as the router does;
+    paths matching none are kept as logged.
+    """
+    patterns = []
+    for template in route_templates:
+        regex = re.sub(
+            r"\\\{(\w+)(?::(\w+))?\\\}",
+            lambda match: ".+" if match.group(2) == "path" else "[^/]+",
+            re.escape(template),
+        )
+        patterns.append((re.compile(f"^{regex}$"), template))
+
+    def normalize(logged: str) -> str:
+        method, _, path = (logged or "").partition(" ")
+        for pattern, template in patterns:
+            if pattern.match(path):
+                return f"{method} {template}"
+        return logged
+
+    return normalize
+
+
+def _app_route_templates() -> List[str]:
+    from backend.main import app
+
+    return [route.path for route in app.routes if getattr(route, "path", None)]
+
+
+def backfill_from_session_logs(session, since: datetime, chunk_size: int = 5000,
+                               route_templates: Optional[Iterable[str]] = None) -> int:
+    """
+    Rebuilds the rollup from session_logs for rows created at or after ``since``
+    (e.g. after first deploying the rollup). Existing rollup rows in that range are replaced.
+    session_logs keeps the raw request path, so it is mapped back onto
+    ``route_templates`` (the backend app's routes by default) to match live rows.
+    """
+    normalize = route_normalizer(route_templates if route_templates is not None else _app_route_templates())
+    # Hour rows start at the top of the hour, so the whole first hour is replayed.
+    start = truncate(since, "hour")
+    session.query(MetricsRollup).filter(MetricsRollup.bucket_start >= start).delete(synchronize_session=False)
+    query = session.query(
+        SessionLog.created_at, SessionLog.user_input, SessionLog.status_code, SessionLog.response_time_ms,
+        SessionLog.regeneration_attempts, SessionLog.regeneration_success, SessionLog.log_persist_failed,
+    ).filter(SessionLog.created_at >= start, SessionLog.status_code.isnot(None))
+    batch, total = [], 0
+    for row in query.yield_per(chunk_size):
+        sample = row._asdict()
+        sample["path"] = normalize(sample.pop("user_input"))
+        batch.append(sample)
+        if len(batch) >= chunk_size:
+            apply_samples(session, batch)
+            total, batch = total + len(batch), []
+    if batch:
+        apply_samples(session, batch)
+        total += len(batch)
+    session.commit()
+    log_manager.info(f"[MetricsRollup] Backfilled {total} session logs since {start.isoformat()}.")
+    return total
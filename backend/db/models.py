@@ -1,6 +1,6 @@
 # path: backend/db/models.py
-# version: v0.30
-from sqlalchemy import Column, Integer, DateTime, Text, Float, JSON, String, Boolean # String をインポート
+# version: v0.31
+from sqlalchemy import Column, Index, Integer, BigInteger, DateTime, Text, Float, JSON, String, Boolean # String をインポート
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import ARRAY # Import ARRAY for PostgreSQL specific types
@@ -31,9 +31,39 @@ class SessionLog(Base):
     error_tag = Column(String, nullable=True)
     impact_level = Column(String, nullable=True)
 
+    # Keyset pagination in /api/sessions walks (created_at, id) backwards.
+    __table_args__ = (Index("ix_session_logs_created_at_id", "created_at", "id"),)
+
     def __repr__(self):
         return f"<SessionLog(id={self.id}, timestamp={self.created_at}, user_input='{self.user_input[:30]}...')>"
 
+class MetricsRollup(Base):
+    """Per-minute / per-hour request aggregates per path, maintained by backend.db.metrics_rollup."""
+    __tablename__ = "metrics_rollup"
+
+    granularity = Column(String(8), primary_key=True)  # "minute" or "hour"
+    bucket_start = Column(DateTime, primary_key=True)  # naive UTC, truncated to the granularity
+    path = Column(String, primary_key=True)  # "METHOD /route/template"
+    count = Column(Integer, nullable=False, default=0)
+    success = Column(Integer, nullable=False, default=0)
+    latency_sum_ms = Column(BigInteger, nullable=False, default=0)
+    latency_min_ms = Column(Integer, nullable=True)
+    latency_max_ms = Column(Integer, nullable=True)
+    # Latency histogram; bounds are backend.db.metrics_rollup.LATENCY_BUCKETS
+    latency_le_100ms = Column(Integer, nullable=False, default=0)
+    latency_le_250ms = Column(Integer, nullable=False, default=0)
+    latency_le_500ms = Column(Integer, nullable=False, default=0)
+    latency_le_1000ms = Column(Integer, nullable=False, default=0)
+    latency_le_2500ms = Column(Integer, nullable=False, default=0)
+    latency_le_5000ms = Column(Integer, nullable=False, default=0)
+    latency_gt_5000ms = Column(Integer, nullable=False, default=0)
+    regen_attempts = Column(Integer, nullable=False, default=0)
+    regen_success = Column(Integer, nullable=False, default=0)
+    log_persist_failed = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MetricsRollup({self.granularity} {self.bucket_start} {self.path} count={self.count})>"
+
 class Sample(Base):
     __tablename__ = "samples"
 
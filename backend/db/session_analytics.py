@@ -0,0 +1,189 @@
+# path: backend/db/session_analytics.py
+# version: v1.0
+"""Session analytics computed in SQL.
+
+Totals, score averages, emotion buckets and the per-day score series are each a
+single aggregate query over the needed columns only; large text columns are never
+loaded. Results are cached per window and dropped when a new session is saved
+(``invalidate()``), with a short TTL covering writers in other processes.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from sqlalchemy import and_, case, func
+
+from backend.db.models import SessionLog
+
+CACHE_TTL_SECONDS = float(os.getenv("SESSION_ANALYTICS_CACHE_TTL", "30"))
+CACHE_MAX_ENTRIES = 64
+
+_cache: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (generation, stored_at, value)
+_cache_lock = threading.Lock()
+_generation = 0
+
+
+def invalidate():
+    """Marks every cached result stale; call after inserting or updating session logs."""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _cache.clear()
+
+
+def cached(key: Hashable, compute: Callable[[], Any], ttl: float = None) -> Any:
+    """Returns the cached value for ``key`` if it was stored less than ``ttl`` seconds ago."""
+    ttl = CACHE_TTL_SECONDS if ttl is None else ttl
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0] == _generation and now - entry[1] < ttl:
+            _cache.move_to_end(key)
+            return entry[2]
+        generation = _generation
+    value = compute()
+    with _cache_lock:
+        # A session saved while computing makes this result stale; don't cache it.
+        if generation == _generation:
+            _cache[key] = (generation, now, value)
+            _cache.move_to_end(key)
+            while len(_cache) > CACHE_MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return value
+
+
+def _window(start: Optional[datetime], end: Optional[datetime]) -> List[Any]:
+    conditions = []
+    if start:
+        conditions.append(SessionLog.created_at >= start)
+    if end:
+        conditions.append(SessionLog.created_at <= end)
+    return conditions
+
+
+def _day_string(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()[:10]
+    return str(value)
+
+
+def score_totals(db, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+    """Session count, average score and emotion buckets for the window in one query."""
+    score = SessionLog.evaluation_score
+    row = db.query(
+        func.count(SessionLog.id),
+        func.avg(score),
+        func.sum(case((score >= 4.0, 1), else_=0)),
+        func.sum(case((and_(score >= 3.0, score < 4.0), 1), else_=0)),
+        func.sum(case((score < 3.0, 1), else_=0)),
+    ).filter(*_window(start, end)).one()
+    total, average, positive, neutral, negative = row
+    return {
+        "total_sessions": total or 0,
+        "average_score": round(float(average), 2) if average is not None else 0.0,
+        "emotion_summary": {"positive": positive or 0, "neutral": neutral or 0, "negative": negative or 0},
+    }
+
+
+def daily_series(db, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Per-day average score and count, with the day-over-day change from a LAG window."""
+    score = SessionLog.evaluation_score
+    day = func.date(SessionLog.created_at).label("day")
+    daily = (
+        db.query(day, func.avg(score).label("avg_score"), func.count(score).label("count"))
+        .filter(*_window(start, end), score.isnot(None), SessionLog.created_at.isnot(None))
+        .group_by(day)
+        .subquery()
+    )
+    rows = db.query(
+        daily.c.day,
+        daily.c.avg_score,
+        daily.c.count,
+        (daily.c.avg_score - func.lag(daily.c.avg_score).over(order_by=daily.c.day)).label("delta"),
+    ).order_by(daily.c.day)
+    return [
+        {
+            "date": _day_string(row.day),
+            "avg_score": round(float(row.avg_score), 3),
+            "count": row.count,
+            "delta": round(float(row.delta), 3) if row.delta is not None else None,
+        }
+        for row in rows
+    ]
+
+
+def _trend(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    trend_delta = 0.0
+    trend_direction = "flat"
+    if len(series) >= 2:
+        trend_delta = round(series[-1]["avg_score"] - series[-2]["avg_score"], 3)
+        if trend_delta > 0.01:
+            trend_direction = "up"
+        elif trend_delta < -0.01:
+            trend_direction = "down"
+    return {"delta": trend_delta, "direction": trend_direction}
+
+
+def session_summary(db, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Any]:
+    """Same shape as backend.api.session_summary.build_session_summary, plus emotion_summary."""
+    totals = score_totals(db, start, end)
+    series = daily_series(db, start, end)
+    return {
+        "total_sessions": totals["total_sessions"],
+        "average_score": totals["average_score"],
+        "series": series,
+        "trend": _trend(series),
+        "emotion_summary": totals["emotion_summary"],
+    }
+
+
+def recent_sessions(db, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    limit: int = 10) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(SessionLog.id, SessionLog.created_at, SessionLog.evaluation_score, SessionLog.evaluation_comment)
+        .filter(*_window(start, end))
+        .order_by(SessionLog.created_at.desc().nullslast())
+        .limit(limit)
+    )
+    return [
+        {
+            "id": row.id,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "score": row.evaluation_score,
+            "comment": row.evaluation_comment,
+        }
+        for row in rows
+    ]
+
+
+def recent_scores(db, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  limit: int = 1000) -> List[float]:
+    """The latest ``limit`` scores in chronological order."""
+    rows = (
+        db.query(SessionLog.evaluation_score)
+        .filter(*_window(start, end), SessionLog.evaluation_score.isnot(None))
+        .order_by(SessionLog.created_at.desc().nullslast())
+        .limit(limit)
+        .all()
+    )
+    return [float(row[0]) for row in reversed(rows)]
+
+
+def evaluation_comments(db, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                        limit: int = 1000, newest: bool = True) -> List[str]:
+    """Non-empty evaluation comments in chronological order: the latest (or earliest) ``limit``."""
+    comment = SessionLog.evaluation_comment
+    order = SessionLog.created_at.desc().nullslast() if newest else SessionLog.created_at.asc().nullsfirst()
+    rows = (
+        db.query(comment)
+        .filter(*_window(start, end), comment.isnot(None), comment != "")
+        .order_by(order)
+        .limit(limit)
+        .all()
+    )
+    comments = [row[0] for row in rows]
+    return comments[::-1] if newest else comments
@@ -4,16 +4,20 @@ from __future__ import annotations
 
 import time
 import asyncio
+from datetime import datetime
 from typing import Optional
 
 from fastapi import FastAPI
 from starlette.requests import Request
 from starlette.responses import Response
 
-from backend.db.connection import SessionLocal, update_session_logs_table
-from backend.db.models import SessionLog
+from backend.db.connection import SessionLocal, ensure_metrics_rollup_table, update_session_logs_table
+from backend.middleware.metrics_writer import MetricsWriter, new_request_id
 from modules.log_manager import log_manager
 
+# Rows are written in batches off the request path; see backend.middleware.metrics_writer.
+metrics_writer = MetricsWriter(SessionLocal)
+
 
 
 def _classify_error_tag(status_code: int, exception: Optional[Exception]) -> Optional[str]:
@@ -38,6 +42,9 @@ def _determine_impact_level(status_code: int, error_tag: Optional[str]) -> str:
 
 def setup_metrics_middleware(app: FastAPI) -> None:
     update_session_logs_table()
+    ensure_metrics_rollup_table()
+    app.state.metrics_writer = metrics_writer
+    app.add_event_handler("shutdown", metrics_writer.close)
 
     @app.middleware("http")
     async def metrics_logger(request: Request, call_next):
@@ -66,21 +73,22 @@ def setup_metrics_middleware(app: FastAPI) -> None:
 
             error_tag = _classify_error_tag(status_code, exception)
             impact_level = _determine_impact_level(status_code, error_tag)
-            try:
-                with SessionLocal() as session:
-                    log_entry = SessionLog(
-                        id=f"req-{int(time.time() * 1000)}",
-                        user_input=f"{request.method} {request.url.path}",
-                        final_output=str(status_code),
-                        status_code=status_code,
-                        response_time_ms=duration_ms,
-                        log_persist_failed=0,
-                        regeneration_attempts=1 if regen_flag else 0,
-                        regeneration_success=bool(regen_flag and success),
-                        error_tag=error_tag,
-                        impact_level=impact_level,
-                    )
-                    session.merge(log_entry)
-                    session.commit()
-            except Exception as exc:  # pragma: no cover
-                log_manager.error("Failed to persist metrics log", exc_info=exc)
+            # Roll up by route template so /api/chat/{job_id} polling stays one series.
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", None) or request.url.path
+            metrics_writer.submit(
+                {
+                    "id": new_request_id(),
+                    "created_at": datetime.utcnow(),
+                    "user_input": f"{request.method} {request.url.path}",
+                    "final_output": str(status_code),
+                    "status_code": status_code,
+                    "response_time_ms": duration_ms,
+                    "log_persist_failed": 0,
+                    "regeneration_attempts": 1 if regen_flag else 0,
+                    "regeneration_success": bool(regen_flag and success),
+                    "error_tag": error_tag,
+                    "impact_level": impact_level,
+                },
+                rollup_path=f"{request.method} {route_path}",
+            )
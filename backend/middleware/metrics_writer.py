@@ -0,0 +1,165 @@
+"""Batched background writer for request metrics.
+
+The metrics middleware hands each request's row to ``MetricsWriter.submit``,
+which only appends to a bounded queue. A background thread drains the queue and
+writes each batch with one executemany INSERT into session_logs plus one rollup
+upsert, in a single transaction. When the queue is full the row is dropped and
+counted rather than slowing the request down. Closing sets a stop flag: rows
+accepted before it are still written, later ones are rejected, and close never
+blocks on a full queue.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import insert
+
+from backend.db.metrics_rollup import apply_samples
+from backend.db.models import SessionLog
+from modules.log_manager import log_manager
+
+QUEUE_SIZE = int(os.getenv("METRICS_QUEUE_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("METRICS_BATCH_SIZE", "500"))
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "1.0"))
+# Seconds an idle writer waits before re-checking the stop flag.
+_IDLE_POLL_SECONDS = 0.1
+
+
+def new_request_id() -> str:
+    """Time-ordered and collision-free across threads and workers."""
+    return f"req-{int(time.time() * 1000)}-{uuid.uuid4().hex[:12]}"
+
+
+class MetricsWriter:
+    def __init__(self, session_factory: Callable, queue_size: int = None, batch_size: int = None,
+                 flush_interval: float = None):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size or BATCH_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else FLUSH_INTERVAL
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size or QUEUE_SIZE))
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # Held across the stop check and the enqueue so no row lands after close().
+        self._submit_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._counters = {"submitted": 0, "dropped": 0, "written": 0, "failed": 0, "batches": 0}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._counters_lock:
+            self._counters[name] += amount
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def submit(self, row: Dict[str, Any], rollup_path: str = None) -> bool:
+        """
+        Queues one session_logs row (a dict of SessionLog columns). ``rollup_path``
+        is the key the request is rolled up under. Returns False if it was dropped.
+        """
+        with self._submit_lock:
+            if self._stop.is_set():
+                self._count("dropped")
+                return False
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait((row, rollup_path or row.get("user_input")))
+            except queue.Full:
+                self._count("dropped")
+                return False
+            self._count("submitted")
+        return True
+
+    def _next_batch(self) -> List:
+        """Waits briefly for the first item, then collects up to batch_size within flush_interval."""
+        try:
+            batch = [self._queue.get(timeout=_IDLE_POLL_SECONDS)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            elif self._stop.is_set():
+                # Nothing is queued after the stop flag is set, so an empty poll means drained.
+                return
+
+    def _write(self, items: List):
+        rows = [row for row, _ in items]
+        samples = [
+            {
+                "created_at": row.get("created_at"),
+                "path": rollup_path,
+                "status_code": row.get("status_code"),
+                "response_time_ms": row.get("response_time_ms"),
+                "regeneration_attempts": row.get("regeneration_attempts"),
+                "regeneration_success": row.get("regeneration_success"),
+            }
+            for row, rollup_path in items
+        ]
+        try:
+            with self.session_factory() as session:
+                # Plain multi-row INSERT: ids are unique, so merge's per-row SELECT is not needed.
+                session.execute(insert(SessionLog.__table__), rows)
+                apply_samples(session, samples)
+                session.commit()
+        except Exception as exc:
+            self._count("failed", len(rows))
+            log_manager.error(f"[MetricsWriter] Failed to write {len(rows)} metric rows", exc_info=exc)
+            return
+        self._count("written", len(rows))
+        self._count("batches")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Waits until every row queued so far has been written (or failed)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._counters_lock:
+                settled = self._counters["written"] + self._counters["failed"]
+                submitted = self._counters["submitted"]
+            if settled >= submitted:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 10.0):
+        """Stops accepting rows and drains the queue; called on app shutdown and at exit."""
+        with self._submit_lock:
+            if self._stop.is_set():
+                return
+            self._stop.set()
+        if self._thread is None:
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            log_manager.warning(f"[MetricsWriter] Shutdown timed out with ~{self._queue.qsize()} rows unwritten.")
+
+    def stats(self) -> Dict[str, int]:
+        with self._counters_lock:
+            counters = dict(self._counters)
+        counters["queued"] = self._queue.qsize()
+        counters["capacity"] = self._queue.maxsize
+        return counters
@@ -0,0 +1,207 @@
+"""Fan-out of pre-encoded frames to WebSocket subscribers.
+
+A topic encodes each payload once and puts the same string on every subscriber's
+bounded queue. A subscriber that falls behind loses its oldest frames; one that
+stays full for ``BROADCAST_MAX_CONSECUTIVE_DROPS`` frames in a row is cut off.
+``SampledTopic`` runs a single sampling task per topic, only while someone is
+subscribed, and replaces unchanged payloads with a small delta frame.
+``Topic.stream`` serves one client and also returns as soon as that client
+disconnects, even if the topic has nothing to send.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from modules.log_manager import log_manager
+
+QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "32"))
+MAX_CONSECUTIVE_DROPS = int(os.getenv("BROADCAST_MAX_CONSECUTIVE_DROPS", "64"))
+
+_CLOSED = None  # queue sentinel: the subscription was cut off
+
+
+def encode(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class Subscription:
+    def __init__(self, topic: "Topic", queue_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, queue_size))
+        self.dropped = 0
+        self.consecutive_drops = 0
+        self.closed = False
+        self.cut_off = False
+
+    def offer(self, frame: str) -> bool:
+        """Queues a frame without waiting; returns False once the subscriber has been cut off."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            pass
+        self.dropped += 1
+        self.consecutive_drops += 1
+        if self.consecutive_drops > MAX_CONSECUTIVE_DROPS:
+            self.cut_off = True
+            self.close()
+            return False
+        self.queue.get_nowait()  # drop the oldest frame; the newest state matters most
+        self.queue.put_nowait(frame)
+        return True
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(_CLOSED)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while True:
+            frame = await self.queue.get()
+            if frame is _CLOSED:
+                return
+            self.consecutive_drops = 0
+            yield frame
+
+
+class Topic:
+    """Push topic: ``publish`` encodes once and fans out to every subscriber."""
+
+    def __init__(self, name: str, queue_size: int = None):
+        self.name = name
+        self.queue_size = queue_size or QUEUE_SIZE
+        self.subscribers: List[Subscription] = []
+        # Latest full frame per key, replayed to new subscribers so they never start from a delta.
+        self._snapshot: Dict[str, str] = {}
+        self._counters = {"published": 0, "sent": 0, "dropped": 0, "cut_off": 0}
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.queue_size)
+        for frame in self._snapshot.values():
+            subscription.offer(frame)
+        self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscribers:
+            self.subscribers.remove(subscription)
+            self._counters["dropped"] += subscription.dropped
+
+    def publish(self, payload: Dict[str, Any], key: str = None) -> str:
+        frame = encode(payload)
+        self._snapshot[key or payload.get("type") or ""] = frame
+        self.publish_frame(frame)
+        return frame
+
+    def publish_frame(self, frame: str):
+        self._counters["published"] += 1
+        for subscription in list(self.subscribers):
+            if subscription.offer(frame):
+                self._counters["sent"] += 1
+            elif subscription.closed:
+                self.unsubscribe(subscription)
+                if subscription.cut_off:
+                    self._counters["cut_off"] += 1
+                    log_manager.warning(f"[BroadcastHub] Cut off slow subscriber on '{self.name}'.")
+
+    async def stream(self, send: Callable[[str], Awaitable[Any]], disconnected: Awaitable[Any]) -> bool:
+        """
+        Subscribes one client and forwards frames to ``send`` until ``disconnected``
+        completes (returns True) or the hub cuts the client off (returns False). The
+        subscription is always released, also for a client that leaves while the
+        topic is silent.
+        """
+        subscription = self.subscribe()
+        watcher = asyncio.ensure_future(disconnected)
+
+        def on_disconnect(task: asyncio.Future):
+            if not task.cancelled():
+                task.exception()  # a receive error also means the client is gone
+            subscription.close()
+
+        watcher.add_done_callback(on_disconnect)
+        try:
+            async for frame in subscription:
+                await send(frame)
+            return not subscription.cut_off
+        finally:
+            watcher.remove_done_callback(on_disconnect)
+            watcher.cancel()
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscribers),
+            "queued": sum(subscription.queue.qsize() for subscription in self.subscribers),
+            **self._counters,
+            "dropped": self._counters["dropped"] + sum(subscription.dropped for subscription in self.subscribers),
+        }
+
+
+class SampledTopic(Topic):
+    """
+    ``sample()`` returns the payloads for one tick (each with a "type"); it runs
+    every ``interval`` seconds in one task shared by all subscribers. A payload
+    equal to the previous one, ignoring its timestamp, goes out as
+    ``{"type", "unchanged": true, "timestamp"}`` when ``delta_frames`` is set and
+    is skipped otherwise.
+    """
+
+    def __init__(self, name: str, sample: Callable[[], Awaitable[List[Dict[str, Any]]]], interval: float,
+                 delta_frames: bool = True, queue_size: int = None):
+        super().__init__(name, queue_size)
+        self.sample = sample
+        self.interval = interval
+        self.delta_frames = delta_frames
+        self._previous: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._counters.update({"samples": 0, "unchanged": 0, "sample_errors": 0})
+
+    def subscribe(self) -> Subscription:
+        subscription = super().subscribe()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        super().unsubscribe(subscription)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def publish_sample(self, payload: Dict[str, Any]):
+        key = payload.get("type") or ""
+        content = {field: value for field, value in payload.items() if field != "timestamp"}
+        if self._previous.get(key) == content:
+            self._counters["unchanged"] += 1
+            if self.delta_frames:
+                self.publish_frame(encode({"type": key, "unchanged": True, "timestamp": payload.get("timestamp")}))
+            return
+        self._previous[key] = content
+        self.publish(payload, key)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while self.subscribers:
+            try:
+                payloads = await self.sample()
+                self._counters["samples"] += 1
+                for payload in payloads:
+                    self.publish_sample(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._counters["sample_errors"] += 1
+                log_manager.error(f"[BroadcastHub] Sampling '{self.name}' failed: {exc}", exc_info=True)
+            next_tick += self.interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
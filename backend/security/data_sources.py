@@ -9,6 +9,8 @@ from typing import Dict, List, Tuple
 
 from modules.distributed_recovery_manager import manager as recovery_manager
 from modules.akashic_sync_manager import manager as akashic_manager
+from modules.event_log import EventLog
+from orchestrator.context_history import load_history_entries
 
 CONTEXT_HISTORY_PATH = Path("logs/context_history.json")
 META_REGISTRY_PATH = Path("contracts/meta/meta_registry.json")
@@ -38,17 +40,11 @@ def _parse_timestamp(value: str | None) -> datetime | None:
 
 
 def _load_context_entries(limit: int = 120) -> List[dict]:
-    data = _read_json(CONTEXT_HISTORY_PATH)
-    if not isinstance(data, list):
-        return []
-    return data[-limit:]
+    return load_history_entries(CONTEXT_HISTORY_PATH, limit=limit)
 
 
 def _load_predictive_actions(limit: int = 50) -> List[dict]:
-    data = _read_json(PREDICTIVE_CORRECTION_PATH)
-    if not isinstance(data, list):
-        return []
-    return data[-limit:]
+    return EventLog.for_path(str(PREDICTIVE_CORRECTION_PATH)).tail(limit)
 
 
 def _load_meta_registry() -> dict:
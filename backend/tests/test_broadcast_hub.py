@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+from backend.modules import broadcast_hub
+from backend.modules.broadcast_hub import SampledTopic, Topic
+
+
+def test_frames_are_encoded_once_and_shared():
+    async def scenario():
+        topic = Topic("t")
+        first, second = topic.subscribe(), topic.subscribe()
+        frame = topic.publish({"type": "x", "value": 1})
+        return first.queue.get_nowait(), second.queue.get_nowait(), frame
+
+    a, b, frame = asyncio.run(scenario())
+    assert a is b is frame
+
+
+def test_slow_subscriber_drops_oldest_then_is_cut_off(monkeypatch):
+    monkeypatch.setattr(broadcast_hub, "MAX_CONSECUTIVE_DROPS", 3)
+
+    async def scenario():
+        topic = Topic("t", queue_size=2)
+        slow = topic.subscribe()
+        for value in range(4):
+            topic.publish({"type": "x", "value": value})
+        kept = [json.loads(slow.queue.get_nowait())["value"] for _ in range(2)]
+        for value in range(4, 8):
+            topic.publish({"type": "x", "value": value})
+        return kept, slow, topic
+
+    kept, slow, topic = asyncio.run(scenario())
+    assert kept == [2, 3]
+    assert slow.closed
+    assert topic.stats()["subscribers"] == 0
+    assert topic.stats()["cut_off"] == 1
+
+
+def test_sampled_topic_shares_one_producer_and_sends_deltas():
+    calls = []
+
+    async def sample():
+        calls.append(1)
+        return [{"type": "state", "value": 1, "timestamp": len(calls)}]
+
+    async def scenario():
+        topic = SampledTopic("s", sample, interval=0.01)
+        subscriptions = [topic.subscribe() for _ in range(3)]
+        frames = []
+        iterator = subscriptions[0].__aiter__()
+        for _ in range(3):
+            frames.append(json.loads(await iterator.__anext__()))
+        for subscription in subscriptions:
+            topic.unsubscribe(subscription)
+        await asyncio.sleep(0.05)
+        return topic, frames
+
+    topic, frames = asyncio.run(scenario())
+    assert frames[0]["value"] == 1
+    assert frames[1] == {"type": "state", "unchanged": True, "timestamp": 2}
+    # One sample per tick regardless of subscriber count, and none after the last one left.
+    assert topic.stats()["samples"] == len(calls) <= 4
+    assert topic._task is None
+
+
+def test_late_subscriber_starts_from_the_latest_full_frame():
+    async def scenario():
+        topic = Topic("t")
+        topic.publish({"type": "a", "value": 1})
+        topic.publish({"type": "b", "value": 2})
+        topic.publish({"type": "a", "value": 3})
+        late = topic.subscribe()
+        return [json.loads(late.queue.get_nowait()) for _ in range(late.queue.qsize())]
+
+    assert asyncio.run(scenario()) == [{"type": "a", "value": 3}, {"type": "b", "value": 2}]
+
+
+def test_client_leaving_a_silent_topic_is_released():
+    async def sample():
+        return [{"type": "emotion", "joy": 0.5}]  # never changes
+
+    async def scenario():
+        # Like /ws/emotion: unchanged payloads are skipped, so nothing is sent after the first frame.
+        topic = SampledTopic("emotion", sample, interval=0.01, delta_frames=False)
+        sent = []
+        gone = asyncio.Event()
+        client = asyncio.get_running_loop().create_task(topic.stream(_async_append(sent), gone.wait()))
+        await asyncio.sleep(0.05)
+        assert topic.stats()["subscribers"] == 1
+        gone.set()
+        disconnected = await asyncio.wait_for(client, timeout=1)
+        await asyncio.sleep(0.02)
+        return topic, sent, disconnected
+
+    topic, sent, disconnected = asyncio.run(scenario())
+    assert disconnected is True
+    assert len(sent) == 1
+    assert topic.stats()["subscribers"] == 0
+    assert topic.stats()["cut_off"] == 0
+    assert topic._task is None
+
+
+def test_stream_reports_a_cut_off_client(monkeypatch):
+    monkeypatch.setattr(broadcast_hub, "MAX_CONSECUTIVE_DROPS", 1)
+
+    async def scenario():
+        topic = Topic("t", queue_size=1)
+        stuck = asyncio.Event()
+
+        async def send(frame):
+            await stuck.wait()
+
+        client = asyncio.get_running_loop().create_task(topic.stream(send, asyncio.Event().wait()))
+        await asyncio.sleep(0)
+        for value in range(4):
+            topic.publish({"type": "x", "value": value})
+        stuck.set()
+        return topic, await asyncio.wait_for(client, timeout=1)
+
+    topic, disconnected = asyncio.run(scenario())
+    assert disconnected is False
+    assert topic.stats()["subscribers"] == 0
+    assert topic.stats()["cut_off"] == 1
+
+
+def _async_append(target):
+    async def send(frame):
+        target.append(frame)
+    return send
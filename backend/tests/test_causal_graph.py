@@ -0,0 +1,53 @@
+import json
+
+from modules.causal_graph import CausalEvent, CausalGraph
+
+
+def _event(event_id, parents=()):
+    return CausalEvent(event_id, "test", "", f"{event_id} update", list(parents), {}, [], {}, 0.5, {})
+
+
+def test_orphans_are_resolved_when_the_parent_arrives(tmp_path):
+    graph = CausalGraph(tmp_path / "causal_graph.json")
+    graph.add_events([_event("child", ["root", "other"]), _event("other")])
+    assert graph.orphans() == ["child"]
+    assert graph.missing_parents("child") == ["root"]
+
+    graph.add_event(_event("root"))
+
+    assert graph.orphans() == []
+    assert graph.children_of("root") == ["child"]
+    assert graph.stats() == {"total_nodes": 3, "total_edges": 2, "orphan_count": 0, "missing_parent_ids": 0}
+
+
+def test_replacing_an_event_reindexes_its_parents(tmp_path):
+    graph = CausalGraph(tmp_path / "causal_graph.json")
+    graph.add_events([_event("a"), _event("b", ["a"])])
+    graph.add_event(_event("b", ["gone"]))
+
+    assert graph.children_of("a") == []
+    assert graph.orphans() == ["b"]
+    assert graph.stats()["total_edges"] == 1
+
+
+def test_append_log_reloads_after_legacy_json(tmp_path):
+    legacy = tmp_path / "causal_graph.json"
+    legacy.write_text(json.dumps({"old": {"type": "legacy", "parents": []}}), encoding="utf-8")
+    graph = CausalGraph(legacy)
+    graph.add_event(_event("new", ["old"]))
+
+    reloaded = CausalGraph(legacy)
+    assert [event.event_id for event in reloaded.list_events()] == ["old", "new"]
+    assert reloaded.orphans() == []
+    assert json.loads(legacy.read_text(encoding="utf-8")) == {"old": {"type": "legacy", "parents": []}}
+    assert len((tmp_path / "causal_graph.events.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_walk_and_recent_ids(tmp_path):
+    graph = CausalGraph(tmp_path / "causal_graph.json")
+    graph.add_events([_event("a"), _event("b", ["a"]), _event("c", ["b"]), _event("d", ["c"])])
+
+    assert [event.event_id for event in graph.walk("d", depth=2)] == ["d", "c", "b"]
+    assert [event.event_id for event in graph.walk("a", depth=5, direction="children")] == ["a", "b", "c", "d"]
+    assert graph.recent_event_ids(2) == ["c", "d"]
+    assert graph.walk("missing") == []
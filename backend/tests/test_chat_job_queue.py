@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from orchestrator.context_manager import ContextManager
+from orchestrator.cycle_progress import report_stage
+from orchestrator.job_queue import JobQueue, QueueFullError
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_job_reports_stages_and_result():
+    def handler(text):
+        report_stage("rag", context="ctx")
+        report_stage("generator", answer=text.upper())
+        return text.upper()
+
+    jobs = JobQueue(handler, max_workers=1, max_pending=2)
+    job = jobs.submit("hello")
+    _wait_for(lambda: job.done)
+
+    assert job.status == "completed"
+    assert job.result == "HELLO"
+    assert [event["stage"] for event in job.events] == ["queued", "started", "rag", "generator", "completed"]
+    assert [event["seq"] for event in job.events] == list(range(5))
+    jobs.shutdown()
+
+
+def test_full_backlog_raises_and_failures_are_recorded():
+    release = threading.Event()
+
+    def handler(text):
+        release.wait(2)
+        if text == "boom":
+            raise RuntimeError("generator down")
+        return text
+
+    jobs = JobQueue(handler, max_workers=1, max_pending=1)
+    running = jobs.submit("boom")
+    _wait_for(lambda: running.status == "running")
+    jobs.submit("waiting")
+    with pytest.raises(QueueFullError):
+        jobs.submit("rejected")
+
+    release.set()
+    _wait_for(lambda: running.done)
+    assert running.status == "failed"
+    assert running.error == "generator down"
+    jobs.shutdown()
+
+
+def test_subscriber_receives_live_events():
+    gate = threading.Event()
+
+    def handler(text):
+        gate.wait(2)
+        report_stage("evaluator", score=0.9)
+        return text
+
+    jobs = JobQueue(handler, max_workers=1, max_pending=1)
+
+    async def consume():
+        job = jobs.submit("hi")
+        backlog, events = job.subscribe(asyncio.get_running_loop())
+        gate.set()
+        stages = [event["stage"] for event in backlog]
+        while "completed" not in stages:
+            stages.append((await asyncio.wait_for(events.get(), timeout=2))["stage"])
+        job.unsubscribe(events)
+        return stages
+
+    stages = asyncio.run(consume())
+    assert stages[0] == "queued"
+    assert stages[-2:] == ["evaluator", "completed"]
+    jobs.shutdown()
+
+
+def test_default_is_a_single_worker(monkeypatch):
+    monkeypatch.delenv("CHAT_JOB_WORKERS", raising=False)
+    assert JobQueue(lambda text: text).max_workers == 1
+
+
+def test_concurrent_jobs_keep_their_own_cycle_results():
+    manager = ContextManager()
+    both_running = threading.Barrier(2, timeout=2)
+
+    def handler(text):
+        # Mirrors run_context_evolution_cycle: generator, evaluator, then final answer.
+        with manager.request_scope():
+            manager.set("mid_term.generated_output", f"answer to {text}", reason="test")
+            both_running.wait()
+            manager.set("mid_term.evaluation_score", float(len(text)), reason="test")
+            both_running.wait()
+            manager.set("mid_term.final_answer", manager.get("mid_term.generated_output"), reason="test")
+            return manager.get("mid_term.final_answer"), manager.get("mid_term.evaluation_score")
+
+    jobs = JobQueue(handler, max_workers=2, max_pending=2)
+    first, second = jobs.submit("hi"), jobs.submit("hello")
+    _wait_for(lambda: first.done and second.done)
+
+    assert first.result == ("answer to hi", 2.0)
+    assert second.result == ("answer to hello", 5.0)
+    jobs.shutdown()
+
+
+def test_reported_error_stage_fails_the_job():
+    def handler(text):
+        # run_context_evolution_cycle catches its own exceptions and returns None.
+        report_stage("error", error="boom")
+        return None
+
+    jobs = JobQueue(handler, max_workers=1, max_pending=1)
+    job = jobs.submit("x")
+    _wait_for(lambda: job.done)
+
+    assert job.status == "failed"
+    assert job.error == "boom"
+    jobs.shutdown()
+
+
+def test_shutdown_with_a_full_backlog_cancels_waiting_jobs_without_blocking():
+    started, release = threading.Event(), threading.Event()
+
+    def handler(text):
+        started.set()
+        release.wait(5)
+        return text
+
+    jobs = JobQueue(handler, max_workers=1, max_pending=2)
+    running = jobs.submit("running")
+    assert started.wait(2)
+    waiting = [jobs.submit("a"), jobs.submit("b")]
+
+    began = time.monotonic()
+    jobs.shutdown()
+    assert time.monotonic() - began < 1
+
+    assert [job.status for job in waiting] == ["cancelled", "cancelled"]
+    assert waiting[0].events[-1]["stage"] == "cancelled"
+    with pytest.raises(QueueFullError):
+        jobs.submit("late")
+    release.set()
+    _wait_for(lambda: running.done)
+    assert running.status == "completed"
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+from modules.config_service import ConfigService, _parse_persona, _read_json, thaw
+
+
+def _write(path, data, mtime=None):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_sources_are_parsed_once_and_reloaded_on_change(tmp_path):
+    params_path = tmp_path / "model_params.json"
+    _write(params_path, {"temperature": 0.5}, mtime=1_000_000)
+    parses = []
+
+    def parse(path):
+        parses.append(path)
+        return _read_json(path)
+
+    service = ConfigService(check_interval=0)
+    service.register("model_params", str(params_path), parse, {})
+
+    assert service.get("model_params")["temperature"] == 0.5
+    assert service.get("model_params")["temperature"] == 0.5
+    assert len(parses) == 1
+    version = service.version
+
+    _write(params_path, {"temperature": 0.9, "response_format": {"type": "json"}}, mtime=1_000_010)
+    params = service.get("model_params")
+
+    assert params["temperature"] == 0.9
+    assert service.version == version + 1
+    assert service.status()["sources"]["model_params"]["reloads"] == 2
+    with pytest.raises(TypeError):
+        params["temperature"] = 1.0
+    assert json.dumps(thaw(params))  # thawed copies are plain JSON again
+
+
+def test_unreadable_file_keeps_last_good_value(tmp_path):
+    persona_path = tmp_path / "persona_profile.json"
+    _write(persona_path, {"traits": {"empathy": 0.5}}, mtime=1_000_000)
+    service = ConfigService(check_interval=0)
+    service.register("persona", str(persona_path), _parse_persona, {"traits": {}, "prompt_prefix": ""})
+    assert service.get("persona")["prompt_prefix"] == "[Personality traits: empathy:0.5]\n"
+
+    persona_path.write_text("{not json", encoding="utf-8")
+    os.utime(persona_path, (1_000_010, 1_000_010))
+
+    assert service.get("persona")["traits"]["empathy"] == 0.5
+    assert service.status()["sources"]["persona"]["errors"] == 1
+
+
+def test_check_interval_defers_stat_until_invalidated(tmp_path):
+    params_path = tmp_path / "model_params.json"
+    _write(params_path, {"top_p": 0.9}, mtime=1_000_000)
+    service = ConfigService(check_interval=3600)
+    service.register("model_params", str(params_path), _read_json, {})
+    service.get("model_params")
+
+    _write(params_path, {"top_p": 0.5}, mtime=1_000_010)
+    assert service.get("model_params")["top_p"] == 0.9
+
+    service.invalidate("model_params")
+    assert service.get("model_params")["top_p"] == 0.5
+
+
+def test_missing_file_yields_default(tmp_path):
+    service = ConfigService(check_interval=0)
+    service.register("model_params", str(tmp_path / "absent.json"), _read_json, {"temperature": 0.7})
+
+    assert dict(service.get("model_params")) == {"temperature": 0.7}
+    assert service.status()["sources"]["model_params"]["present"] is False
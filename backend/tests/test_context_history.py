@@ -0,0 +1,51 @@
+import json
+
+from orchestrator import context_history
+from orchestrator.context_history import ContextHistory, load_history_entries
+
+
+def test_record_change_appends_without_rewriting_compacted_file(tmp_path):
+    history_path = tmp_path / "context_history.json"
+    history_path.write_text(json.dumps([{"layer": "long_term", "key": "seed", "new_value": 1}]), encoding="utf-8")
+    before = history_path.stat().st_mtime_ns
+
+    history = ContextHistory(history_path=str(history_path))
+    history.record_change("short_term", "prompt", None, "hello", "test")
+    history.record_change("mid_term", "final_answer", None, "hi", "test")
+
+    assert history_path.stat().st_mtime_ns == before
+    entries = load_history_entries(history_path)
+    assert [entry["key"] for entry in entries] == ["seed", "prompt", "final_answer"]
+    assert load_history_entries(history_path, limit=1)[0]["key"] == "final_answer"
+
+
+def test_get_timeline_uses_layer_key_index(tmp_path):
+    history = ContextHistory(history_path=str(tmp_path / "history.json"))
+    for value in range(3):
+        history.record_change("short_term", "prompt", None, value, "test")
+        history.record_change("mid_term", "prompt", None, value, "test")
+    history.record_event("cycle_done", {"ok": True})
+
+    assert [entry["new_value"] for entry in history.get_timeline("short_term", "prompt")] == [0, 1, 2]
+    assert len(history.get_timeline(key="prompt")) == 6
+    assert len(history.get_timeline(layer="system_event")) == 1
+
+    reloaded = ContextHistory(history_path=str(tmp_path / "history.json"))
+    assert len(reloaded.get_timeline("mid_term", "prompt")) == 3
+
+
+def test_segments_rotate_and_compact(tmp_path, monkeypatch):
+    monkeypatch.setattr(context_history, "SEGMENT_MAX_BYTES", 200)
+    monkeypatch.setattr(context_history, "COMPACT_AFTER_SEGMENTS", 3)
+    history_path = tmp_path / "history.json"
+    history = ContextHistory(history_path=str(history_path))
+    for value in range(20):
+        history.record_change("short_term", "counter", None, value, "rotation")
+
+    assert history_path.exists()
+    entries = load_history_entries(history_path)
+    assert [entry["new_value"] for entry in entries] == list(range(20))
+
+    history.compact()
+    assert json.loads(history_path.read_text(encoding="utf-8"))[-1]["new_value"] == 19
+    assert not list((tmp_path / "history.segments").glob("segment_*.jsonl"))
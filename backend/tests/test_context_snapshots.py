@@ -0,0 +1,99 @@
+import json
+
+from orchestrator.context_manager import ContextManager
+from orchestrator.context_snapshot_store import ContextSnapshotStore
+
+
+def _manager():
+    manager = ContextManager()
+    manager.set("long_term.persona", {"name": "Shiroi", "traits": ["calm"]}, reason="seed")
+    manager.set("mid_term.chat_history", [], reason="seed")
+    return manager
+
+
+def test_snapshot_writes_only_changed_keys(tmp_path):
+    manager = _manager()
+    first = manager.snapshot_to_file(snapshot_dir=str(tmp_path))
+    manager.set("short_term.prompt", "hello", reason="test")
+    second = manager.snapshot_to_file(snapshot_dir=str(tmp_path))
+
+    record = json.loads(open(second, encoding="utf-8").read())
+    assert record["parent"] == json.loads(open(first, encoding="utf-8").read())["id"]
+    assert record["layers"] == {"short_term": {"set": {"prompt": record["layers"]["short_term"]["set"]["prompt"]}, "deleted": []}}
+
+    # Unchanged content maps to the same content-addressed snapshot.
+    assert manager.snapshot_to_file(snapshot_dir=str(tmp_path)) == second
+
+
+def test_rollback_restores_only_changed_keys_and_isolates_values(tmp_path):
+    manager = _manager()
+    snapshot = manager.snapshot_to_file(snapshot_dir=str(tmp_path))
+
+    history = manager.get("mid_term.chat_history")
+    history.append({"role": "user", "content": "hi"})
+    manager.set("mid_term.chat_history", history, reason="turn")
+    manager.set("short_term.prompt", "hi", reason="turn")
+
+    store = ContextSnapshotStore.for_dir(str(tmp_path))
+    assert store.restore(manager._layers, snapshot) == 2
+    assert manager.get("mid_term.chat_history") == []
+    assert manager.get("short_term.prompt") is None
+    assert manager.get("long_term.persona") == {"name": "Shiroi", "traits": ["calm"]}
+
+
+def test_rollback_from_disk_and_retention_gc(tmp_path):
+    snapshot_dir = str(tmp_path)
+    manager = _manager()
+    store = ContextSnapshotStore(snapshot_dir, retention=3, checkpoint_every=100)
+    ContextSnapshotStore._instances[str(tmp_path.resolve())] = store
+    paths = []
+    for turn in range(6):
+        manager.set("short_term.turn", turn, reason="turn")
+        paths.append(manager.snapshot_to_file(snapshot_dir=snapshot_dir))
+
+    # GC runs once the window overflows by retention // 4 (min 1): 5 -> 3, then one more.
+    assert len(list(tmp_path.glob("ctx_*.json"))) == 4
+    assert not any((tmp_path / path.split("/")[-1]).exists() for path in paths[:2])
+
+    # A fresh process only has the files: the retained chain must still resolve.
+    ContextSnapshotStore._instances.pop(str(tmp_path.resolve()))
+    restored = ContextManager()
+    assert restored.rollback_to_snapshot(paths[3])
+    assert restored.get("short_term.turn") == 3
+    assert restored.get("long_term.persona")["name"] == "Shiroi"
+
+
+def test_legacy_full_snapshot_still_rolls_back(tmp_path):
+    legacy = tmp_path / "context_snapshot_20250101_000000_000000.json"
+    legacy.write_text(json.dumps({"long_term": {"a": 1}, "mid_term": {}, "short_term": {"b": 2}}), encoding="utf-8")
+    manager = _manager()
+    assert manager.rollback_to_snapshot(str(legacy))
+    assert manager.get_full_context() == {"long_term": {"a": 1}, "mid_term": {}, "short_term": {"b": 2}}
+
+
+def test_gc_covers_snapshots_and_objects_from_earlier_runs(tmp_path):
+    snapshot_dir = str(tmp_path)
+    key = str(tmp_path.resolve())
+    manager = _manager()
+    paths = []
+    for run in range(3):
+        # Each run is a fresh store over the same directory, as after a restart.
+        store = ContextSnapshotStore(snapshot_dir, retention=3, checkpoint_every=100)
+        ContextSnapshotStore._instances[key] = store
+        for turn in range(3):
+            manager.set("short_term.turn", f"run {run} turn {turn}", reason="turn")
+            paths.append(manager.snapshot_to_file(snapshot_dir=snapshot_dir))
+    ContextSnapshotStore._instances.pop(key)
+
+    # 9 snapshots over three runs never exceed the window plus its GC slack.
+    assert len(list(tmp_path.glob("ctx_*.json"))) <= 4
+    assert (tmp_path / paths[-1].split("/")[-1]).exists()
+    # Every object left on disk is referenced by a retained snapshot; earlier runs' values are gone.
+    objects = {path.read_text(encoding="utf-8") for path in (tmp_path / "objects").glob("*.json")}
+    assert '"run 0 turn 0"' not in objects
+    assert '"run 2 turn 2"' in objects
+
+    restored = ContextManager()
+    assert restored.rollback_to_snapshot(paths[-2])
+    assert restored.get("short_term.turn") == "run 2 turn 1"
+    assert restored.get("long_term.persona")["name"] == "Shiroi"
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+
+from modules.continuum_feed import ContinuumFeed
+
+
+def _entry(session_id, **extra):
+    return {"session_id": session_id, "timestamp": "2025-01-01T00:00:00", **extra}
+
+
+def test_snapshot_is_seeded_once_and_kept_current():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [_entry("b"), _entry("a")]  # newest first
+
+    feed = ContinuumFeed(loader=loader, snapshot_size=3)
+    feed.publish(_entry("early"))
+    assert [entry["session_id"] for entry in feed.snapshot()[1]] == ["early", "b", "a"]
+
+    feed.publish(_entry("c"))
+    feed.publish(_entry("b", updated=True))
+    seq, sessions = feed.snapshot()
+    assert seq == 3
+    assert [entry["session_id"] for entry in sessions] == ["b", "c", "early"]
+    assert sessions[0]["updated"] is True
+    assert len(loads) == 1
+
+
+def test_resume_from_last_event_id():
+    feed = ContinuumFeed(loader=list, ring_size=2)
+    first = feed.publish(_entry("a"))
+    feed.publish(_entry("b"))
+    assert [entry["session_id"] for _, entry in feed.events_since(feed.event_id(first))] == ["b"]
+    assert feed.events_since(feed.event_id(2)) == []
+
+    feed.publish(_entry("c"))
+    # "a" fell out of the ring, an unknown boot or a future id all need a snapshot.
+    assert feed.events_since(feed.event_id(0)) is None
+    assert feed.events_since("deadbeef-1") is None
+    assert feed.events_since(feed.event_id(99)) is None
+    assert feed.events_since(None) is None
+
+
+def test_wait_wakes_on_publish_from_another_thread():
+    feed = ContinuumFeed(loader=list)
+
+    async def scenario():
+        seq, _ = feed.snapshot()
+        timer = threading.Timer(0.05, feed.publish, args=(_entry("a"),))
+        timer.start()
+        events = await feed.wait(seq, timeout=2)
+        idle = await feed.wait(feed._seq, timeout=0.01)
+        timer.join()
+        return events, idle
+
+    events, idle = asyncio.run(scenario())
+    assert [entry["session_id"] for _, entry in events] == ["a"]
+    assert idle == []
+    assert feed._waiters == []
+
+
+def test_publish_does_not_wait_for_the_snapshot_query():
+    loading, release = threading.Event(), threading.Event()
+
+    def loader():
+        loading.set()
+        release.wait(2)
+        return [_entry("old")]
+
+    feed = ContinuumFeed(loader=loader)
+    seeding = threading.Thread(target=feed.snapshot)
+    seeding.start()
+    assert loading.wait(2)
+    # The loader is still blocked; publishing must not queue behind it.
+    assert feed.publish(_entry("new")) == 1
+    release.set()
+    seeding.join()
+    assert [entry["session_id"] for entry in feed.snapshot()[1]] == ["new", "old"]
+    assert feed.parse_event_id(feed.event_id(1)) == 1
@@ -0,0 +1,60 @@
+import json
+
+from modules.event_log import EventLog, read_tail_lines
+
+
+def test_append_is_buffered_and_tail_reads_memory(tmp_path):
+    log = EventLog(str(tmp_path / "predictive.json"), tail_size=5, flush_interval=60)
+    for value in range(8):
+        log.append({"pred_prob": value / 10, "action": "none"})
+
+    # Nothing has hit the disk yet, but tail still sees every entry.
+    assert not (tmp_path / "predictive.segments").exists()
+    assert [entry["pred_prob"] for entry in log.tail(3)] == [0.5, 0.6, 0.7]
+
+    log.flush()
+    assert [entry["pred_prob"] for entry in log.read_all()] == [value / 10 for value in range(8)]
+
+
+def test_legacy_array_is_read_first_and_never_rewritten(tmp_path):
+    legacy = tmp_path / "predictive.json"
+    legacy.write_text(json.dumps([{"action": "old"}]), encoding="utf-8")
+    before = legacy.read_bytes()
+
+    log = EventLog(str(legacy), tail_size=10, flush_interval=0)
+    log.append({"action": "new"})
+
+    assert legacy.read_bytes() == before
+    assert [entry["action"] for entry in log.tail(5)] == ["old", "new"]
+    # A cold reader in another process only reads the newest segment backwards.
+    assert [entry["action"] for entry in EventLog(str(legacy)).tail(1)] == ["new"]
+
+
+def test_segments_rotate_by_size_and_old_ones_are_dropped(tmp_path):
+    log = EventLog(str(tmp_path / "events.json"), flush_interval=0, segment_max_bytes=120, max_segments=3)
+    for value in range(30):
+        log.append({"value": value, "pad": "x" * 20})
+
+    segments = sorted((tmp_path / "events.segments").glob("segment_*.jsonl"))
+    assert len(segments) == 3
+    assert log.stats["rotations"] > 0
+    assert [entry["value"] for entry in EventLog(str(tmp_path / "events.json")).tail(2)] == [28, 29]
+
+
+def test_read_tail_lines_spans_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr("modules.event_log._READ_BLOCK", 16)
+    path = tmp_path / "lines.jsonl"
+    path.write_bytes(b"".join(f'{{"n": {n}}}\n'.encode() for n in range(50)))
+    assert read_tail_lines(path, 3) == [b'{"n": 47}', b'{"n": 48}', b'{"n": 49}']
+
+
+def test_iter_all_streams_legacy_then_segments(tmp_path):
+    legacy = tmp_path / "events.json"
+    legacy.write_text(json.dumps([{"value": -1}]), encoding="utf-8")
+    log = EventLog(str(legacy), flush_interval=0, segment_max_bytes=40)
+    for value in range(5):
+        log.append({"value": value})
+
+    entries = log.iter_all()
+    assert next(entries) == {"value": -1}
+    assert [entry["value"] for entry in entries] == [0, 1, 2, 3, 4]
@@ -1,21 +1,16 @@
+from modules.causal_graph import CausalEvent, CausalGraph
 from orchestrator.insight_monitor import InsightMonitor
 
 
-def _setup_graph(monkeypatch, nodes=None):
-    nodes = nodes or [{"event_id": "e1"}]
-    monkeypatch.setattr(
-        "orchestrator.insight_monitor.causal_graph.build_graph",
-        lambda: {"nodes": nodes, "edges": []},
-    )
-
+def _event(event_id, parents):
+    return CausalEvent(event_id, "test", "", "", parents, {}, [], {}, 0.0, {})
 
-def _setup_failures(monkeypatch, success=False):
-    def fake_verify(event_id):
-        if success:
-            return {"success": True, "missing_parents": []}
-        return {"success": False, "missing_parents": ["missing-seed"]}
 
-    monkeypatch.setattr("orchestrator.insight_monitor.verify_causality", fake_verify)
+def _setup_graph(monkeypatch, tmp_path, parents=("missing-seed",)):
+    graph = CausalGraph(tmp_path / "causal_graph.json")
+    graph.add_event(_event("e1", list(parents)))
+    monkeypatch.setattr("orchestrator.insight_monitor.causal_graph", graph)
+    return graph
 
 
 def _setup_rollback(monkeypatch, payload):
@@ -26,10 +21,9 @@ def _setup_rollback(monkeypatch, payload):
     monkeypatch.setattr("orchestrator.insight_monitor.rollback_manager", DummyRollback())
 
 
-def test_compute_causal_integrity_skips_auto_action(monkeypatch):
+def test_compute_causal_integrity_skips_auto_action(monkeypatch, tmp_path):
     monitor = InsightMonitor.__new__(InsightMonitor)
-    _setup_graph(monkeypatch)
-    _setup_failures(monkeypatch)
+    _setup_graph(monkeypatch, tmp_path)
     monkeypatch.setattr("orchestrator.insight_monitor.ingest_from_history", lambda limit=50: {"success": True})
     _setup_rollback(monkeypatch, {"success": True})
     log_calls = []
@@ -47,10 +41,9 @@ def test_compute_causal_integrity_skips_auto_action(monkeypatch):
     assert log_calls == []
 
 
-def test_compute_causal_integrity_executes_with_success_flag(monkeypatch):
+def test_compute_causal_integrity_executes_with_success_flag(monkeypatch, tmp_path):
     monitor = InsightMonitor.__new__(InsightMonitor)
-    _setup_graph(monkeypatch)
-    _setup_failures(monkeypatch)
+    _setup_graph(monkeypatch, tmp_path)
     ingest_result = {"success": True}
     rollback_result = {"success": False}
     monkeypatch.setattr("orchestrator.insight_monitor.ingest_from_history", lambda limit=50: ingest_result)
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from modules.event_log import EventLog
+from modules.metacognition import MAX_ENTRIES, extract_emotional_patterns
+
+
+def _entry(index, valence=0.0):
+    return {"stage": "s", "thought": f"t{index}", "confidence": 0.5, "emotion": {"valence": valence, "arousal": 0.0}}
+
+
+def _journal(path, **options):
+    return EventLog(str(path), live_file=True, flush_interval=0, **options)
+
+
+def test_journal_rotates_live_file_by_size_and_keeps_backups(tmp_path):
+    path = tmp_path / "introspection_trace.log"
+    journal = _journal(path, segment_max_bytes=400, max_segments=3, tail_size=10)
+    for index in range(40):
+        journal.append(_entry(index))
+
+    assert path.stat().st_size <= 400 + len(json.dumps(_entry(39))) + 1
+    assert len(list((tmp_path / "introspection_trace.segments").glob("segment_*.jsonl"))) == 2
+    assert journal.stats["rotations"] > 2
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[-1])["thought"] == "t39"
+    assert [entry["thought"] for entry in journal.tail(3)] == ["t37", "t38", "t39"]
+
+
+def test_cold_start_reads_the_live_file_then_rotated_segments(tmp_path):
+    path = tmp_path / "introspection_trace.log"
+    writer = _journal(path, segment_max_bytes=400, max_segments=4, tail_size=10)
+    for index in range(20):
+        writer.append(_entry(index))
+
+    reader = _journal(path, segment_max_bytes=400, max_segments=4, tail_size=10)
+
+    assert [entry["thought"] for entry in reader.tail(10)] == [f"t{index}" for index in range(10, 20)]
+
+
+def test_readers_see_appends_from_other_writers(tmp_path):
+    path = tmp_path / "introspection_trace.log"
+    journal = _journal(path, tail_size=10)
+    journal.append(_entry(0))
+    assert journal.tail(1)[0]["thought"] == "t0"
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_entry(1)) + "\n")
+
+    assert journal.tail(1)[0]["thought"] == "t1"
+    assert len(journal.tail(5)) == 2
+
+
+def test_emotional_patterns_look_back_past_the_ring(tmp_path, monkeypatch):
+    journal = _journal(tmp_path / "introspection_trace.log", tail_size=10)
+    journal.append(_entry(0, valence=-0.9))
+    for index in range(1, 20):
+        journal.append(_entry(index, valence=0.0 if index < 19 else 0.1))
+    monkeypatch.setattr("modules.metacognition.introspection_journal", journal)
+
+    # The negative entry has left the ring but is still inside MAX_ENTRIES.
+    assert MAX_ENTRIES > 20
+    assert extract_emotional_patterns()["dominant_emotion"] == "negative"
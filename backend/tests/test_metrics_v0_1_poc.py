@@ -4,12 +4,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.api.metrics_v0_1 import summary, timeseries
-from backend.db.models import SessionLog
+from backend.db.metrics_rollup import apply_samples, backfill_from_session_logs
+from backend.db.models import MetricsRollup, SessionLog
 
 
 def _session_fixture():
     engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
     SessionLog.__table__.create(engine)
+    MetricsRollup.__table__.create(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
     try:
@@ -25,6 +27,8 @@ def in_memory_session():
 
 def _populate_sample_logs(session):
     now = datetime.utcnow()
+    # Hour-aligned so the rollup buckets are deterministic: two rows in the current hour, one in the previous.
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
     sample_logs = [
         SessionLog(
             id="log-now",
@@ -36,7 +40,7 @@ def _populate_sample_logs(session):
             evaluation_score=5,
             regeneration_attempts=0,
             regeneration_success=False,
-            created_at=now - timedelta(minutes=15),
+            created_at=hour_start,
         ),
         SessionLog(
             id="log-old",
@@ -48,7 +52,7 @@ def _populate_sample_logs(session):
             evaluation_score=4,
             regeneration_attempts=0,
             regeneration_success=False,
-            created_at=now - timedelta(minutes=75),
+            created_at=hour_start - timedelta(minutes=30),
         ),
         SessionLog(
             id="log-reg",
@@ -60,7 +64,7 @@ def _populate_sample_logs(session):
             evaluation_score=3,
             regeneration_attempts=1,
             regeneration_success=True,
-            created_at=now - timedelta(minutes=30),
+            created_at=hour_start,
         ),
     ]
 
@@ -84,7 +88,8 @@ def test_summary_aggregates_kpis(in_memory_session):
 
 
 def test_timeseries_breaks_data_by_hour(in_memory_session):
-    _populate_sample_logs(in_memory_session)
+    now = _populate_sample_logs(in_memory_session)
+    assert backfill_from_session_logs(in_memory_session, since=now - timedelta(hours=3), route_templates=[]) == 3
     result = timeseries(hours=2, db=in_memory_session)
 
     assert len(result["points"]) == 2
@@ -94,4 +99,40 @@ def test_timeseries_breaks_data_by_hour(in_memory_session):
     assert recent["samples"] == 2
     assert recent["success_rate"] == 1
     assert recent["regeneration_success_rate"] == 1
+    assert recent["avg_response_time_sec"] == pytest.approx(1.25)
+
+
+def test_rollup_is_updated_incrementally(in_memory_session):
+    created_at = datetime.utcnow().replace(second=0, microsecond=0)
+    samples = [
+        {"created_at": created_at, "path": "GET /api/chat", "status_code": 200, "response_time_ms": 80},
+        {"created_at": created_at, "path": "GET /api/chat", "status_code": 503, "response_time_ms": 6000},
+    ]
+    apply_samples(in_memory_session, samples[:1])
+    apply_samples(in_memory_session, samples[1:])
+    in_memory_session.commit()
+
+    minute = in_memory_session.get(MetricsRollup, ("minute", created_at, "GET /api/chat"))
+    assert (minute.count, minute.success, minute.latency_sum_ms) == (2, 1, 6080)
+    assert (minute.latency_min_ms, minute.latency_max_ms) == (80, 6000)
+    assert (minute.latency_le_100ms, minute.latency_gt_5000ms) == (1, 1)
+
+    points = timeseries(hours=1, bucket="minute", path="GET /api/chat", db=in_memory_session)["points"]
+    assert points[-1]["samples"] == 2
+    assert points[-1]["failure_rate"] == pytest.approx(0.5)
+    assert timeseries(hours=1, path="POST", db=in_memory_session)["points"][-1]["samples"] == 0
+
+
+def test_backfill_rolls_up_by_route_template(in_memory_session):
+    created_at = datetime.utcnow().replace(second=0, microsecond=0)
+    in_memory_session.add_all([
+        SessionLog(id=f"poll-{job}", user_input=f"GET /api/chat/{job}", status_code=200,
+                   response_time_ms=50, created_at=created_at)
+        for job in ("job-a", "job-b")
+    ])
+    in_memory_session.commit()
 
+    templates = ["/api/chat", "/api/chat/{job_id}"]
+    assert backfill_from_session_logs(in_memory_session, since=created_at, route_templates=templates) == 2
+    minute = in_memory_session.get(MetricsRollup, ("minute", created_at, "GET /api/chat/{job_id}"))
+    assert minute.count == 2
@@ -0,0 +1,93 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.db.models import MetricsRollup, SessionLog
+from backend.middleware.metrics_writer import MetricsWriter, new_request_id
+
+
+def _session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SessionLog.__table__.create(engine)
+    MetricsRollup.__table__.create(engine)
+    return sessionmaker(bind=engine)
+
+
+def _row(status_code=200):
+    return {
+        "id": new_request_id(),
+        "created_at": datetime.utcnow(),
+        "user_input": "GET /api/status",
+        "final_output": str(status_code),
+        "status_code": status_code,
+        "response_time_ms": 12,
+        "log_persist_failed": 0,
+        "regeneration_attempts": 0,
+        "regeneration_success": False,
+        "error_tag": None,
+        "impact_level": "normal",
+    }
+
+
+def test_rows_are_written_in_batches_and_rolled_up():
+    Session = _session_factory()
+    writer = MetricsWriter(Session, batch_size=50, flush_interval=0.05)
+    for _ in range(120):
+        assert writer.submit(_row())
+    assert writer.flush()
+    writer.close()
+
+    with Session() as session:
+        assert session.query(SessionLog).count() == 120
+        rollup = session.query(MetricsRollup).filter_by(granularity="hour").one()
+    assert rollup.count == 120
+    stats = writer.stats()
+    assert stats["written"] == 120 and stats["dropped"] == 0
+    assert 3 <= stats["batches"] <= 120
+
+
+def test_overflow_is_counted_and_close_drains_the_queue():
+    Session = _session_factory()
+    writer = MetricsWriter(Session, queue_size=5, batch_size=100, flush_interval=0.5)
+    accepted = sum(writer.submit(_row()) for _ in range(50))
+    writer.close()
+
+    stats = writer.stats()
+    assert stats["dropped"] == 50 - accepted
+    assert stats["written"] == accepted
+    assert not writer.submit(_row())  # closed writers reject rows
+
+
+def test_request_ids_do_not_collide():
+    assert len({new_request_id() for _ in range(10000)}) == 10000
+
+
+def test_close_does_not_block_on_a_full_queue_behind_a_stalled_write():
+    Session = _session_factory()
+    stalled, release = threading.Event(), threading.Event()
+
+    def stalling_session():
+        stalled.set()
+        release.wait(5)
+        return Session()
+
+    writer = MetricsWriter(stalling_session, queue_size=3, batch_size=1, flush_interval=0)
+    writer.submit(_row())
+    assert stalled.wait(2)
+    while writer.submit(_row()):
+        pass  # fill the queue behind the stalled batch
+
+    began = time.monotonic()
+    writer.close(timeout=0.2)
+    assert time.monotonic() - began < 1
+    assert not writer.submit(_row())
+
+    release.set()
+    # Every accepted row is still written, so flush settles instead of timing out.
+    assert writer.flush(timeout=5)
+    stats = writer.stats()
+    assert stats["written"] == stats["submitted"] == 4
@@ -0,0 +1,61 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+
+from modules.predictive_analyzer import PredictiveAnalyzer
+
+
+def _analyzer(tmp_path, window_size=8):
+    torch.manual_seed(0)
+    return PredictiveAnalyzer(model_path=str(tmp_path / "missing.pt"), window_size=window_size, lstm_hidden_size=16)
+
+
+def _full_window_prob(analyzer):
+    with torch.no_grad():
+        return analyzer.lstm_model(torch.from_numpy(analyzer.window()).unsqueeze(0)).item()
+
+
+def test_window_is_ordered_and_none_repeats_last_value(tmp_path):
+    analyzer = _analyzer(tmp_path, window_size=4)
+    for i in range(6):
+        analyzer.update_metrics(float(i), float(i) * 2, None if i == 5 else float(i) * 3)
+
+    window = analyzer.window()
+    assert window.shape == (4, 3)
+    assert window[:, 0].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert window[-1, 2] == 12.0  # latency repeated from the previous sample
+
+
+def test_no_prediction_before_full_window(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    for _ in range(analyzer.window_size - 1):
+        analyzer.update_metrics(10.0, 20.0, 30.0)
+    assert analyzer.predict_lstm() == 0.0
+
+
+def test_prediction_matches_full_window_at_anchor_points(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    rng = np.random.default_rng(0)
+    size = analyzer.window_size
+    # The first full window anchors; after that every (window_size + 1)th sample re-anchors.
+    anchors = {size, size * 2 + 1, size * 3 + 2}
+    for step in range(1, size * 3 + 3):
+        analyzer.update_metrics(*rng.uniform(0, 100, size=3).tolist())
+        if step in anchors:
+            assert analyzer.predict_lstm() == pytest.approx(_full_window_prob(analyzer), abs=1e-5)
+    assert 0.0 <= analyzer.predict_anomaly_probability() <= 1.0
+
+
+def test_score_windows_batches_streams(tmp_path):
+    analyzer = _analyzer(tmp_path)
+    rng = np.random.default_rng(1)
+    windows = [rng.uniform(0, 100, size=(analyzer.window_size, 3)) for _ in range(3)]
+
+    scores = analyzer.score_windows(windows)
+
+    assert len(scores) == 3
+    with torch.no_grad():
+        expected = analyzer.lstm_model(torch.tensor(windows[1], dtype=torch.float32).unsqueeze(0)).item()
+    assert scores[1] == pytest.approx(expected, abs=1e-5)
+    assert analyzer.score_windows([]) == []
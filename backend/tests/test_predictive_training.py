@@ -0,0 +1,94 @@
+import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+torch = pytest.importorskip("torch")
+pytest.importorskip("sklearn")
+
+from modules import predictive_trainer
+from modules.model_registry import ModelRegistry
+from modules.predictive_dataset import WindowDataset, fill_latency, load_log_samples
+
+
+def _entries(count, start=datetime.datetime(2025, 1, 1)):
+    entries = []
+    for i in range(count):
+        spike = i % 20 >= 15
+        entries.append({
+            "timestamp": (start + datetime.timedelta(seconds=10 * i)).isoformat(),
+            "pred_prob": 0.0,
+            "action": "preemptive_repair_triggered" if spike else "none",
+            "cpu": 90.0 if spike else 20.0,
+            "mem": 80.0 if spike else 30.0,
+            "latency": None if i % 7 == 0 else 100.0,
+        })
+    return entries
+
+
+def test_windows_are_views_with_horizon_labels():
+    features = np.arange(30, dtype=np.float32).reshape(10, 3)
+    labels = np.zeros(10, dtype=np.float32)
+    labels[6] = 1
+
+    dataset = WindowDataset(features, labels, window=4, horizon=2, stride=1)
+
+    assert len(dataset) == 5  # 10 - 4 - 2 + 1
+    assert np.shares_memory(dataset._windows, features)
+    # Window i is followed by rows i+4 and i+5, so row 6 labels windows 1 and 2.
+    assert dataset.labels.tolist() == [0.0, 1.0, 1.0, 0.0, 0.0]
+    batch, batch_labels = dataset[[1, 3]]
+    assert batch.shape == (2, 4, 3)
+    assert batch[0, 0].tolist() == [3.0, 4.0, 5.0]
+    assert batch_labels.shape == (2, 1)
+
+
+def test_split_keeps_validation_and_test_disjoint_and_chronological():
+    dataset = WindowDataset(np.zeros((200, 3), dtype=np.float32), np.zeros(200, dtype=np.float32), window=10)
+    train, val, test = dataset.split(0.2, 0.1)
+    assert len(train) and len(val) and len(test)
+    assert train.starts[-1] + dataset.window <= val.starts[0]
+    assert val.starts[-1] + dataset.window <= test.starts[0]
+    assert test.starts[-1] == dataset.starts[-1]
+
+    train, val, test = dataset.split(0.2, 0.0)
+    assert len(test) == 0 and val.starts[-1] == dataset.starts[-1]
+
+
+def test_latency_gaps_use_session_response_times_then_forward_fill():
+    timestamps, features, _ = load_log_samples(_entries(8))
+    assert np.isnan(features[0, 2]) and np.isnan(features[7, 2])
+
+    filled = fill_latency(timestamps, features, np.array([timestamps[0] - 1.0]), np.array([1234.0], dtype=np.float32),
+                          max_age_seconds=30)
+
+    assert filled[0, 2] == 1234.0
+    assert filled[7, 2] == 100.0  # the session value is too old here, so the last logged latency carries forward
+    assert not np.isnan(filled).any()
+
+
+def test_registry_promotes_only_better_models(tmp_path):
+    active = tmp_path / "model.pt"
+    registry = ModelRegistry(str(active))
+    first = tmp_path / "a.pt"
+    first.write_bytes(b"a")
+    second = tmp_path / "b.pt"
+    second.write_bytes(b"b")
+
+    assert registry.register(str(first), {"f1": 0.5, "val_loss": 0.3})["promoted"]
+    assert not registry.register(str(second), {"f1": 0.4, "val_loss": 0.1}, {"f1": 0.5, "val_loss": 0.3})["promoted"]
+    assert active.read_bytes() == b"a"
+    assert registry.active()["path"] == str(first)
+
+
+def test_trainer_trains_on_log_and_registers(tmp_path, monkeypatch):
+    monkeypatch.setattr(predictive_trainer, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(predictive_trainer, "MODEL_PATH", str(tmp_path / "predictive_lstm.pt"))
+    monkeypatch.setattr(predictive_trainer, "MAX_EPOCHS", 3)
+    trainer = predictive_trainer.PredictiveTrainer(window_size=10, horizon=2, session_factory=lambda: 1 / 0)
+
+    result = trainer.evaluate_and_replace(entries=_entries(400))
+
+    assert result["status"] == "replaced"
+    assert (tmp_path / "predictive_lstm.pt").exists()
+    assert trainer.registry.active()["version"] == result["version"]
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.api.session_summary import build_session_summary
+from backend.db import session_analytics
+from backend.db.models import SessionLog
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    SessionLog.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session_analytics.invalidate()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _populate(db):
+    base = datetime(2025, 11, 1, 12, 0, 0)
+    scores = [5, 4, None, 2, 3, 4.5, 1]
+    for index, score in enumerate(scores):
+        db.add(SessionLog(
+            id=f"s{index}",
+            created_at=base + timedelta(days=index // 3, minutes=index),
+            user_input="hello",
+            evaluation_score=score,
+            evaluation_comment=f"comment {index}" if index % 2 == 0 else None,
+            generator_prompt="x" * 1000,
+        ))
+    db.commit()
+
+
+def test_sql_summary_matches_python_summary(db):
+    _populate(db)
+    expected = build_session_summary(db.query(SessionLog).all())
+
+    summary = session_analytics.session_summary(db)
+
+    assert summary["total_sessions"] == expected["total_sessions"]
+    assert summary["average_score"] == expected["average_score"]
+    assert summary["trend"] == expected["trend"]
+    assert [(p["date"], p["avg_score"], p["count"]) for p in summary["series"]] == [
+        (p["date"], p["avg_score"], p["count"]) for p in expected["series"]
+    ]
+    assert summary["series"][0]["delta"] is None
+    assert summary["emotion_summary"] == {"positive": 3, "neutral": 1, "negative": 2}
+
+
+def test_recent_rows_and_details_are_projected_and_ordered(db):
+    _populate(db)
+
+    recent = session_analytics.recent_sessions(db, limit=2)
+    assert [row["id"] for row in recent] == ["s6", "s5"]
+    assert session_analytics.recent_scores(db, limit=3) == [3.0, 4.5, 1.0]
+    assert session_analytics.evaluation_comments(db, limit=2) == ["comment 4", "comment 6"]
+    assert session_analytics.evaluation_comments(db, limit=1, newest=False) == ["comment 0"]
+
+
+def test_cache_is_invalidated_by_new_sessions():
+    session_analytics.invalidate()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    assert session_analytics.cached("key", compute) == 1
+    assert session_analytics.cached("key", compute) == 1
+    session_analytics.invalidate()
+    assert session_analytics.cached("key", compute) == 2
+    assert session_analytics.cached("key", compute, ttl=0) == 3
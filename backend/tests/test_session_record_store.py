@@ -0,0 +1,57 @@
+import json
+
+from modules.session_record_store import SessionRecordStore
+
+
+def _record(iteration, **extra):
+    return {"iteration": iteration, "question": f"q{iteration}", "timestamp": f"2025-01-01T00:00:0{iteration}", **extra}
+
+
+def test_append_lookup_and_tail(tmp_path):
+    store = SessionRecordStore(str(tmp_path / "memory.sqlite3"))
+    store.append("a", _record(1))
+    store.append("b", _record(1))
+    store.append(" a ", _record(2, emotion_vector={"joy": 0.5}))
+
+    assert [r["iteration"] for r in store.session("a")["records"]] == [1, 2]
+    assert store.session("missing") is None
+    assert [(r["session_id"], r["iteration"]) for r in store.tail(2)] == [("b", 1), ("a", 2)]
+    assert [r["iteration"] for r in store.tail(5, session_id="a")] == [1, 2]
+
+    latest = store.latest_sessions(limit=5)
+    assert [s["session_id"] for s in latest] == ["a", "b"]
+    assert latest[0]["record_count"] == 2
+    assert latest[0]["last_record"]["emotion_vector"] == {"joy": 0.5}
+    assert latest[0]["created_at"] == "2025-01-01T00:00:01"
+    # Legacy shape: sessions by creation, oldest first.
+    assert [s["session_id"] for s in store.recent_sessions(limit=5)] == ["a", "b"]
+    assert store.stats() == {"records": 3, "sessions": 2}
+
+
+def test_json_migration_runs_once_and_survives_reopen(tmp_path):
+    legacy = tmp_path / "memory_log.json"
+    legacy.write_text(json.dumps([
+        {"session_id": "s1", "records": [_record(1), _record(2)]},
+        {"session_id": "s2", "records": [_record(1)]},
+        {"records": [_record(1)]},
+    ]), encoding="utf-8")
+    path = str(tmp_path / "memory.sqlite3")
+
+    store = SessionRecordStore(path)
+    assert store.migrate_json(legacy) == 3
+    assert store.migrate_json(legacy) == 0
+    store.append("s1", _record(3))
+    store.close()
+
+    reopened = SessionRecordStore(path)
+    assert reopened.migrate_json(legacy) == 0
+    assert [r["iteration"] for r in reopened.session("s1")["records"]] == [1, 2, 3]
+    assert reopened.stats() == {"records": 4, "sessions": 2}
+
+
+def test_unreadable_legacy_file_is_skipped(tmp_path):
+    legacy = tmp_path / "memory_log.json"
+    legacy.write_text("[{", encoding="utf-8")
+    store = SessionRecordStore(str(tmp_path / "memory.sqlite3"))
+    assert store.migrate_json(legacy) == 0
+    assert store.stats() == {"records": 0, "sessions": 0}
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.api import sessions
+from backend.db.connection import get_db
+from backend.db.models import SessionLog
+
+
+@pytest.fixture
+def client(monkeypatch):
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SessionLog.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    base = datetime(2025, 11, 1, 12, 0, 0)
+    with factory() as db:
+        for index in range(7):
+            # s3 and s4 share a timestamp so the id tie-breaker is exercised.
+            created_at = base + timedelta(minutes=min(index, 3) if index <= 4 else index)
+            db.add(SessionLog(
+                id=f"s{index}",
+                created_at=created_at,
+                user_input="q" * 500,
+                final_output="a" * 5000,
+                evaluation_score=float(index),
+                evaluation_comment="ok" if index % 2 else None,
+            ))
+        db.commit()
+
+    def override_get_db():
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(sessions, "SessionLocal", factory)
+    app = FastAPI()
+    app.include_router(sessions.router, prefix="/api")
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_sessions_are_paged_by_cursor_without_gaps(client):
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/api/sessions", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == ["s6", "s5", "s4", "s3", "s2", "s1", "s0"]
+
+
+def test_session_list_is_a_summary_projection(client):
+    item = client.get("/api/sessions", params={"limit": 1}).json()["items"][0]
+
+    assert "final_output" not in item
+    assert len(item["user_input_preview"]) == sessions.PREVIEW_LENGTH
+    assert item["has_comment"] is False
+    assert client.get(f"/api/sessions/{item['id']}").json()["final_output"] == "a" * 5000
+
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/sessions", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_export_streams_ndjson(client):
+    response = client.get("/api/sessions/export", params={"full": True})
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == ["s6", "s5", "s4", "s3", "s2", "s1", "s0"]
+    assert rows[0]["final_output"] == "a" * 5000
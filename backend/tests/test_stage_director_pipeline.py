@@ -0,0 +1,80 @@
+import asyncio
+import json
+import time
+import wave
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("playsound")
+pytest.importorskip("pythonosc")
+pytest.importorskip("sqlalchemy")
+
+from modules.stage_director import StageDirector
+
+
+def _write_clip(path, seconds, rate=8000):
+    with wave.open(str(path), "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(rate)
+        clip.writeframes(b"\x00\x00" * int(seconds * rate))
+    return str(path)
+
+
+class FakeTTS:
+    def __init__(self, directory, clip_seconds=0.05, synth_seconds=0.04):
+        self.directory = directory
+        self.clip_seconds = clip_seconds
+        self.synth_seconds = synth_seconds
+        self.events = []
+
+    async def synthesize_async(self, text, emotion, speaker_id=1):
+        self.events.append(("synth_start", text, time.perf_counter()))
+        await asyncio.sleep(self.synth_seconds)
+        return _write_clip(self.directory / f"{text}.wav", self.clip_seconds), False, None
+
+    async def play(self, audio_path, emotion_dict=None):
+        self.events.append(("play_start", audio_path, time.perf_counter()))
+        await asyncio.sleep(self.clip_seconds)
+        self.events.append(("play_end", audio_path, time.perf_counter()))
+        return {"status": "played", "audio_path": audio_path}
+
+
+class FakeOSC:
+    async def send_emotion(self, emotion):
+        return {"emotion": emotion}
+
+
+def test_lines_are_synthesized_ahead_and_scheduled_by_audio_length(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    timeline_path = tmp_path / "timeline.json"
+    # Script durations are deliberately long: the scheduler must follow the clips instead.
+    timeline = [{"character": "A", "text": f"line{i}", "emotion": "joy", "duration": 30} for i in range(4)]
+    timeline_path.write_text(json.dumps(timeline), encoding="utf-8")
+    tts = FakeTTS(tmp_path)
+    director = StageDirector(tts=tts, osc=FakeOSC(), lookahead=2)
+    progress = []
+
+    async def no_persist(*args, **kwargs):
+        return None
+
+    async def capture(payload):
+        progress.append(payload)
+
+    monkeypatch.setattr(director, "_persist_stage_event", no_persist)
+    director.progress_callback = capture
+
+    started = time.perf_counter()
+    asyncio.run(director.play_timeline(str(timeline_path)))
+
+    assert time.perf_counter() - started < 5
+    synth_starts = {text: at for kind, text, at in tts.events if kind == "synth_start"}
+    first_play_end = next(at for kind, _, at in tts.events if kind == "play_end")
+    # The next lines were already being synthesized while line0 played.
+    assert synth_starts["line1"] < first_play_end
+    assert synth_starts["line2"] < first_play_end
+    updates = [payload for payload in progress if payload["type"] == "progress"]
+    assert [payload["index"] for payload in updates] == [0, 1, 2, 3]
+    assert updates[-1]["time"] == pytest.approx(0.2, abs=0.01)
+    assert all("jitterMs" in payload for payload in updates)
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from modules.tts_audio_cache import AudioCache, cache_key
+
+
+def test_cache_key_is_stable_and_ignores_float_noise():
+    params = {"pitchScale": 0.105, "speedScale": 1.0349999999}
+    noisy = {"pitchScale": 0.1050000001, "speedScale": 1.035}
+
+    assert cache_key("hello", 1, params) == cache_key("hello", 1, noisy)
+    assert cache_key("hello", 1, params) != cache_key("hello", 2, params)
+    assert len(cache_key("hello", 1, params)) == 64
+
+
+def test_clips_survive_a_restart(tmp_path):
+    cache = AudioCache(tmp_path)
+    key = cache_key("line", 1, {"pitchScale": 0.0})
+    assert cache.get(key) is None
+    path = cache.put(key, b"RIFF")
+
+    reopened = AudioCache(tmp_path)
+
+    assert reopened.get(key) == path
+    assert reopened.stats()["hits"] == 1
+    assert reopened.stats()["bytes"] == 4
+
+
+def test_least_recently_used_clips_are_evicted(tmp_path):
+    cache = AudioCache(tmp_path, max_bytes=10)
+    cache.put("a" * 64, b"x" * 4)
+    cache.put("b" * 64, b"x" * 4)
+    cache.get("a" * 64)  # b is now the least recently used
+    cache.put("c" * 64, b"x" * 4)
+
+    assert cache.get("b" * 64) is None
+    assert not cache.path_for("b" * 64).exists()
+    assert cache.get("a" * 64) and cache.get("c" * 64)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_rehearsed_timeline_needs_no_synthesis(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    pytest.importorskip("playsound")
+    from modules.tts_manager import TTSManager
+
+    calls = []
+
+    def fake_voicevox(self, text, params, speaker_id):
+        calls.append(text)
+        return b"RIFF" + text.encode("utf-8"), None
+
+    monkeypatch.setattr(TTSManager, "_request_voicevox", fake_voicevox)
+    lines = [{"text": "hello", "emotion": "joy"}, {"text": "bye", "emotion": "calm"}, {"text": "hello", "emotion": "joy"}]
+
+    first = asyncio.run(TTSManager(output_dir=tmp_path).prewarm(lines))
+    assert first["synthesized"] == 2 and first["cached"] == 1
+    assert sorted(calls) == ["bye", "hello"]
+
+    # A fresh process sees the same files through the index.
+    monkeypatch.setattr(AudioCache, "_instances", {})
+    manager = TTSManager(output_dir=tmp_path)
+    calls.clear()
+    second = asyncio.run(manager.prewarm(lines))
+    path, fallback, _ = manager.synthesize("bye", manager._normalize_emotion_payload("calm"))
+
+    assert calls == []
+    assert second["cached"] == 3
+    assert not fallback and path.endswith(".wav")
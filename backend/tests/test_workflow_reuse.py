@@ -0,0 +1,121 @@
+import os
+import threading
+
+import pytest
+
+from orchestrator.context_manager import ContextManager
+from orchestrator.meta_contract_engine import MetaContractEngine
+
+
+def test_request_scope_isolates_short_term_layer():
+    manager = ContextManager()
+    manager.set("long_term.persona", "shared", reason="seed")
+    seen = {}
+
+    def cycle(name):
+        with manager.request_scope():
+            manager.set("short_term.user_input", name, reason="test")
+            manager.set("mid_term.last_cycle", name, reason="test")
+            barrier.wait()
+            seen[name] = (manager.get("short_term.user_input"), manager.get("long_term.persona"))
+
+    barrier = threading.Barrier(2)
+    threads = [threading.Thread(target=cycle, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"a": ("a", "shared"), "b": ("b", "shared")}
+    assert manager.get("short_term.user_input") is None
+    # Keys outside CYCLE_KEYS remain shared mid-term state.
+    assert manager.get("mid_term.last_cycle") in {"a", "b"}
+
+
+def test_request_scope_isolates_cycle_results(tmp_path):
+    manager = ContextManager()
+    manager.set("mid_term.predicted_anomaly_probability", 0.1, reason="seed")
+    seen = {}
+
+    def cycle(name, score):
+        with manager.request_scope():
+            manager.set("mid_term.session_id", name, reason="test")
+            manager.set("mid_term.chat_history", [name], reason="test")
+            snapshot = manager.snapshot_to_file(snapshot_dir=str(tmp_path / "snapshots"))
+            manager.set("mid_term.generated_output", f"answer-{name}", reason="test")
+            manager.set("mid_term.evaluation_score", score, reason="test")
+            barrier.wait()
+            # One cycle rolls back while the other is still reading its results.
+            if name == "a":
+                manager.rollback_to_snapshot(snapshot)
+            barrier.wait()
+            manager.set("mid_term.final_answer", manager.get("mid_term.generated_output"), reason="test")
+            seen[name] = {
+                key: manager.get(f"mid_term.{key}")
+                for key in ("session_id", "chat_history", "generated_output", "evaluation_score", "final_answer")
+            }
+            seen[name]["shared"] = manager.get_layer("mid_term")["predicted_anomaly_probability"]
+
+    barrier = threading.Barrier(2)
+    threads = [threading.Thread(target=cycle, args=args) for args in (("a", 1.0), ("b", 4.0))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen["a"] == {
+        "session_id": "a", "chat_history": ["a"], "generated_output": None,
+        "evaluation_score": None, "final_answer": None, "shared": 0.1,
+    }
+    assert seen["b"] == {
+        "session_id": "b", "chat_history": ["b"], "generated_output": "answer-b",
+        "evaluation_score": 4.0, "final_answer": "answer-b", "shared": 0.1,
+    }
+    # Nothing a cycle produced leaks into the shared layer or the next request.
+    assert manager.get("mid_term.final_answer") is None
+    with manager.request_scope():
+        assert manager.get("mid_term.chat_history", default=[]) == []
+
+
+def test_meta_contract_engine_reparses_only_changed_files(tmp_path):
+    (tmp_path / "generator.yaml").write_text("name: generator\nversion: '1.0'\n", encoding="utf-8")
+    (tmp_path / "evaluator.yaml").write_text("name: evaluator\nversion: '2.0'\n", encoding="utf-8")
+    engine = MetaContractEngine()
+    engine.contract_dir = str(tmp_path)
+
+    assert sorted(engine.load_contracts()) == ["evaluator", "generator"]
+    assert engine.load_contracts() == []
+    assert len(engine.contracts) == 2
+
+    path = tmp_path / "evaluator.yaml"
+    path.write_text("name: evaluator\nversion: '2.1'\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert engine.load_contracts() == ["evaluator"]
+    assert engine.get_contract("evaluator")["version"] == "2.1"
+
+    (tmp_path / "generator.yaml").unlink()
+    assert engine.load_contracts() == []
+    assert [contract["name"] for contract in engine.contracts] == ["evaluator"]
+
+
+def test_contract_edits_reach_the_shared_validator(tmp_path):
+    from orchestrator.context_validator import ContextValidator
+    from orchestrator.contract_registry import ContractRegistry
+    main = pytest.importorskip("orchestrator.main")
+
+    path = tmp_path / "generator.yaml"
+    path.write_text("name: generator\nversion: '1.0'\n", encoding="utf-8")
+    registry = ContractRegistry(contract_dir=str(tmp_path))
+    validator = ContextValidator(ContextManager(), registry)
+    engine = MetaContractEngine()
+    engine.contract_dir = str(tmp_path)
+    engine.analyze_and_suggest_rewrite = lambda module_name: None
+    main._refresh_contracts(engine, registry)
+
+    path.write_text("name: generator\nversion: '1.1'\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    main._refresh_contracts(engine, registry)
+
+    assert validator.contract_registry.get_contract("generator")["version"] == "1.1"
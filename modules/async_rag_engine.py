@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional
+
+from modules.log_manager import log_manager
+from modules.rag_engine import RAGEngine
+
+
+class AsyncRAGEngine:
+    """Async facade over RAGEngine for FastAPI handlers.
+
+    SentenceTransformer encoding runs on a small dedicated executor so a burst of
+    queries cannot starve the default loop executor, vector search goes through
+    Qdrant's AsyncQdrantClient, and PostgreSQL text fetches (psycopg2 is
+    synchronous) run on a separate I/O executor backed by the shared pool.
+    """
+
+    def __init__(
+        self,
+        engine: Optional[RAGEngine] = None,
+        *,
+        encode_workers: Optional[int] = None,
+        io_workers: Optional[int] = None,
+    ):
+        self.engine = engine or RAGEngine()
+        self._encode_executor = ThreadPoolExecutor(
+            max_workers=encode_workers or int(os.getenv("RAG_ENCODE_WORKERS", "2")),
+            thread_name_prefix="rag-encode",
+        )
+        self._io_executor = ThreadPoolExecutor(
+            max_workers=io_workers or int(os.getenv("RAG_IO_WORKERS", "8")),
+            thread_name_prefix="rag-io",
+        )
+        self._async_client = None
+        self._client_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def available(self) -> bool:
+        return bool(self.engine.qdrant_client and self.engine.embedding_model)
+
+    async def _run(self, executor: ThreadPoolExecutor, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    async def _get_async_client(self):
+        if self._async_client is not None:
+            return self._async_client
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._async_client is None:
+                try:
+                    from qdrant_client import AsyncQdrantClient
+
+                    self._async_client = AsyncQdrantClient(
+                        host=self.engine.qdrant_host, port=self.engine.qdrant_port
+                    )
+                except Exception as exc:
+                    log_manager.warning(f"AsyncQdrantClient unavailable, falling back to threaded client: {exc}")
+                    self._async_client = False
+        return self._async_client
+
+    async def vectorize(self, query: str) -> list:
+        return await self._run(self._encode_executor, self.engine._vectorize_query, query)
+
+    async def search_ids(self, query_vector: list, limit: int = 5) -> list:
+        if not query_vector or not self.engine.qdrant_client:
+            return []
+        client = await self._get_async_client()
+        if not client:
+            return await self._run(self._io_executor, self.engine._search_qdrant, query_vector)
+        hits = await client.search(
+            collection_name=self.engine.qdrant_collection_name,
+            query_vector=query_vector,
+            limit=limit,
+        )
+        return [hit.id for hit in hits]
+
+    async def fetch_texts(self, ids: list) -> list[str]:
+        if not ids:
+            return []
+        return await self._run(self._io_executor, self.engine._get_text_from_postgresql, ids)
+
+    async def get_context(self, query: str) -> str:
+        if not self.available or not self.engine._ensure_pg_engine():
+            log_manager.error("Cannot get context: RAGEngine is not available.")
+            return "RAG Engine is currently unavailable."
+        try:
+            query_vector = await self.vectorize(query)
+            ids = await self.search_ids(query_vector)
+            texts = await self.fetch_texts(ids)
+            context = "\n".join(texts) if texts else "情報不足"
+            log_manager.info("RAG context retrieved.", extra={"query": query, "context": context})
+            return context
+        except Exception as exc:
+            context = f"RAG Engine エラー: {exc}"
+            log_manager.exception("RAG context retrieval failed.", extra={"query": query, "context": context})
+            return context
+
+    async def get_contexts(self, queries: list[str]) -> list[str]:
+        """Fans out several queries so encoding, vector search and text fetch overlap across them."""
+        return list(await asyncio.gather(*(self.get_context(query) for query in queries)))
+
+    async def search(self, query: str, **kwargs) -> dict:
+        # Warm the embedding cache on the encode executor so the threaded search is I/O only.
+        await self.vectorize(query)
+        return await self._run(self._io_executor, self.engine.search, query, **kwargs)
+
+    async def list_embeddings(self, **kwargs) -> dict:
+        return await self._run(self._io_executor, self.engine.list_embeddings, **kwargs)
+
+    async def get_by_id(self, entry_id: str):
+        return await self._run(self._io_executor, self.engine.get_by_id, entry_id)
+
+    async def ingest_text(self, text: str, **kwargs) -> dict:
+        return await self._run(self._io_executor, self.engine.ingest_text, text, **kwargs)
+
+    async def aclose(self) -> None:
+        if self._async_client:
+            try:
+                await self._async_client.close()
+            except Exception as exc:
+                log_manager.warning(f"Failed to close AsyncQdrantClient: {exc}")
+        self._async_client = None
+        self._encode_executor.shutdown(wait=False)
+        self._io_executor.shutdown(wait=False)
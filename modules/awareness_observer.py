@@ -15,6 +15,7 @@ from typing import Any, Deque, Dict, List, Optional
 from backend.db.connection import SessionLocal, ensure_awareness_snapshot_table
 from backend.db.models import AwarenessSnapshot
 from modules.log_manager import log_manager
+from orchestrator.context_history import load_history_entries
 
 LOGS_BASE = Path("logs")
 FEEDBACK_LOG = LOGS_BASE / "feedback_loop.log"
@@ -90,17 +91,8 @@ def _summarize_introspection(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
 
 
 def _load_latest_context() -> Optional[Dict[str, Any]]:
-    if not CONTEXT_LOG.exists():
-        return None
-    try:
-        payload = json.loads(CONTEXT_LOG.read_text(encoding="utf-8"))
-        if isinstance(payload, list) and payload:
-            return payload[-1]
-        if isinstance(payload, dict):
-            return payload
-    except json.JSONDecodeError:
-        log_manager.warning("[AwarenessObserver] Failed to parse context_history.json")
-    return None
+    latest = load_history_entries(CONTEXT_LOG, limit=1)
+    return latest[-1] if latest else None
 
 
 def build_snapshot_payload() -> Dict[str, Any]:
@@ -2,24 +2,18 @@
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Dict, List
 
+from orchestrator.context_history import load_history_entries
+
 
 HISTORY_PATH = Path("logs/context_history.json")
 
 
 def detect_bias(limit: int = 200, threshold: float = 0.6) -> Dict[str, object]:
-    if not HISTORY_PATH.exists():
-        return {"total_entries": 0, "emotion_bias": [], "knowledge_bias": [], "raw_emotions": {}, "raw_knowledge": {}}
-
-    try:
-        entries = json.loads(HISTORY_PATH.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return {"total_entries": 0, "emotion_bias": [], "knowledge_bias": [], "raw_emotions": {}, "raw_knowledge": {}}
-
-    if not isinstance(entries, list):
+    entries = load_history_entries(HISTORY_PATH, limit=limit)
+    if not entries:
         return {"total_entries": 0, "emotion_bias": [], "knowledge_bias": [], "raw_emotions": {}, "raw_knowledge": {}}
 
     selected = entries[-limit:]
@@ -1,15 +1,30 @@
-"""Causal graph utilities for R-v0.8."""
+"""Causal graph utilities for R-v0.8.
+
+Events are appended to ``data/causal_graph.events.jsonl`` (one event per line, a
+later line for the same id replaces the earlier one); a legacy
+``data/causal_graph.json`` is read first and never rewritten. Parent→children
+links and the set of events with missing parents are maintained as events
+arrive, so integrity checks and traces read indexes instead of the whole graph.
+"""
 
 from __future__ import annotations
 
 import json
+import threading
+from collections import deque
 from dataclasses import dataclass, asdict
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Set
+
+from modules.log_manager import log_manager
 
 
 GRAPH_PATH = Path("data/causal_graph.json")
 
+# The append log is compacted on load once superseded lines outnumber live events.
+COMPACT_MIN_LINES = 1000
+
 
 @dataclass
 class CausalEvent:
@@ -25,41 +40,117 @@ class CausalEvent:
     metadata: Dict[str, object]
 
 
+def _event_from_dict(eid: str, item: dict) -> CausalEvent:
+    return CausalEvent(
+        event_id=eid,
+        type=item.get("type", "unknown"),
+        timestamp=item.get("timestamp", ""),
+        description=item.get("description", ""),
+        parents=item.get("parents", []),
+        emotion_contribution=item.get("emotion_contribution", {}),
+        knowledge_sources=item.get("knowledge_sources", []),
+        context_features=item.get("context_features", {}),
+        confidence=item.get("confidence", 0.0),
+        metadata=item.get("metadata", {}),
+    )
+
+
 class CausalGraph:
-    def __init__(self, graph_path: Path = GRAPH_PATH) -> None:
-        self.graph_path = graph_path
+    def __init__(self, graph_path: Path = GRAPH_PATH, log_path: Path = None) -> None:
+        self.graph_path = Path(graph_path)
+        self.log_path = Path(log_path) if log_path else self.graph_path.with_suffix(".events.jsonl")
         self.events: Dict[str, CausalEvent] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._waiting: Dict[str, Set[str]] = {}  # missing parent id -> events that reference it
+        self._orphans: Set[str] = set()  # events with at least one missing parent
+        self._edge_count = 0
+        self._lock = threading.RLock()
         self._load()
 
-    def _load(self) -> None:
-        if not self.graph_path.exists():
-            self.events = {}
-            return
-        data = json.loads(self.graph_path.read_text(encoding="utf-8"))
-        self.events = {
-            eid: CausalEvent(
-                event_id=eid,
-                type=item.get("type", "unknown"),
-                timestamp=item.get("timestamp", ""),
-                description=item.get("description", ""),
-                parents=item.get("parents", []),
-                emotion_contribution=item.get("emotion_contribution", {}),
-                knowledge_sources=item.get("knowledge_sources", []),
-                context_features=item.get("context_features", {}),
-                confidence=item.get("confidence", 0.0),
-                metadata=item.get("metadata", {}),
-            )
-            for eid, item in data.items()
-        }
+    # --- loading -----------------------------------------------------------
 
-    def _persist(self) -> None:
-        payload = {eid: asdict(event) for eid, event in self.events.items()}
-        self.graph_path.parent.mkdir(parents=True, exist_ok=True)
-        self.graph_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    def _load(self) -> None:
+        self.events = {}
+        self._children, self._waiting, self._orphans, self._edge_count = {}, {}, set(), 0
+        if self.graph_path.exists():
+            data = json.loads(self.graph_path.read_text(encoding="utf-8") or "{}")
+            for eid, item in data.items():
+                self._index(_event_from_dict(eid, item))
+        lines = 0
+        if self.log_path.exists():
+            with open(self.log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    lines += 1
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        log_manager.warning(f"[CausalGraph] Skipping unreadable line in {self.log_path}")
+                        continue
+                    self._index(_event_from_dict(item["event_id"], item))
+        if lines > max(COMPACT_MIN_LINES, 2 * len(self.events)):
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp_path = self.log_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for event in self.events.values():
+                f.write(json.dumps(asdict(event), ensure_ascii=False) + "\n")
+        tmp_path.replace(self.log_path)
+        log_manager.info(f"[CausalGraph] Compacted {self.log_path} to {len(self.events)} events.")
+
+    # --- indexing ----------------------------------------------------------
+
+    def _unindex(self, event: CausalEvent) -> None:
+        for parent in event.parents:
+            self._edge_count -= 1
+            children = self._children.get(parent)
+            if children is not None:
+                children.discard(event.event_id)
+            waiting = self._waiting.get(parent)
+            if waiting is not None:
+                waiting.discard(event.event_id)
+                if not waiting:
+                    del self._waiting[parent]
+        self._orphans.discard(event.event_id)
+
+    def _index(self, event: CausalEvent) -> None:
+        previous = self.events.get(event.event_id)
+        if previous is not None:
+            self._unindex(previous)
+        self.events[event.event_id] = event
+        for parent in event.parents:
+            self._edge_count += 1
+            self._children.setdefault(parent, set()).add(event.event_id)
+            if parent not in self.events:
+                self._waiting.setdefault(parent, set()).add(event.event_id)
+                self._orphans.add(event.event_id)
+        # Events that were waiting for this one may now be complete.
+        for child_id in self._waiting.pop(event.event_id, ()):
+            if not self.missing_parents(child_id):
+                self._orphans.discard(child_id)
+
+    # --- writes ------------------------------------------------------------
 
     def add_event(self, event: CausalEvent) -> None:
-        self.events[event.event_id] = event
-        self._persist()
+        self.add_events([event])
+
+    def add_events(self, events: Iterable[CausalEvent]) -> None:
+        """Indexes and appends events; one file append for the whole batch."""
+        with self._lock:
+            lines = []
+            for event in events:
+                self._index(event)
+                lines.append(json.dumps(asdict(event), ensure_ascii=False) + "\n")
+            if not lines:
+                return
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write("".join(lines))
+
+    # --- reads -------------------------------------------------------------
 
     def get_event(self, event_id: str) -> CausalEvent | None:
         return self.events.get(event_id)
@@ -67,6 +158,60 @@ class CausalGraph:
     def list_events(self) -> List[CausalEvent]:
         return list(self.events.values())
 
+    def recent_event_ids(self, limit: int) -> List[str]:
+        """The ``limit`` most recently added event ids, oldest first."""
+        with self._lock:
+            return list(islice(reversed(self.events), limit))[::-1]
+
+    def children_of(self, event_id: str) -> List[str]:
+        return sorted(self._children.get(event_id, ()))
+
+    def missing_parents(self, event_id: str) -> List[str]:
+        event = self.events.get(event_id)
+        if not event:
+            return []
+        return [parent for parent in event.parents if parent not in self.events]
+
+    def is_orphan(self, event_id: str) -> bool:
+        return event_id in self._orphans
+
+    def orphans(self) -> List[str]:
+        with self._lock:
+            return sorted(self._orphans)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "total_nodes": len(self.events),
+            "total_edges": self._edge_count,
+            "orphan_count": len(self._orphans),
+            "missing_parent_ids": len(self._waiting),
+        }
+
+    def walk(self, event_id: str, depth: int = 3, direction: str = "parents") -> List[CausalEvent]:
+        """Breadth-first walk up to ``depth`` hops along parent (or child) links."""
+        with self._lock:
+            start = self.events.get(event_id)
+            if not start:
+                return []
+            visited = [start]
+            seen = {event_id}
+            queue = deque([(event_id, 0)])
+            while queue:
+                current_id, level = queue.popleft()
+                if level >= depth:
+                    continue
+                if direction == "children":
+                    neighbours = self._children.get(current_id, ())
+                else:
+                    neighbours = self.events[current_id].parents
+                for neighbour in neighbours:
+                    if neighbour in seen or neighbour not in self.events:
+                        continue
+                    seen.add(neighbour)
+                    visited.append(self.events[neighbour])
+                    queue.append((neighbour, level + 1))
+            return visited
+
     def build_graph(self) -> Dict[str, object]:
         return {
             "nodes": [asdict(event) for event in self.events.values()],
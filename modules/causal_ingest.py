@@ -2,27 +2,25 @@
 
 from __future__ import annotations
 
-import json
 import uuid
 from pathlib import Path
 from typing import Dict, List
 
 from modules.causal_graph import causal_graph, CausalEvent
+from orchestrator.context_history import load_history_entries
 
 HISTORY_PATH = Path("logs/context_history.json")
 
 
 def ingest_from_history(limit: int = 200) -> Dict[str, object]:
-    if not HISTORY_PATH.exists():
+    entries = load_history_entries(HISTORY_PATH, limit=limit)
+    if not entries:
         return {"success": False, "detail": "logs/context_history.json not found."}
 
-    entries = json.loads(HISTORY_PATH.read_text(encoding="utf-8"))
-    if not isinstance(entries, list):
-        return {"success": False, "detail": "Context history malformed."}
-
-    selected = entries[-limit:]
+    selected = entries
     last_by_layer: Dict[str, str] = {}
     created: List[str] = []
+    events: List[CausalEvent] = []
 
     for idx, entry in enumerate(selected):
         timestamp = entry.get("timestamp") or entry.get("created_at") or ""
@@ -59,8 +57,9 @@ def ingest_from_history(limit: int = 200) -> Dict[str, object]:
                 "new_value": entry.get("new_value"),
             },
         )
-        causal_graph.add_event(event)
+        events.append(event)
         last_by_layer[layer] = event_id
         created.append(event_id)
 
+    causal_graph.add_events(events)
     return {"success": True, "created": created, "count": len(created)}
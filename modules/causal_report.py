@@ -2,18 +2,18 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import Dict, Any
 
 from modules.causal_graph import causal_graph
 
 
 def generate_report(event_id: str | None = None) -> Dict[str, Any]:
-    graph = causal_graph.build_graph()
-    nodes = graph.get("nodes", [])
     if event_id:
-        node = next((item for item in nodes if item["event_id"] == event_id), None)
-        if not node:
+        event = causal_graph.get_event(event_id)
+        if not event:
             return {"success": False, "detail": "Event not found."}
+        node = asdict(event)
         parents = node.get("parents", [])
         metadata = node.get("metadata") or {}
         emotions = node.get("emotion_contribution") or {}
@@ -36,9 +36,10 @@ def generate_report(event_id: str | None = None) -> Dict[str, Any]:
             "parents": parents,
         }
     else:
+        stats = causal_graph.stats()
         summary = (
-            f"Causal graph currently tracks {len(nodes)} events with "
-            f"{len(graph.get('edges', []))} edges. "
+            f"Causal graph currently tracks {stats['total_nodes']} events with "
+            f"{stats['total_edges']} edges. "
             "Use /api/causal/report?event_id=<ID> for detailed context."
         )
-        return {"success": True, "summary": summary, "total_nodes": len(nodes)}
+        return {"success": True, "summary": summary, "total_nodes": stats["total_nodes"]}
@@ -2,30 +2,23 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+from typing import Dict
 
-from modules.causal_graph import causal_graph, CausalEvent
+from modules.causal_graph import causal_graph
 
 
-def trace_event(event_id: str, depth: int = 3) -> Dict[str, object]:
-    visited: List[CausalEvent] = []
-    stack: List[tuple[str, int]] = [(event_id, 0)]
-    seen = set()
-
-    while stack:
-        current_id, level = stack.pop()
-        if current_id in seen or level > depth:
-            continue
-        seen.add(current_id)
-        event = causal_graph.get_event(current_id)
-        if not event:
-            continue
-        visited.append(event)
-        for parent in event.parents:
-            stack.append((parent, level + 1))
+def trace_event(event_id: str, depth: int = 3, direction: str = "parents") -> Dict[str, object]:
+    visited = causal_graph.walk(event_id, depth, direction=direction)
+    visited_ids = {event.event_id for event in visited}
 
     return {
         "root": event_id,
         "visited": [event.event_id for event in visited],
         "nodes": [event.__dict__ for event in visited],
+        "edges": [
+            {"from": parent, "to": event.event_id}
+            for event in visited
+            for parent in event.parents
+            if parent in visited_ids
+        ],
     }
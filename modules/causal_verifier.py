@@ -11,7 +11,7 @@ def verify_causality(event_id: str) -> Dict[str, object]:
     event = causal_graph.get_event(event_id)
     if not event:
         return {"success": False, "detail": "Event not found."}
-    missing = [parent for parent in event.parents if not causal_graph.get_event(parent)]
+    missing = causal_graph.missing_parents(event_id)
     return {
         "success": len(missing) == 0,
         "event_id": event_id,
@@ -17,6 +17,8 @@ Core Features:
 
 import os, json, statistics, datetime, logging
 
+from modules.config_service import config_service
+
 COLLECTIVE_LOG = "./logs/collective_log.json"
 PARAM_FILE = "./config/model_params.json"
 OPT_LOG = "./logs/optimization_log.json"
@@ -74,6 +76,7 @@ def merge_ai_insights():
     try:
         with open(PARAM_FILE, "w", encoding="utf-8") as f:
             json.dump(params, f, indent=2)
+        config_service.invalidate("model_params")
     except IOError as e:
         logging.error(f"Error writing model parameters to {PARAM_FILE}: {e}")
         return {"message": f"Error writing model parameters: {e}", "status": "failed"}
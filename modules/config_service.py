@@ -0,0 +1,180 @@
+# path: modules/config_service.py
+# version: v1.0
+"""Parsed, hot-reloaded configuration shared by the whole process.
+
+Model params, persona traits and the .env-derived environment are parsed once and
+handed out as read-only snapshots. Each source is re-checked at most every
+``CONFIG_CHECK_INTERVAL`` seconds with a single ``stat``; only a changed mtime or
+size triggers a re-parse. Writers in this process call ``invalidate(name)`` so
+their change is visible immediately. ``version`` increases on every reload.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from modules.config_manager import load_environment
+from modules.log_manager import log_manager
+
+CHECK_INTERVAL = float(os.getenv("CONFIG_CHECK_INTERVAL", "1.0"))
+
+MODEL_PARAMS_PATH = "./config/model_params.json"
+PERSONA_PROFILE_PATH = "./config/persona_profile.json"
+DOTENV_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".env")
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of parsed JSON: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Mutable (and JSON-serializable) copy of a frozen snapshot."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+class _Source:
+    def __init__(self, name: str, path: str, parse: Callable[[str], Any], default: Any, requires_file: bool):
+        self.name = name
+        self.path = path
+        self.parse = parse
+        self.requires_file = requires_file
+        self.default = freeze(default)
+        self.value = self.default
+        self.signature = False  # never checked; None means "file absent"
+        self.checked_at = float("-inf")
+        self.loaded_at: Optional[str] = None
+        self.reloads = 0
+        self.errors = 0
+
+
+class ConfigService:
+    def __init__(self, check_interval: float = None):
+        self.check_interval = CHECK_INTERVAL if check_interval is None else check_interval
+        self.version = 0
+        self._sources: Dict[str, _Source] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str, parse: Callable[[str], Any], default: Any = None,
+                 requires_file: bool = True):
+        """
+        ``parse(path)`` returns the parsed value; it is only called when the file
+        changed. A missing file yields ``default`` unless ``requires_file`` is False.
+        """
+        with self._lock:
+            self._sources[name] = _Source(name, path, parse, default, requires_file)
+
+    @staticmethod
+    def _signature(path: str):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, name: str) -> Any:
+        source = self._sources[name]
+        now = time.monotonic()
+        if now - source.checked_at < self.check_interval:
+            return source.value
+        with self._lock:
+            if now - source.checked_at >= self.check_interval:
+                self._refresh(source)
+                source.checked_at = now
+            return source.value
+
+    def _refresh(self, source: _Source):
+        signature = self._signature(source.path)
+        if signature == source.signature:
+            return
+        try:
+            if signature is None and source.requires_file:
+                value = source.default
+            else:
+                value = freeze(source.parse(source.path))
+        except Exception as exc:
+            # Keep serving the last good value; a half-written file is retried next check.
+            source.errors += 1
+            log_manager.error(f"[ConfigService] Failed to reload {source.name} from {source.path}: {exc}")
+            return
+        source.value = value
+        source.signature = signature
+        source.loaded_at = datetime.now().isoformat()
+        source.reloads += 1
+        self.version += 1
+        log_manager.debug(f"[ConfigService] Loaded {source.name} (version {self.version}).")
+
+    def invalidate(self, name: str = None):
+        """Forces the next ``get`` to re-check the file (all sources if ``name`` is None)."""
+        with self._lock:
+            for source in self._sources.values():
+                if name is None or source.name == name:
+                    source.checked_at = float("-inf")
+                    source.signature = False
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "version": self.version,
+                "check_interval_s": self.check_interval,
+                "sources": {
+                    source.name: {
+                        "path": source.path,
+                        "present": bool(source.signature),
+                        "loaded_at": source.loaded_at,
+                        "reloads": source.reloads,
+                        "errors": source.errors,
+                    }
+                    for source in self._sources.values()
+                },
+            }
+
+    # --- typed accessors ---------------------------------------------------
+
+    def model_params(self) -> Mapping[str, Any]:
+        return self.get("model_params")
+
+    def persona_traits(self) -> Mapping[str, Any]:
+        return self.get("persona")["traits"]
+
+    def persona_prompt_prefix(self) -> str:
+        """``"[Personality traits: k:v, ...]\\n"``, or "" without traits."""
+        return self.get("persona")["prompt_prefix"]
+
+    def environment(self) -> Mapping[str, Any]:
+        return self.get("environment")
+
+
+def _read_json(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_persona(path: str) -> dict:
+    traits = _read_json(path).get("traits", {})
+    prefix = ""
+    if traits:
+        prefix = "[Personality traits: " + ", ".join(f"{k}:{v}" for k, v in traits.items()) + "]\n"
+    return {"traits": traits, "prompt_prefix": prefix}
+
+
+config_service = ConfigService()
+config_service.register("model_params", MODEL_PARAMS_PATH, _read_json, {})
+config_service.register("persona", PERSONA_PROFILE_PATH, _parse_persona, {"traits": {}, "prompt_prefix": ""})
+# load_environment() reads .env itself; re-running it only when .env changes keeps
+# the snapshot write and load_dotenv(override=True) off the per-call path.
+config_service.register("environment", DOTENV_PATH, lambda _path: load_environment(), {}, requires_file=False)
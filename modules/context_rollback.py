@@ -7,6 +7,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from orchestrator.context_history import load_history_entries
+
 
 class ContextRollback:
     def __init__(
@@ -43,9 +45,7 @@ class ContextRollback:
         return {"success": True, "payload": payload, "log": log_entry}
 
     def _load_history(self):
-        if not self.history_path.exists():
-            return []
-        return json.loads(self.history_path.read_text(encoding="utf-8"))
+        return load_history_entries(self.history_path)
 
     def _find_closest_snapshot(self, snapshots, timestamp: Optional[str]):
         if not timestamp:
@@ -5,6 +5,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Dict, List
 
+from modules.continuum_feed import continuum_feed
 from modules.memory_store import MemoryStore
 from modules.temporal_emotion import generate_emotion_signature
 
@@ -15,7 +16,7 @@ class ContinuumCore:
 
     def current_state(self) -> Dict[str, object]:
         now = datetime.utcnow().isoformat()
-        sessions = self.memory.latest_sessions(limit=10)
+        sessions = continuum_feed.snapshot()[1][:10]
         signature = generate_emotion_signature(sessions)
         return {
             "timestamp": now,
@@ -27,14 +28,5 @@ class ContinuumCore:
         }
 
     def stream_state(self) -> List[Dict[str, object]]:
-        results: List[Dict[str, object]] = []
-        for session in self.memory.latest_sessions(limit=30):
-            results.append(
-                {
-                    "session_id": session.id,
-                    "timestamp": session.created_at.isoformat() if session.created_at else None,
-                    "memory_snapshot": session.context_snapshot,
-                    "emotion_vector": session.emotion_vector,
-                }
-            )
-        return results
+        """Newest sessions first; served from the shared continuum feed snapshot."""
+        return continuum_feed.snapshot()[1]
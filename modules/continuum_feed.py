@@ -0,0 +1,193 @@
+# path: modules/continuum_feed.py
+# version: v1.1
+"""In-process publish/subscribe feed behind the continuum stream.
+
+Session writers (``save_session_to_db``, ``MemoryStore.save``) publish one entry
+per saved session; the feed keeps a single cached snapshot of the newest sessions
+shared by every client, plus a ring of recent events so a reconnecting SSE client
+can resume from its ``Last-Event-ID``. The snapshot is seeded from session_logs
+once per process instead of once per client tick.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.log_manager import log_manager
+
+SNAPSHOT_SIZE = 30
+RING_SIZE = int(os.getenv("CONTINUUM_FEED_RING_SIZE", "256"))
+
+
+def _isoformat(value) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def entry_from_session_log(session_log: Dict[str, Any]) -> Dict[str, Any]:
+    """Continuum entry for a session_logs row (as passed to save_session_to_db)."""
+    return {
+        "session_id": session_log.get("id") or session_log.get("session_id"),
+        "timestamp": _isoformat(session_log.get("created_at")) or datetime.utcnow().isoformat(),
+        "memory_snapshot": session_log.get("context"),
+        "emotion_vector": session_log.get("emotion_vector"),
+    }
+
+
+def entry_from_memory_record(record: Dict[str, Any], iteration: int) -> Dict[str, Any]:
+    """Continuum entry for a MemoryStore record."""
+    return {
+        "session_id": record.get("session_id"),
+        "timestamp": record.get("timestamp") or datetime.now().isoformat(),
+        "memory_snapshot": {
+            "iteration": iteration,
+            "question": record.get("user_input", ""),
+            "answer": record.get("answer", ""),
+        },
+        "emotion_vector": record.get("emotion_vector"),
+    }
+
+
+def load_recent_session_logs(limit: int = SNAPSHOT_SIZE) -> List[Dict[str, Any]]:
+    """Newest session_logs rows as continuum entries, newest first (empty if the DB is unreachable)."""
+    try:
+        from backend.db.connection import SessionLocal
+        from backend.db.models import SessionLog
+    except Exception as e:
+        log_manager.warning(f"[ContinuumFeed] session_logs unavailable, starting with an empty snapshot: {e}")
+        return []
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(SessionLog.id, SessionLog.created_at, SessionLog.context)
+            .order_by(SessionLog.created_at.desc(), SessionLog.id.desc())
+            .limit(limit)
+            .all()
+        )
+        return [entry_from_session_log(row._asdict()) for row in rows]
+    except Exception as e:
+        log_manager.warning(f"[ContinuumFeed] Failed to load recent sessions: {e}")
+        return []
+    finally:
+        db.close()
+
+
+class ContinuumFeed:
+    def __init__(self, loader: Callable[[], List[Dict[str, Any]]] = load_recent_session_logs,
+                 snapshot_size: int = SNAPSHOT_SIZE, ring_size: int = None):
+        self.loader = loader
+        self.snapshot_size = snapshot_size
+        # Event ids are "<boot>-<seq>"; an id from another process lifetime forces a fresh snapshot.
+        self.boot = uuid.uuid4().hex[:8]
+        self._seq = 0
+        self._ring: deque = deque(maxlen=max(1, ring_size or RING_SIZE))  # (seq, entry)
+        self._sessions: Optional["OrderedDict[str, Dict[str, Any]]"] = None  # newest last
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    # --- ids ---------------------------------------------------------------
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.boot}-{seq}"
+
+    def parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        """The sequence number in ``event_id``, or None if it is missing or from another process lifetime."""
+        if not event_id:
+            return None
+        boot, _, seq = event_id.rpartition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    # --- publishing --------------------------------------------------------
+
+    def _seed_locked(self, loaded: List[Dict[str, Any]]):
+        self._sessions = OrderedDict()
+        for entry in reversed(loaded):
+            if entry.get("session_id"):
+                self._sessions[str(entry["session_id"])] = entry
+        # Sessions published before the first snapshot request.
+        for _, entry in self._ring:
+            self._sessions.pop(str(entry["session_id"]), None)
+            self._sessions[str(entry["session_id"])] = entry
+        while len(self._sessions) > self.snapshot_size:
+            self._sessions.popitem(last=False)
+
+    def publish(self, entry: Dict[str, Any]) -> Optional[int]:
+        """Records a saved session; safe to call from any thread. Returns the event sequence number."""
+        session_id = entry.get("session_id")
+        if not session_id:
+            return None
+        with self._lock:
+            if self._sessions is not None:
+                self._sessions.pop(str(session_id), None)
+                self._sessions[str(session_id)] = entry
+                while len(self._sessions) > self.snapshot_size:
+                    self._sessions.popitem(last=False)
+            self._seq += 1
+            seq = self._seq
+            self._ring.append((seq, entry))
+            waiters, self._waiters = self._waiters, []
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                pass  # the subscriber's loop has closed
+        return seq
+
+    # --- reading -----------------------------------------------------------
+
+    def snapshot(self) -> Tuple[int, List[Dict[str, Any]]]:
+        """(current seq, newest sessions first); loads from session_logs on first use."""
+        # The session_logs query runs outside the lock so publishers never wait on it.
+        loaded = self.loader() if self._sessions is None else None
+        with self._lock:
+            if self._sessions is None:
+                self._seed_locked(loaded)
+            return self._seq, list(reversed(self._sessions.values()))
+
+    def events_since(self, event_id: Optional[str]) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+        """Events after ``event_id``, or None when the client must start from a snapshot."""
+        after = self.parse_event_id(event_id)
+        if after is None:
+            return None
+        with self._lock:
+            if after > self._seq:
+                return None
+            if after < self._seq and (not self._ring or self._ring[0][0] > after + 1):
+                return None  # fell out of the ring
+            return [(seq, entry) for seq, entry in self._ring if seq > after]
+
+    async def wait(self, after: int, timeout: float) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+        """
+        Events after sequence ``after``; waits up to ``timeout`` seconds if there are
+        none yet. None means events were missed (the reader fell behind the ring).
+        """
+        event = asyncio.Event()
+        with self._lock:
+            if self._seq <= after:
+                self._waiters.append((asyncio.get_running_loop(), event))
+                pending = True
+            else:
+                pending = False
+        if pending:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    self._waiters = [waiter for waiter in self._waiters if waiter[1] is not event]
+                return []
+        with self._lock:
+            if self._ring and self._ring[0][0] > after + 1:
+                return None
+            return [(seq, entry) for seq, entry in self._ring if seq > after]
+
+
+continuum_feed = ContinuumFeed()
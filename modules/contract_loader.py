@@ -27,14 +27,19 @@ class ContractLoader:
         if not self.contract_dir.exists():
             return {}
         with self._lock:
+            seen = set()
             for file in self.contract_dir.glob("*.*ml"):
-                mtime = file.stat().st_mtime
-                cached_mtime = self._mtimes.get(file.stem)
-                if cached_mtime is not None and cached_mtime >= mtime:
+                seen.add(file.stem)
+                mtime = file.stat().st_mtime_ns
+                if self._mtimes.get(file.stem) == mtime:
                     continue
                 contract = self._load_file(file)
                 self._cache[file.stem] = contract
                 self._mtimes[file.stem] = mtime
+            # Contracts whose file was removed are dropped too.
+            for name in set(self._cache) - seen:
+                self._cache.pop(name, None)
+                self._mtimes.pop(name, None)
         return dict(self._cache)
 
     def get_contract(self, module_name: str) -> Optional[dict]:
@@ -42,6 +47,8 @@ class ContractLoader:
             return self._cache.get(module_name)
 
     def refresh_if_changed(self) -> bool:
-        previous = {name: self._mtimes.get(name) for name in self._cache}
+        with self._lock:
+            previous = dict(self._mtimes)
         self.load_all()
-        return previous != self._mtimes
+        with self._lock:
+            return previous != self._mtimes
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Optional
+
+from modules.log_manager import log_manager
+
+
+def normalize_text(text: str) -> str:
+    normalized = unicodedata.normalize("NFKC", text or "")
+    return re.sub(r"\s+", " ", normalized).strip()
+
+
+def make_cache_key(model_name: str, text: str) -> str:
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+class _DiskTier:
+    """
+    Memory-mapped float32 matrix used as a ring buffer. Each row's key digest is
+    stored beside it and checked on read, so a row reused after the ring wraps can
+    never be returned for the key that used to own it. The key→row index is rebuilt
+    from those digests on open; flushing only writes the ring position.
+    """
+
+    _DIGEST_SIZE = 32
+
+    def __init__(self, directory: Path, capacity: int, flush_every: int = 32):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self._matrices: dict = {}
+        self._digests: dict = {}
+        self._rows: dict[int, dict[bytes, int]] = {}
+        self._next_row: dict[int, int] = {}
+        self._dirty: dict[int, int] = {}
+        self._dims: set[int] = set()
+        for path in self.directory.glob("keys_*.bin"):
+            try:
+                self._dims.add(int(path.stem.split("_", 1)[1]))
+            except ValueError:
+                continue
+
+    def _paths(self, dim: int) -> tuple[Path, Path, Path]:
+        return (
+            self.directory / f"vectors_{dim}.f32",
+            self.directory / f"keys_{dim}.bin",
+            self.directory / f"ring_{dim}.json",
+        )
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.sha256(key.encode("utf-8")).digest()
+
+    def _open(self, dim: int):
+        matrix = self._matrices.get(dim)
+        if matrix is not None:
+            return matrix, self._digests[dim]
+        import numpy as np
+
+        matrix_path, keys_path, ring_path = self._paths(dim)
+        matrix = np.memmap(
+            matrix_path, dtype=np.float32, mode="r+" if matrix_path.exists() else "w+", shape=(self.capacity, dim)
+        )
+        digests = np.memmap(
+            keys_path, dtype=np.uint8, mode="r+" if keys_path.exists() else "w+", shape=(self.capacity, self._DIGEST_SIZE)
+        )
+        next_row = 0
+        if ring_path.exists():
+            try:
+                next_row = int(json.loads(ring_path.read_text(encoding="utf-8"))["next_row"])
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                log_manager.warning(f"Embedding cache ring position {ring_path} is unreadable, restarting at 0: {exc}")
+        empty = bytes(self._DIGEST_SIZE)
+        rows = {}
+        for row in range(self.capacity):
+            digest = digests[row].tobytes()
+            if digest != empty:
+                rows[digest] = row
+        self._matrices[dim] = matrix
+        self._digests[dim] = digests
+        self._rows[dim] = rows
+        self._next_row[dim] = next_row % self.capacity
+        self._dims.add(dim)
+        return matrix, digests
+
+    def get(self, key: str) -> Optional[list[float]]:
+        digest = self._digest(key)
+        for dim in sorted(self._dims):
+            matrix, digests = self._open(dim)
+            row = self._rows[dim].get(digest)
+            if row is not None and digests[row].tobytes() == digest:
+                return matrix[row].tolist()
+        return None
+
+    def put(self, key: str, vector: list[float]) -> None:
+        dim = len(vector)
+        matrix, digests = self._open(dim)
+        digest = self._digest(key)
+        rows = self._rows[dim]
+        row = rows.get(digest)
+        if row is None:
+            row = self._next_row[dim]
+            self._next_row[dim] = (row + 1) % self.capacity
+            # Drop whichever key previously occupied this slot.
+            rows.pop(digests[row].tobytes(), None)
+            rows[digest] = row
+        # Clear the owner first so a torn write never pairs one key with another's vector.
+        digests[row] = 0
+        matrix[row] = vector
+        digests[row] = list(digest)
+        self._dirty[dim] = self._dirty.get(dim, 0) + 1
+        if self._dirty[dim] >= self.flush_every:
+            self._flush_dim(dim)
+
+    def _flush_dim(self, dim: int) -> None:
+        matrix, digests = self._open(dim)
+        matrix.flush()
+        digests.flush()
+        _, _, ring_path = self._paths(dim)
+        tmp_path = ring_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps({"next_row": self._next_row[dim]}), encoding="utf-8")
+        os.replace(tmp_path, ring_path)
+        self._dirty[dim] = 0
+
+    def flush(self) -> None:
+        for dim, dirty in list(self._dirty.items()):
+            if dirty:
+                self._flush_dim(dim)
+
+    def clear(self) -> None:
+        for dim in self._dims:
+            for path in self._paths(dim):
+                path.unlink(missing_ok=True)
+        self._matrices.clear()
+        self._digests.clear()
+        self._rows.clear()
+        self._next_row.clear()
+        self._dirty.clear()
+        self._dims.clear()
+
+
+class EmbeddingCache:
+    """Thread-safe LRU cache for embedding vectors keyed by (model name, normalized text hash)."""
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        ttl_seconds: Optional[float] = None,
+        disk_dir: Optional[str | Path] = None,
+        disk_capacity: int = 50000,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._entries: OrderedDict[str, tuple[tuple[float, ...], float]] = OrderedDict()
+        self._lock = Lock()
+        self._disk: Optional[_DiskTier] = None
+        if disk_dir:
+            try:
+                self._disk = _DiskTier(Path(disk_dir), disk_capacity)
+            except Exception as exc:
+                log_manager.warning(f"Embedding cache disk tier disabled: {exc}")
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "disk_errors": 0,
+        }
+
+    def _store_locked(self, key: str, vector: tuple[float, ...]) -> None:
+        self._entries[key] = (vector, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def get(self, model_name: str, text: str) -> Optional[list[float]]:
+        key = make_cache_key(model_name, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return list(vector)
+                del self._entries[key]
+                self._counters["expirations"] += 1
+            if self._disk is not None:
+                try:
+                    disk_vector = self._disk.get(key)
+                except Exception as exc:
+                    self._counters["disk_errors"] += 1
+                    log_manager.warning(f"Embedding cache disk read failed: {exc}")
+                    disk_vector = None
+                if disk_vector is not None:
+                    self._store_locked(key, tuple(disk_vector))
+                    self._counters["hits"] += 1
+                    self._counters["disk_hits"] += 1
+                    return disk_vector
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, model_name: str, text: str, vector: list[float]) -> None:
+        if not vector:
+            return
+        key = make_cache_key(model_name, text)
+        stored = tuple(float(value) for value in vector)
+        with self._lock:
+            self._store_locked(key, stored)
+            if self._disk is not None:
+                try:
+                    self._disk.put(key, list(stored))
+                except Exception as exc:
+                    self._counters["disk_errors"] += 1
+                    log_manager.warning(f"Embedding cache disk write failed: {exc}")
+
+    def get_or_compute(self, model_name: str, text: str, compute: Callable[[str], list[float]]) -> list[float]:
+        cached = self.get(model_name, text)
+        if cached is not None:
+            return cached
+        vector = compute(text)
+        self.put(model_name, text, vector)
+        return vector
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._disk is not None:
+                self._disk.flush()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_enabled": self._disk is not None,
+                "hit_ratio": (self._counters["hits"] / lookups) if lookups else 0.0,
+            }
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_cache_lock = Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache configured from RAG_EMBED_CACHE_* variables."""
+    global _shared_cache
+    if _shared_cache is not None:
+        return _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            ttl = os.getenv("RAG_EMBED_CACHE_TTL")
+            _shared_cache = EmbeddingCache(
+                max_entries=int(os.getenv("RAG_EMBED_CACHE_SIZE", "2048")),
+                ttl_seconds=float(ttl) if ttl else None,
+                disk_dir=os.getenv("RAG_EMBED_CACHE_DIR") or None,
+                disk_capacity=int(os.getenv("RAG_EMBED_CACHE_DISK_CAPACITY", "50000")),
+            )
+            import atexit
+
+            atexit.register(_shared_cache.flush)
+        return _shared_cache
@@ -6,7 +6,7 @@ import json
 import re
 import datetime
 from modules.log_manager import log_manager
-from modules.config_manager import load_environment
+from modules.config_service import config_service
 from orchestrator.context_manager import ContextManager
 from modules.llm import analyze_text # Import analyze_text
 
@@ -26,7 +26,7 @@ def evaluate_output(context_manager: ContextManager):
     """Evaluates the quality of a response using an LLM, based on data in the ContextManager."""
     log_manager.debug("Starting context-aware evaluation...")
 
-    config = load_environment()
+    config = config_service.environment()
     preferred_llm_url = (
         config.get("LM_STUDIO_URL")
         or config.get("LOCAL_LLM_API_URL")
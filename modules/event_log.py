@@ -0,0 +1,287 @@
+# path: modules/event_log.py
+# version: v1.2
+"""Append-only event logs written as rotating JSONL segments.
+
+``EventLog.for_path("logs/foo.json")`` keeps its segments in ``logs/foo.segments/``.
+A legacy JSON array at the original path is still read as the oldest data but is
+never rewritten. With ``live_file=True`` the original path is itself the newest
+JSONL segment instead, for logs that other tools read directly; once it reaches
+the size limit it is moved into the segment directory and started afresh.
+Appends go to an in-memory buffer that a background thread flushes, so callers on
+the request path never wait on disk, and a bounded ring of the newest entries
+answers ``tail(n)`` without touching the files.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from modules.log_manager import log_manager
+
+SEGMENT_MAX_BYTES = int(os.getenv("EVENT_LOG_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+SEGMENT_MAX_AGE_SECONDS = float(os.getenv("EVENT_LOG_SEGMENT_SECONDS", str(24 * 3600)))
+MAX_SEGMENTS = int(os.getenv("EVENT_LOG_MAX_SEGMENTS", "30"))
+FLUSH_INTERVAL = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "0.5"))
+TAIL_SIZE = int(os.getenv("EVENT_LOG_TAIL_SIZE", "1000"))
+
+PREDICTIVE_SELF_CORRECTION_PATH = "logs/predictive_self_correction.json"
+
+_READ_BLOCK = 64 * 1024
+
+
+def segment_dir_for(path) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.stem}.segments")
+
+
+def parse_lines(lines: Iterable[bytes], source) -> List[dict]:
+    """Decodes JSONL lines, skipping blank ones and logging (then skipping) unreadable ones."""
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            # A torn final line from a crash mid-write; skip it.
+            log_manager.warning(f"[EventLog] Skipping unreadable line in {source}")
+    return entries
+
+
+def read_tail_lines(path: Path, count: int) -> List[bytes]:
+    """Returns up to ``count`` last lines of a file, reading backwards in blocks."""
+    if count <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        buffer = b""
+        while position > 0 and buffer.count(b"\n") <= count:
+            step = min(_READ_BLOCK, position)
+            position -= step
+            f.seek(position)
+            buffer = f.read(step) + buffer
+    lines = [line for line in buffer.split(b"\n") if line.strip()]
+    return lines[-count:]
+
+
+def read_segment(path: Path, count: int = None) -> List[dict]:
+    """Entries of one JSONL segment, oldest first; with ``count`` only the last ``count`` lines are read."""
+    if count is not None:
+        return parse_lines(read_tail_lines(path, count), path)
+    with open(path, "rb") as f:
+        return parse_lines(f, path)
+
+
+class EventLog:
+    """Shared per-path append-only log; see the module docstring."""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path: str, **options) -> "EventLog":
+        """The shared log for ``path``; ``options`` apply when it is first created."""
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            log = cls._instances.get(key)
+            if log is None:
+                log = cls(path, **options)
+                cls._instances[key] = log
+            return log
+
+    def __init__(self, path: str, tail_size: int = None, flush_interval: float = None,
+                 segment_max_bytes: int = None, segment_max_age: float = None, max_segments: int = None,
+                 live_file: bool = False):
+        self.path = Path(path)
+        self.live_file = live_file
+        self.segment_dir = segment_dir_for(path)
+        self.tail_size = max(1, tail_size or TAIL_SIZE)
+        self.flush_interval = flush_interval if flush_interval is not None else FLUSH_INTERVAL
+        self.segment_max_bytes = segment_max_bytes or SEGMENT_MAX_BYTES
+        self.segment_max_age = segment_max_age or SEGMENT_MAX_AGE_SECONDS
+        self.max_segments = max(1, max_segments or MAX_SEGMENTS)
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[dict] = []
+        self._tail: Optional[deque] = None
+        self._disk_marker = None  # (newest segment name, size) after our last flush
+        self._wakeup = threading.Event()
+        self._flusher = None
+        self._closed = False
+        self.stats = {"appended": 0, "flushed": 0, "flushes": 0, "rotations": 0, "write_errors": 0}
+
+    # --- writing -----------------------------------------------------------
+
+    def append(self, entry: dict):
+        with self._lock:
+            self._pending.append(entry)
+            if self._tail is not None:
+                self._tail.append(entry)
+            self.stats["appended"] += 1
+            self._ensure_flusher()
+        if self.flush_interval <= 0:
+            self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name=f"event-log-{self.path.stem}", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _segments(self) -> List[Path]:
+        segments = sorted(self.segment_dir.glob("segment_*.jsonl")) if self.segment_dir.is_dir() else []
+        if self.live_file and self.path.exists():
+            segments.append(self.path)
+        return segments
+
+    def _active_segment(self, segments: List[Path]) -> Path:
+        if self.live_file:
+            # The live file rotates by size only; its age is not recorded anywhere.
+            if segments and segments[-1] == self.path and self.path.stat().st_size >= self.segment_max_bytes:
+                rotated = segments[:-1]
+                next_index = int(rotated[-1].stem.split("_")[1]) + 1 if rotated else 1
+                self.path.replace(self.segment_dir / f"segment_{next_index:06d}_{int(time.time())}.jsonl")
+                self.stats["rotations"] += 1
+                segments[:] = self._segments()
+            return self.path
+        # Segment names carry their creation time: segment_<index>_<epoch>.jsonl
+        if segments:
+            newest = segments[-1]
+            _, index, created = newest.stem.split("_")
+            if newest.stat().st_size < self.segment_max_bytes and time.time() - int(created) < self.segment_max_age:
+                return newest
+            self.stats["rotations"] += 1
+            next_index = int(index) + 1
+        else:
+            next_index = 1
+        return self.segment_dir / f"segment_{next_index:06d}_{int(time.time())}.jsonl"
+
+    def flush(self):
+        """Writes buffered entries to the active segment (rotating by size or age)."""
+        with self._io_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            payload = b"".join(
+                (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8") for entry in batch
+            )
+            try:
+                self.segment_dir.mkdir(parents=True, exist_ok=True)
+                segments = self._segments()
+                active = self._active_segment(segments)
+                fd = os.open(active, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, payload)
+                    size = os.fstat(fd).st_size
+                finally:
+                    os.close(fd)
+                if active not in segments:
+                    segments.append(active)
+                for stale in segments[:-self.max_segments]:
+                    stale.unlink(missing_ok=True)
+                with self._lock:
+                    self._disk_marker = (active.name, size)
+                self.stats["flushed"] += len(batch)
+                self.stats["flushes"] += 1
+            except OSError as e:
+                self.stats["write_errors"] += 1
+                log_manager.error(f"[EventLog] Failed to flush {len(batch)} entries to {self.segment_dir}: {e}")
+                with self._lock:
+                    self._pending = batch + self._pending
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self.flush()
+
+    # --- reading -----------------------------------------------------------
+
+    def _current_marker(self):
+        segments = self._segments()
+        if not segments:
+            return None
+        try:
+            return (segments[-1].name, segments[-1].stat().st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load_legacy(self) -> List[dict]:
+        if self.live_file or not self.path.exists():
+            return []
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8") or "[]")
+        except (json.JSONDecodeError, OSError) as e:
+            log_manager.warning(f"[EventLog] Could not read legacy log {self.path}: {e}")
+            return []
+        return data if isinstance(data, list) else []
+
+    def _read_disk_tail(self, count: int) -> List[dict]:
+        entries: List[dict] = []
+        for segment in reversed(self._segments()):
+            needed = count - len(entries)
+            try:
+                entries = read_segment(segment, needed) + entries
+            except FileNotFoundError:
+                continue
+            if len(entries) >= count:
+                return entries[-count:]
+        legacy = self._load_legacy()
+        return (legacy + entries)[-count:]
+
+    def _prime_tail_locked(self):
+        # Holding _io_lock keeps flush() from moving pending entries to disk meanwhile.
+        disk = self._read_disk_tail(self.tail_size)
+        marker = self._current_marker()
+        with self._lock:
+            self._tail = deque(disk + self._pending, maxlen=self.tail_size)
+            self._disk_marker = marker
+
+    def tail(self, count: int = 50) -> List[dict]:
+        """Returns the newest ``count`` entries, oldest first."""
+        if count <= 0:
+            return []
+        if count > self.tail_size:
+            self.flush()
+            return self._read_disk_tail(count)
+        with self._io_lock:
+            # Re-prime when another process has written to the segments since our last flush.
+            if self._tail is None or self._current_marker() != self._disk_marker:
+                self._prime_tail_locked()
+            with self._lock:
+                return list(self._tail)[-count:]
+
+    def iter_all(self) -> Iterator[dict]:
+        """Like read_all, but yields entries one segment at a time instead of holding them all."""
+        self.flush()
+        yield from self._load_legacy()
+        for segment in self._segments():
+            try:
+                entries = read_segment(segment)
+            except FileNotFoundError:
+                continue
+            yield from entries
+
+    def read_all(self) -> List[dict]:
+        """Every entry: the legacy JSON array, then all segments, then unflushed entries."""
+        return list(self.iter_all())
+
+
+def predictive_self_correction_log() -> EventLog:
+    return EventLog.for_path(PREDICTIVE_SELF_CORRECTION_PATH)
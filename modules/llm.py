@@ -1,57 +1,52 @@
 # path: modules/llm.py
-# version: v1.5
+# version: v1.7
 import requests
+import asyncio
 import json
 import os
+import re
 import datetime
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Iterator, Optional, Tuple
 from modules.metacognition import log_introspection  # Import for metacognition logging
-from modules.config_manager import load_environment
+from modules.config_service import MODEL_PARAMS_PATH, PERSONA_PROFILE_PATH, config_service, thaw
 
 try:
-    from transformers import pipeline
+    from transformers import pipeline, StoppingCriteriaList, TextIteratorStreamer
     _TRANSFORMERS_AVAILABLE = True
 except ImportError:
     pipeline = None
+    StoppingCriteriaList = None
+    TextIteratorStreamer = None
     _TRANSFORMERS_AVAILABLE = False
 
 # ❌ 旧: 固定URL
 # LLM_API_URL = os.getenv("LLM_API_URL", "http://localhost:1234/v1/chat/completions")
 
 LLM_SIMULATION_MODE = os.getenv("LLM_SIMULATION_MODE", "False").lower() == "true"
-PARAM_FILE = "./config/model_params.json"
-PERSONA_FILE = "./config/persona_profile.json"
+PARAM_FILE = MODEL_PARAMS_PATH
+PERSONA_FILE = PERSONA_PROFILE_PATH
 _TRANSFORMERS_PIPELINE = None
 _TRANSFORMERS_PIPELINE_KEY = None
 
 # Ensure .env settings are loaded before any LLM calls
 try:
-    load_environment()
+    config_service.environment()
 except Exception as env_exc:
     logging.warning(f"[LLM] Failed to initialize environment variables: {env_exc}")
 
 
 def load_persona_traits():
-    """Loads current persona traits from PERSONA_FILE or returns an empty dict."""
-    if not os.path.exists(PERSONA_FILE):
-        return {}
-    try:
-        with open(PERSONA_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data.get("traits", {})
-    except json.JSONDecodeError as e:
-        logging.error(f"Error loading persona profile from {PERSONA_FILE}: {e}. Using empty traits.")
-        return {}
+    """Current persona traits (read-only, reloaded when PERSONA_FILE changes)."""
+    return config_service.persona_traits()
 
 
 def apply_persona_to_prompt(prompt: str) -> str:
     """Applies persona traits to the given prompt."""
-    traits = load_persona_traits()
-    if not traits:
-        return prompt
-    personality_desc = ", ".join([f"{k}:{v}" for k, v in traits.items()])
-    return f"[Personality traits: {personality_desc}]\n{prompt}"
+    return config_service.persona_prompt_prefix() + prompt
 
 
 def _resolve_transformers_model(model_params: dict) -> Tuple[bool, Optional[str]]:
@@ -116,16 +111,18 @@ def _compose_transformers_prompt(system_prompt: str, user_text: str) -> str:
     return f"{system}\n\n{user}"
 
 
-def _generate_with_transformers(prompt_text: str, model_params: dict, model_name: str) -> str:
+def _get_transformers_pipeline_for(model_params: dict, model_name: str):
     device = model_params.get("transformers_device") or os.getenv("TRANSFORMERS_DEVICE", "cpu")
     trust_remote_code = str(
         model_params.get("transformers_trust_remote_code")
         or os.getenv("TRANSFORMERS_TRUST_REMOTE_CODE", "false")
     ).lower() == "true"
+    return _get_transformers_pipeline(model_name, device, trust_remote_code)
 
-    pipe = _get_transformers_pipeline(model_name, device, trust_remote_code)
+
+def _transformers_generation_kwargs(pipe, model_params: dict) -> dict:
     temperature = model_params.get("temperature", 0.7)
-    generation_kwargs = {
+    return {
         "max_new_tokens": model_params.get("max_tokens", 1024),
         "temperature": temperature,
         "top_p": model_params.get("top_p", 0.9),
@@ -133,13 +130,52 @@ def _generate_with_transformers(prompt_text: str, model_params: dict, model_name
         "pad_token_id": pipe.tokenizer.pad_token_id,
         "eos_token_id": pipe.tokenizer.eos_token_id,
     }
-    outputs = pipe(prompt_text, **generation_kwargs)
+
+
+def _generate_with_transformers(prompt_text: str, model_params: dict, model_name: str) -> str:
+    pipe = _get_transformers_pipeline_for(model_params, model_name)
+    outputs = pipe(prompt_text, **_transformers_generation_kwargs(pipe, model_params))
     generated_text = outputs[0]["generated_text"]
     if generated_text.startswith(prompt_text):
         return generated_text[len(prompt_text):].strip()
     return generated_text.strip()
 
 
+def _load_model_params(model_params_override: dict = None) -> dict:
+    model_params = {"temperature": 0.7, "top_p": 0.9, "max_tokens": 1024}
+    # Parsed once per file change by config_service; thawed so callers may mutate it.
+    model_params.update(thaw(config_service.model_params()))
+
+    if model_params_override:
+        model_params.update(model_params_override)
+    return model_params
+
+
+def _resolve_llm_url(model_params: dict) -> str:
+    return (
+        model_params.get("llm_url")
+        or os.getenv("LOCAL_LLM_API_URL")
+        or "http://127.0.0.1:1234/v1"
+    )
+
+
+def _build_chat_payload(text: str, augmented_prompt: str, model_params: dict) -> dict:
+    data = {
+        "model": os.getenv("SSP_LOCAL_LLM_MODEL_NAME", "Meta-Llama-3-8B-Instruct-Q4_K_M-GGUF"),
+        "messages": [
+            {"role": "system", "content": augmented_prompt},
+            {"role": "user", "content": text}
+        ],
+        "temperature": model_params["temperature"],
+        "top_p": model_params["top_p"],
+        "max_tokens": model_params["max_tokens"]
+    }
+
+    if "response_format" in model_params:
+        data["response_format"] = model_params["response_format"]
+    return data
+
+
 def _build_error_response(message: str, suggestion: str, source: str = "Actual LLM") -> str:
     payload = {
         "timestamp": datetime.datetime.now().isoformat(),
@@ -159,16 +195,7 @@ def analyze_text(text: str, prompt: str, model_params_override: dict = None) ->
     log_introspection("input_received", f"User input: {text[:100]}..., Prompt: {prompt[:100]}...")
 
     # --- モデルパラメータのロード ---
-    model_params = {"temperature": 0.7, "top_p": 0.9, "max_tokens": 1024}
-    if os.path.exists(PARAM_FILE):
-        try:
-            with open(PARAM_FILE, "r", encoding="utf-8") as f:
-                model_params.update(json.load(f))
-        except json.JSONDecodeError as e:
-            logging.error(f"Error loading model parameters from {PARAM_FILE}: {e}. Using default parameters.")
-
-    if model_params_override:
-        model_params.update(model_params_override)
+    model_params = _load_model_params(model_params_override)
 
     # --- Persona を付与 ---
     augmented_prompt = apply_persona_to_prompt(prompt)
@@ -201,27 +228,11 @@ def analyze_text(text: str, prompt: str, model_params_override: dict = None) ->
             # Transformers利用が失敗した場合はHTTPバックエンドにフォールバック
 
     # --- HTTPバックエンド (LM Studio / Ollama互換) ---
-    llm_url = (
-        model_params.get("llm_url")
-        or os.getenv("LOCAL_LLM_API_URL")
-        or "http://127.0.0.1:1234/v1"
-    )
+    llm_url = _resolve_llm_url(model_params)
     log_introspection("llm_url_selected", f"Using endpoint: {llm_url}", confidence=0.9)
 
     headers = {"Content-Type": "application/json"}
-    data = {
-        "model": os.getenv("SSP_LOCAL_LLM_MODEL_NAME", "Meta-Llama-3-8B-Instruct-Q4_K_M-GGUF"),
-        "messages": [
-            {"role": "system", "content": augmented_prompt},
-            {"role": "user", "content": text}
-        ],
-        "temperature": model_params["temperature"],
-        "top_p": model_params["top_p"],
-        "max_tokens": model_params["max_tokens"]
-    }
-
-    if "response_format" in model_params:
-        data["response_format"] = model_params["response_format"]
+    data = _build_chat_payload(text, augmented_prompt, model_params)
 
     try:
         response = requests.post(f"{llm_url}/chat/completions", headers=headers, json=data, timeout=30)
@@ -257,3 +268,259 @@ def analyze_text(text: str, prompt: str, model_params_override: dict = None) ->
             "LLM analysis failed due to connection error.",
             f"Please check LLM service at {llm_url}. Error: {str(e)}",
         )
+
+
+# --- Streaming ---------------------------------------------------------------
+
+STREAM_READ_TIMEOUT = float(os.getenv("LLM_STREAM_READ_TIMEOUT", "60"))
+_SENTENCE_END = re.compile(r"(.+?(?:[。！？!?]+|\.+(?=\s)|\n))", re.S)
+_recent_stream_metrics = deque(maxlen=100)
+_stream_metrics_lock = threading.Lock()
+
+
+class StreamMetrics:
+    """Time-to-first-token and throughput for one streamed completion."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+        self.characters = 0
+
+    def on_chunk(self, chunk: str, tokens: int = 1):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += tokens
+        self.characters += len(chunk)
+
+    def finish(self) -> dict:
+        self.finished_at = time.perf_counter()
+        summary = self.to_dict()
+        with _stream_metrics_lock:
+            _recent_stream_metrics.append(summary)
+        log_introspection(
+            "stream_metrics",
+            f"{self.backend}: ttft={summary['ttft_ms']}ms, {summary['tokens']} tokens, {summary['tokens_per_sec']} tok/s",
+            confidence=0.9,
+        )
+        return summary
+
+    def to_dict(self) -> dict:
+        end = self.finished_at or time.perf_counter()
+        ttft = (self.first_token_at - self.started) if self.first_token_at else None
+        generation = (end - self.first_token_at) if self.first_token_at else 0.0
+        return {
+            "backend": self.backend,
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "total_ms": round((end - self.started) * 1000, 1),
+            "tokens": self.tokens,
+            "characters": self.characters,
+            "tokens_per_sec": round(self.tokens / generation, 2) if generation > 0 else None,
+        }
+
+
+def get_stream_metrics() -> dict:
+    """Summary of the most recent streamed completions (up to 100)."""
+    with _stream_metrics_lock:
+        recent = list(_recent_stream_metrics)
+    ttfts = [m["ttft_ms"] for m in recent if m["ttft_ms"] is not None]
+    rates = [m["tokens_per_sec"] for m in recent if m["tokens_per_sec"]]
+    return {
+        "count": len(recent),
+        "avg_ttft_ms": round(sum(ttfts) / len(ttfts), 1) if ttfts else None,
+        "avg_tokens_per_sec": round(sum(rates) / len(rates), 2) if rates else None,
+        "last": recent[-1] if recent else None,
+    }
+
+
+def _iter_sse_deltas(response) -> Iterator[Tuple[str, Optional[int]]]:
+    """Yields (content delta, usage completion tokens or None) from an OpenAI-compatible SSE body."""
+    for raw_line in response.iter_lines(decode_unicode=True):
+        if not raw_line:
+            continue
+        line = raw_line.decode("utf-8") if isinstance(raw_line, bytes) else raw_line
+        if not line.startswith("data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == "[DONE]":
+            return
+        try:
+            chunk = json.loads(payload)
+        except json.JSONDecodeError:
+            logging.warning(f"[LLM] Skipping malformed stream chunk: {payload[:100]}")
+            continue
+        usage = (chunk.get("usage") or {}).get("completion_tokens")
+        for choice in chunk.get("choices") or []:
+            delta = (choice.get("delta") or {}).get("content")
+            if delta:
+                yield delta, None
+        if usage:
+            yield "", usage
+
+
+def _stream_http(text: str, augmented_prompt: str, model_params: dict, metrics: StreamMetrics) -> Iterator[str]:
+    llm_url = _resolve_llm_url(model_params)
+    data = _build_chat_payload(text, augmented_prompt, model_params)
+    data["stream"] = True
+    with requests.post(
+        f"{llm_url}/chat/completions",
+        headers={"Content-Type": "application/json", "Accept": "text/event-stream"},
+        json=data,
+        stream=True,
+        timeout=(10, STREAM_READ_TIMEOUT),
+    ) as response:
+        response.raise_for_status()
+        for delta, usage in _iter_sse_deltas(response):
+            if usage:
+                # Server-reported usage replaces the per-chunk estimate.
+                metrics.tokens = usage
+                continue
+            metrics.on_chunk(delta)
+            yield delta
+
+
+def _stream_transformers(prompt_text: str, model_params: dict, model_name: str, metrics: StreamMetrics) -> Iterator[str]:
+    if TextIteratorStreamer is None:
+        raise RuntimeError("Transformers streaming requested but the 'transformers' package is not installed.")
+    pipe = _get_transformers_pipeline_for(model_params, model_name)
+    streamer = TextIteratorStreamer(pipe.tokenizer, skip_prompt=True, skip_special_tokens=True, timeout=STREAM_READ_TIMEOUT)
+    kwargs = _transformers_generation_kwargs(pipe, model_params)
+    # Set when the consumer closes this generator early, so generate() stops at the next token.
+    stop = threading.Event()
+    kwargs["stopping_criteria"] = StoppingCriteriaList([lambda input_ids, scores, **_: stop.is_set()])
+    errors = []
+
+    def _generate():
+        try:
+            pipe(prompt_text, streamer=streamer, **kwargs)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    worker = threading.Thread(target=_generate, name="llm-hf-stream", daemon=True)
+    worker.start()
+    try:
+        for chunk in streamer:
+            if not chunk:
+                continue
+            metrics.on_chunk(chunk, tokens=len(pipe.tokenizer.encode(chunk, add_special_tokens=False)))
+            yield chunk
+    finally:
+        stop.set()
+    worker.join()
+    if errors:
+        raise errors[0]
+
+
+def stream_text(text: str, prompt: str, model_params_override: dict = None, metrics_out: dict = None) -> Iterator[str]:
+    """
+    Streaming variant of analyze_text: yields the completion as text chunks as they arrive.
+
+    Uses the same backend selection (simulation, Transformers, HTTP). If ``metrics_out``
+    is given it is filled with ttft_ms / tokens / tokens_per_sec when the stream ends.
+    Errors before the first chunk yield the same JSON error payload analyze_text returns.
+    """
+    log_introspection("input_received", f"User input: {text[:100]}..., Prompt: {prompt[:100]}...")
+    model_params = _load_model_params(model_params_override)
+    augmented_prompt = apply_persona_to_prompt(prompt)
+
+    if LLM_SIMULATION_MODE:
+        metrics = StreamMetrics("simulation")
+        simulated = analyze_text(text, prompt, model_params_override)
+        metrics.on_chunk(simulated)
+        yield simulated
+        summary = metrics.finish()
+        if metrics_out is not None:
+            metrics_out.update(summary)
+        return
+
+    use_transformers, transformers_model = _resolve_transformers_model(model_params)
+    if use_transformers:
+        metrics = StreamMetrics("transformers")
+        try:
+            prompt_text = _compose_transformers_prompt(augmented_prompt, text)
+            yield from _stream_transformers(prompt_text, model_params, transformers_model, metrics)
+            summary = metrics.finish()
+            if metrics_out is not None:
+                metrics_out.update(summary)
+            return
+        except Exception as e:
+            logging.error(f"Error streaming from transformers backend: {e}", exc_info=True)
+            log_introspection("llm_transformers_failed", f"Error: {e}", confidence=0.0)
+            if metrics.tokens:
+                return
+            # Nothing was produced yet, so fall back to the HTTP backend like analyze_text does.
+
+    metrics = StreamMetrics("http")
+    try:
+        yield from _stream_http(text, augmented_prompt, model_params, metrics)
+    except requests.exceptions.RequestException as e:
+        logging.error(f"Error streaming from local LLM: {e}")
+        log_introspection("llm_call_failed", f"Error: {e}", confidence=0.0)
+        if not metrics.tokens:
+            yield _build_error_response(
+                "LLM analysis failed due to connection error.",
+                f"Please check LLM service at {_resolve_llm_url(model_params)}. Error: {str(e)}",
+            )
+    summary = metrics.finish()
+    if metrics_out is not None:
+        metrics_out.update(summary)
+
+
+async def astream_text(text: str, prompt: str, model_params_override: dict = None, metrics_out: dict = None) -> AsyncIterator[str]:
+    """Async iterator over stream_text; the blocking backend runs on a worker thread.
+
+    If the consumer stops early (client disconnect, ``aclose()``), the worker closes
+    stream_text at its next chunk, which closes the HTTP response or stops generation.
+    """
+    loop = asyncio.get_running_loop()
+    chunks: asyncio.Queue = asyncio.Queue()
+    done = object()
+    cancelled = threading.Event()
+
+    def _produce():
+        stream = stream_text(text, prompt, model_params_override, metrics_out)
+        try:
+            for chunk in stream:
+                if cancelled.is_set():
+                    break
+                loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+        except Exception as e:
+            if not cancelled.is_set():
+                loop.call_soon_threadsafe(chunks.put_nowait, e)
+        finally:
+            stream.close()
+            if not cancelled.is_set():
+                loop.call_soon_threadsafe(chunks.put_nowait, done)
+
+    producer = loop.run_in_executor(None, _produce)
+    try:
+        while True:
+            item = await chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+        await producer
+    finally:
+        cancelled.set()
+
+
+def iter_sentences(chunks) -> Iterator[str]:
+    """Regroups streamed chunks into sentences so TTS can start on the first one."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            match = _SENTENCE_END.match(buffer)
+            if not match:
+                break
+            sentence = match.group(1).strip()
+            buffer = buffer[match.end():]
+            if sentence:
+                yield sentence
+    if buffer.strip():
+        yield buffer.strip()
@@ -15,13 +15,14 @@ class MemoryIntegrator:
         sessions = self.memory.latest_sessions(limit=depth)
         chain: List[Dict[str, Any]] = []
         for session in sessions:
+            last_record = session.get("last_record") or {}
             chain.append(
                 {
-                    "id": session.id,
-                    "topic": (session.context_snapshot or {}).get("topic"),
-                    "emotion": session.emotion_vector,
-                    "score": session.evaluation_score,
-                    "timestamp": session.created_at.isoformat() if session.created_at else None,
+                    "id": session["session_id"],
+                    "topic": last_record.get("question"),
+                    "emotion": last_record.get("emotion_vector"),
+                    "score": last_record.get("rating"),
+                    "timestamp": session.get("updated_at"),
                 }
             )
         return chain
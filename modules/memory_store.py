@@ -1,15 +1,19 @@
 # path: modules/memory_store.py
-# version: v1.3
+# version: v1.4
 # メモリストアモジュール
 # セッションログをPostgreSQLデータベースに確実に保存する機構を提供する
 
 import os
-import json
+import threading
 from pathlib import Path
 from backend.db.connection import save_session_to_db
+from modules.continuum_feed import continuum_feed, entry_from_memory_record
+from modules.session_record_store import SessionRecordStore
 import datetime # 追加
 from modules.log_manager import log_manager
 
+MEMORY_STORE_PATH = os.getenv("MEMORY_STORE_PATH", "data/memory_store.sqlite3")
+
 class MemoryStore:
     _instance = None
     _initialized = False
@@ -24,52 +28,32 @@ class MemoryStore:
             return
 
         self.config = config if config is not None else {}
+        # Legacy JSON array; imported into the record store once, then only read for that.
         self.file_path = Path("data/memory_log.json")
-        self.file_path.parent.mkdir(parents=True, exist_ok=True)
-        log_manager.info(f"✅ MemoryStore initialized. Data file path: {self.file_path}")
+        self.store_path = Path(self.config.get("store_path") or MEMORY_STORE_PATH)
+        self._store = None
+        self._store_lock = threading.Lock()
+        log_manager.info(f"✅ MemoryStore initialized. Store path: {self.store_path}")
         self._initialized = True
 
-    def _load_records(self) -> list:
-        log_manager.debug(f"Loading records from {self.file_path}")
-        if self.file_path.exists():
-            try:
-                with open(self.file_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except json.JSONDecodeError:
-                log_manager.warning(f"⚠️ MemoryStore: {self.file_path} が破損しています。新規作成します。")
-                return []
-            except Exception as e:
-                log_manager.exception(f"❌ MemoryStore: {self.file_path} の読み込み中にエラーが発生しました: {e}")
-                return []
-        return []
-
-    def _save_records(self, records: list):
-        log_manager.debug(f"Saving {len(records)} records to {self.file_path}")
-        try:
-            with open(self.file_path, "w", encoding="utf-8") as f:
-                json.dump(records, f, ensure_ascii=False, indent=2)
-            log_manager.debug(f"✅ MemoryStore: {self.file_path} に保存しました。")
-        except Exception as e:
-            log_manager.exception(f"❌ MemoryStore: {self.file_path} の保存中にエラーが発生しました: {e}")
+    @property
+    def store(self) -> SessionRecordStore:
+        # Opened on first use so importing or constructing MemoryStore never touches disk.
+        if self._store is None:
+            with self._store_lock:
+                if self._store is None:
+                    store = SessionRecordStore.for_path(str(self.store_path))
+                    store.migrate_json(self.file_path)
+                    self._store = store
+        return self._store
 
     def save(self, record_data: dict, iteration: int = 1):
-        log_manager.debug(f"Attempting to save record for session_id: {record_data.get('session_id')}, iteration: {iteration}")
-        try:
-            all_sessions = self._load_records()
-        except Exception as e:
-            log_manager.error(f"MemoryStore.save: _load_records中にエラーが発生しました: {e}。record.jsonを再初期化します。")
-            all_sessions = []
-
         session_id = record_data.get("session_id")
+        log_manager.debug(f"Attempting to save record for session_id: {session_id}, iteration: {iteration}")
         if not session_id:
             log_manager.error("❌ record_data に session_id がありません。保存をスキップします。")
             return
 
-        existing_session_index = next(
-            (i for i, s in enumerate(all_sessions) if str(s.get("session_id")).strip() == str(session_id).strip()),
-            -1
-        )
-
         new_record_entry = {
             "iteration": iteration,
             "question": record_data.get("user_input", ""),
@@ -83,18 +67,29 @@ class MemoryStore:
             if record_data.get(field) is not None:
                 new_record_entry[field] = record_data.get(field)
 
-        if existing_session_index != -1:
-            all_sessions[existing_session_index]["records"].append(new_record_entry)
-            log_manager.info(f"🧩 既存セッション {session_id} に iteration {iteration} を追加しました。")
-        else:
-            new_session = {
-                "session_id": session_id,
-                "records": [new_record_entry]
-            }
-            all_sessions.append(new_session)
-            log_manager.info(f"🆕 新規セッション {session_id} を作成しました。")
-
-        self._save_records(all_sessions)
+        try:
+            self.store.append(session_id, new_record_entry)
+        except Exception as e:
+            log_manager.exception(f"❌ MemoryStore: {self.store_path} への保存中にエラーが発生しました: {e}")
+            return
+        log_manager.debug(f"🧩 セッション {session_id} に iteration {iteration} を追加しました。")
+        continuum_feed.publish(entry_from_memory_record(record_data, iteration))
+
+    def get_session(self, session_id: str):
+        """``{"session_id", "records": [...]}`` or None."""
+        return self.store.session(session_id)
+
+    def tail(self, limit: int = 50, session_id: str = None) -> list:
+        """Newest ``limit`` records (optionally of one session), oldest first."""
+        return self.store.tail(limit, session_id)
+
+    def latest_sessions(self, limit: int = 10) -> list:
+        """Most recently updated sessions, newest first, with their last record."""
+        return self.store.latest_sessions(limit)
+
+    def recent_sessions(self, limit: int = 10) -> list:
+        """Last ``limit`` sessions by creation, oldest first, as full session dicts."""
+        return self.store.recent_sessions(limit)
 
     def save_record_to_db(self, log_data: dict):
         log_manager.debug(f"Attempting to save record to DB for session_id: {log_data.get('session_id')}")
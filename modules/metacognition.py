@@ -1,10 +1,14 @@
 # path: modules/metacognition.py
-# version: v1.9
+# version: v2.1
 """
 Cognitive Harmony Extension
 ----------------------------------------
 Evaluates alignment between emotional valence and logical confidence.
 Enables Shiroi to measure her internal cognitive balance.
+
+Introspection entries are kept in an ``EventLog`` whose live file is
+``introspection_trace.log`` (JSONL), rotated by size into
+``introspection_trace.segments/``. Its ring of the newest entries serves the readers.
 """
 
 import os, json, datetime, logging
@@ -12,9 +16,14 @@ import re
 import numpy as np
 import statistics
 
+from modules.event_log import EventLog
+
 LOG_PATH = "./logs/introspection_trace.log"
 PERSONA_PROFILE_PATH = "./config/persona_profile.json" # Moved up for visibility
-MAX_ENTRIES = 5000
+MAX_ENTRIES = 5000  # entries extract_emotional_patterns looks back over
+RING_SIZE = int(os.getenv("INTROSPECTION_RING_SIZE", "1000"))  # entries kept in memory
+MAX_LOG_BYTES = int(os.getenv("INTROSPECTION_LOG_MAX_BYTES", str(2 * 1024 * 1024)))
+ROTATED_LOGS = int(os.getenv("INTROSPECTION_LOG_BACKUPS", "3"))
 
 # 感情語辞書（暫定）
 EMOTION_MAP = {
@@ -35,9 +44,18 @@ def analyze_emotion(text: str):
         return (0.0, 0.0)
     return (round(valence/count, 2), round(arousal/count, 2))
 
+def introspection_log(path: str = LOG_PATH) -> EventLog:
+    """The shared introspection journal: the live file plus ``ROTATED_LOGS`` rotated segments."""
+    return EventLog.for_path(
+        path, live_file=True, tail_size=RING_SIZE, segment_max_bytes=MAX_LOG_BYTES, max_segments=ROTATED_LOGS + 1
+    )
+
+
+introspection_journal = introspection_log()
+
+
 def log_introspection(stage: str, thought: str, confidence: float = 0.7):
     """Record a thought into the introspection log."""
-    os.makedirs(os.path.dirname(LOG_PATH), exist_ok=True)
     valence, arousal = analyze_emotion(thought)
     entry = {
         "timestamp": datetime.datetime.now().isoformat(),
@@ -47,30 +65,17 @@ def log_introspection(stage: str, thought: str, confidence: float = 0.7):
         "emotion": {"valence": valence, "arousal": arousal}
     }
 
-    with open(LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-
-    _truncate_if_needed()
+    introspection_journal.append(entry)
     logging.info(f"[Metacognition] {stage}: {thought}")
     return entry
 
 def summarize_introspection(limit: int = 10):
     """
     Summarize recent introspections for reflection."""
-    if not os.path.exists(LOG_PATH):
+    data = introspection_journal.tail(limit)
+    if not data:
         return "No introspection logs yet."
 
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()[-limit:]
-
-    data = []
-    for line in lines:
-        try:
-            data.append(json.loads(line))
-        except json.JSONDecodeError as e:
-            logging.warning(f"Could not decode JSON from introspection log line: {line.strip()}. Error: {e}")
-            continue
-
     thoughts = [f"{d['stage']}: {d['thought']}" for d in data]
     avg_conf = round(sum(d['confidence'] for d in data) / len(data), 2) if data else 0.0
     summary = " / ".join(thoughts)
@@ -81,16 +86,6 @@ def summarize_introspection(limit: int = 10):
         "summary": summary
     }
 
-def _truncate_if_needed():
-    """Auto-truncate old logs when exceeding MAX_ENTRIES."""
-    if not os.path.exists(LOG_PATH):
-        return
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    if len(lines) > MAX_ENTRIES:
-        with open(LOG_PATH, "w", encoding="utf-8") as f:
-            f.writelines(lines[-MAX_ENTRIES:])
-
 def compute_cognitive_harmony(valence: float, confidence: float) -> float:
     """
     Harmony Score ∈ [-1.0, +1.0]
@@ -108,12 +103,7 @@ def compute_cognitive_harmony(valence: float, confidence: float) -> float:
     return round(harmony, 2)
 
 def extract_emotional_patterns():
-    file = "./logs/introspection_trace.log"
-    if not os.path.exists(file):
-        return {"average_valence": 0, "dominant_emotion": "neutral"}
-
-    with open(file, "r", encoding="utf-8") as f:
-        data = [json.loads(x) for x in f.readlines() if "emotion" in x]
+    data = introspection_journal.tail(MAX_ENTRIES)
     valences = [d["emotion"]["valence"] for d in data if "emotion" in d]
     if not valences:
         return {"average_valence": 0, "dominant_emotion": "neutral"}
@@ -124,20 +114,10 @@ def extract_emotional_patterns():
 
 def get_latest_introspection_log():
     """Retrieve the most recent introspection log entry."""
-    if not os.path.exists(LOG_PATH):
+    latest = introspection_journal.tail(1)
+    if not latest:
         return {"summary": "No introspection logs yet."}
-
-    with open(LOG_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-        if not lines:
-            return {"summary": "No introspection logs yet."}
-        
-        last_line = lines[-1]
-        try:
-            return json.loads(last_line)
-        except json.JSONDecodeError as e:
-            logging.warning(f"Could not decode JSON from last introspection log line: {last_line.strip()}. Error: {e}")
-            return {"summary": "Error reading last log entry."}
+    return latest[0]
 
 def get_cognitive_graph_data():
     """Retrieve cognitive traits from persona_profile.json."""
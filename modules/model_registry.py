@@ -0,0 +1,99 @@
+# path: modules/model_registry.py
+# version: R-v1.0
+"""
+Versioned registry for predictive models.
+
+Every trained candidate is recorded in ``<model_dir>/registry.json`` with its
+evaluation metrics. A candidate is promoted to the serving path only when it
+beats the active model on the same validation data; promotion is an atomic
+file replace, so a running PredictiveAnalyzer never reads a half-written model.
+"""
+
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+from modules.log_manager import log_manager
+
+
+class ModelRegistry:
+    def __init__(self, active_path: str, registry_path: str = None, keep_versions: int = 5):
+        self.active_path = active_path
+        self.model_dir = os.path.dirname(active_path) or "."
+        self.registry_path = registry_path or os.path.join(self.model_dir, "registry.json")
+        self.keep_versions = max(1, keep_versions)
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        if not os.path.exists(self.registry_path):
+            return {"active": None, "versions": []}
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            log_manager.warning(f"[ModelRegistry] Could not read {self.registry_path}, starting a new registry: {e}")
+            return {"active": None, "versions": []}
+
+    def _save(self, registry: dict):
+        os.makedirs(self.model_dir, exist_ok=True)
+        tmp_path = f"{self.registry_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(registry, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.registry_path)
+
+    def active(self) -> dict:
+        """The record of the model currently served at active_path, if the registry knows it."""
+        registry = self._load()
+        return next((v for v in registry["versions"] if v["version"] == registry["active"]), None)
+
+    def versions(self) -> list:
+        return self._load()["versions"]
+
+    @staticmethod
+    def is_better(candidate: dict, incumbent: dict) -> bool:
+        """Higher F1 wins; on an F1 tie the lower validation loss wins."""
+        if incumbent is None:
+            return True
+        if candidate["f1"] != incumbent["f1"]:
+            return candidate["f1"] > incumbent["f1"]
+        return candidate["val_loss"] < incumbent["val_loss"]
+
+    def register(self, candidate_path: str, metrics: dict, incumbent_metrics: dict = None) -> dict:
+        """
+        Records a candidate and promotes it if it beats ``incumbent_metrics`` (the active
+        model evaluated on the same data; None when there is no active model).
+        Returns the candidate record with a ``promoted`` flag.
+        """
+        with self._lock:
+            registry = self._load()
+            version = datetime.now().strftime("%Y%m%d%H%M%S%f")
+            record = {"version": version, "path": candidate_path, "registered_at": datetime.now().isoformat(), **metrics}
+            promoted = self.is_better(metrics, incumbent_metrics)
+            record["promoted"] = promoted
+            registry["versions"].append(record)
+            if promoted:
+                tmp_path = f"{self.active_path}.tmp"
+                shutil.copyfile(candidate_path, tmp_path)
+                os.replace(tmp_path, self.active_path)
+                registry["active"] = version
+                log_manager.info(f"[ModelRegistry] Promoted model {version} to {self.active_path}.")
+            self._prune(registry)
+            self._save(registry)
+            return record
+
+    def _prune(self, registry: dict):
+        # Keep the active version and the newest keep_versions candidate files.
+        keep = {v["version"] for v in registry["versions"][-self.keep_versions:]}
+        keep.add(registry["active"])
+        retained = []
+        for record in registry["versions"]:
+            if record["version"] in keep:
+                retained.append(record)
+                continue
+            try:
+                os.remove(record["path"])
+            except FileNotFoundError:
+                pass
+        registry["versions"] = retained
@@ -9,6 +9,8 @@ Reconstructs Shiroi's personality profile from emotional and harmony logs.
 import os, json, statistics, datetime, logging
 import numpy as np
 
+from modules.config_service import config_service
+
 # Configure logging
 COLLECTIVE_LOG = "./logs/collective_log.json"
 OPT_LOG = "./logs/optimization_log.json"
@@ -156,6 +158,7 @@ def evolve_persona_profile():
     try:
         with open(PERSONA_FILE, "w", encoding="utf-8") as f:
             json.dump(persona, f, indent=2)
+        config_service.invalidate("persona")
         logging.info(f"[Persona Evolver] Persona updated: {profile}")
         # TODO: Future Improvement: Implement "persona drift detection" (v1.6+) to maintain consistency
         # in the evolution history.
@@ -239,6 +242,7 @@ def recalibrate_persona(baseline: str = "default") -> dict:
     try:
         with open(PERSONA_FILE, "w", encoding="utf-8") as f:
             json.dump(persona, f, indent=2)
+        config_service.invalidate("persona")
         logging.info(f"[Persona Evolver] Persona recalibrated to {baseline} baseline: {new_traits}")
         log_persona_update(persona) # Log the recalibrated persona
         return {"message": f"Persona recalibrated successfully to {baseline} baseline", "profile": new_traits, "status": "completed"}
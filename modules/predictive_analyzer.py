@@ -1,15 +1,15 @@
 # path: modules/predictive_analyzer.py
-# version: R-v1.1
+# version: R-v1.2
 
-import collections
 import numpy as np
 import torch
 import torch.nn as nn
-import torch.optim as optim
 import os
 import json
 from modules.log_manager import log_manager
 
+METRIC_NAMES = ("cpu", "mem", "latency")
+
 # Define the LSTM model
 class LSTMAnomalyPredictor(nn.Module):
     def __init__(self, input_size, hidden_size, num_layers, output_size):
@@ -29,6 +29,11 @@ class LSTMAnomalyPredictor(nn.Module):
         out = self.sigmoid(out)
         return out
 
+    def forward_with_state(self, x, state=None):
+        """Like forward, but starts from ``state`` (h, c) and also returns the final state."""
+        out, state = self.lstm(x, state)
+        return self.sigmoid(self.fc(out[:, -1, :])), state
+
 class PredictiveAnalyzer:
     """
     Analyzes time-series system metrics to predict anomaly probabilities
@@ -43,14 +48,17 @@ class PredictiveAnalyzer:
         self.window_size = window_size
         self.ewma_alpha = ewma_alpha
         
-        # Ring buffers for metrics: cpu, mem, latency
-        self.metrics_history = {
-            "cpu": collections.deque(maxlen=window_size),
-            "mem": collections.deque(maxlen=window_size),
-            "latency": collections.deque(maxlen=window_size)
-        }
-        self.ewma_values = {"cpu": 0.0, "mem": 0.0, "latency": 0.0
-        }
+        # Preallocated ring of aligned [cpu, mem, latency] rows, updated in place.
+        self._ring = np.zeros((window_size, len(METRIC_NAMES)), dtype=np.float32)
+        self._ring_pos = 0
+        self._count = 0
+        self._last_row = np.zeros(len(METRIC_NAMES), dtype=np.float32)
+        self.ewma_values = {metric_name: 0.0 for metric_name in METRIC_NAMES}
+
+        # Streaming LSTM state: (h, c) after the newest sample, and its output.
+        self._state = None
+        self._steps_since_anchor = 0
+        self._last_prob = 0.0
 
         self.lstm_model = LSTMAnomalyPredictor(lstm_input_size, lstm_hidden_size, lstm_num_layers, lstm_output_size)
         self.load_model() # Load pre-trained model if available
@@ -60,21 +68,58 @@ class PredictiveAnalyzer:
 
     def update_metrics(self, cpu: float, mem: float, latency: float):
         """
-        Accumulates recent metrics into ring buffers and updates EWMA.
+        Writes one aligned sample into the ring buffer, updates EWMA and advances the
+        streaming LSTM by a single cell step. A missing metric repeats its last value.
         """
-        current_metrics = {"cpu": cpu, "mem": mem, "latency": latency}
-        for metric_name, value in current_metrics.items():
-            if value is not None:
-                self.metrics_history[metric_name].append(value)
-                
-                # Update EWMA
-                if len(self.metrics_history[metric_name]) == 1:
-                    self.ewma_values[metric_name] = value
-                else:
-                    self.ewma_values[metric_name] = (self.ewma_alpha * value) + \
-                                                     ((1 - self.ewma_alpha) * self.ewma_values[metric_name])
+        row = self._ring[self._ring_pos]
+        for index, (metric_name, value) in enumerate(zip(METRIC_NAMES, (cpu, mem, latency))):
+            if value is None:
+                log_manager.warning(f"[PredictiveAnalyzer] Received None for metric {metric_name}. Repeating last value.")
+                row[index] = self._last_row[index]
+                continue
+            row[index] = value
+
+            # Update EWMA
+            if self._count == 0:
+                self.ewma_values[metric_name] = value
+            else:
+                self.ewma_values[metric_name] = (self.ewma_alpha * value) + \
+                                                 ((1 - self.ewma_alpha) * self.ewma_values[metric_name])
+        self._last_row[:] = row
+        self._ring_pos = (self._ring_pos + 1) % self.window_size
+        self._count = min(self._count + 1, self.window_size)
+        self._advance_lstm(row)
+
+    @property
+    def sample_count(self) -> int:
+        return self._count
+
+    def window(self) -> np.ndarray:
+        """The buffered samples, oldest first (a copy of at most window_size rows)."""
+        if self._count < self.window_size:
+            return self._ring[:self._count].copy()
+        return np.concatenate((self._ring[self._ring_pos:], self._ring[:self._ring_pos]))
+
+    def _advance_lstm(self, row: np.ndarray):
+        if self._count < self.window_size:
+            return
+        with torch.no_grad():
+            if self._state is None or self._steps_since_anchor >= self.window_size:
+                # Re-anchor on the full window from a zero state, which is exactly what the
+                # model was trained on; in between, each sample costs one cell step.
+                window = torch.from_numpy(self.window()).unsqueeze(0)
+                prediction, self._state = self.lstm_model.forward_with_state(window)
+                self._steps_since_anchor = 0
             else:
-                log_manager.warning(f"[PredictiveAnalyzer] Received None for metric {metric_name}. Skipping update.")
+                step = torch.from_numpy(row.copy()).view(1, 1, -1)
+                prediction, self._state = self.lstm_model.forward_with_state(step, self._state)
+                self._steps_since_anchor += 1
+        self._last_prob = prediction.item()
+
+    def reset_stream(self):
+        """Drops the carried LSTM state; the next sample re-anchors on the full window."""
+        self._state = None
+        self._steps_since_anchor = 0
 
     def compute_ewma_score(self) -> float:
         """
@@ -82,7 +127,7 @@ class PredictiveAnalyzer:
         This is a simplified combination; can be made more sophisticated.
         """
         # Ensure we have enough data for meaningful EWMA
-        if any(len(q) < 1 for q in self.metrics_history.values()):
+        if self._count < 1:
             return 0.0 # Not enough data
 
         # Simple average of EWMA values for now
@@ -94,31 +139,24 @@ class PredictiveAnalyzer:
 
     def predict_lstm(self) -> float:
         """
-        Predicts the next anomaly probability using the LSTM model.
-        Returns 0.0 if not enough historical data.
+        Returns the LSTM anomaly probability for the newest sample.
+        The value is maintained incrementally by update_metrics, so this call does no
+        model work. Returns 0.0 until a full window has been observed.
         """
-        # Ensure enough data for LSTM input (window_size)
-        if any(len(q) < self.window_size for q in self.metrics_history.values()):
+        if self._count < self.window_size:
             return 0.0 # Not enough data for a full sequence
+        return self._last_prob
 
-        # Prepare data for LSTM: (batch_size, seq_len, input_size)
-        # input_size = 3 for cpu, mem, latency
-        lstm_input_data = []
-        for i in range(self.window_size):
-            # Assuming metrics_history deques are aligned by index for the same timestamp
-            # This might need more robust timestamp-based alignment in a real system
-            cpu_val = self.metrics_history["cpu"][i] if i < len(self.metrics_history["cpu"]) else 0.0
-            mem_val = self.metrics_history["mem"][i] if i < len(self.metrics_history["mem"]) else 0.0
-            latency_val = self.metrics_history["latency"][i] if i < len(self.metrics_history["latency"]) else 0.0
-            lstm_input_data.append([cpu_val, mem_val, latency_val])
-        
-        # Convert to tensor and add batch dimension
-        input_tensor = torch.tensor(lstm_input_data, dtype=torch.float32).unsqueeze(0) # Add batch_size=1
-
+    def score_windows(self, windows) -> list:
+        """
+        Scores many metric streams (e.g. per node or per module) in one forward pass.
+        ``windows`` is a sequence of (window_size, 3) arrays; returns one probability each.
+        """
+        if len(windows) == 0:
+            return []
+        batch = torch.from_numpy(np.ascontiguousarray(np.stack(windows), dtype=np.float32))
         with torch.no_grad():
-            prediction = self.lstm_model(input_tensor)
-        
-        return prediction.item() # Get the scalar probability
+            return self.lstm_model(batch).squeeze(-1).tolist()
 
     def predict_anomaly_probability(self) -> float:
         """
@@ -129,9 +167,9 @@ class PredictiveAnalyzer:
         lstm_prob = self.predict_lstm()
 
         # Ensure EWMA and LSTM have enough data to contribute meaningfully
-        if any(len(q) < 5 for q in self.metrics_history.values()): # Arbitrary threshold for EWMA to be stable
+        if self._count < 5: # Arbitrary threshold for EWMA to be stable
             final_risk = lstm_prob # Rely more on LSTM if EWMA is unstable
-        elif any(len(q) < self.window_size for q in self.metrics_history.values()): # Not enough for full LSTM sequence
+        elif self._count < self.window_size: # Not enough for full LSTM sequence
             final_risk = ewma_risk # Rely more on EWMA if LSTM is unstable
         else:
             final_risk = (ewma_risk * 0.3) + (lstm_prob * 0.7)
@@ -141,33 +179,26 @@ class PredictiveAnalyzer:
     def train_predictive_model(self, log_path: str, epochs: int = 10, learning_rate: float = 0.001):
         """
         Retrains the LSTM model from past logs.
-        log_path: Path to a JSON file containing historical metric data and anomaly labels.
+        log_path: Path of the predictive self-correction event log; windows of
+        window_size samples are built from it (see modules.predictive_dataset).
         """
+        # Imported here: the trainer and dataset modules import this one.
+        from modules.event_log import EventLog
+        from modules.predictive_dataset import build_window_dataset
+        from modules.predictive_trainer import fit
+
         log_manager.info(f"[PredictiveAnalyzer] Starting LSTM model training from {log_path}...")
-        self.lstm_model.train() # Set to training mode
-
-        # Placeholder for data loading and preprocessing
-        # In a real scenario, this would load logs/predictive_self_correction.json
-        # and prepare sequences (X) and labels (y) for training.
-        # For now, generate dummy data.
-        X_train = torch.randn(100, self.window_size, 3) # 100 samples, 60 timesteps, 3 features
-        y_train = torch.randint(0, 2, (100, 1)).float() # 100 labels (0 or 1)
-
-        criterion = nn.BCEWithLogitsLoss() # Binary Cross-Entropy with Logits
-        optimizer = optim.Adam(self.lstm_model.parameters(), lr=learning_rate)
-
-        for epoch in range(epochs):
-            outputs = self.lstm_model(X_train)
-            loss = criterion(outputs, y_train)
-            
-            optimizer.zero_grad()
-            loss.backward()
-            optimizer.step()
-            
-            log_manager.debug(f"Epoch [{epoch+1}/{epochs}], Loss: {loss.item():.4f}")
-        
-        log_manager.info("[PredictiveAnalyzer] LSTM model training complete.")
-        self.lstm_model.eval() # Set back to evaluation mode
+        dataset = build_window_dataset(self.window_size, entries=EventLog.for_path(log_path).iter_all())
+        if dataset is None or len(dataset) < 2:
+            log_manager.warning("[PredictiveAnalyzer] Not enough logged metrics to train; keeping the current model.")
+            return
+        train_set, val_set, _ = dataset.split(test_fraction=0.0)
+        if len(val_set) == 0:
+            val_set = train_set
+        metrics = fit(self.lstm_model, train_set, val_set, epochs=epochs, learning_rate=learning_rate)
+
+        log_manager.info(f"[PredictiveAnalyzer] LSTM model training complete: {metrics}")
+        self.reset_stream() # The carried state was produced by the old weights
         self.save_model()
 
     def save_model(self):
@@ -181,6 +212,7 @@ class PredictiveAnalyzer:
         if os.path.exists(self.model_path):
             try:
                 self.lstm_model.load_state_dict(torch.load(self.model_path))
+                self.reset_stream()
                 log_manager.info(f"[PredictiveAnalyzer] LSTM model loaded from {self.model_path}")
             except Exception as e:
                 log_manager.error(f"[PredictiveAnalyzer] Error loading LSTM model from {self.model_path}: {e}. Initializing new model.", exc_info=True)
@@ -0,0 +1,217 @@
+# path: modules/predictive_dataset.py
+# version: R-v1.0
+"""
+Training data for the Predictive Self-Correction LSTM.
+
+Samples come from the predictive_self_correction event log (cpu, mem, latency and
+the action taken); gaps in latency are filled from session_logs.response_time_ms
+with an as-of join on time. Windows are strided views over one (N, 3) array, so
+nothing is copied until a mini-batch is gathered.
+"""
+
+import datetime
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+import torch
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+
+from modules.event_log import predictive_self_correction_log
+from modules.log_manager import log_manager
+from modules.predictive_analyzer import METRIC_NAMES
+
+CORRECTIVE_ACTIONS = ("preemptive_repair_triggered", "preventive_fix")
+
+
+def _epoch(value, naive_is_utc: bool) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None and naive_is_utc:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    # Naive log timestamps come from datetime.now(), i.e. local time.
+    return value.timestamp()
+
+
+def _metric(entry: dict, name: str):
+    # Entries written by InsightMonitor carry the metrics at the top level; older
+    # entries nest them under "metrics".
+    value = entry.get(name)
+    if value is None:
+        value = (entry.get("metrics") or {}).get(name)
+    return value
+
+
+def load_log_samples(entries: Iterable[dict] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (timestamps (N,), features (N, 3), labels (N,)) ordered by time.
+    Missing metrics are NaN; a label is 1 when a corrective action was taken.
+    """
+    if entries is None:
+        entries = predictive_self_correction_log().iter_all()
+    timestamps, rows, labels = [], [], []
+    for entry in entries:
+        if "action" not in entry:
+            continue
+        values = [_metric(entry, name) for name in METRIC_NAMES]
+        if values[0] is None and values[1] is None:
+            continue  # Forecast-only entries carry no metrics
+        timestamp = _epoch(entry.get("timestamp"), naive_is_utc=False)
+        if timestamp is None:
+            continue
+        timestamps.append(timestamp)
+        rows.append([np.nan if value is None else value for value in values])
+        labels.append(entry["action"] in CORRECTIVE_ACTIONS)
+
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    features = np.asarray(rows, dtype=np.float32).reshape(-1, len(METRIC_NAMES))
+    labels = np.asarray(labels, dtype=np.float32)
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], features[order], labels[order]
+
+
+def load_response_times(session_factory=None, since: datetime.datetime = None,
+                        chunk_size: int = 5000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (timestamps, response_time_ms) from session_logs, streamed in chunks.
+    An unreachable database yields empty arrays so training can proceed on the log alone.
+    """
+    try:
+        from backend.db.models import SessionLog
+        if session_factory is None:
+            from backend.db.connection import SessionLocal as session_factory
+        db = session_factory()
+    except Exception as e:
+        log_manager.warning(f"[PredictiveDataset] session_logs unavailable, skipping response times: {e}")
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float32)
+
+    timestamps, values = [], []
+    try:
+        query = (
+            db.query(SessionLog.created_at, SessionLog.response_time_ms)
+            .filter(SessionLog.response_time_ms.isnot(None), SessionLog.created_at.isnot(None))
+            .order_by(SessionLog.created_at)
+        )
+        if since is not None:
+            query = query.filter(SessionLog.created_at >= since)
+        for created_at, response_time_ms in query.yield_per(chunk_size):
+            timestamps.append(_epoch(created_at, naive_is_utc=True))
+            values.append(response_time_ms)
+    except Exception as e:
+        log_manager.warning(f"[PredictiveDataset] Failed to read session_logs response times: {e}")
+    finally:
+        db.close()
+    return np.asarray(timestamps, dtype=np.float64), np.asarray(values, dtype=np.float32)
+
+
+def fill_latency(timestamps: np.ndarray, features: np.ndarray, response_timestamps: np.ndarray,
+                 response_times: np.ndarray, max_age_seconds: float = 600.0) -> np.ndarray:
+    """
+    Fills NaN latency with the most recent session response time at or before each
+    sample (as-of join, at most ``max_age_seconds`` old), then carries every column
+    forward and zero-fills the rest.
+    """
+    features = features.copy()
+    latency_index = METRIC_NAMES.index("latency")
+    missing = np.isnan(features[:, latency_index])
+    if missing.any() and len(response_timestamps):
+        positions = np.searchsorted(response_timestamps, timestamps[missing], side="right") - 1
+        found = positions >= 0
+        found[found] = timestamps[missing][found] - response_timestamps[positions[found]] <= max_age_seconds
+        filled = np.full(positions.shape, np.nan, dtype=np.float32)
+        filled[found] = response_times[positions[found]]
+        features[missing, latency_index] = filled
+
+    # Forward fill per column: index of the last valid row at or before each row.
+    valid = ~np.isnan(features)
+    last_valid = np.where(valid, np.arange(len(features))[:, None], 0)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    features = np.take_along_axis(features, last_valid, axis=0)
+    return np.nan_to_num(features, nan=0.0)
+
+
+class WindowDataset(Dataset):
+    """
+    Sliding windows over a (N, 3) series. Window i covers rows [s, s + window) with
+    s = starts[i]; its label is 1 if a corrective action occurs within the next
+    ``horizon`` rows. Indexing takes an array of window indices and returns a batch.
+    """
+
+    def __init__(self, features: np.ndarray, labels: np.ndarray, window: int, horizon: int = 1, stride: int = 1):
+        features = np.ascontiguousarray(features, dtype=np.float32)
+        count = len(features) - window - horizon + 1
+        self.window = window
+        self.starts = np.arange(0, max(count, 0), max(1, stride))
+        # (N - window + 1, window, 3) view; no data is copied here.
+        self._windows = np.lib.stride_tricks.sliding_window_view(features, window, axis=0).transpose(0, 2, 1)
+        # Prefix sums turn "any positive in the horizon" into a single subtraction per window.
+        cumulative = np.concatenate(([0.0], np.cumsum(labels, dtype=np.float64)))
+        ends = self.starts + window
+        self.labels = (cumulative[ends + horizon] - cumulative[ends] > 0).astype(np.float32)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, indices):
+        indices = np.asarray(indices)
+        batch = self._windows[self.starts[indices]]  # fancy indexing gathers a (B, window, 3) copy
+        return torch.from_numpy(batch), torch.from_numpy(self.labels[indices]).unsqueeze(-1)
+
+    def subset(self, begin: int, end: int) -> "WindowDataset":
+        subset = WindowDataset.__new__(WindowDataset)
+        subset.window = self.window
+        subset._windows = self._windows
+        subset.starts = self.starts[begin:end]
+        subset.labels = self.labels[begin:end]
+        return subset
+
+    def _clear_of(self, boundary: int) -> int:
+        """First window index at or after ``boundary`` that does not overlap window ``boundary - 1``."""
+        if boundary <= 0 or boundary >= len(self):
+            return boundary
+        return int(np.searchsorted(self.starts, self.starts[boundary - 1] + self.window))
+
+    def split(self, validation_fraction: float = 0.2,
+              test_fraction: float = 0.1) -> Tuple["WindowDataset", "WindowDataset", "WindowDataset"]:
+        """
+        Chronological train / validation / test split. Windows that overlap the
+        preceding part are dropped from validation and test. The test slice is the
+        newest, kept out of training and early stopping for unbiased comparisons.
+        """
+        test_boundary = int(len(self) * (1 - test_fraction))
+        validation_boundary = int(len(self) * (1 - validation_fraction - test_fraction))
+        validation_begin = min(self._clear_of(validation_boundary), test_boundary)
+        return (
+            self.subset(0, validation_boundary),
+            self.subset(validation_begin, test_boundary),
+            self.subset(self._clear_of(test_boundary), len(self)),
+        )
+
+    def loader(self, batch_size: int = 256, shuffle: bool = False) -> DataLoader:
+        # The sampler yields whole index batches, so each batch is one vectorised gather.
+        sampler = RandomSampler(range(len(self))) if shuffle else SequentialSampler(range(len(self)))
+        return DataLoader(self, sampler=BatchSampler(sampler, batch_size, drop_last=False), batch_size=None)
+
+
+def build_window_dataset(window: int, horizon: int = 1, stride: int = 1, entries: Iterable[dict] = None,
+                         session_factory=None, max_samples: int = None) -> Optional[WindowDataset]:
+    """Loads the log and session response times and returns the windowed dataset (None if too little data)."""
+    timestamps, features, labels = load_log_samples(entries)
+    if max_samples:
+        timestamps, features, labels = timestamps[-max_samples:], features[-max_samples:], labels[-max_samples:]
+    if len(features) < window + horizon:
+        log_manager.warning(f"[PredictiveDataset] {len(features)} samples is not enough for window={window}.")
+        return None
+    since = datetime.datetime.fromtimestamp(timestamps[0], tz=datetime.timezone.utc)
+    response_timestamps, response_times = load_response_times(session_factory, since=since)
+    features = fill_latency(timestamps, features, response_timestamps, response_times)
+    dataset = WindowDataset(features, labels, window, horizon=horizon, stride=stride)
+    log_manager.info(
+        f"[PredictiveDataset] {len(features)} samples -> {len(dataset)} windows "
+        f"({int(dataset.labels.sum())} positive, {len(response_times)} session response times)."
+    )
+    return dataset
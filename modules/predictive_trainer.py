@@ -1,27 +1,101 @@
 # path: modules/predictive_trainer.py
-# version: R-v1.1
+# version: R-v1.3
 """
 Trains and evaluates the Predictive Self-Correction model (LSTM).
 Re-trains periodically using historical logs and replaces the model if it improves.
+The newest windows are held out as a test slice: training and early stopping never
+see them, and the candidate and active models are compared on them alone.
 """
 
-import json
+import copy
 import os
+import time
 import numpy as np
 import torch
+import torch.nn as nn
 from sklearn.metrics import f1_score, accuracy_score
 from datetime import datetime
 from modules.log_manager import log_manager
-from modules.predictive_analyzer import PredictiveAnalyzer, LSTMAnomalyPredictor
+from modules.model_registry import ModelRegistry
+from modules.predictive_analyzer import LSTMAnomalyPredictor
+from modules.predictive_dataset import build_window_dataset
 
 LOG_PATH = "logs/predictive_self_correction.json"
 MODEL_PATH = "models/predictive_lstm.pt" # Use the same path as the analyzer
 MODEL_DIR = os.path.dirname(MODEL_PATH)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+WINDOW_SIZE = int(os.getenv("PREDICTIVE_WINDOW_SIZE", "60"))
+WINDOW_STRIDE = int(os.getenv("PREDICTIVE_WINDOW_STRIDE", "1"))
+HORIZON = int(os.getenv("PREDICTIVE_HORIZON", "5"))
+BATCH_SIZE = int(os.getenv("PREDICTIVE_BATCH_SIZE", "256"))
+MAX_EPOCHS = int(os.getenv("PREDICTIVE_MAX_EPOCHS", "30"))
+PATIENCE = int(os.getenv("PREDICTIVE_PATIENCE", "4"))
+
+
+def evaluate(model, dataset, batch_size: int = None) -> dict:
+    """BCE loss, F1 and accuracy of ``model`` over ``dataset`` in batched no-grad passes."""
+    batch_size = batch_size or BATCH_SIZE
+    criterion = nn.BCELoss(reduction="sum")
+    model.eval()
+    total_loss, predictions = 0.0, []
+    with torch.no_grad():
+        for features, labels in dataset.loader(batch_size):
+            outputs = model(features)
+            total_loss += criterion(outputs, labels).item()
+            predictions.append((outputs.squeeze(-1).numpy() > 0.5).astype(int))
+    predictions = np.concatenate(predictions) if predictions else np.empty(0, dtype=int)
+    return {
+        "val_loss": total_loss / max(1, len(dataset)),
+        "f1": float(f1_score(dataset.labels, predictions, zero_division=0)),
+        "accuracy": float(accuracy_score(dataset.labels, predictions)) if len(dataset) else 0.0,
+    }
+
+
+def fit(model, train_set, val_set, epochs: int = None, patience: int = None,
+        batch_size: int = None, learning_rate: float = 0.001) -> dict:
+    """
+    Mini-batch training with early stopping on validation loss. The model is left
+    holding the best weights seen; returns their validation metrics and the epoch count.
+    """
+    epochs = epochs or MAX_EPOCHS
+    patience = patience or PATIENCE
+    batch_size = batch_size or BATCH_SIZE
+    criterion = nn.BCELoss()
+    optimizer = torch.optim.Adam(model.parameters(), lr=learning_rate)
+    best_metrics, best_state, stale_epochs, epoch = None, None, 0, 0
+    for epoch in range(1, epochs + 1):
+        model.train()
+        for features, labels in train_set.loader(batch_size, shuffle=True):
+            optimizer.zero_grad()
+            loss = criterion(model(features), labels)
+            loss.backward()
+            optimizer.step()
+
+        metrics = evaluate(model, val_set, batch_size)
+        log_manager.debug(f"[Trainer] Epoch {epoch}/{epochs}: val_loss={metrics['val_loss']:.4f}, F1={metrics['f1']:.4f}")
+        if best_metrics is None or metrics["val_loss"] < best_metrics["val_loss"]:
+            best_metrics, best_state, stale_epochs = metrics, copy.deepcopy(model.state_dict()), 0
+        else:
+            stale_epochs += 1
+            if stale_epochs >= patience:
+                log_manager.info(f"[Trainer] Early stopping after epoch {epoch} (no improvement for {patience} epochs).")
+                break
+
+    model.load_state_dict(best_state)
+    model.eval()
+    return {**best_metrics, "epochs": epoch}
+
+
 class PredictiveTrainer:
-    def __init__(self):
+    def __init__(self, window_size: int = WINDOW_SIZE, stride: int = WINDOW_STRIDE, horizon: int = HORIZON,
+                 session_factory=None):
         self.model_path = MODEL_PATH
+        self.window_size = window_size
+        self.stride = stride
+        self.horizon = horizon
+        self.session_factory = session_factory
+        self.registry = ModelRegistry(self.model_path)
         # Use the same model parameters as the analyzer for consistency
         self.analyzer_params = {
             "lstm_input_size": 3,
@@ -30,140 +104,97 @@ class PredictiveTrainer:
             "lstm_output_size": 1
         }
 
-    def load_log_data(self, max_samples=1000):
+    def _new_model(self) -> LSTMAnomalyPredictor:
+        params = self.analyzer_params
+        return LSTMAnomalyPredictor(params["lstm_input_size"], params["lstm_hidden_size"],
+                                    params["lstm_num_layers"], params["lstm_output_size"])
+
+    def load_dataset(self, entries=None, max_samples: int = None):
         """
-        Load historical forecast logs and create training data.
-        It filters for logs that contain the necessary metric data.
+        Builds the sliding-window dataset from the predictive log and session_logs
+        response times. Returns None when there is not enough history.
         """
-        if not os.path.exists(LOG_PATH):
-            log_manager.warning(f"[Trainer] Log file not found at {LOG_PATH}")
-            return None, None
+        return build_window_dataset(self.window_size, horizon=self.horizon, stride=self.stride, entries=entries,
+                                    session_factory=self.session_factory, max_samples=max_samples)
 
-        X, y = [], []
-        try:
-            with open(LOG_PATH, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            log_manager.error(f"[Trainer] Could not read or parse log file: {LOG_PATH}")
-            return None, None
-
-        for entry in logs:
-            # We need logs that have both metrics and a clear action
-            if 'metrics' in entry and 'action' in entry:
-                metrics = entry.get('metrics', {})
-                cpu = metrics.get('cpu')
-                mem = metrics.get('mem')
-                latency = metrics.get('latency')
-
-                if all(v is not None for v in [cpu, mem, latency]):
-                    # Feature: [cpu, mem, latency]
-                    features = [cpu, mem, latency]
-                    # Label: 1 if a corrective action was triggered, 0 otherwise
-                    label = 1 if entry['action'] in ["preemptive_repair_triggered", "preventive_fix"] else 0
-                    
-                    X.append(features)
-                    y.append(label)
-
-        if len(X) == 0:
-            log_manager.warning("[Trainer] No suitable training data found in logs.")
-            return None, None
-
-        log_manager.info(f"[Trainer] Loaded {len(X)} data points for training.")
-        return np.array(X[-max_samples:]), np.array(y[-max_samples:])
-
-    def train_new_model(self, X_train, y_train):
-        """Trains a new LSTM model instance."""
-        if X_train is None or len(X_train) < 20:
+    def train_new_model(self, train_set, val_set):
+        """Trains a new LSTM model instance and saves it as a candidate."""
+        if train_set is None or len(train_set) < 20 or len(val_set) == 0:
             log_manager.warning("[Trainer] Insufficient data for retraining.")
-            return None, None
+            return None, None, None
 
-        # Reshape for LSTM: (batch_size, seq_len, input_size)
-        # We treat each entry as a sequence of length 1 for simplicity here.
-        # A more advanced implementation would create sequences from the time-series data.
-        X_tensor = torch.tensor(X_train, dtype=torch.float32).unsqueeze(1)
-        y_tensor = torch.tensor(y_train, dtype=torch.float32).unsqueeze(1)
-
-        model = LSTMAnomalyPredictor(**self.analyzer_params)
-        model.train()
-        
-        criterion = nn.BCELoss()
-        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
-
-        log_manager.info("[Trainer] Starting model training...")
-        for epoch in range(50): # Increased epochs for better training on small data
-            optimizer.zero_grad()
-            outputs = model(X_tensor)
-            loss = criterion(outputs, y_tensor)
-            loss.backward()
-            optimizer.step()
-            if (epoch + 1) % 10 == 0:
-                log_manager.debug(f"[Trainer] Epoch [{epoch+1}/50], Loss: {loss.item():.4f}")
+        model = self._new_model()
+        log_manager.info(f"[Trainer] Starting model training on {len(train_set)} windows ({len(val_set)} for validation)...")
+        started = time.monotonic()
+        metrics = fit(model, train_set, val_set)
+        metrics["train_seconds"] = round(time.monotonic() - started, 2)
 
         # Save the newly trained model to a temporary candidate path
         candidate_path = os.path.join(MODEL_DIR, f"predictive_model_candidate_{datetime.now().strftime('%Y%m%d%H%M%S')}.pt")
         torch.save(model.state_dict(), candidate_path)
         log_manager.info(f"[Trainer] Trained new candidate model and saved to: {candidate_path}")
-        
-        model.eval()
-        return candidate_path, model
+        return candidate_path, model, metrics
 
-    def evaluate_and_replace(self):
+    def _evaluate_active_model(self, test_set):
+        if not os.path.exists(self.model_path):
+            return None
+        try:
+            model = self._new_model()
+            model.load_state_dict(torch.load(self.model_path))
+        except Exception as e:
+            log_manager.warning(f"[Trainer] Active model at {self.model_path} could not be loaded; it will be replaced: {e}")
+            return None
+        return evaluate(model, test_set)
+
+    def evaluate_and_replace(self, entries=None):
         """
-        Trains a new model, compares its F1 score with the current model,
-        and replaces the current model if the new one performs better.
+        Trains a new model, compares it with the current model on the held-out test
+        windows, and promotes it through the model registry only if it performs better.
         """
-        X_test, y_test = self.load_log_data()
-        if X_test is None:
+        dataset = self.load_dataset(entries)
+        if dataset is None:
             return {"status": "aborted", "reason": "Insufficient data"}
 
-        training_result = self.train_new_model(X_test, y_test)
-        if not training_result:
+        train_set, val_set, test_set = dataset.split()
+        if len(test_set) == 0:
+            log_manager.warning("[Trainer] No windows left for the held-out test slice.")
+            return {"status": "aborted", "reason": "Insufficient data"}
+        candidate_path, new_model, train_metrics = self.train_new_model(train_set, val_set)
+        if not candidate_path:
             return {"status": "aborted", "reason": "Training failed"}
-        
-        candidate_path, new_model = training_result
-        X_tensor = torch.tensor(X_test, dtype=torch.float32).unsqueeze(1)
-
-        # --- Evaluate New Model ---
-        with torch.no_grad():
-            preds_new_raw = new_model(X_tensor)
-        preds_new = (preds_new_raw.numpy() > 0.5).astype(int)
-        score_new = f1_score(y_test, preds_new, zero_division=0)
-        accuracy_new = accuracy_score(y_test, preds_new)
-        log_manager.info(f"[Trainer] New model evaluation: F1 Score={score_new:.4f}, Accuracy={accuracy_new:.4f}")
-
-        # --- Evaluate Old Model ---
-        try:
-            analyzer_old = PredictiveAnalyzer(model_path=self.model_path)
-            # The analyzer loads the model on init. We access it directly.
-            old_model = analyzer_old.lstm_model
-            old_model.eval()
-            with torch.no_grad():
-                preds_old_raw = old_model(X_tensor)
-            preds_old = (preds_old_raw.numpy() > 0.5).astype(int)
-            score_old = f1_score(y_test, preds_old, zero_division=0)
-            accuracy_old = accuracy_score(y_test, preds_old)
-            log_manager.info(f"[Trainer] Old model evaluation: F1 Score={score_old:.4f}, Accuracy={accuracy_old:.4f}")
-        except FileNotFoundError:
-            log_manager.warning("[Trainer] No old model found to compare against. The new model will be adopted by default.")
-            score_old = -1.0 # Ensure new model is adopted
-
-        # --- Compare and Replace ---
-        if score_new > score_old:
-            log_manager.info(f"[Trainer] New model is superior. Replacing old model. New F1={score_new:.4f}, Old F1={score_old:.4f}")
-            try:
-                os.replace(candidate_path, self.model_path)
-                return {"status": "replaced", "score_new": score_new, "score_old": score_old}
-            except Exception as e:
-                log_manager.error(f"[Trainer] Failed to replace model file: {e}", exc_info=True)
-                # Clean up candidate file if replacement fails
-                if os.path.exists(candidate_path):
-                    os.remove(candidate_path)
-                return {"status": "error", "reason": "File replacement failed"}
+        # val_set picked the best epoch, so it would flatter the candidate; compare on test_set only.
+        score_new = {
+            **evaluate(new_model, test_set),
+            "epochs": train_metrics["epochs"],
+            "train_seconds": train_metrics["train_seconds"],
+        }
+        log_manager.info(f"[Trainer] New model evaluation: F1 Score={score_new['f1']:.4f}, Accuracy={score_new['accuracy']:.4f}")
+
+        score_old = self._evaluate_active_model(test_set)
+        if score_old is not None:
+            log_manager.info(f"[Trainer] Old model evaluation: F1 Score={score_old['f1']:.4f}, Accuracy={score_old['accuracy']:.4f}")
         else:
-            log_manager.info(f"[Trainer] New model is not superior. Discarding candidate. New F1={score_new:.4f}, Old F1={score_old:.4f}")
-            if os.path.exists(candidate_path):
-                os.remove(candidate_path)
-            return {"status": "kept_old", "score_new": score_new, "score_old": score_old}
+            log_manager.warning("[Trainer] No old model found to compare against. The new model will be adopted by default.")
+
+        try:
+            record = self.registry.register(candidate_path, score_new, score_old)
+        except Exception as e:
+            log_manager.error(f"[Trainer] Failed to register model: {e}", exc_info=True)
+            return {"status": "error", "reason": "Model registration failed"}
+
+        result = {
+            "version": record["version"],
+            "score_new": score_new["f1"],
+            "score_old": score_old["f1"] if score_old else -1.0,
+            "windows": len(dataset),
+            "epochs": score_new["epochs"],
+            "train_seconds": score_new["train_seconds"],
+        }
+        if record["promoted"]:
+            log_manager.info(f"[Trainer] New model is superior. Replacing old model. New F1={result['score_new']:.4f}, Old F1={result['score_old']:.4f}")
+            return {"status": "replaced", **result}
+        log_manager.info(f"[Trainer] New model is not superior. Keeping old model. New F1={result['score_new']:.4f}, Old F1={result['score_old']:.4f}")
+        return {"status": "kept_old", **result}
 
 if __name__ == '__main__':
     # For direct testing of the trainer
@@ -1,23 +1,75 @@
+import base64
+import hashlib
 import json
 import os
+import time
 import uuid
-import psycopg2
 import datetime
 from collections import Counter
-from threading import Lock
-from typing import Iterable, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from threading import Lock, Thread
+from typing import Iterable, Iterator, Optional
 from pathlib import Path
-from psycopg2.extensions import connection as PGConnection
 from qdrant_client import QdrantClient
 from sentence_transformers import SentenceTransformer
 from modules.config_manager import load_environment
+from modules.embedding_cache import get_embedding_cache
 from modules.log_manager import log_manager
 from modules.knowledge_pipeline import KnowledgePipeline, KnowledgeChunk
 
 _resource_lock = Lock()
+_collection_lock = Lock()
 _shared_qdrant_clients: dict[tuple[str, int], QdrantClient] = {}
 _shared_embedding_models: dict[str, SentenceTransformer] = {}
-_shared_pg_connections: dict[tuple[str, int, str, str, str], PGConnection] = {}
+_shared_pg_engines: dict[tuple[str, int, str, str, str], object] = {}
+_pg_pool_metrics = {
+    "checkouts": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+    "timeouts": 0,
+    "failures": 0,
+}
+_pg_metrics_lock = Lock()
+
+_FETCH_TEXTS_STATEMENT = "rag_fetch_world_knowledge"
+
+# Collection-wide source counts and score summary, shared by every RAGEngine in the
+# process. They are recomputed by a background walk (one per collection at a time)
+# when older than RAG_AGGREGATE_TTL or after this process wrote to the collection;
+# listings serve the last completed result meanwhile.
+_aggregate_state: dict[str, dict] = {}
+_aggregate_lock = Lock()
+_indexed_collections: set[str] = set()
+
+_SOURCE_KEYS = ("source", "module", "source_name")
+_SCORE_KEYS = ("rating", "score")
+_ORDER_PAYLOAD_KEYS = {"created_at": "created_at", "score": "rating"}
+
+
+def _encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {exc}") from exc
+    if not isinstance(state, dict):
+        raise ValueError("Invalid cursor: expected an object.")
+    return state
+
+
+def _payload_source(payload: dict) -> str:
+    return next((payload[key] for key in _SOURCE_KEYS if payload.get(key)), "unknown")
+
+
+def _payload_score(payload: dict) -> float:
+    return float(next((payload[key] for key in _SCORE_KEYS if payload.get(key)), 0.0))
 
 
 def _get_shared_qdrant_client(host: str, port: int) -> QdrantClient:
@@ -47,27 +99,62 @@ def _get_shared_embedding_model(model_name: str) -> SentenceTransformer:
         return model
 
 
-def _get_shared_pg_connection(host: str, port: int, database: str, user: str, password: str):
+def _get_shared_pg_engine(host: str, port: int, database: str, user: str, password: str):
+    """Returns a pooled SQLAlchemy engine for the DSN, reusing backend.db.connection.engine when it matches."""
     key = (host, port, database, user, password)
-    conn = _shared_pg_connections.get(key)
-    if conn and getattr(conn, "closed", 1) == 0:
-        return conn
+    engine = _shared_pg_engines.get(key)
+    if engine is not None:
+        return engine
     with _resource_lock:
-        conn = _shared_pg_connections.get(key)
-        if conn and getattr(conn, "closed", 1) == 0:
-            return conn
-        conn = psycopg2.connect(
-            host=host,
-            port=port,
-            database=database,
-            user=user,
-            password=password,
-            client_encoding='UTF8'
-        )
-        _shared_pg_connections[key] = conn
-        return conn
+        engine = _shared_pg_engines.get(key)
+        if engine is not None:
+            return engine
+        from backend.db import connection as db_connection
+
+        shared_url = db_connection.engine.url
+        if (
+            shared_url.host == host
+            and int(shared_url.port or 5432) == port
+            and shared_url.database == database
+            and shared_url.username == user
+        ):
+            engine = db_connection.engine
+        else:
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import URL
+
+            engine = create_engine(
+                URL.create(
+                    "postgresql+psycopg2",
+                    username=user,
+                    password=password,
+                    host=host,
+                    port=port,
+                    database=database,
+                ),
+                connect_args={"client_encoding": "UTF8"},
+                **db_connection.pool_options(),
+            )
+        _shared_pg_engines[key] = engine
+        return engine
+
+
+def _record_pg_checkout(wait_ms: float, *, failed: bool = False, timed_out: bool = False) -> None:
+    with _pg_metrics_lock:
+        if failed:
+            _pg_pool_metrics["failures"] += 1
+            if timed_out:
+                _pg_pool_metrics["timeouts"] += 1
+            return
+        _pg_pool_metrics["checkouts"] += 1
+        _pg_pool_metrics["wait_ms_total"] += wait_ms
+        _pg_pool_metrics["wait_ms_max"] = max(_pg_pool_metrics["wait_ms_max"], wait_ms)
 
 class RAGEngine:
+    ingest_batch_size: int = 64
+    embedding_model_name: str = "all-MiniLM-L6-v2"
+    _verified_collection: Optional[str] = None
+
     def __init__(self, collection_name: str = None):
         config = load_environment()
         self.qdrant_host = config.get("QDRANT_HOST", "localhost")
@@ -78,10 +165,11 @@ class RAGEngine:
         self.pg_user = config.get("POSTGRES_USER", "ssp_admin")
         self.pg_password = config.get("POSTGRES_PASSWORD", "Mizuho0824")
         self.qdrant_collection_name = collection_name or config.get("QDRANT_COLLECTION", "world_knowledge")
+        self.ingest_batch_size = int(os.getenv("RAG_INGEST_BATCH_SIZE", self.ingest_batch_size))
 
         self.qdrant_client = None
         self.embedding_model = None
-        self.pg_conn = None
+        self.pg_engine = None
         self.pipeline = KnowledgePipeline()
 
         try:
@@ -90,69 +178,157 @@ class RAGEngine:
 
             embedding_name = config.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
             self.embedding_model = _get_shared_embedding_model(embedding_name)
+            self.embedding_model_name = embedding_name
             log_manager.info(f"Embedding model {embedding_name} loaded (shared).")
 
-            self.pg_conn = _get_shared_pg_connection(
+            self.pg_engine = _get_shared_pg_engine(
                 self.pg_host,
                 self.pg_port,
                 self.pg_database,
                 self.pg_user,
                 self.pg_password
             )
-            log_manager.info(f"PostgreSQL connected to {self.pg_host}:{self.pg_port}/{self.pg_database} (shared).")
+            log_manager.info(f"PostgreSQL pool ready for {self.pg_host}:{self.pg_port}/{self.pg_database} (shared).")
         except Exception as e:
             log_manager.exception(f"RAGEngine initialization error: {e}. RAG will be unavailable.")
             self.qdrant_client = None
             self.embedding_model = None
-            self.pg_conn = None
+            self.pg_engine = None
 
-    def _ensure_pg_connection(self):
-        if self.pg_conn and getattr(self.pg_conn, "closed", 1) == 0:
-            return self.pg_conn
+    def _ensure_pg_engine(self):
+        if self.pg_engine is not None:
+            return self.pg_engine
         try:
-            self.pg_conn = _get_shared_pg_connection(
+            self.pg_engine = _get_shared_pg_engine(
                 self.pg_host,
                 self.pg_port,
                 self.pg_database,
                 self.pg_user,
                 self.pg_password
             )
-            log_manager.debug("PostgreSQL connection refreshed for RAGEngine instance.")
+            log_manager.debug("PostgreSQL pool attached to RAGEngine instance.")
         except Exception as e:
-            log_manager.exception(f"Failed to refresh PostgreSQL connection: {e}")
-            self.pg_conn = None
-        return self.pg_conn
+            log_manager.exception(f"Failed to attach PostgreSQL pool: {e}")
+            self.pg_engine = None
+        return self.pg_engine
+
+    @contextmanager
+    def _pg_connection(self):
+        """Checks a DBAPI connection out of the pool (pre-pinged) and records how long the wait took."""
+        engine = self._ensure_pg_engine()
+        if engine is None:
+            raise RuntimeError("PostgreSQL pool is unavailable.")
+        started = time.perf_counter()
+        try:
+            conn = engine.raw_connection()
+        except Exception as exc:
+            from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+            _record_pg_checkout(0.0, failed=True, timed_out=isinstance(exc, PoolTimeoutError))
+            raise
+        _record_pg_checkout((time.perf_counter() - started) * 1000.0)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def pg_pool_stats(self) -> dict:
+        with _pg_metrics_lock:
+            metrics = dict(_pg_pool_metrics)
+        checkouts = metrics["checkouts"]
+        metrics["wait_ms_avg"] = metrics["wait_ms_total"] / checkouts if checkouts else 0.0
+        pool = getattr(self.pg_engine, "pool", None)
+        if pool is not None:
+            metrics.update(
+                {
+                    "size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": pool.overflow(),
+                    "status": pool.status(),
+                }
+            )
+        return metrics
+
+    def pg_health(self) -> dict:
+        try:
+            with self._pg_connection() as conn:
+                cur = conn.cursor()
+                try:
+                    cur.execute("SELECT 1")
+                    cur.fetchone()
+                finally:
+                    cur.close()
+            return {"healthy": True, **self.pg_pool_stats()}
+        except Exception as exc:
+            log_manager.warning(f"PostgreSQL health check failed: {exc}")
+            return {"healthy": False, "error": str(exc), **self.pg_pool_stats()}
 
     def _vectorize_query(self, query: str):
         if not self.embedding_model:
             return []
+        cache = get_embedding_cache()
+        cached = cache.get(self.embedding_model_name, query)
+        if cached is not None:
+            log_manager.debug(f"Embedding cache hit for query: {query[:50]}...")
+            return cached
         log_manager.debug(f"Vectorizing query: {query[:50]}...")
-        return self.embedding_model.encode(query).tolist()
+        vector = self.embedding_model.encode(query).tolist()
+        cache.put(self.embedding_model_name, query, vector)
+        return vector
+
+    def embedding_cache_stats(self) -> dict:
+        return {"model": self.embedding_model_name, **get_embedding_cache().stats()}
+
+    def _vectorize_batch(self, texts: list[str]) -> list[list[float]]:
+        if not self.embedding_model or not texts:
+            return []
+        log_manager.debug(f"Vectorizing batch of {len(texts)} texts.")
+        vectors = self.embedding_model.encode(texts, batch_size=len(texts))
+        return [vector.tolist() if hasattr(vector, "tolist") else list(vector) for vector in vectors]
+
+    @staticmethod
+    def _iter_batches(chunks: Iterable[KnowledgeChunk], batch_size: int) -> Iterator[list[KnowledgeChunk]]:
+        iterator = iter(chunks)
+        while True:
+            batch = list(islice(iterator, batch_size))
+            if not batch:
+                return
+            yield batch
 
-    def _upsert_chunk(self, chunk: KnowledgeChunk) -> Optional[str]:
+    def _upsert_batch(self, chunks: list[KnowledgeChunk]) -> list[str]:
+        """Encodes a batch of chunks in one call and writes them with a single bulk upsert."""
         try:
-            vector = self._vectorize_query(chunk.text)
-            if not vector:
+            vectors = self._vectorize_batch([chunk.text for chunk in chunks])
+            if len(vectors) != len(chunks):
                 log_manager.warning(
-                    f"Skipping chunk {chunk.metadata.get('chunk_index')} due to failed vectorization."
+                    f"Skipping batch of {len(chunks)} chunks due to failed vectorization."
                 )
-                return None
-            self._ensure_qdrant_collection_exists(len(vector))
+                return []
+            self._ensure_qdrant_collection_exists(len(vectors[0]))
             self.qdrant_client.upsert(
                 collection_name=self.qdrant_collection_name,
                 wait=True,
-                points=[{
-                    "id": chunk.id,
-                    "vector": vector,
-                    "payload": {"text": chunk.text, **chunk.metadata},
-                }]
+                points=[
+                    {
+                        "id": chunk.id,
+                        "vector": vector,
+                        "payload": {
+                            "text": chunk.text,
+                            "created_at": chunk.metadata.get("ingested_at"),
+                            **chunk.metadata,
+                        },
+                    }
+                    for chunk, vector in zip(chunks, vectors)
+                ],
             )
-            return chunk.id
+            self._invalidate_aggregates()
+            return [chunk.id for chunk in chunks]
         except Exception as exc:
             log_manager.exception(
-                f"Failed to upsert chunk {chunk.id} into collection {self.qdrant_collection_name}: {exc}"
+                f"Failed to upsert batch of {len(chunks)} chunks "
+                f"(first={chunks[0].id}) into collection {self.qdrant_collection_name}: {exc}"
             )
-            return None
+            return []
 
     def upsert_text(self, doc_id: str, text: str, metadata: dict = None):
         """Vectorizes and upserts a single text document into the collection."""
@@ -167,7 +343,7 @@ class RAGEngine:
                 log_manager.error("Cannot upsert text: Vectorization failed.")
                 return
 
-            payload = {"text": text}
+            payload = {"text": text, "created_at": datetime.datetime.now().isoformat()}
             if metadata:
                 payload.update(metadata)
             
@@ -182,6 +358,7 @@ class RAGEngine:
                     "payload": payload
                 }]
             )
+            self._invalidate_aggregates()
             log_manager.info(f"Successfully upserted text with ID {doc_id} to collection '{self.qdrant_collection_name}'.")
         except Exception as e:
             log_manager.exception(f"Error upserting text with ID {doc_id}: {e}")
@@ -197,11 +374,13 @@ class RAGEngine:
         title: Optional[str] = None,
         tags: Optional[list[str]] = None,
         permission_label: str = "public",
+        batch_size: Optional[int] = None,
     ) -> dict:
         output_path = self.pipeline.make_output_path(source)
         ingested_chunks: list[dict] = []
         written = 0
         vectorization_enabled = bool(self.qdrant_client and self.embedding_model)
+        batch_size = max(1, batch_size or self.ingest_batch_size)
 
         if isinstance(text, str) and not text.strip():
             log_manager.warning("Cannot ingest text: provided content is empty.")
@@ -220,20 +399,34 @@ class RAGEngine:
             )
 
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            futures: dict = {}
             with output_path.open("w", encoding="utf-8") as jsonl_file:
                 if vectorization_enabled:
-                    from concurrent.futures import ThreadPoolExecutor, as_completed
+                    # Keep only a bounded number of batches in flight so large corpora
+                    # are streamed instead of being buffered in memory as futures.
+                    max_in_flight = self.pipeline.max_workers * 2
+                    pending: dict = {}
+
+                    def _collect(done) -> None:
+                        for future in done:
+                            batch = pending.pop(future)
+                            chunk_ids = set(future.result())
+                            ingested_chunks.extend(
+                                {"id": chunk.id, "text": chunk.text}
+                                for chunk in batch
+                                if chunk.id in chunk_ids
+                            )
+
                     with ThreadPoolExecutor(max_workers=self.pipeline.max_workers) as executor:
-                        for chunk in chunk_iterator:
-                            written += 1
-                            jsonl_file.write(json.dumps(chunk.to_jsonl(), ensure_ascii=False) + "\n")
-                            futures[executor.submit(self._upsert_chunk, chunk)] = chunk
-                        for future in as_completed(futures):
-                            chunk = futures[future]
-                            chunk_id = future.result()
-                            if chunk_id:
-                                ingested_chunks.append({"id": chunk_id, "text": chunk.text})
+                        for batch in self._iter_batches(chunk_iterator, batch_size):
+                            written += len(batch)
+                            jsonl_file.writelines(
+                                json.dumps(chunk.to_jsonl(), ensure_ascii=False) + "\n" for chunk in batch
+                            )
+                            pending[executor.submit(self._upsert_batch, batch)] = batch
+                            if len(pending) >= max_in_flight:
+                                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                                _collect(done)
+                        _collect(list(pending))
                 else:
                     for chunk in chunk_iterator:
                         written += 1
@@ -251,7 +444,7 @@ class RAGEngine:
 
         log_manager.info(
             f"Ingested {len(ingested_chunks)}/{written} chunks into collection "
-            f"'{self.qdrant_collection_name}' (source={source}, chat={treat_as_chat})"
+            f"'{self.qdrant_collection_name}' (source={source}, chat={treat_as_chat}, batch_size={batch_size})"
         )
 
         return {"ingested": len(ingested_chunks), "chunks": ingested_chunks, "jsonl_path": str(output_path)}
@@ -304,24 +497,38 @@ class RAGEngine:
         return [hit.id for hit in search_result]
 
     def _get_text_from_postgresql(self, ids: list):
-        conn = self._ensure_pg_connection()
-        if not conn:
-            log_manager.error("PostgreSQL connection is unavailable for text retrieval.")
-            return []
         log_manager.debug(f"Fetching texts from PostgreSQL for IDs: {ids}")
         if not ids:
             log_manager.debug("No IDs provided for PostgreSQL text retrieval.")
             return []
+        # world_knowledge.id is SERIAL; skip non-numeric Qdrant ids (e.g. ingested chunk UUIDs).
+        id_list = [int(point_id) for point_id in ids if str(point_id).isdigit()]
+        if not id_list:
+            return []
 
-        cur = conn.cursor()
         try:
-            id_list = ','.join(map(str, ids))
-            cur.execute(f"SELECT content FROM world_knowledge WHERE id IN ({id_list}) ORDER BY id;")
-            texts = [row[0] for row in cur.fetchall()]
-            log_manager.debug(f"Retrieved {len(texts)} texts from PostgreSQL.")
-            return texts
-        finally:
-            cur.close()
+            with self._pg_connection() as conn:
+                prepared = conn.info.setdefault("rag_prepared", set())
+                cur = conn.cursor()
+                try:
+                    if _FETCH_TEXTS_STATEMENT not in prepared:
+                        cur.execute(
+                            f"PREPARE {_FETCH_TEXTS_STATEMENT}(int[]) AS "
+                            "SELECT id, content FROM world_knowledge WHERE id = ANY($1)"
+                        )
+                        prepared.add(_FETCH_TEXTS_STATEMENT)
+                    cur.execute(f"EXECUTE {_FETCH_TEXTS_STATEMENT}(%s)", (id_list,))
+                    rows = dict(cur.fetchall())
+                finally:
+                    cur.close()
+        except Exception as exc:
+            log_manager.exception(f"PostgreSQL text retrieval failed: {exc}")
+            return []
+
+        # Keep Qdrant's rank order rather than primary-key order.
+        texts = [rows[point_id] for point_id in id_list if point_id in rows]
+        log_manager.debug(f"Retrieved {len(texts)} texts from PostgreSQL.")
+        return texts
 
     def _format_hit(self, hit, score_hint=None):
         payload = getattr(hit, "payload", {}) or {}
@@ -332,8 +539,8 @@ class RAGEngine:
             or payload.get("timestamp")
             or datetime.datetime.now().isoformat()
         )
-        source = payload.get("source") or payload.get("module") or payload.get("source_name") or "unknown"
-        score = score_hint if score_hint is not None else payload.get("rating") or payload.get("score") or 0.0
+        source = _payload_source(payload)
+        score = score_hint if score_hint is not None else _payload_score(payload)
         permission_label = payload.get("permission_label") or payload.get("permission")
         return {
             "id": str(getattr(hit, "id", payload.get("id", ""))),
@@ -382,7 +589,7 @@ class RAGEngine:
         return dict(Counter(entry["source"] for entry in entries))
 
     def get_context(self, query: str) -> str: # Reverted to get_context
-        if not self.qdrant_client or not self.embedding_model or not self._ensure_pg_connection():
+        if not self.qdrant_client or not self.embedding_model or not self._ensure_pg_engine():
             log_manager.error("Cannot get context: RAGEngine is not available.")
             return "RAG Engine is currently unavailable."
 
@@ -412,67 +619,301 @@ class RAGEngine:
 
         return context
 
+    def _empty_listing(self, limit: int, offset: int, total: int = 0) -> dict:
+        return {
+            "items": [],
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": None,
+            "source_counts": {},
+            "score_summary": self._build_score_summary([]),
+        }
+
+    def _aggregate_entry(self) -> dict:
+        return _aggregate_state.setdefault(
+            self.qdrant_collection_name,
+            {"value": None, "computed_at": float("-inf"), "generation": 0, "computed_generation": -1, "thread": None},
+        )
+
+    def _invalidate_aggregates(self) -> None:
+        """Marks the aggregates stale; the next listing starts a background refresh."""
+        with _aggregate_lock:
+            self._aggregate_entry()["generation"] += 1
+
+    def _get_collection_aggregates(self) -> dict:
+        """Last computed source counts and score summary; never walks the collection itself."""
+        ttl = float(os.getenv("RAG_AGGREGATE_TTL", "300"))
+        with _aggregate_lock:
+            entry = self._aggregate_entry()
+            stale = (
+                entry["computed_generation"] != entry["generation"]
+                or time.monotonic() - entry["computed_at"] >= ttl
+            )
+            running = entry["thread"] is not None and entry["thread"].is_alive()
+            if stale and not running:
+                entry["thread"] = Thread(
+                    target=self._refresh_aggregates,
+                    args=(entry["generation"],),
+                    name=f"rag-aggregates-{self.qdrant_collection_name}",
+                    daemon=True,
+                )
+                entry["thread"].start()
+            value = entry["value"]
+        return value or {"source_counts": {}, "score_summary": self._build_score_summary([])}
+
+    def _refresh_aggregates(self, generation: int) -> None:
+        name = self.qdrant_collection_name
+        sources: Counter = Counter()
+        scores: list[float] = []
+        next_offset = None
+        try:
+            while True:
+                points, next_offset = self.qdrant_client.scroll(
+                    collection_name=name,
+                    limit=1000,
+                    offset=next_offset,
+                    with_payload=list(_SOURCE_KEYS + _SCORE_KEYS),
+                    with_vectors=False,
+                )
+                for point in points:
+                    payload = getattr(point, "payload", None) or {}
+                    sources[_payload_source(payload)] += 1
+                    scores.append(_payload_score(payload))
+                if next_offset is None or not points:
+                    break
+            value = {"source_counts": dict(sources), "score_summary": self._build_score_summary(scores)}
+        except Exception as e:
+            # Keep serving the previous result and retry once the TTL has passed.
+            log_manager.warning(f"Failed to aggregate collection '{name}': {e}")
+            value = None
+        with _aggregate_lock:
+            entry = self._aggregate_entry()
+            if value is not None:
+                entry["value"] = value
+            entry["computed_at"] = time.monotonic()
+            entry["computed_generation"] = generation
+
+    def _ensure_payload_indexes(self) -> None:
+        name = self.qdrant_collection_name
+        if name in _indexed_collections:
+            return
+        from qdrant_client.http.models import PayloadSchemaType
+
+        for field_name, schema in (
+            ("created_at", PayloadSchemaType.DATETIME),
+            ("rating", PayloadSchemaType.FLOAT),
+            ("source", PayloadSchemaType.KEYWORD),
+        ):
+            try:
+                self.qdrant_client.create_payload_index(
+                    collection_name=name,
+                    field_name=field_name,
+                    field_schema=schema,
+                )
+            except Exception as exc:
+                log_manager.debug(f"Payload index {field_name} on {name} not created: {exc}")
+        _indexed_collections.add(name)
+
+    @staticmethod
+    def _parse_order_value(raw, order_by: str):
+        if order_by == "created_at" and isinstance(raw, str):
+            try:
+                return datetime.datetime.fromisoformat(raw)
+            except ValueError:
+                return raw
+        return raw
+
+    def _order_value(self, point, order_by: str):
+        return self._parse_order_value((point.payload or {}).get(_ORDER_PAYLOAD_KEYS[order_by]), order_by)
+
+    @staticmethod
+    def _order_filter(order_by: str, **bounds):
+        from qdrant_client.http.models import DatetimeRange, FieldCondition, Filter, Range
+
+        range_type = DatetimeRange if order_by == "created_at" else Range
+        return Filter(must=[FieldCondition(key=_ORDER_PAYLOAD_KEYS[order_by], range=range_type(**bounds))])
+
+    def _scroll_ties(self, order_by: str, value, after_id, limit: int) -> list:
+        """Points whose order value equals ``value``, in id order, starting after ``after_id``."""
+        if limit <= 0:
+            return []
+        points, _ = self.qdrant_client.scroll(
+            collection_name=self.qdrant_collection_name,
+            scroll_filter=self._order_filter(order_by, gte=value, lte=value),
+            # Qdrant's id offset is inclusive, so fetch one extra to step over after_id.
+            limit=limit + (1 if after_id is not None else 0),
+            offset=after_id,
+            with_payload=True,
+            with_vectors=False,
+        )
+        if after_id is not None:
+            points = [point for point in points if point.id != after_id]
+        return points[:limit]
+
+    def _scroll_missing(self, order_by: str, descending: bool, limit: int, skip: int, start_id):
+        """Points without the order key (e.g. legacy points lacking created_at), in id order, after all others."""
+        from qdrant_client.http.models import Filter, IsEmptyCondition, PayloadField
+
+        points, _ = self.qdrant_client.scroll(
+            collection_name=self.qdrant_collection_name,
+            scroll_filter=Filter(must=[IsEmptyCondition(is_empty=PayloadField(key=_ORDER_PAYLOAD_KEYS[order_by]))]),
+            limit=skip + limit + 1,
+            offset=start_id,
+            with_payload=True,
+            with_vectors=False,
+        )
+        page = points[skip: skip + limit]
+        if len(points) <= skip + limit:
+            return page, None
+        return page, {"m": "missing", "k": order_by, "d": descending, "o": points[skip + limit].id}
+
+    def _scroll_ordered(self, limit: int, offset: int, order_by: str, descending: bool, state: Optional[dict]):
+        """One page of points ordered server-side by a payload index.
+
+        Rows are ordered by (value, id): Qdrant orders by the value, and each tie group
+        is re-read in id order through an equality filter. The cursor is the last
+        (value, id) pair, so it stays the same size however many rows share a value.
+        Points that lack the order key follow the ordered ones, in id order.
+        """
+        from qdrant_client.http.models import Direction, OrderBy
+
+        self._ensure_payload_indexes()
+        page = []
+        scroll_filter = None
+        skip = offset
+        if state:
+            skip = 0
+            value = self._parse_order_value(state.get("v"), order_by)
+            page = self._scroll_ties(order_by, value, state.get("id"), limit + 1)
+            if len(page) > limit:
+                page = page[:limit]
+                return page, self._order_cursor(page[-1], order_by, descending)
+            scroll_filter = self._order_filter(order_by, **{"lt" if descending else "gt": value})
+
+        needed = limit - len(page)
+        batch, _ = self.qdrant_client.scroll(
+            collection_name=self.qdrant_collection_name,
+            scroll_filter=scroll_filter,
+            limit=skip + needed + 1,
+            order_by=OrderBy(
+                key=_ORDER_PAYLOAD_KEYS[order_by],
+                direction=Direction.DESC if descending else Direction.ASC,
+            ),
+            with_payload=True,
+            with_vectors=False,
+        )
+        if len(batch) <= skip + needed:
+            # Ordered points are exhausted; continue with the ones lacking the key.
+            taken = batch[skip:]
+            rest, next_state = self._scroll_missing(
+                order_by, descending, needed - len(taken), max(0, skip - len(batch)), None
+            )
+            return page + taken + rest, next_state
+
+        taken = batch[skip: skip + needed]
+        if taken:
+            # Swap the trailing tie group for the lowest ids with that value, so the
+            # next page can resume after the last id.
+            last_value = self._order_value(taken[-1], order_by)
+            group = 0
+            while group < len(taken) and self._order_value(taken[-1 - group], order_by) == last_value:
+                group += 1
+            taken = taken[:-group] + self._scroll_ties(order_by, last_value, None, group)
+        page = page + taken
+        return page, self._order_cursor(page[-1], order_by, descending)
+
+    def _order_cursor(self, point, order_by: str, descending: bool) -> dict:
+        value = (point.payload or {}).get(_ORDER_PAYLOAD_KEYS[order_by])
+        return {"m": "order", "k": order_by, "d": descending, "v": value, "id": point.id}
+
+    def _scroll_by_id(self, limit: int, offset: int, state: Optional[dict]):
+        """Fallback for servers without payload ordering: Qdrant's own id order and next_page_offset."""
+        if state:
+            page, next_offset = self.qdrant_client.scroll(
+                collection_name=self.qdrant_collection_name,
+                limit=limit,
+                offset=state.get("o"),
+                with_payload=True,
+                with_vectors=False,
+            )
+        else:
+            page, next_offset = [], None
+            while True:
+                batch, next_offset = self.qdrant_client.scroll(
+                    collection_name=self.qdrant_collection_name,
+                    limit=min(offset + limit - len(page), 1000) or limit,
+                    offset=next_offset,
+                    with_payload=True,
+                    with_vectors=False,
+                )
+                page.extend(batch)
+                if next_offset is None or len(page) >= offset + limit or not batch:
+                    break
+            page = page[offset: offset + limit]
+        return page, ({"m": "id", "o": next_offset} if next_offset is not None else None)
+
     def list_embeddings(
         self,
         limit: int = 50,
         offset: int = 0,
         order_by: str = "created_at",
         descending: bool = True,
+        cursor: Optional[str] = None,
     ) -> dict:
+        """Lists stored points.
+
+        Pass the returned ``next_cursor`` back as ``cursor`` to page through the whole
+        collection; ``offset`` is only honoured for the first page.
+        """
+        order_by = order_by if order_by in _ORDER_PAYLOAD_KEYS else "created_at"
+        state = _decode_cursor(cursor) if cursor else None
         if not self.qdrant_client:
             log_manager.error("Cannot list embeddings: RAGEngine is not available.")
-            return {
-                "items": [],
-                "total": 0,
-                "limit": limit,
-                "offset": offset,
-                "source_counts": {},
-                "score_summary": self._build_score_summary([]),
-            }
-        log_manager.debug(f"Listing embeddings from Qdrant (limit={limit}, offset={offset}).")
+            return self._empty_listing(limit, offset)
+        log_manager.debug(f"Listing embeddings from Qdrant (limit={limit}, offset={offset}, cursor={bool(cursor)}).")
 
         total_count = 0
         try:
-            total_count = self.qdrant_client.count(collection_name=self.qdrant_collection_name).count
+            total_count = self.qdrant_client.count(collection_name=self.qdrant_collection_name, exact=True).count
         except Exception as e:
             log_manager.warning(f"Failed to count collection '{self.qdrant_collection_name}': {e}")
+        aggregates = self._get_collection_aggregates()
 
         try:
-            scroll_result, _ = self.qdrant_client.scroll(
-                collection_name=self.qdrant_collection_name,
-                limit=limit,
-                offset=offset,
-                with_payload=True,
-                with_vectors=False,
-            )
+            if state and state.get("m") == "id":
+                points, next_state = self._scroll_by_id(limit, offset, state)
+            elif state and state.get("m") == "missing":
+                points, next_state = self._scroll_missing(order_by, descending, limit, 0, state.get("o"))
+            else:
+                try:
+                    points, next_state = self._scroll_ordered(limit, offset, order_by, descending, state)
+                except Exception as e:
+                    if state:
+                        raise
+                    log_manager.warning(f"Ordered scroll unavailable, falling back to id order: {e}")
+                    points, next_state = self._scroll_by_id(limit, offset, None)
             entries = []
-            for hit in scroll_result:
+            for hit in points:
                 try:
                     entries.append(self._format_hit(hit))
                 except Exception as err:
                     log_manager.warning(f"Skipping hit due to formatting error: {err}")
-            entries = self._apply_sort(entries, order_by if order_by in {"score", "created_at"} else "created_at", descending)
-            source_counts = self._collect_source_counts(entries)
-            score_summary = self._build_score_summary([entry["score"] for entry in entries])
+            if next_state and next_state.get("m") == "id":
+                entries = self._apply_sort(entries, order_by, descending)
             log_manager.debug(f"Listed {len(entries)} embeddings (total={total_count}).")
             return {
                 "items": entries,
                 "total": total_count,
                 "limit": limit,
                 "offset": offset,
-                "source_counts": source_counts,
-                "score_summary": score_summary,
+                "next_cursor": _encode_cursor(next_state) if next_state else None,
+                "source_counts": aggregates["source_counts"],
+                "score_summary": aggregates["score_summary"],
             }
         except Exception as e:
             log_manager.exception(f"Error listing embeddings from Qdrant: {e}")
-            return {
-                "items": [],
-                "total": total_count,
-                "limit": limit,
-                "offset": offset,
-                "source_counts": {},
-                "score_summary": self._build_score_summary([]),
-            }
+            return self._empty_listing(limit, offset, total_count)
 
     def search(
         self,
@@ -481,106 +922,131 @@ class RAGEngine:
         offset: int = 0,
         order_by: str = "score",
         descending: bool = True,
+        cursor: Optional[str] = None,
     ) -> dict:
+        """Similarity search paged with Qdrant's server-side offset.
+
+        Qdrant's search takes only a lower score bound, so the offset remains the
+        position hint. The cursor also carries the last page's lowest score and the ids
+        returned at exactly that score: hits that moved above it after new inserts, or
+        tie at it, are skipped instead of being returned twice.
+        """
+        query_hash = hashlib.sha256(query.encode("utf-8")).hexdigest()[:16]
+        state = _decode_cursor(cursor) if cursor else None
+        if state is not None:
+            if state.get("q") != query_hash:
+                raise ValueError("Cursor does not belong to this query.")
+            offset = int(state.get("o", 0))
+        empty = {
+            "items": [],
+            "seen": offset,
+            "next_cursor": None,
+            "source_counts": {},
+            "score_summary": self._build_score_summary([]),
+            "query": query,
+            "limit": limit,
+            "offset": offset,
+        }
         if not self.qdrant_client or not self.embedding_model:
             log_manager.error("Cannot search embeddings: RAGEngine is not available.")
-            return {
-                "items": [],
-                "total": 0,
-                "source_counts": {},
-                "score_summary": self._build_score_summary([]),
-                "query": query,
-                "limit": limit,
-                "offset": offset,
-            }
-
-    def get_by_id(self, entry_id: str):
-        if not self.qdrant_client:
-            log_manager.error("Cannot retrieve entry: RAGEngine is not available.")
-            return None
-        try:
-            point = self.qdrant_client.retrieve(
-                collection_name=self.qdrant_collection_name,
-                point_id=entry_id,
-                with_payload=True,
-            )
-            if not point or not getattr(point, "payload", None):
-                return None
-            return self._format_hit(point)
-        except Exception as exc:
-            log_manager.exception(f"Failed to fetch entry {entry_id}: {exc}")
-            return None
+            return empty
 
         log_manager.debug(f"Searching RAG for query='{query}' (limit={limit}, offset={offset}).")
         query_vector = self._vectorize_query(query)
         if not query_vector:
-            return {
-                "items": [],
-                "total": 0,
-                "source_counts": {},
-                "score_summary": self._build_score_summary([]),
-                "query": query,
-                "limit": limit,
-                "offset": offset,
-            }
+            return empty
 
         try:
-            search_limit = max(limit + offset, 1)
             search_result = self.qdrant_client.search(
                 collection_name=self.qdrant_collection_name,
                 query_vector=query_vector,
-                limit=search_limit,
+                limit=limit + 1,
+                offset=offset,
                 with_payload=True,
             )
+            # Decide paging on the raw hits so a skipped duplicate never ends the walk early.
+            has_more = len(search_result) > limit
+            page = search_result[:limit]
+            boundary = state.get("s") if state else None
+            tied = set(state.get("t", [])) if state else set()
+            if boundary is not None:
+                page = [
+                    hit
+                    for hit in page
+                    if getattr(hit, "score", 0.0) < boundary
+                    or (getattr(hit, "score", 0.0) == boundary and str(hit.id) not in tied)
+                ]
             entries = []
-            for hit in search_result:
+            for hit in page:
                 try:
                     entries.append(self._format_hit(hit, score_hint=getattr(hit, "score", None)))
                 except Exception as err:
                     log_manager.warning(f"Skipping hit during search formatting: {err}")
-            entries = self._apply_sort(
-                entries,
-                order_by if order_by in {"score", "created_at"} else "score",
-                descending,
-            )
-            total_hits = len(entries)
-            paged = entries[offset: offset + limit]
-            score_summary = self._build_score_summary([entry["score"] for entry in entries])
+            next_state = None
+            if has_more:
+                next_state = {"q": query_hash, "o": offset + limit, "s": boundary, "t": sorted(tied)}
+                if page:
+                    lowest = getattr(page[-1], "score", None)
+                    same = {str(hit.id) for hit in page if getattr(hit, "score", None) == lowest}
+                    next_state["s"] = lowest
+                    next_state["t"] = sorted(same | tied if lowest == boundary else same)
+            if order_by == "created_at" or not descending:
+                entries = self._apply_sort(
+                    entries,
+                    order_by if order_by in _ORDER_PAYLOAD_KEYS else "score",
+                    descending,
+                )
             return {
-                "items": paged,
-                "total": total_hits,
+                "items": entries,
+                "seen": offset + len(search_result[:limit]),
                 "limit": limit,
                 "offset": offset,
+                "next_cursor": _encode_cursor(next_state) if next_state else None,
                 "query": query,
                 "source_counts": self._collect_source_counts(entries),
-                "score_summary": score_summary,
+                "score_summary": self._build_score_summary([entry["score"] for entry in entries]),
             }
         except Exception as e:
             log_manager.exception(f"Error running search for '{query}': {e}")
-            return {
-                "items": [],
-                "total": 0,
-                "source_counts": {},
-                "score_summary": self._build_score_summary([]),
-                "query": query,
-                "limit": limit,
-                "offset": offset,
-            }
+            return empty
 
-    def _ensure_qdrant_collection_exists(self, vector_size: int):
+    def get_by_id(self, entry_id: str):
         if not self.qdrant_client:
-            return
-        from qdrant_client.http.models import Distance, VectorParams
+            log_manager.error("Cannot retrieve entry: RAGEngine is not available.")
+            return None
         try:
-            self.qdrant_client.get_collection(collection_name=self.qdrant_collection_name)
-            log_manager.debug(f"Qdrant collection {self.qdrant_collection_name} already exists.")
-        except Exception:
-            log_manager.info(f"Collection {self.qdrant_collection_name} not found, creating it.")
-            self.qdrant_client.recreate_collection(
+            point = self.qdrant_client.retrieve(
                 collection_name=self.qdrant_collection_name,
-                vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+                point_id=entry_id,
+                with_payload=True,
             )
-            log_manager.info(f"Collection {self.qdrant_collection_name} created with vector size {vector_size}.")
+            if not point or not getattr(point, "payload", None):
+                return None
+            return self._format_hit(point)
+        except Exception as exc:
+            log_manager.exception(f"Failed to fetch entry {entry_id}: {exc}")
+            return None
+
+    def _ensure_qdrant_collection_exists(self, vector_size: int):
+        if not self.qdrant_client:
+            return
+        if self._verified_collection == self.qdrant_collection_name:
+            return
+        from qdrant_client.http.models import Distance, VectorParams
+        with _collection_lock:
+            if self._verified_collection == self.qdrant_collection_name:
+                return
+            try:
+                self.qdrant_client.get_collection(collection_name=self.qdrant_collection_name)
+                log_manager.debug(f"Qdrant collection {self.qdrant_collection_name} already exists.")
+            except Exception:
+                log_manager.info(f"Collection {self.qdrant_collection_name} not found, creating it.")
+                self.qdrant_client.recreate_collection(
+                    collection_name=self.qdrant_collection_name,
+                    vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE)
+                )
+                log_manager.info(f"Collection {self.qdrant_collection_name} created with vector size {vector_size}.")
+            self._verified_collection = self.qdrant_collection_name
 
     def inject_samples_to_qdrant(self) -> int:
         if not self.qdrant_client:
@@ -623,6 +1089,7 @@ class RAGEngine:
                     points=points
                 )
                 synced_count = len(points)
+                self._invalidate_aggregates()
                 log_manager.info(f"Qdrant upsert operation info: {operation_info}")
             except Exception as e:
                 log_manager.exception(f"Error upserting samples to Qdrant: {e}")
@@ -645,6 +1112,7 @@ class RAGEngine:
                     "payload": payload
                 }]
             )
+            self._invalidate_aggregates()
             log_manager.debug(f"Successfully upserted sample {sample_id}.")
         except Exception as e:
             log_manager.exception(f"Error upserting single sample {sample_id} to Qdrant: {e}")
@@ -689,7 +1157,6 @@ def register_high_score_sample(user_input: str, answer: str, rating: float, feed
                 "feedback": feedback,
                 "created_at": datetime.datetime.now().isoformat()
             }
-            import hashlib
             sample_id = int(hashlib.sha256(answer.encode('utf-8')).hexdigest(), 16) % (10**9)
 
             rag._upsert_single_sample_to_qdrant(sample_id, vector, payload)
@@ -722,7 +1189,6 @@ def reinforce_rag_with_feedback(feedback_path="data/feedback_log.json", min_scor
             combined_text = f"Q: {entry['user_input']}\nA: {entry['final_output']}"
             vector = rag_engine._vectorize_query(combined_text)
 
-            import hashlib
             sample_id = int(hashlib.sha256(combined_text.encode('utf-8')).hexdigest(), 16) % (10**9)
 
             payload = {
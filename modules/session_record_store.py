@@ -0,0 +1,222 @@
+# path: modules/session_record_store.py
+# version: v1.0
+"""Indexed, append-only storage for MemoryStore session records.
+
+Records live in a SQLite database in WAL mode: saving an iteration is one INSERT
+plus one upsert of the session's summary row, regardless of how many records
+exist. ``(session_id, seq)`` is indexed for per-session lookups and ``seq`` orders
+tail queries. ``migrate_json`` imports the legacy ``data/memory_log.json`` array
+once; the JSON file itself is left untouched.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from modules.log_manager import log_manager
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    iteration INTEGER,
+    timestamp TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_records_session_seq ON records (session_id, seq);
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    updated_at TEXT,
+    first_seq INTEGER NOT NULL,
+    last_seq INTEGER NOT NULL,
+    record_count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_sessions_first_seq ON sessions (first_seq);
+CREATE INDEX IF NOT EXISTS ix_sessions_last_seq ON sessions (last_seq);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_UPSERT_SESSION = """
+INSERT INTO sessions (session_id, created_at, updated_at, first_seq, last_seq, record_count)
+VALUES (?, ?, ?, ?, ?, 1)
+ON CONFLICT (session_id) DO UPDATE SET
+    updated_at = excluded.updated_at,
+    last_seq = excluded.last_seq,
+    record_count = record_count + 1
+"""
+
+
+def _session_summary(row) -> Dict[str, Any]:
+    session_id, created_at, updated_at, record_count, last_record = row
+    return {
+        "session_id": session_id,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "record_count": record_count,
+        "last_record": json.loads(last_record) if last_record else None,
+    }
+
+
+class SessionRecordStore:
+    """Shared per-path record store; see the module docstring."""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path: str) -> "SessionRecordStore":
+        key = os.path.abspath(path)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(path)
+                cls._instances[key] = store
+            return store
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared under _lock; autocommit mode with explicit transactions.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- writing -----------------------------------------------------------
+
+    def _append_locked(self, session_id: str, record: Dict[str, Any]) -> int:
+        timestamp = record.get("timestamp")
+        cursor = self._conn.execute(
+            "INSERT INTO records (session_id, iteration, timestamp, record) VALUES (?, ?, ?, ?)",
+            (session_id, record.get("iteration"), timestamp, json.dumps(record, ensure_ascii=False, default=str)),
+        )
+        seq = cursor.lastrowid
+        self._conn.execute(_UPSERT_SESSION, (session_id, timestamp, timestamp, seq, seq))
+        return seq
+
+    def append(self, session_id: str, record: Dict[str, Any]) -> int:
+        """Appends one record to ``session_id`` and returns its sequence number."""
+        session_id = str(session_id).strip()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                seq = self._append_locked(session_id, record)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        return seq
+
+    def migrate_json(self, json_path) -> int:
+        """
+        Imports a legacy ``[{"session_id", "records": [...]}, ...]`` file in one
+        transaction, once per store. Returns the number of records imported.
+        """
+        json_path = Path(json_path)
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+                return 0
+            sessions = []
+            if json_path.exists():
+                try:
+                    sessions = json.loads(json_path.read_text(encoding="utf-8") or "[]")
+                except (OSError, json.JSONDecodeError) as e:
+                    # Not marked as migrated, so a repaired file is imported on the next start.
+                    log_manager.warning(f"[SessionRecordStore] {json_path} is unreadable; nothing migrated: {e}")
+                    return 0
+            if not isinstance(sessions, list):
+                sessions = []
+            imported = 0
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for session in sessions:
+                    if not isinstance(session, dict) or not session.get("session_id"):
+                        continue
+                    for record in session.get("records") or []:
+                        self._append_locked(str(session["session_id"]).strip(), record)
+                        imported += 1
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('json_migrated', ?)",
+                    (json.dumps({"source": str(json_path), "records": imported}),),
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if imported:
+            log_manager.info(f"[SessionRecordStore] Migrated {imported} records from {json_path} to {self.path}")
+        return imported
+
+    # --- reading -----------------------------------------------------------
+
+    def session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """``{"session_id", "records": [...]}`` in append order, or None if unknown."""
+        session_id = str(session_id).strip()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT record FROM records WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        if not rows:
+            return None
+        return {"session_id": session_id, "records": [json.loads(row[0]) for row in rows]}
+
+    def tail(self, limit: int = 50, session_id: str = None) -> List[Dict[str, Any]]:
+        """The newest ``limit`` records (each tagged with its session_id), oldest first."""
+        if limit <= 0:
+            return []
+        query = "SELECT session_id, record FROM records"
+        params: list = []
+        if session_id is not None:
+            query += " WHERE session_id = ?"
+            params.append(str(session_id).strip())
+        query += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"session_id": sid, **json.loads(record)} for sid, record in reversed(rows)]
+
+    def latest_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Summaries of the most recently updated sessions, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT s.session_id, s.created_at, s.updated_at, s.record_count, r.record
+                FROM sessions s JOIN records r ON r.seq = s.last_seq
+                ORDER BY s.last_seq DESC LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+        return [_session_summary(row) for row in rows]
+
+    def recent_sessions(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """The last ``limit`` sessions by creation, oldest first, in the legacy JSON shape."""
+        with self._lock:
+            ids = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT session_id FROM sessions ORDER BY first_seq DESC LIMIT ?", (limit,)
+                )
+            ]
+        sessions = (self.session(session_id) for session_id in reversed(ids))
+        return [session for session in sessions if session is not None]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            records, sessions = self._conn.execute(
+                "SELECT (SELECT COUNT(*) FROM records), (SELECT COUNT(*) FROM sessions)"
+            ).fetchone()
+        return {"records": records, "sessions": sessions}
@@ -18,7 +18,10 @@ from modules.emotion_engine import EmotionEngine
 from modules.log_manager import log_manager
 from modules.memory_store import MemoryStore
 from modules.osc_bridge import OSCBridge
-from modules.tts_manager import TTSManager
+from modules.tts_manager import TTSManager, audio_duration
+
+LOOKAHEAD = int(os.getenv("STAGE_TTS_LOOKAHEAD", "3"))
+STALL_THRESHOLD_MS = 50.0
 
 
 class StageDirector:
@@ -29,8 +32,10 @@ class StageDirector:
         tts: TTSManager | None = None,
         osc: OSCBridge | None = None,
         progress_callback: Callable[[Dict[str, Any]], Awaitable[None]] | None = None,
+        lookahead: int | None = None,
     ):
         self.tts = tts or TTSManager()
+        self.lookahead = max(0, LOOKAHEAD if lookahead is None else lookahead)
         self.osc = osc or OSCBridge()
         self.stage_log_dir = "logs/stage_logs"
         self.timeline_archive_dir = Path("data/stage_runs")
@@ -95,7 +100,7 @@ class StageDirector:
                 self._log_step("checkpoint_clear", "error", error=str(exc), extra={"session": session_key})
 
     async def play_timeline(self, timeline_path: str, *, label: str | None = None, tags: List[str] | None = None, max_retries: int = 2):
-        """Load a timeline JSON file and execute it sequentially."""
+        """Load a timeline JSON file and play it, synthesizing upcoming lines while the current one plays."""
         load_started = time.perf_counter()
         try:
             with open(timeline_path, "r", encoding="utf-8") as f:
@@ -117,24 +122,61 @@ class StageDirector:
             self._log_step("timeline_resume", "ok", extra={"session": session_key, "resume_from": resume_index})
         await self._notify_clients({"type": "status", "status": "playing", "timeline": session_key})
 
-        for idx, event in enumerate(timeline[resume_index:], start=resume_index):
+        # Look-ahead pipeline: lines idx+1..idx+lookahead are synthesized (cache
+        # lookups or Voicevox requests, bounded inside TTSManager) while idx plays.
+        payloads: Dict[int, Dict[str, Any]] = {}
+        prefetch: Dict[int, asyncio.Task] = {}
+        next_prefetch = resume_index
+
+        def schedule_prefetch(upto: int) -> None:
+            nonlocal next_prefetch
+            while next_prefetch < min(upto, len(timeline)):
+                payloads[next_prefetch] = self._prepare_emotion_payload(timeline[next_prefetch])
+                prefetch[next_prefetch] = asyncio.create_task(
+                    self._synthesize_event(timeline[next_prefetch], payloads[next_prefetch])
+                )
+                next_prefetch += 1
+
+        timings: List[Dict[str, float]] = []
+        planned_start: float | None = None  # perf_counter time the current line is due
+
+        for idx in range(resume_index, len(timeline)):
+            event = timeline[idx]
             try:
                 event_started = time.perf_counter()
                 text = event.get("text", "")
                 duration = float(event.get("duration", 3.0))
-                emotion_payload = self._prepare_emotion_payload(event)
+                schedule_prefetch(idx + 1 + self.lookahead)
+                emotion_payload = payloads.pop(idx)
                 dominant_emotion = emotion_payload["dominant_emotion"]
 
                 attempts = 0
                 last_error: str | None = None
+                synthesis: Dict[str, Any] | None = None
                 while attempts <= max_retries:
                     attempts += 1
                     step_start = time.perf_counter()
                     try:
-                        tts_result, osc_result = await asyncio.gather(
-                            self.tts.speak(text, emotion_payload),
-                            self.osc.send_emotion(dominant_emotion.capitalize()),
-                        )
+                        if synthesis is None:
+                            task = prefetch.pop(idx, None)
+                            synthesis = await (task if task is not None else self._synthesize_event(event, emotion_payload))
+                        line_start = time.perf_counter()
+                        if planned_start is None:
+                            planned_start = line_start
+                        timing = {
+                            "synthesis_ms": round(synthesis["synthesis_ms"], 2),
+                            "wait_ms": round((line_start - step_start) * 1000, 2),
+                            "jitter_ms": round((line_start - planned_start) * 1000, 2),
+                            "audio_duration_s": synthesis["audio_duration"],
+                        }
+                        if synthesis["audio_path"]:
+                            tts_result, osc_result = await asyncio.gather(
+                                self.tts.play(synthesis["audio_path"], emotion_payload),
+                                self.osc.send_emotion(dominant_emotion.capitalize()),
+                            )
+                        else:
+                            tts_result = {"status": "error", "error": synthesis["error"], "audio_path": None, "fallback_used": True}
+                            osc_result = await self.osc.send_emotion(dominant_emotion.capitalize())
                         self._log_step(
                             "event_execute",
                             "ok",
@@ -146,6 +188,7 @@ class StageDirector:
                                 "emotion": dominant_emotion,
                                 "attempt": attempts,
                                 "timeline_size": len(timeline),
+                                **timing,
                             },
                         )
                         last_error = None
@@ -169,21 +212,26 @@ class StageDirector:
                             raise
                         await asyncio.sleep(min(1.0 * attempts, 5.0))
 
+                # The real clip length drives the schedule; the script duration is the fallback.
+                slot = synthesis["audio_duration"] or duration
+                timings.append(timing)
                 stage_entry = {
                     "timestamp": datetime.now().isoformat(),
                     "character": event.get("character"),
                     "emotion": dominant_emotion,
                     "text": text,
                     "duration": duration,
+                    "audio_duration": synthesis["audio_duration"],
                     "audio_path": (tts_result or {}).get("audio_path") if isinstance(tts_result, dict) else None,
                     "emotion_vector": emotion_payload["emotion_vector"],
                     "osc_payload": osc_result,
+                    "timing": timing,
                 }
                 stage_log.append(stage_entry)
                 await self._persist_stage_event(session_key, idx, stage_entry)
                 self._save_checkpoint(session_key, idx + 1)
 
-                elapsed += duration
+                elapsed += slot
                 await self._notify_clients(
                     {
                         "type": "progress",
@@ -193,6 +241,7 @@ class StageDirector:
                         "vector": emotion_payload["emotion_vector"],
                         "text": text,
                         "audioPath": stage_entry["audio_path"],
+                        "jitterMs": timing["jitter_ms"],
                     }
                 )
                 self._log_step(
@@ -202,7 +251,9 @@ class StageDirector:
                     items=1,
                     extra={"event_index": idx, "elapsed_schedule_s": elapsed},
                 )
-                await asyncio.sleep(duration)
+                # Playback has usually consumed the slot already; only the remainder is waited.
+                planned_start = max(planned_start, line_start) + slot
+                await asyncio.sleep(max(0.0, planned_start - time.perf_counter()))
             except Exception as exc:
                 self._save_checkpoint(session_key, idx, last_error=str(exc))
                 self._log_step(
@@ -214,13 +265,68 @@ class StageDirector:
                 log_manager.error(f"[StageDirector] Error executing event {idx}: {exc}", exc_info=True)
                 break
 
+        for task in prefetch.values():
+            task.cancel()
+
         total_time = datetime.now().timestamp() - start_time
         self._clear_checkpoint(session_key)
-        self._log_step("timeline_complete", "ok", duration_ms=total_time * 1000, items=len(stage_log), extra={"timeline": session_key})
+        self._log_step(
+            "timeline_complete",
+            "ok",
+            duration_ms=total_time * 1000,
+            items=len(stage_log),
+            extra={"timeline": session_key, **self._timing_summary(timings)},
+        )
         self._record_stage_log(stage_log, source_path=timeline_path, label=label, tags=tags or [])
         self._archive_timeline(timeline_path, stage_log, label=label, tags=tags or [])
         await self._notify_clients({"type": "status", "status": "stopped", "timeline": session_key})
 
+    async def _synthesize_event(self, event: Dict[str, Any], emotion_payload: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        text = event.get("text", "")
+        if not text:
+            return {"audio_path": None, "error": "empty_text", "synthesis_ms": 0.0, "audio_duration": None}
+        audio_path, fallback, error_code = await self.tts.synthesize_async(text, emotion_payload)
+        ok = bool(audio_path) and not fallback
+        return {
+            "audio_path": audio_path if ok else None,
+            "error": None if ok else error_code,
+            "synthesis_ms": (time.perf_counter() - started) * 1000,
+            "audio_duration": audio_duration(audio_path) if ok else None,
+        }
+
+    @staticmethod
+    def _timing_summary(timings: List[Dict[str, float]]) -> Dict[str, Any]:
+        if not timings:
+            return {}
+        jitters = [timing["jitter_ms"] for timing in timings]
+        return {
+            "avg_jitter_ms": round(sum(jitters) / len(jitters), 2),
+            "max_jitter_ms": max(jitters),
+            # The first line always waits for its synthesis; later waits are audible gaps.
+            "stalls": sum(1 for timing in timings[1:] if timing["wait_ms"] > STALL_THRESHOLD_MS),
+        }
+
+    async def prewarm_timeline(self, timeline_path: str) -> Dict[str, Any]:
+        """Synthesize every line of a timeline ahead of playback so playback only hits the audio cache."""
+        started = time.perf_counter()
+        with open(timeline_path, "r", encoding="utf-8") as f:
+            timeline = json.load(f)
+        # Same emotion payloads play_timeline passes to speak(), hence the same cache keys.
+        lines = [
+            {"text": event.get("text", ""), "emotion": self._prepare_emotion_payload(event)}
+            for event in timeline
+        ]
+        summary = await self.tts.prewarm(lines)
+        self._log_step(
+            "timeline_prewarm",
+            "ok" if not summary["failed"] else "partial",
+            duration_ms=(time.perf_counter() - started) * 1000,
+            items=summary["lines"],
+            extra={"timeline_path": timeline_path, "cached": summary["cached"], "synthesized": summary["synthesized"], "failed": summary["failed"]},
+        )
+        return summary
+
     def _record_stage_log(self, stage_log: List[Dict[str, Any]], *, source_path: str | None = None, label: str | None = None, tags: List[str] | None = None):
         """Save execution logs to a timestamped file for replay."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
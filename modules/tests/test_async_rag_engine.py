@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+sys.modules.setdefault("dotenv", types.SimpleNamespace(load_dotenv=lambda *_, **__: None))
+sys.modules.setdefault("qdrant_client", types.SimpleNamespace(QdrantClient=object))
+sys.modules.setdefault("sentence_transformers", types.SimpleNamespace(SentenceTransformer=object))
+
+from modules.async_rag_engine import AsyncRAGEngine
+
+
+class _FakeEngine:
+    qdrant_client = object()
+    embedding_model = object()
+
+    def __init__(self):
+        self.fetched: list[list] = []
+
+    def _ensure_pg_engine(self):
+        return object()
+
+    def _vectorize_query(self, query: str):
+        return [float(len(query))]
+
+    def _search_qdrant(self, vector: list):
+        return [int(vector[0])]
+
+    def _get_text_from_postgresql(self, ids: list):
+        self.fetched.append(ids)
+        return [f"text-{point_id}" for point_id in ids]
+
+
+def test_get_contexts_fans_out_queries():
+    engine = _FakeEngine()
+    async_rag = AsyncRAGEngine(engine, encode_workers=1, io_workers=2)
+    async_rag._async_client = False
+
+    async def _run():
+        try:
+            return await async_rag.get_contexts(["a", "bbb"])
+        finally:
+            await async_rag.aclose()
+
+    assert asyncio.run(_run()) == ["text-1", "text-3"]
+    assert sorted(engine.fetched) == [[1], [3]]
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from modules.embedding_cache import EmbeddingCache, make_cache_key
+
+
+def test_key_normalizes_whitespace_and_width():
+    assert make_cache_key("m", "  Hello\n world ") == make_cache_key("m", "Hello world")
+    assert make_cache_key("m", "ＡＢＣ") == make_cache_key("m", "ABC")
+    assert make_cache_key("m", "hello") != make_cache_key("other", "hello")
+
+
+def test_lru_eviction_and_counters():
+    cache = EmbeddingCache(max_entries=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "c") == [3.0]
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+
+
+def test_ttl_expiration():
+    cache = EmbeddingCache(max_entries=4, ttl_seconds=0.01)
+    cache.put("m", "a", [1.0])
+    time.sleep(0.02)
+    assert cache.get("m", "a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_get_or_compute_only_encodes_once():
+    cache = EmbeddingCache()
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return [0.5, 0.25]
+
+    assert cache.get_or_compute("m", "query", compute) == [0.5, 0.25]
+    assert cache.get_or_compute("m", " query ", compute) == [0.5, 0.25]
+    assert calls == ["query"]
+
+
+def test_disk_tier_survives_new_cache_instance(tmp_path: Path):
+    pytest.importorskip("numpy")
+    first = EmbeddingCache(max_entries=1, disk_dir=tmp_path)
+    first.put("m", "persisted", [0.25, 0.5, 0.75])
+    first.flush()
+
+    second = EmbeddingCache(max_entries=1, disk_dir=tmp_path)
+    assert second.get("m", "persisted") == [0.25, 0.5, 0.75]
+    assert second.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_never_serves_an_overwritten_row(tmp_path: Path):
+    pytest.importorskip("numpy")
+    first = EmbeddingCache(max_entries=1, disk_dir=tmp_path, disk_capacity=2)
+    first.put("m", "a", [1.0, 1.0])
+    first.put("m", "b", [2.0, 2.0])
+    first.flush()
+    # Wrap the ring without flushing: "c" takes "a"'s row only in the vector file.
+    first.put("m", "c", [3.0, 3.0])
+    first._disk._matrices[2].flush()
+    first._disk._digests[2].flush()
+
+    second = EmbeddingCache(max_entries=1, disk_dir=tmp_path, disk_capacity=2)
+    assert second.get("m", "a") is None
+    assert second.get("m", "c") == [3.0, 3.0]
+    assert second.get("m", "b") == [2.0, 2.0]
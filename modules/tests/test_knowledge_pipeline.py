@@ -41,17 +41,31 @@ class _FakeEmbedding:
         def tolist(self):
             return list(self)
 
-    def encode(self, text: str):
+    def __init__(self):
+        self.calls: list[int] = []
+
+    def encode(self, text, batch_size: int = 32):
+        if isinstance(text, list):
+            self.calls.append(len(text))
+            return [self._VectorResult([float(i) for i in range(3)]) for _ in text]
+        self.calls.append(1)
         return self._VectorResult([float(i) for i in range(3)])
 
 
 class _FakeQdrant:
     def __init__(self):
         self.points: list[dict] = []
+        self.upsert_calls = 0
+        self.collection_checks = 0
 
     def upsert(self, collection_name: str, wait: bool, points: list[dict]):
+        self.upsert_calls += 1
         self.points.extend(points)
 
+    def get_collection(self, collection_name: str):
+        self.collection_checks += 1
+        return {"name": collection_name}
+
 
 def test_pipeline_cleans_and_splits(tmp_path: Path):
     pipeline = KnowledgePipeline(output_dir=tmp_path)
@@ -110,3 +124,71 @@ def test_rag_engine_streams_to_jsonl(tmp_path: Path):
     assert result["ingested"] == len(rag.qdrant_client.points)
     assert rag.qdrant_client.points
     assert all(point["payload"].get("text") for point in rag.qdrant_client.points)
+
+
+def test_rag_engine_ingests_in_batches(tmp_path: Path):
+    rag = RAGEngine.__new__(RAGEngine)
+    rag.qdrant_client = _FakeQdrant()
+    rag.embedding_model = _FakeEmbedding()
+    rag.qdrant_collection_name = "batched"
+    rag.pipeline = KnowledgePipeline(output_dir=tmp_path, max_workers=2)
+
+    lines = [line for idx in range(10) for line in (f"Paragraph {idx} " + "x" * 180 + "\n", "\n")]
+    result = RAGEngine.ingest_text(rag, lines, source="batch", chunk_size=200, overlap=0, batch_size=4)
+
+    assert result["ingested"] == len(rag.qdrant_client.points) == 10
+    assert rag.qdrant_client.upsert_calls == 3
+    assert sorted(rag.embedding_model.calls) == [2, 4, 4]
+    assert rag.qdrant_client.collection_checks == 1
+
+
+class _FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+
+    def execute(self, sql: str, params=None):
+        self.conn.statements.append(sql)
+        if sql.startswith("EXECUTE"):
+            wanted = set(params[0])
+            self._rows = [(row_id, text) for row_id, text in sorted(self.conn.table.items()) if row_id in wanted]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class _FakePGConnection:
+    def __init__(self, table: dict):
+        self.table = table
+        self.info: dict = {}
+        self.statements: list[str] = []
+
+    def cursor(self):
+        return _FakeCursor(self)
+
+    def close(self):
+        pass
+
+
+class _FakePGEngine:
+    def __init__(self, table: dict):
+        self.connection = _FakePGConnection(table)
+
+    def raw_connection(self):
+        return self.connection
+
+
+def test_postgres_lookup_keeps_qdrant_rank_order():
+    rag = RAGEngine.__new__(RAGEngine)
+    rag.pg_engine = _FakePGEngine({1: "one", 2: "two", 3: "three"})
+
+    assert rag._get_text_from_postgresql([3, 1, "chunk-uuid", 2]) == ["three", "one", "two"]
+    assert rag._get_text_from_postgresql([2]) == ["two"]
+
+    statements = rag.pg_engine.connection.statements
+    assert sum(sql.startswith("PREPARE") for sql in statements) == 1
+    assert sum(sql.startswith("EXECUTE") for sql in statements) == 2
+    assert rag.pg_pool_stats()["checkouts"] >= 2
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import json
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+# Provide lightweight stubs for optional heavy dependencies to keep tests isolated.
+sys.modules.setdefault("dotenv", types.SimpleNamespace(load_dotenv=lambda *_, **__: None))
+if importlib.util.find_spec("requests") is None:
+    class _RequestException(Exception):
+        pass
+
+    sys.modules["requests"] = types.SimpleNamespace(
+        post=None, exceptions=types.SimpleNamespace(RequestException=_RequestException)
+    )
+if importlib.util.find_spec("numpy") is None:
+    sys.modules.setdefault("modules.metacognition", types.SimpleNamespace(log_introspection=lambda *_, **__: None))
+
+from modules import llm
+
+
+class _FakeStreamResponse:
+    def __init__(self, lines):
+        self._lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        return None
+
+    def iter_lines(self, decode_unicode=True):
+        return iter(self._lines)
+
+
+def _sse(content=None, usage=None):
+    chunk = {"choices": [{"delta": {"content": content}}] if content is not None else []}
+    if usage:
+        chunk["usage"] = {"completion_tokens": usage}
+    return "data: " + json.dumps(chunk)
+
+
+def _use_http(monkeypatch, lines, captured):
+    def fake_post(url, **kwargs):
+        captured.update(kwargs)
+        return _FakeStreamResponse(lines)
+
+    monkeypatch.setattr(llm, "LLM_SIMULATION_MODE", False)
+    monkeypatch.setattr(llm.requests, "post", fake_post)
+    monkeypatch.setattr(llm, "log_introspection", lambda *_, **__: None)
+    monkeypatch.delenv("TRANSFORMERS_MODEL", raising=False)
+
+
+def test_stream_text_parses_sse_and_reports_metrics(monkeypatch):
+    captured = {}
+    lines = [_sse("こんにちは。"), "", ": keep-alive", _sse("元気"), _sse("です！"), _sse(usage=7), "data: [DONE]", _sse("ignored")]
+    _use_http(monkeypatch, lines, captured)
+
+    metrics = {}
+    chunks = list(llm.stream_text("hi", "system", metrics_out=metrics))
+
+    assert chunks == ["こんにちは。", "元気", "です！"]
+    assert captured["json"]["stream"] is True
+    assert captured["stream"] is True
+    assert metrics["tokens"] == 7
+    assert metrics["ttft_ms"] is not None
+    assert llm.get_stream_metrics()["last"]["backend"] == "http"
+
+
+def test_astream_text_and_sentence_grouping(monkeypatch):
+    _use_http(monkeypatch, [_sse("First sen"), _sse("tence. Sec"), _sse("ond one!"), _sse(" tail")], {})
+
+    async def collect():
+        return [chunk async for chunk in llm.astream_text("hi", "system")]
+
+    chunks = asyncio.run(collect())
+    assert "".join(chunks) == "First sentence. Second one! tail"
+    assert list(llm.iter_sentences(chunks)) == ["First sentence.", "Second one!", "tail"]
+
+
+def test_astream_text_closes_the_response_when_the_consumer_stops(monkeypatch):
+    state = {"read": 0, "closed": threading.Event()}
+
+    def endless():
+        while True:
+            state["read"] += 1
+            yield _sse(f"chunk{state['read']} ")
+
+    class _EndlessResponse(_FakeStreamResponse):
+        def __exit__(self, *exc):
+            state["closed"].set()
+            return False
+
+    monkeypatch.setattr(llm, "LLM_SIMULATION_MODE", False)
+    monkeypatch.setattr(llm.requests, "post", lambda url, **kwargs: _EndlessResponse(endless()))
+    monkeypatch.setattr(llm, "log_introspection", lambda *_, **__: None)
+    monkeypatch.delenv("TRANSFORMERS_MODEL", raising=False)
+
+    async def take_two():
+        stream = llm.astream_text("hi", "system")
+        first = [await stream.__anext__(), await stream.__anext__()]
+        await stream.aclose()
+        return first
+
+    assert asyncio.run(take_two()) == ["chunk1 ", "chunk2 "]
+    assert state["closed"].wait(2)
+    read = state["read"]
+    time.sleep(0.05)
+    assert state["read"] == read
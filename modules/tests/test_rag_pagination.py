@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import datetime
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+sys.modules.setdefault("dotenv", types.SimpleNamespace(load_dotenv=lambda *_, **__: None))
+sys.modules.setdefault("qdrant_client", types.SimpleNamespace(QdrantClient=object))
+sys.modules.setdefault("sentence_transformers", types.SimpleNamespace(SentenceTransformer=object))
+
+from modules import rag_engine
+from modules.rag_engine import RAGEngine
+
+
+class _Direction:
+    ASC = "asc"
+    DESC = "desc"
+
+
+class _OrderBy:
+    def __init__(self, key, direction, start_from=None):
+        self.key = key
+        self.direction = direction
+        self.start_from = start_from
+
+
+class _Model:
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+
+class _Point:
+    def __init__(self, point_id, payload, score=None):
+        self.id = point_id
+        self.payload = payload
+        self.score = score
+
+
+def _matches(point, scroll_filter):
+    for condition in scroll_filter.must if scroll_filter else []:
+        if hasattr(condition, "is_empty"):
+            if point.payload.get(condition.is_empty.key) is not None:
+                return False
+            continue
+        raw = point.payload.get(condition.key)
+        if raw is None:
+            return False
+        value = datetime.datetime.fromisoformat(raw) if isinstance(raw, str) else raw
+        bounds = condition.range.__dict__
+        if "gt" in bounds and not value > bounds["gt"]:
+            return False
+        if "gte" in bounds and not value >= bounds["gte"]:
+            return False
+        if "lt" in bounds and not value < bounds["lt"]:
+            return False
+        if "lte" in bounds and not value <= bounds["lte"]:
+            return False
+    return True
+
+
+class _OrderedQdrant:
+    """Mimics Qdrant scroll: id order with an inclusive id offset, or payload order (dropping points without the key)."""
+
+    def __init__(self, points):
+        self.points = points
+        self.walk_calls = 0
+        self.scroll_limits = []
+
+    def create_payload_index(self, **_kwargs):
+        pass
+
+    def count(self, collection_name, exact=True):
+        return types.SimpleNamespace(count=len(self.points))
+
+    def scroll(self, collection_name, limit, offset=None, order_by=None, scroll_filter=None,
+               with_payload=True, with_vectors=False):
+        if order_by is None and scroll_filter is None:
+            self.walk_calls += 1
+        else:
+            self.scroll_limits.append(limit)
+        points = [point for point in self.points if _matches(point, scroll_filter)]
+        if order_by is None:
+            points = sorted(points, key=lambda point: point.id)
+            if offset is not None:
+                points = [point for point in points if point.id >= offset]
+            page = points[:limit]
+            return page, (points[limit].id if len(points) > limit else None)
+
+        def value(point):
+            raw = point.payload[order_by.key]
+            return datetime.datetime.fromisoformat(raw) if isinstance(raw, str) else raw
+
+        # Ties come back highest id first, unlike the id order the cursor relies on.
+        ordered = sorted(
+            (point for point in points if point.payload.get(order_by.key) is not None),
+            key=lambda point: (value(point), point.id if order_by.direction == _Direction.DESC else -point.id),
+            reverse=order_by.direction == _Direction.DESC,
+        )
+        return ordered[:limit], None
+
+    def search(self, collection_name, query_vector, limit, offset=0, with_payload=True):
+        ranked = sorted(self.points, key=lambda point: point.score, reverse=True)
+        return ranked[offset: offset + limit]
+
+
+class _Embedding:
+    class _Vector(list):
+        def tolist(self):
+            return list(self)
+
+    def encode(self, text):
+        return self._Vector([1.0, 0.0])
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setitem(
+        sys.modules,
+        "qdrant_client.http.models",
+        types.SimpleNamespace(
+            Direction=_Direction,
+            OrderBy=_OrderBy,
+            Filter=_Model,
+            FieldCondition=_Model,
+            Range=_Model,
+            DatetimeRange=_Model,
+            IsEmptyCondition=_Model,
+            PayloadField=_Model,
+            PayloadSchemaType=types.SimpleNamespace(DATETIME="datetime", FLOAT="float", KEYWORD="keyword"),
+        ),
+    )
+    base = datetime.datetime(2025, 1, 1)
+    points = [
+        _Point(
+            idx,
+            {
+                "text": f"doc {idx}",
+                "source": "a" if idx % 2 else "b",
+                # Pairs share a timestamp so page boundaries fall inside ties.
+                "created_at": (base + datetime.timedelta(minutes=idx // 2)).isoformat(),
+                "rating": idx / 10,
+            },
+            score=1.0 - idx / 100,
+        )
+        for idx in range(9)
+    ]
+    rag = RAGEngine.__new__(RAGEngine)
+    rag.qdrant_client = _OrderedQdrant(points)
+    rag.embedding_model = _Embedding()
+    rag.qdrant_collection_name = f"pagination-{id(rag)}"
+    yield rag
+    _join_aggregate_refresh(rag)
+    rag_engine._aggregate_state.pop(rag.qdrant_collection_name, None)
+
+
+def _join_aggregate_refresh(engine):
+    thread = rag_engine._aggregate_state.get(engine.qdrant_collection_name, {}).get("thread")
+    if thread is not None:
+        thread.join(timeout=5)
+
+
+def test_list_embeddings_cursor_walks_whole_collection_in_order(engine):
+    seen = []
+    cursor = None
+    while True:
+        page = engine.list_embeddings(limit=3, cursor=cursor)
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == len(set(seen)) == 9
+    assert page["total"] == 9
+    _join_aggregate_refresh(engine)
+    assert engine.list_embeddings(limit=3)["source_counts"] == {"b": 5, "a": 4}
+    ordered = [engine.qdrant_client.points[int(point_id)].payload["created_at"] for point_id in seen]
+    assert ordered == sorted(ordered, reverse=True)
+
+
+def test_aggregates_are_refreshed_off_the_request_path(engine):
+    first = engine.list_embeddings(limit=3)
+    # Nothing computed yet: the listing answers with the exact count and empty aggregates.
+    assert first["total"] == 9
+    assert first["source_counts"] == {}
+    _join_aggregate_refresh(engine)
+    walks_after_refresh = engine.qdrant_client.walk_calls
+    assert walks_after_refresh == 1
+
+    page = engine.list_embeddings(limit=3)
+    assert page["source_counts"] == {"b": 5, "a": 4}
+    assert engine.qdrant_client.walk_calls == walks_after_refresh
+
+    engine._invalidate_aggregates()
+    stale = engine.list_embeddings(limit=3)
+    # A write schedules a refresh; the previous result is served until it lands.
+    assert stale["source_counts"] == {"b": 5, "a": 4}
+    _join_aggregate_refresh(engine)
+    assert engine.qdrant_client.walk_calls == walks_after_refresh + 1
+
+
+def _walk(engine, **kwargs):
+    pages, cursor = [], None
+    while True:
+        page = engine.list_embeddings(cursor=cursor, **kwargs)
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            return pages
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_cursor_stays_small_across_large_tie_groups(engine, descending):
+    # Three distinct ratings over 30 points: every page boundary falls inside a tie group.
+    engine.qdrant_client.points = [
+        _Point(idx, {"text": f"doc {idx}", "source": "a", "rating": float(idx % 3),
+                     "created_at": "2025-01-01T00:00:00"})
+        for idx in range(30)
+    ]
+    pages = _walk(engine, limit=4, order_by="score", descending=descending)
+
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert len(ids) == len(set(ids)) == 30
+    ratings = [engine.qdrant_client.points[int(point_id)].payload["rating"] for point_id in ids]
+    assert ratings == sorted(ratings, reverse=descending)
+    assert max(len(page["next_cursor"] or "") for page in pages) < 100
+    assert max(engine.qdrant_client.scroll_limits) <= 4 + 2
+
+
+def test_points_without_the_order_key_are_listed_last(engine):
+    engine.qdrant_client.points[4].payload.pop("created_at")
+    engine.qdrant_client.points[7].payload["created_at"] = None
+    pages = _walk(engine, limit=4)
+
+    ids = [item["id"] for page in pages for item in page["items"]]
+    assert len(ids) == len(set(ids)) == 9
+    assert ids[-2:] == ["4", "7"]
+
+
+def test_search_cursor_pages_without_overlap(monkeypatch, engine):
+    monkeypatch.setattr(rag_engine, "get_embedding_cache", lambda: types.SimpleNamespace(get=lambda *_: None, put=lambda *_: None))
+    first = engine.search("doc", limit=4)
+    second = engine.search("doc", limit=4, cursor=first["next_cursor"])
+    third = engine.search("doc", limit=4, cursor=second["next_cursor"])
+
+    ids = [item["id"] for page in (first, second, third) for item in page["items"]]
+    assert ids == [str(idx) for idx in range(9)]
+    assert third["next_cursor"] is None
+    with pytest.raises(ValueError):
+        engine.search("other", limit=4, cursor=first["next_cursor"])
+
+
+def test_search_cursor_survives_inserts_between_pages(monkeypatch, engine):
+    monkeypatch.setattr(rag_engine, "get_embedding_cache", lambda: types.SimpleNamespace(get=lambda *_: None, put=lambda *_: None))
+    points = engine.qdrant_client.points
+    # Points 3 and 4 tie on the page boundary.
+    points[4].score = points[3].score
+    first = engine.search("doc", limit=4)
+    assert [item["id"] for item in first["items"]] == ["0", "1", "2", "3"]
+
+    # Two inserts above the boundary push already-returned hits back into the next window.
+    points.append(_Point(100, {"text": "new", "source": "a"}, score=2.0))
+    points.append(_Point(101, {"text": "new", "source": "a"}, score=1.5))
+    second = engine.search("doc", limit=4, cursor=first["next_cursor"])
+
+    # Both re-served hits are skipped (one of them at the tied score), but paging goes on.
+    assert [item["id"] for item in second["items"]] == ["4", "5"]
+    assert second["next_cursor"] is not None
+    assert "total" not in second and second["seen"] == 8
+    third = engine.search("doc", limit=4, cursor=second["next_cursor"])
+    assert [item["id"] for item in third["items"]] == ["6", "7", "8"]
+    assert third["next_cursor"] is None
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-import json
 from pathlib import Path
 from typing import Any, Dict, List
 
+from orchestrator.context_history import load_history_entries
+
 
 class TimelineRebuilder:
     def __init__(
@@ -17,10 +18,7 @@ class TimelineRebuilder:
         self.snapshot_dir = Path(snapshot_dir)
 
     def _load_history(self) -> List[Dict[str, Any]]:
-        if not self.history_path.exists():
-            return []
-        data = json.loads(self.history_path.read_text(encoding="utf-8"))
-        return data if isinstance(data, list) else []
+        return load_history_entries(self.history_path)
 
     def rebuild_timeline(self, limit: int = 50, layer: str | None = None) -> Dict[str, Any]:
         history = self._load_history()
@@ -0,0 +1,177 @@
+# path: modules/tts_audio_cache.py
+# version: v1.0
+"""Content-addressed on-disk cache for synthesized speech.
+
+A clip is keyed by the SHA-256 of its text, speaker and Voicevox parameters
+(rounded so float noise does not split entries), so the same line maps to the same
+file across restarts and workers. ``tts_cache_index.json`` records size and last use per
+clip; when the directory grows past ``TTS_CACHE_MAX_BYTES`` the least recently
+used clips are deleted.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from modules.log_manager import log_manager
+
+MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+PARAM_DECIMALS = 3
+INDEX_NAME = "tts_cache_index.json"
+
+_CLIP_PATTERN = re.compile(r"^tts_([0-9a-f]{64})\.wav$")
+
+
+def cache_key(text: str, speaker_id: int, params: Dict[str, float]) -> str:
+    quantized = {name: round(float(value), PARAM_DECIMALS) for name, value in params.items()}
+    payload = json.dumps([text, int(speaker_id), quantized], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Shared per-directory clip cache; see the module docstring."""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, directory) -> "AudioCache":
+        key = os.path.abspath(directory)
+        with cls._instances_lock:
+            cache = cls._instances.get(key)
+            if cache is None:
+                cache = cls(directory)
+                cls._instances[key] = cache
+            return cache
+
+    def __init__(self, directory, max_bytes: int = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / INDEX_NAME
+        self.max_bytes = max_bytes or MAX_BYTES
+        self._entries: "OrderedDict[str, Dict[str, float]]" = OrderedDict()  # least recently used first
+        self._bytes = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._load()
+        atexit.register(self.save_index)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"tts_{key}.wav"
+
+    # --- index -------------------------------------------------------------
+
+    def _load(self):
+        entries = {}
+        if self.index_path.exists():
+            try:
+                entries = json.loads(self.index_path.read_text(encoding="utf-8") or "{}")
+            except (OSError, json.JSONDecodeError) as exc:
+                log_manager.warning(f"[AudioCache] Rebuilding unreadable index {self.index_path}: {exc}")
+                entries = {}
+        # Clips written by a process that exited before saving the index are adopted.
+        for path in self.directory.glob("tts_*.wav"):
+            match = _CLIP_PATTERN.match(path.name)
+            if match and match.group(1) not in entries:
+                stat = path.stat()
+                entries[match.group(1)] = {"size": stat.st_size, "last_used": stat.st_mtime}
+                self._dirty = True
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_used", 0)):
+            if not self.path_for(key).exists():
+                self._dirty = True
+                continue
+            self._entries[key] = entry
+            self._bytes += int(entry.get("size", 0))
+        self._evict()
+
+    def save_index(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._entries)
+            self._dirty = False
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        try:
+            tmp_path.write_text(snapshot, encoding="utf-8")
+            tmp_path.replace(self.index_path)
+        except OSError as exc:
+            log_manager.warning(f"[AudioCache] Failed to save index {self.index_path}: {exc}")
+
+    # --- lookups -----------------------------------------------------------
+
+    def get(self, key: str, record: bool = True) -> Optional[str]:
+        """
+        Returns the clip path for ``key`` and marks it recently used, or None on a
+        miss. ``record=False`` leaves the hit/miss counters alone (for re-checks).
+        """
+        path = self.path_for(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not path.exists():
+                # Deleted behind our back.
+                self._bytes -= int(entry.get("size", 0))
+                del self._entries[key]
+                entry = None
+                self._dirty = True
+            if entry is None:
+                if record:
+                    self._counters["misses"] += 1
+                return None
+            entry["last_used"] = time.time()
+            self._entries.move_to_end(key)
+            if record:
+                self._counters["hits"] += 1
+            self._dirty = True
+        return str(path)
+
+    def put(self, key: str, data: bytes) -> str:
+        """Stores a clip atomically, evicts past the size bound and returns its path."""
+        path = self.path_for(key)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        tmp_path.replace(path)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= int(previous.get("size", 0))
+            self._entries[key] = {"size": len(data), "last_used": time.time()}
+            self._bytes += len(data)
+            self._counters["stores"] += 1
+            self._dirty = True
+            self._evict(keep=key)
+        self.save_index()
+        return str(path)
+
+    def _evict(self, keep: str = None):
+        while self._bytes > self.max_bytes and len(self._entries) > (1 if keep else 0):
+            key, entry = next(iter(self._entries.items()))
+            if key == keep:
+                self._entries.move_to_end(key)
+                continue
+            del self._entries[key]
+            self._bytes -= int(entry.get("size", 0))
+            self._counters["evictions"] += 1
+            self._dirty = True
+            try:
+                self.path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes})
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
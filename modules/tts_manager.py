@@ -1,18 +1,41 @@
-"""Emotion-aware TTS Manager that maps emotion vectors to Voicevox parameters."""
+"""Emotion-aware TTS Manager that maps emotion vectors to Voicevox parameters.
+
+Synthesized clips are kept in a content-addressed cache (modules.tts_audio_cache),
+so a line is only sent to Voicevox the first time it is spoken with given params.
+"""
 
 from __future__ import annotations
 
 import asyncio
-import hashlib
 import json
 import os
-from functools import lru_cache
+import threading
+import wave
 from pathlib import Path
-from typing import Any, Dict, Union
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
 
 import requests
 from playsound import playsound  # type: ignore
 
+from modules.tts_audio_cache import AudioCache, cache_key
+
+PREWARM_CONCURRENCY = int(os.getenv("TTS_PREWARM_CONCURRENCY", "2"))
+VOICEVOX_CONCURRENCY = int(os.getenv("TTS_VOICEVOX_CONCURRENCY", "2"))
+
+# Shared by every TTSManager: bounds concurrent requests to the Voicevox engine,
+# however many look-ahead or pre-warm tasks are queued. Cache hits never wait.
+_voicevox_slots = threading.BoundedSemaphore(max(1, VOICEVOX_CONCURRENCY))
+
+
+def audio_duration(audio_path: str) -> Optional[float]:
+    """Length of a wav file in seconds, or None if it cannot be read."""
+    try:
+        with wave.open(audio_path, "rb") as clip:
+            rate = clip.getframerate()
+            return clip.getnframes() / float(rate) if rate else None
+    except (OSError, EOFError, wave.Error):
+        return None
+
 
 class TTSManager:
     def __init__(self, voicevox_url: str | None = None, output_dir: str | Path = "data/audio_outputs"):
@@ -22,6 +45,9 @@ class TTSManager:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.session = requests.Session()
         self.session.headers.update({"User-Agent": "SSP-TTS/0.2.1"})
+        self.cache = AudioCache.for_dir(self.output_dir)
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
 
     def _adjust_params(self, emotion: Dict[str, Any]) -> Dict[str, float]:
         """Map emotion tags + intensity to Voicevox pitch/speed."""
@@ -58,16 +84,44 @@ class TTSManager:
         return {"emotion_tags": [tag], "intensity": 0.7, "emotion_vector": None}
 
     def synthesize(self, text: str, emotion_dict: Dict[str, Any], speaker_id: int = 1) -> str:
-        """Generate TTS wav path using Voicevox."""
+        """Generate TTS wav path using Voicevox, or return the cached clip."""
         if not text:
             return "Error: Input text is empty."
+        audio_path, fallback, error_code, _ = self._synthesize_cached(text, emotion_dict, speaker_id)
+        return audio_path, fallback, error_code
 
-        params = self._adjust_params(emotion_dict)
-        filename = f"tts_{speaker_id}_{hash(text + json.dumps(params, sort_keys=True))}.wav"
-        output_path = self.output_dir / filename
-        if output_path.exists():
-            return str(output_path), False, None
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
 
+    def _synthesize_cached(self, text: str, emotion_dict: Dict[str, Any], speaker_id: int) -> Tuple[str, bool, str | None, bool]:
+        """Returns (path, fallback_used, error_code, cache_hit)."""
+        params = self._adjust_params(emotion_dict)
+        key = cache_key(text, speaker_id, params)
+        cached_path = self.cache.get(key)
+        if cached_path:
+            return cached_path, False, None, True
+
+        # One synthesis per clip even when playback and a pre-warm ask at once.
+        lock = self._key_lock(key)
+        with lock:
+            cached_path = self.cache.get(key, record=False)
+            if cached_path:
+                return cached_path, False, None, True
+            try:
+                audio, error_code = self._request_voicevox(text, params, speaker_id)
+                if audio is None:
+                    return "", True, error_code, False
+                return self.cache.put(key, audio), False, None, False
+            finally:
+                with self._key_locks_guard:
+                    self._key_locks.pop(key, None)
+
+    def _request_voicevox(self, text: str, params: Dict[str, float], speaker_id: int) -> Tuple[bytes | None, str | None]:
+        with _voicevox_slots:
+            return self._request_voicevox_unbounded(text, params, speaker_id)
+
+    def _request_voicevox_unbounded(self, text: str, params: Dict[str, float], speaker_id: int) -> Tuple[bytes | None, str | None]:
         attempts = 0
         max_attempts = 2
         last_error: str | None = None
@@ -94,9 +148,7 @@ class TTSManager:
                     timeout=30,
                 )
                 synthesis_response.raise_for_status()
-                with open(output_path, "wb") as f:
-                    f.write(synthesis_response.content)
-                return str(output_path), False, None
+                return synthesis_response.content, None
             except requests.Timeout:
                 last_error = "tts_timeout"
                 attempts += 1
@@ -108,12 +160,62 @@ class TTSManager:
             except Exception as exc:  # pragma: no cover
                 last_error = f"tts_unknown_error:{exc}"
                 break
-        return "", True, last_error or "tts_unknown_error"
+        return None, last_error or "tts_unknown_error"
+
+    async def prewarm(self, lines: Iterable[Dict[str, Any]], concurrency: int | None = None) -> Dict[str, Any]:
+        """
+        Synthesizes every line ({"text", "emotion", "speaker_id"}) that is not cached
+        yet, ``concurrency`` at a time, so later ``speak`` calls are all cache hits.
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency or PREWARM_CONCURRENCY))
+        loop = asyncio.get_running_loop()
+        summary = {"lines": 0, "cached": 0, "synthesized": 0, "failed": 0, "errors": []}
+
+        async def warm(line: Dict[str, Any]):
+            text = line.get("text") or ""
+            if not text:
+                return
+            summary["lines"] += 1
+            emotion_dict = self._normalize_emotion_payload(line.get("emotion", "neutral"))
+            async with semaphore:
+                _, fallback, error_code, hit = await loop.run_in_executor(
+                    None, self._synthesize_cached, text, emotion_dict, int(line.get("speaker_id", 1))
+                )
+            if fallback:
+                summary["failed"] += 1
+                summary["errors"].append(error_code)
+            elif hit:
+                summary["cached"] += 1
+            else:
+                summary["synthesized"] += 1
+
+        await asyncio.gather(*(warm(line) for line in lines))
+        return summary
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+    async def synthesize_async(self, text: str, emotion: Union[str, Dict[str, Any]] = "neutral", speaker_id: int = 1):
+        """``synthesize`` on the default executor; Voicevox requests block."""
+        emotion_dict = self._normalize_emotion_payload(emotion)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.synthesize, text, emotion_dict, speaker_id)
+
+    async def play(self, audio_file_path: str, emotion_dict: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        """Play a synthesized clip; returns once playback has finished."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, playsound, audio_file_path)
+            return {"status": "played", "audio_path": audio_file_path, "emotion": emotion_dict}
+        except Exception as exc:  # pragma: no cover - audio playback failure is environment-specific
+            error_message = f"Error playing sound: {exc}"
+            print(error_message)
+            return {"status": "error", "error": error_message, "audio_path": audio_file_path, "emotion": emotion_dict}
 
     async def speak(self, text: str, emotion: Union[str, Dict[str, Any]] = "neutral", speaker_id: int = 1) -> Dict[str, Any]:
         """Synthesize + play audio, returning playback metadata."""
         emotion_dict = self._normalize_emotion_payload(emotion)
-        audio_file_path, fallback, error_code = self.synthesize(text, emotion_dict, speaker_id)
+        audio_file_path, fallback, error_code = await self.synthesize_async(text, emotion_dict, speaker_id)
         if fallback or not audio_file_path:
             message = f"TTS Error: {error_code}"
             print(message)
@@ -125,11 +227,4 @@ class TTSManager:
                 "fallback_used": True,
             }
 
-        loop = asyncio.get_running_loop()
-        try:
-            await loop.run_in_executor(None, playsound, audio_file_path)
-            return {"status": "played", "audio_path": audio_file_path, "emotion": emotion_dict}
-        except Exception as exc:  # pragma: no cover - audio playback failure is environment-specific
-            error_message = f"Error playing sound: {exc}"
-            print(error_message)
-            return {"status": "error", "error": error_message, "audio_path": audio_file_path, "emotion": emotion_dict}
+        return await self.play(audio_file_path, emotion_dict)
@@ -1,43 +1,203 @@
 # path: orchestrator/context_history.py
-# version: v2.4
+# version: v2.6
 
 import datetime
 import os
 import json
+import threading
+import time
+from pathlib import Path
+from modules.event_log import read_segment
 from modules.log_manager import log_manager
 
+SEGMENT_MAX_BYTES = int(os.getenv("CONTEXT_HISTORY_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+COMPACT_AFTER_SEGMENTS = int(os.getenv("CONTEXT_HISTORY_COMPACT_SEGMENTS", "8"))
+FSYNC_POLICY = os.getenv("CONTEXT_HISTORY_FSYNC", "interval")  # always | interval | never
+FSYNC_INTERVAL = float(os.getenv("CONTEXT_HISTORY_FSYNC_INTERVAL", "1.0"))
+
+
+def _segment_dir(history_path) -> Path:
+    path = Path(history_path)
+    return path.with_name(f"{path.stem}.segments")
+
+
+def load_history_entries(history_path, limit: int = None) -> list:
+    """Reads the compacted JSON array plus every appended JSONL segment, oldest first.
+
+    Readers of logs/context_history.json should use this instead of json.load so
+    they also see entries that have not been compacted yet. With ``limit`` only the
+    newest segments are read when they already hold enough entries.
+    """
+    path = Path(history_path)
+    segment_dir = _segment_dir(path)
+    tail = []
+    if segment_dir.is_dir():
+        for segment in sorted(segment_dir.glob("segment_*.jsonl"), reverse=True):
+            tail = read_segment(segment, limit - len(tail) if limit else None) + tail
+            if limit and len(tail) >= limit:
+                return tail[-limit:]
+
+    entries = []
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, list):
+                entries = data
+        except (json.JSONDecodeError, IOError) as e:
+            log_manager.error(f"[ContextHistory] Failed to load compacted history from {path}: {e}")
+    entries.extend(tail)
+    return entries[-limit:] if limit else entries
+
+
+class _SegmentJournal:
+    """Append-only JSONL segments next to the compacted history file, shared per path."""
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, history_path: str) -> "_SegmentJournal":
+        key = os.path.abspath(history_path)
+        with cls._instances_lock:
+            journal = cls._instances.get(key)
+            if journal is None:
+                journal = cls(history_path)
+                cls._instances[key] = journal
+            return journal
+
+    def __init__(self, history_path: str):
+        self.history_path = Path(history_path)
+        self.segment_dir = _segment_dir(history_path)
+        self.fsync_policy = FSYNC_POLICY
+        self.fsync_interval = FSYNC_INTERVAL
+        self._lock = threading.Lock()
+        self._fd = None
+        self._active = None
+        self._active_size = 0
+        self._last_fsync = 0.0
+
+    def _segments(self) -> list:
+        if not self.segment_dir.is_dir():
+            return []
+        return sorted(self.segment_dir.glob("segment_*.jsonl"))
+
+    def _open_active(self):
+        self.segment_dir.mkdir(parents=True, exist_ok=True)
+        segments = self._segments()
+        if segments and segments[-1].stat().st_size < SEGMENT_MAX_BYTES:
+            self._active = segments[-1]
+        else:
+            next_index = int(segments[-1].stem.split("_")[1]) + 1 if segments else 1
+            self._active = self.segment_dir / f"segment_{next_index:06d}.jsonl"
+        self._fd = os.open(self._active, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._active_size = os.fstat(self._fd).st_size
+
+    def _close_active(self):
+        if self._fd is not None:
+            if self.fsync_policy != "never":
+                os.fsync(self._fd)
+            os.close(self._fd)
+        self._fd = None
+        self._active = None
+
+    def append(self, entry: dict):
+        line = (json.dumps(entry, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                self._open_active()
+            # One write per entry on an O_APPEND descriptor keeps lines whole.
+            os.write(self._fd, line)
+            self._active_size += len(line)
+            now = time.monotonic()
+            if self.fsync_policy == "always" or (
+                self.fsync_policy == "interval" and now - self._last_fsync >= self.fsync_interval
+            ):
+                os.fsync(self._fd)
+                self._last_fsync = now
+            if self._active_size >= SEGMENT_MAX_BYTES:
+                self._close_active()
+                if len(self._segments()) >= COMPACT_AFTER_SEGMENTS:
+                    self._compact_locked()
+
+    def _compact_locked(self):
+        """Folds sealed segments into the compacted JSON array and removes them."""
+        self._close_active()
+        segments = self._segments()
+        if not segments:
+            return
+        entries = load_history_entries(self.history_path)
+        tmp_path = self.history_path.with_suffix(self.history_path.suffix + ".tmp")
+        self.history_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.history_path)
+        for segment in segments:
+            segment.unlink(missing_ok=True)
+        log_manager.info(
+            f"[ContextHistory] Compacted {len(segments)} segments into {self.history_path} ({len(entries)} entries)."
+        )
+
+    def compact(self):
+        with self._lock:
+            self._compact_locked()
+
+    def flush(self):
+        with self._lock:
+            if self._fd is not None and self.fsync_policy != "never":
+                os.fsync(self._fd)
+                self._last_fsync = time.monotonic()
+
+
 class ContextHistory:
-    """Records the history of changes to the context layers, with persistence."""
+    """Records the history of changes to the context layers, with persistence.
+
+    Changes are appended to JSONL segments (see _SegmentJournal) rather than
+    rewriting the whole history file, and an in-memory (layer, key) index serves
+    get_timeline.
+    """
     def __init__(self, history_path: str = None):
         self.history_path = history_path
         self._history = []
+        self._by_layer = {}
+        self._by_key = {}
+        self._by_layer_key = {}
+        self._journal = _SegmentJournal.for_path(history_path) if history_path else None
         if self.history_path:
             self._load_history()
 
+    def _index(self, entry: dict):
+        position = len(self._history)
+        self._history.append(entry)
+        layer, key = entry.get("layer"), entry.get("key")
+        self._by_layer.setdefault(layer, []).append(position)
+        self._by_key.setdefault(key, []).append(position)
+        self._by_layer_key.setdefault((layer, key), []).append(position)
+
     def _load_history(self):
-        """Loads history from the specified file if it exists."""
+        """Loads history (compacted file plus appended segments) if it exists."""
         try:
-            if os.path.exists(self.history_path):
-                with open(self.history_path, 'r', encoding='utf-8') as f:
-                    self._history = json.load(f)
+            for entry in load_history_entries(self.history_path):
+                self._index(entry)
+            if self._history:
                 log_manager.info(f"[ContextHistory] History loaded from {self.history_path}")
-        except (json.JSONDecodeError, IOError) as e:
+        except IOError as e:
             log_manager.error(f"[ContextHistory] Failed to load history from {self.history_path}: {e}")
             self._history = [] # Start fresh on error
+            self._by_layer, self._by_key, self._by_layer_key = {}, {}, {}
 
-    def _save_history(self):
-        """Saves the current history to the specified file."""
-        if not self.history_path:
+    def _append(self, entry: dict):
+        self._index(entry)
+        if not self._journal:
             return
         try:
-            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
-            with open(self.history_path, 'w', encoding='utf-8') as f:
-                json.dump(self._history, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            log_manager.error(f"[ContextHistory] Failed to save history to {self.history_path}: {e}")
+            self._journal.append(entry)
+        except OSError as e:
+            log_manager.error(f"[ContextHistory] Failed to append history to {self.history_path}: {e}")
 
     def record_change(self, layer: str, key: str, old_value: any, new_value: any, reason: str):
-        """Records a single change event and persists the history."""
+        """Records a single change event and persists it."""
         # For simplicity, we'll avoid storing very large values in the history log itself
         if isinstance(old_value, str) and len(old_value) > 200:
             old_value = old_value[:200] + "... (truncated)"
@@ -52,11 +212,10 @@ class ContextHistory:
             "new_value": new_value,
             "reason": reason
         }
-        self._history.append(entry)
-        self._save_history()
+        self._append(entry)
 
     def record_event(self, event_type: str, data: dict):
-        """Records a generic event and persists the history."""
+        """Records a generic event and persists it."""
         entry = {
             "timestamp": datetime.datetime.now().isoformat(),
             "layer": "system_event",
@@ -65,21 +224,28 @@ class ContextHistory:
             "new_value": data,
             "reason": f"System event of type '{event_type}' occurred."
         }
-        self._history.append(entry)
-        self._save_history()
+        self._append(entry)
 
     def get_timeline(self, layer: str = None, key: str = None) -> list:
         """Returns a filtered timeline of changes."""
         if not layer and not key:
             return self._history
-        
-        filtered_history = self._history
-        if layer:
-            filtered_history = [e for e in filtered_history if e["layer"] == layer]
-        if key:
-            filtered_history = [e for e in filtered_history if e["key"] == key]
-            
-        return filtered_history
+        if layer and key:
+            positions = self._by_layer_key.get((layer, key), [])
+        elif layer:
+            positions = self._by_layer.get(layer, [])
+        else:
+            positions = self._by_key.get(key, [])
+        return [self._history[position] for position in positions]
 
     def get_full_history(self) -> list:
         return self._history
+
+    def compact(self):
+        """Folds appended segments into the compacted history file."""
+        if self._journal:
+            self._journal.compact()
+
+    def flush(self):
+        if self._journal:
+            self._journal.flush()
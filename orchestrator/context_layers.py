@@ -1,11 +1,15 @@
 # path: orchestrator/context_layers.py
-# version: v2.4
+# version: v2.6
 
 class BaseContextLayer:
     def __init__(self, history_recorder, layer_name):
         self._data = {}
         self.history_recorder = history_recorder
         self.layer_name = layer_name
+        # Snapshot bookkeeping (see orchestrator/context_snapshot_store.py): the key→hash
+        # manifest this layer last matched, and the keys set since then.
+        self._manifest = None
+        self._dirty = set()
 
     def get(self, key: str, default=None):
         return self._data.get(key, default)
@@ -13,12 +17,23 @@ class BaseContextLayer:
     def set(self, key: str, value: any, reason: str):
         old_value = self._data.get(key)
         self._data[key] = value
+        self._dirty.add(key)
         if self.history_recorder:
             self.history_recorder.record_change(self.layer_name, key, old_value, value, reason)
 
+    def replace(self, data: dict):
+        """Replaces the whole layer without recording history (used by load and rollback)."""
+        self._data = data
+        self._manifest = None
+        self._dirty = set()
+
     def get_full_layer(self) -> dict:
         return self._data
 
+    def view(self) -> dict:
+        """Everything readable through this layer (same as get_full_layer for plain layers)."""
+        return self._data
+
 class LongTermContext(BaseContextLayer):
     def __init__(self, history_recorder):
         super().__init__(history_recorder, 'long_term')
@@ -29,4 +44,42 @@ class MidTermContext(BaseContextLayer):
 
 class ShortTermContext(BaseContextLayer):
     def __init__(self, history_recorder):
-        super().__init__(history_recorder, 'short_term')
\ No newline at end of file
+        super().__init__(history_recorder, 'short_term')
+
+
+# mid_term keys that hold the results of one generate/evaluate cycle.
+CYCLE_KEYS = frozenset({
+    "generated_output", "evaluation_score", "evaluation_feedback", "final_answer", "session_id", "chat_history",
+})
+
+
+class CycleMidTermContext(MidTermContext):
+    """mid_term as seen inside ContextManager.request_scope().
+
+    CYCLE_KEYS live in this request's own data; every other key reads and writes the
+    shared mid_term layer. Snapshots and rollbacks (which work on get_full_layer)
+    therefore only cover this request's cycle keys, never another request's.
+    """
+
+    def __init__(self, shared: MidTermContext, history_recorder):
+        super().__init__(history_recorder)
+        self.shared = shared
+
+    def get(self, key: str, default=None):
+        if key in CYCLE_KEYS:
+            return super().get(key, default)
+        return self.shared.get(key, default)
+
+    def set(self, key: str, value: any, reason: str):
+        if key in CYCLE_KEYS:
+            super().set(key, value, reason)
+        else:
+            self.shared.set(key, value, reason)
+
+    def replace(self, data: dict):
+        super().replace({key: value for key, value in data.items() if key in CYCLE_KEYS})
+
+    def view(self) -> dict:
+        merged = {key: value for key, value in self.shared.get_full_layer().items() if key not in CYCLE_KEYS}
+        merged.update(self._data)
+        return merged
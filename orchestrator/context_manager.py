@@ -1,5 +1,5 @@
 # path: orchestrator/context_manager.py
-# version: v2.7
+# version: v2.10
 
 import sys
 import os
@@ -8,11 +8,13 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import json
-import datetime
 import argparse
+import contextvars
+from contextlib import contextmanager
 from typing import Any
-from orchestrator.context_layers import LongTermContext, MidTermContext, ShortTermContext
+from orchestrator.context_layers import CycleMidTermContext, LongTermContext, MidTermContext, ShortTermContext
 from orchestrator.context_history import ContextHistory
+from orchestrator.context_snapshot_store import ContextSnapshotStore
 from modules.log_manager import log_manager
 
 CONTEXT_FILE = "data/test_context.json"
@@ -21,22 +23,47 @@ class ContextManager:
     """Manages the state of the AI through a layered, historical context."""
     def __init__(self, history_path: str = None, context_filepath: str = None):
         self.history = ContextHistory(history_path=history_path)
-        self._layers = {
+        self._shared_layers = {
             "long_term": LongTermContext(self.history),
             "mid_term": MidTermContext(self.history),
             "short_term": ShortTermContext(self.history),
         }
+        # Layers seen by the current request; see request_scope().
+        self._scoped_layers = contextvars.ContextVar(f"context_layers_{id(self)}", default=None)
         self.context_filepath = context_filepath
         if self.context_filepath:
             self.load_from_file(self.context_filepath)
 
+    @property
+    def _layers(self) -> dict:
+        return self._scoped_layers.get() or self._shared_layers
+
+    @contextmanager
+    def request_scope(self):
+        """Gives the current request (thread or task) its own short-term layer and its
+        own copy of the per-cycle mid-term keys (see context_layers.CYCLE_KEYS).
+
+        The long-term layer and the remaining mid-term keys stay shared, so one
+        long-lived ContextManager can serve concurrent cycles without their prompts,
+        answers, scores or chat history mixing, and a rollback inside one request
+        cannot overwrite another request's cycle state.
+        """
+        layers = dict(self._shared_layers)
+        layers["mid_term"] = CycleMidTermContext(self._shared_layers["mid_term"], self.history)
+        layers["short_term"] = ShortTermContext(self.history)
+        token = self._scoped_layers.set(layers)
+        try:
+            yield self
+        finally:
+            self._scoped_layers.reset(token)
+
     def get(self, key: str, default: Any = None):
         layer_name, _, item_key = key.partition('.')
         if layer_name in self._layers:
             return self._layers[layer_name].get(item_key, default)
         # Allow getting a full layer
         if layer_name in self._layers and not item_key:
-            return self._layers[layer_name].get_full_layer()
+            return self._layers[layer_name].view()
         log_manager.warning(f"[ContextManager] Invalid key or layer name: {key}")
         return default
 
@@ -49,14 +76,14 @@ class ContextManager:
 
     def get_full_context(self) -> dict:
         return {
-            layer_name: layer.get_full_layer()
+            layer_name: layer.view()
             for layer_name, layer in self._layers.items()
         }
 
     def get_layer(self, layer_name: str) -> dict:
         """Gets the full data dictionary for a specific layer."""
         if layer_name in self._layers:
-            return self._layers[layer_name].get_full_layer()
+            return self._layers[layer_name].view()
         return {}
 
     def load_from_file(self, filepath: str):
@@ -70,9 +97,8 @@ class ContextManager:
                 log_manager.error("[ContextManager] Snapshot file is missing required layers.")
                 return False
 
-            self._layers["long_term"]._data = snapshot_data.get("long_term", {})
-            self._layers["mid_term"]._data = snapshot_data.get("mid_term", {})
-            self._layers["short_term"]._data = snapshot_data.get("short_term", {})
+            for layer_name, layer in self._layers.items():
+                layer.replace(snapshot_data.get(layer_name, {}))
             self.context_filepath = filepath
             log_manager.info("[ContextManager] Context loaded successfully.")
             return True
@@ -102,34 +128,45 @@ class ContextManager:
         """Exports the full context in a format suitable for graph construction."""
         return self.get_full_context()
 
-    def snapshot_to_file(self, snapshot_dir: str = "logs/context_snapshots") -> str:
-        """Saves a snapshot of the current context state to a uniquely named file.
+    def snapshot_to_file(self, snapshot_dir: str = "logs/context_snapshots", label: str = None) -> str:
+        """Saves a copy-on-write snapshot of the current context state.
+
+        Only the keys that changed since the previous snapshot in ``snapshot_dir`` are
+        written (see ContextSnapshotStore); an unchanged context returns the existing
+        snapshot, since ids are derived from the content.
 
         Args:
-            snapshot_dir: The directory where the snapshot file will be saved.
+            snapshot_dir: The directory where the snapshot is stored.
+            label: Optional note recorded with the snapshot (e.g. "pre_evolution_cycle").
 
         Returns:
-            The absolute path to the saved snapshot file.
+            The path of the snapshot file, which rollback_to_snapshot accepts.
         """
-        os.makedirs(snapshot_dir, exist_ok=True)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        snapshot_filename = f"context_snapshot_{timestamp}.json"
-        snapshot_filepath = os.path.join(snapshot_dir, snapshot_filename)
-
-        full_context = self.get_full_context()
-        with open(snapshot_filepath, "w", encoding="utf-8") as f:
-            json.dump(full_context, f, indent=2, ensure_ascii=False)
-        
+        store = ContextSnapshotStore.for_dir(snapshot_dir)
+        snapshot_filepath = store.snapshot(self._layers, label=label)
         log_manager.info(f"[ContextManager] Context snapshot saved to: {snapshot_filepath}")
         return snapshot_filepath
 
     def rollback_to_snapshot(self, snapshot_filepath: str):
         """Rolls back the context to a previously saved snapshot.
 
+        Delta snapshots restore only the keys that differ from the snapshot. Full JSON
+        snapshots written by earlier versions are still accepted.
+
         Args:
-            snapshot_filepath: The path to the snapshot file to restore from.
+            snapshot_filepath: The snapshot path returned by snapshot_to_file.
         """
         log_manager.info(f"[ContextManager] Rolling back context to snapshot: {snapshot_filepath}")
+        store = ContextSnapshotStore.for_dir(os.path.dirname(snapshot_filepath) or ".")
+        if store.is_delta_snapshot(snapshot_filepath):
+            try:
+                restored = store.restore(self._layers, snapshot_filepath)
+                log_manager.info(f"[ContextManager] Context successfully rolled back ({restored} keys restored).")
+                return True
+            except (OSError, ValueError, KeyError) as e:
+                log_manager.error(f"[ContextManager] Failed to rollback context from {snapshot_filepath}: {e}")
+                return False
+
         if not os.path.exists(snapshot_filepath):
             log_manager.error(f"[ContextManager] Snapshot file not found: {snapshot_filepath}")
             return False
@@ -142,9 +179,8 @@ class ContextManager:
                 log_manager.error("[ContextManager] Snapshot file is missing required layers for rollback.")
                 return False
 
-            self._layers["long_term"]._data = snapshot_data.get("long_term", {})
-            self._layers["mid_term"]._data = snapshot_data.get("mid_term", {})
-            self._layers["short_term"]._data = snapshot_data.get("short_term", {})
+            for layer_name, layer in self._layers.items():
+                layer.replace(snapshot_data.get(layer_name, {}))
             log_manager.info("[ContextManager] Context successfully rolled back.")
             return True
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
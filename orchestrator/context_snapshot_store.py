@@ -0,0 +1,329 @@
+# path: orchestrator/context_snapshot_store.py
+# version: v1.1
+
+import datetime
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from modules.log_manager import log_manager
+
+RETENTION = int(os.getenv("CONTEXT_SNAPSHOT_RETENTION", "50"))
+CHECKPOINT_EVERY = int(os.getenv("CONTEXT_SNAPSHOT_CHECKPOINT_EVERY", "32"))
+
+
+def _serialize(value) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def snapshot_id_from_ref(snapshot_ref: str) -> str:
+    """Accepts either a snapshot id or the path returned by ContextManager.snapshot_to_file."""
+    return Path(str(snapshot_ref)).stem
+
+
+class ContextSnapshotStore:
+    """Copy-on-write snapshots of the context layers, shared per snapshot directory.
+
+    Every layer value is stored once under the sha256 of its canonical JSON in
+    ``objects/``. A snapshot is a per-layer key→hash manifest; unchanged layers reuse
+    the previous manifest object, and only the keys that differ from the parent
+    snapshot are written to ``<snapshot_id>.json``. The snapshot id is derived from
+    the manifest contents, so an unchanged context maps to the existing snapshot.
+    Every CHECKPOINT_EVERY snapshots (and whenever GC drops a parent) the full
+    manifest is written so the chain stays readable from disk.
+
+    Snapshot files left by earlier runs are indexed by mtime at startup and count
+    toward the retention window; their manifests are read from disk when needed.
+    GC sweeps every object no retained manifest references.
+    """
+
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, snapshot_dir: str) -> "ContextSnapshotStore":
+        key = os.path.abspath(snapshot_dir)
+        with cls._instances_lock:
+            store = cls._instances.get(key)
+            if store is None:
+                store = cls(snapshot_dir)
+                cls._instances[key] = store
+            return store
+
+    def __init__(self, snapshot_dir: str, retention: int = None, checkpoint_every: int = None):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.objects_dir = self.snapshot_dir / "objects"
+        self.retention = max(1, retention or RETENTION)
+        self.checkpoint_every = max(1, checkpoint_every or CHECKPOINT_EVERY)
+        self._lock = threading.RLock()
+        # snapshot id -> {layer: manifest}, oldest first; None until read for earlier runs' snapshots
+        self._snapshots = OrderedDict()
+        self._parents = {}
+        self._blobs = {}  # hash -> canonical JSON text
+        self._head = None
+        self._since_checkpoint = 0
+        self._index_existing()
+
+    def _index_existing(self):
+        """Adds the snapshot files of earlier runs to the retention window, oldest first."""
+        found = []
+        for path in self.snapshot_dir.glob("ctx_*.json"):
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+                found.append((path.stat().st_mtime_ns, path.stem, record.get("parent")))
+            except (OSError, json.JSONDecodeError) as e:
+                log_manager.warning(f"[ContextSnapshotStore] Skipping unreadable snapshot {path}: {e}")
+        for _, snapshot_id, parent_id in sorted(found):
+            self._snapshots[snapshot_id] = None
+            self._parents[snapshot_id] = parent_id
+
+    # --- paths -------------------------------------------------------------
+
+    def snapshot_path(self, snapshot_id: str) -> str:
+        return os.path.join(str(self.snapshot_dir), f"{snapshot_id}.json")
+
+    def _object_path(self, value_hash: str) -> Path:
+        return self.objects_dir / f"{value_hash}.json"
+
+    # --- manifests ---------------------------------------------------------
+
+    def _hash_value(self, value) -> str:
+        text = _serialize(value)
+        value_hash = _hash_text(text)
+        self._blobs.setdefault(value_hash, text)
+        return value_hash
+
+    def _layer_manifest(self, layer) -> dict:
+        """Brings layer._manifest up to date, re-hashing only the keys set since it was built."""
+        data = layer.get_full_layer()
+        if layer._manifest is not None and not layer._dirty:
+            return layer._manifest
+        if layer._manifest is None:
+            manifest = {key: self._hash_value(value) for key, value in data.items()}
+        else:
+            manifest = dict(layer._manifest)
+            for key in layer._dirty:
+                if key in data:
+                    manifest[key] = self._hash_value(data[key])
+                else:
+                    manifest.pop(key, None)
+        layer._manifest = manifest
+        layer._dirty = set()
+        return manifest
+
+    @staticmethod
+    def _snapshot_id(manifests: dict) -> str:
+        digest = hashlib.sha256()
+        for layer_name in sorted(manifests):
+            digest.update(layer_name.encode("utf-8"))
+            for key in sorted(manifests[layer_name]):
+                digest.update(b"\0" + key.encode("utf-8") + b"\0" + manifests[layer_name][key].encode("ascii"))
+        return f"ctx_{digest.hexdigest()[:24]}"
+
+    @staticmethod
+    def _delta(parent: dict, manifest: dict) -> dict:
+        if parent is manifest:
+            return {}
+        if parent is None:
+            return {"set": dict(manifest), "deleted": []}
+        changed = {key: value_hash for key, value_hash in manifest.items() if parent.get(key) != value_hash}
+        deleted = [key for key in parent if key not in manifest]
+        if not changed and not deleted:
+            return {}
+        return {"set": changed, "deleted": deleted}
+
+    # --- writes ------------------------------------------------------------
+
+    def _write_object(self, value_hash: str, data: dict, key: str):
+        path = self._object_path(value_hash)
+        if path.exists():
+            return
+        text = self._blobs.get(value_hash)
+        if text is None:
+            text = _serialize(data[key])
+            self._blobs[value_hash] = text
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _write_snapshot_file(self, snapshot_id: str, parent_id, manifests: dict, label: str = None, checkpoint: bool = False):
+        parent = self._snapshots.get(parent_id) if parent_id and not checkpoint else None
+        layers = {}
+        for layer_name, manifest in manifests.items():
+            delta = self._delta(parent.get(layer_name) if parent else None, manifest)
+            if delta:
+                layers[layer_name] = delta
+        record = {
+            "id": snapshot_id,
+            "parent": None if checkpoint or parent is None else parent_id,
+            "checkpoint": checkpoint or parent is None,
+            "created_at": datetime.datetime.now().isoformat(),
+            "label": label,
+            "layers": layers,
+        }
+        path = Path(self.snapshot_path(snapshot_id))
+        tmp_path = path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+        return layers
+
+    def snapshot(self, layers: dict, label: str = None) -> str:
+        """Records the current state of ``layers`` and returns the snapshot file path."""
+        with self._lock:
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            manifests = {name: self._layer_manifest(layer) for name, layer in layers.items()}
+            snapshot_id = self._snapshot_id(manifests)
+            if snapshot_id in self._snapshots:
+                # Same content as a retained snapshot: nothing to write, just refresh its recency.
+                self._snapshots.move_to_end(snapshot_id)
+                self._head = snapshot_id
+                return self.snapshot_path(snapshot_id)
+
+            checkpoint = self._since_checkpoint + 1 >= self.checkpoint_every
+            parent = self._snapshots.get(self._head) if self._head and not checkpoint else None
+            for layer_name, manifest in manifests.items():
+                delta = self._delta(parent.get(layer_name) if parent else None, manifest)
+                data = layers[layer_name].get_full_layer()
+                for key, value_hash in delta.get("set", {}).items():
+                    self._write_object(value_hash, data, key)
+            written = self._write_snapshot_file(snapshot_id, self._head, manifests, label=label, checkpoint=checkpoint)
+            self._since_checkpoint = 0 if checkpoint or parent is None else self._since_checkpoint + 1
+
+            self._snapshots[snapshot_id] = manifests
+            self._parents[snapshot_id] = self._head if parent is not None else None
+            self._head = snapshot_id
+            changed = sum(len(delta.get("set", {})) + len(delta.get("deleted", [])) for delta in written.values())
+            log_manager.debug(f"[ContextSnapshotStore] Snapshot {snapshot_id} written ({changed} changed keys).")
+            if len(self._snapshots) > self.retention + max(1, self.retention // 4):
+                self._collect_garbage()
+            return self.snapshot_path(snapshot_id)
+
+    # --- reads -------------------------------------------------------------
+
+    def _load_blob(self, value_hash: str):
+        text = self._blobs.get(value_hash)
+        if text is None:
+            text = self._object_path(value_hash).read_text(encoding="utf-8")
+            self._blobs[value_hash] = text
+        # Each restore decodes a fresh copy so live mutations never reach the snapshot.
+        return json.loads(text)
+
+    def _load_manifests_from_disk(self, snapshot_id: str) -> dict:
+        chain = []
+        current = snapshot_id
+        while current:
+            path = Path(self.snapshot_path(current))
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if "layers" not in record or "id" not in record:
+                raise ValueError(f"{path} is not a delta snapshot")
+            chain.append(record)
+            if record.get("checkpoint"):
+                break
+            current = record.get("parent")
+        manifests = {}
+        for record in reversed(chain):
+            for layer_name, delta in record["layers"].items():
+                manifest = manifests.setdefault(layer_name, {})
+                manifest.update(delta.get("set", {}))
+                for key in delta.get("deleted", []):
+                    manifest.pop(key, None)
+        return manifests
+
+    def get_manifests(self, snapshot_ref: str) -> dict:
+        snapshot_id = snapshot_id_from_ref(snapshot_ref)
+        with self._lock:
+            manifests = self._snapshots.get(snapshot_id)
+            if manifests is None:
+                manifests = self._load_manifests_from_disk(snapshot_id)
+                if snapshot_id in self._snapshots:
+                    self._snapshots[snapshot_id] = manifests
+            return manifests
+
+    def is_delta_snapshot(self, snapshot_ref: str) -> bool:
+        snapshot_id = snapshot_id_from_ref(snapshot_ref)
+        return snapshot_id in self._snapshots or (
+            snapshot_id.startswith("ctx_") and os.path.exists(self.snapshot_path(snapshot_id))
+        )
+
+    def restore(self, layers: dict, snapshot_ref: str) -> int:
+        """Rolls ``layers`` back to a snapshot, touching only the keys that differ. Returns that count."""
+        with self._lock:
+            target = self.get_manifests(snapshot_ref)
+            restored = 0
+            for layer_name, layer in layers.items():
+                manifest = target.get(layer_name, {})
+                data = layer.get_full_layer()
+                if layer._manifest is manifest:
+                    changed = set(layer._dirty)
+                elif layer._manifest is not None:
+                    current = layer._manifest
+                    changed = set(layer._dirty)
+                    changed.update(key for key, value_hash in manifest.items() if current.get(key) != value_hash)
+                    changed.update(key for key in current if key not in manifest)
+                else:
+                    changed = set(data) | set(manifest)
+                for key in changed:
+                    if key in manifest:
+                        data[key] = self._load_blob(manifest[key])
+                    else:
+                        data.pop(key, None)
+                layer._manifest = manifest
+                layer._dirty = set()
+                restored += len(changed)
+            snapshot_id = snapshot_id_from_ref(snapshot_ref)
+            if snapshot_id in self._snapshots:
+                self._head = snapshot_id
+            return restored
+
+    # --- retention ---------------------------------------------------------
+
+    def _collect_garbage(self):
+        """Drops snapshots beyond the retention window, then sweeps objects no retained snapshot references."""
+        dropped = []
+        while len(self._snapshots) > self.retention:
+            snapshot_id, _ = self._snapshots.popitem(last=False)
+            dropped.append(snapshot_id)
+        dropped_set = set(dropped)
+        # Read every retained manifest while the dropped files are still there to resolve chains.
+        for snapshot_id in self._snapshots:
+            self.get_manifests(snapshot_id)
+        for snapshot_id, manifests in self._snapshots.items():
+            if self._parents.get(snapshot_id) in dropped_set:
+                self._write_snapshot_file(snapshot_id, None, manifests, checkpoint=True)
+                self._parents[snapshot_id] = None
+        for snapshot_id in dropped:
+            self._parents.pop(snapshot_id, None)
+            try:
+                os.remove(self.snapshot_path(snapshot_id))
+            except FileNotFoundError:
+                pass
+
+        live = set()
+        for manifests in self._snapshots.values():
+            for manifest in manifests.values():
+                live.update(manifest.values())
+        for value_hash in [value_hash for value_hash in self._blobs if value_hash not in live]:
+            del self._blobs[value_hash]
+        swept = 0
+        for path in self.objects_dir.glob("*.json"):
+            if path.stem not in live:
+                path.unlink(missing_ok=True)
+                swept += 1
+        log_manager.info(
+            f"[ContextSnapshotStore] GC removed {len(dropped)} snapshots and {swept} objects from {self.snapshot_dir}."
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "snapshots": len(self._snapshots),
+                "objects": len(self._blobs),
+                "head": self._head,
+                "retention": self.retention,
+            }
@@ -24,6 +24,7 @@ class ContractRegistry:
         self.meta_contracts: Dict[str, Dict] = {}
         self.meta_links_graph: Dict[str, List[str]] = {}
         self.meta_contracts_log_dir = os.path.join(os.getcwd(), 'logs', 'meta_contracts')
+        self.contract_loader = ContractLoader(contract_dir)
         self.load_contracts()
         self._load_meta_links_graph()
 
@@ -47,6 +48,13 @@ class ContractRegistry:
         log_manager.info(f"[ContractRegistry] Loaded {len(self.contracts)} contracts (meta contracts: {len(self.meta_contracts)}).")
         return self.contracts
 
+    def refresh_if_changed(self) -> bool:
+        """Reloads contracts only when a contract file's mtime changed since the last load."""
+        if not self.contract_loader.refresh_if_changed():
+            return False
+        self.load_contracts()
+        return True
+
     def get_contract(self, name: str) -> Dict | None:
         return self.contracts.get(name)
 
@@ -1,12 +1,12 @@
 # path: orchestrator/contract_reinforcer.py
 # version: v2.8
 
-import json
-import os
 import logging
 import datetime
 from typing import Dict, List
 
+from orchestrator.context_history import load_history_entries
+
 log_manager = logging.getLogger(__name__)
 
 # Mock mapping of context keys to the primary module that governs them.
@@ -26,15 +26,9 @@ class ContractReinforcer:
         """Scans context history for frequently drifted modules and returns drift counts."""
         log_manager.info(f"[ContractReinforcer] Analyzing usage from {context_history_path}")
         drift_counts = {}
-        if not os.path.exists(context_history_path):
-            log_manager.warning(f"[ContractReinforcer] History file not found: {context_history_path}")
-            return {}
-
-        try:
-            with open(context_history_path, 'r') as f:
-                history_data = json.load(f)
-        except json.JSONDecodeError:
-            log_manager.error(f"[ContractReinforcer] Failed to decode history file: {context_history_path}")
+        history_data = load_history_entries(context_history_path)
+        if not history_data:
+            log_manager.warning(f"[ContractReinforcer] History file not found or empty: {context_history_path}")
             return {}
 
         for entry in history_data:
@@ -0,0 +1,38 @@
+# path: orchestrator/cycle_progress.py
+# version: v1.0
+"""Stage progress reporting for a running context evolution cycle.
+
+The worker that runs a cycle installs a reporter with ``reporting_to``; the cycle
+code calls ``report_stage`` as each stage finishes. Without a reporter the call is
+a no-op, so CLI runs are unaffected.
+"""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from modules.log_manager import log_manager
+
+_reporter: contextvars.ContextVar[Optional[Callable[[str, dict], None]]] = contextvars.ContextVar(
+    "cycle_progress_reporter", default=None
+)
+
+
+@contextmanager
+def reporting_to(reporter: Callable[[str, dict], None]):
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
+
+
+def report_stage(stage: str, **data):
+    reporter = _reporter.get()
+    if reporter is None:
+        return
+    try:
+        reporter(stage, data)
+    except Exception as e:
+        # Progress is best effort; a broken listener must not fail the cycle.
+        log_manager.warning(f"[CycleProgress] Failed to report stage '{stage}': {e}")
@@ -12,6 +12,7 @@ from orchestrator.context_manager import ContextManager
 from orchestrator.contract_registry import ContractRegistry
 from orchestrator.insight_monitor import InsightMonitor
 from orchestrator.recovery_policy_manager import RecoveryPolicyManager
+from orchestrator.cycle_progress import report_stage
 from modules.log_manager import log_manager
 
 # Import existing modules (now context-aware)
@@ -28,8 +29,16 @@ class FeedbackLoop:
         self.contract_registry = contract_registry
         self.insight_monitor = insight_monitor
         self.policy_manager = policy_manager
+        self._rag_engine = None
         log_manager.info("[FeedbackLoop] Initialized with v2.4 components.")
 
+    @property
+    def rag_engine(self) -> RAGEngine:
+        # Built on first use and reused across attempts and cycles (model load is expensive).
+        if self._rag_engine is None:
+            self._rag_engine = RAGEngine()
+        return self._rag_engine
+
     def _log_adaptive_event(self, session_id: str, score: float, strategy: str, output: str):
         """Logs adaptive regeneration details to context history and a file."""
         log_entry = {
@@ -56,8 +65,7 @@ class FeedbackLoop:
         self.context_manager.set("short_term.prompt", user_input, reason="User initiated feedback loop")
         self.context_manager.set("mid_term.session_id", session_id, reason="New session ID")
 
-        # stable_snapshot_path = self.insight_monitor.trigger_snapshot("pre_feedback_loop") # Removed as InsightMonitor no longer has trigger_snapshot
-        stable_snapshot_path = self.context_manager.snapshot_to_file(snapshot_dir="logs/context_evolution_snapshots") # Use ContextManager for snapshot
+        stable_snapshot_path = self.insight_monitor.trigger_snapshot("pre_feedback_loop")
         retry_count = 0
         max_retries = 1 # Default to at least one retry
         final_answer = ""
@@ -68,11 +76,11 @@ class FeedbackLoop:
                 
                 # 1. RAG Engine
                 log_manager.info("[FeedbackLoop] --- RAG Engine: Start ---")
-                rag_engine = RAGEngine() # RAGEngine should ideally be context-aware too
-                context_for_rag = rag_engine.get_context(user_input) # This needs to be refactored to use ContextManager
+                context_for_rag = self.rag_engine.get_context(user_input) # This needs to be refactored to use ContextManager
                 self.context_manager.set("short_term.rag_context", context_for_rag, reason="RAG context retrieved")
                 log_manager.info(f"[FeedbackLoop] Context: {str(context_for_rag)[:200]}...")
                 log_manager.info("[FeedbackLoop] --- RAG Engine: End ---")
+                report_stage("rag", attempt=retry_count + 1, context=str(context_for_rag)[:500])
 
                 # 2. Generator
                 log_manager.info("[FeedbackLoop] --- Generator: Start ---")
@@ -80,6 +88,7 @@ class FeedbackLoop:
                 generated_answer = self.context_manager.get("mid_term.generated_output")
                 log_manager.info(f"[FeedbackLoop] Answer: {generated_answer}")
                 log_manager.info("[FeedbackLoop] --- Generator: End ---")
+                report_stage("generator", attempt=retry_count + 1, answer=generated_answer)
 
                 # Update chat history
                 history = self.context_manager.get("mid_term.chat_history", default=[])
@@ -94,6 +103,7 @@ class FeedbackLoop:
                 comment = self.context_manager.get("mid_term.evaluation_feedback")
                 log_manager.info(f"[FeedbackLoop] Rating: {score}, Feedback: {comment}")
                 log_manager.info("[FeedbackLoop] --- Evaluator: End ---")
+                report_stage("evaluator", attempt=retry_count + 1, score=score, feedback=comment)
 
                 # 4. Anomaly Detection & Policy Application
                 anomaly = self.insight_monitor.detect_anomaly()
@@ -136,6 +146,7 @@ class FeedbackLoop:
             self.context_manager.set("long_term.last_session_score", score, reason="Final score of feedback loop")
             log_manager.info("[FeedbackLoop] Final session data saved to context.")
             log_manager.info("[FeedbackLoop] --- Memory Store: End ---")
+            report_stage("feedback_loop", final_answer=final_answer, score=score)
 
             return final_answer
 
@@ -13,11 +13,11 @@ from modules.log_manager import log_manager
 from modules.anomaly_detector import AnomalyDetector
 from modules.predictive_analyzer import PredictiveAnalyzer # Import the new PredictiveAnalyzer
 from modules.causal_graph import causal_graph
-from modules.causal_verifier import verify_causality
 from modules.causal_ingest import ingest_from_history
 from modules.context_rollback import rollback_manager
 from modules.auto_action_log import log_action
 from modules.auto_action_analyzer import compute_action_stats, should_execute
+from modules.event_log import predictive_self_correction_log
 
 class TimeSeriesBuffer:
     """Maintain rolling historical data for anomaly metrics."""
@@ -183,6 +183,10 @@ class InsightMonitor:
 
         return None
 
+    def trigger_snapshot(self, label: str, snapshot_dir: str = "logs/context_evolution_snapshots") -> str:
+        """Takes a copy-on-write context snapshot and returns its path for rollback."""
+        return self.context_manager.snapshot_to_file(snapshot_dir=snapshot_dir, label=label)
+
     def notify_recovery(self, message: dict):
         """Logs a recovery action notice."""
         log_manager.info(f"🩹 [Recovery] {message}")
@@ -220,8 +224,8 @@ class InsightMonitor:
 
     def _log_predictive_self_correction(self, pred_prob: float, action: str, result: dict = None, context_id: str = None, metrics: dict = None):
         """
-        Logs prediction results and actions to logs/predictive_self_correction.json.
-        (R-v1.1 Updated)
+        Logs prediction results and actions to the predictive_self_correction event log
+        (JSONL segments under logs/predictive_self_correction.segments/).
         """
         log_entry = {
             "timestamp": datetime.datetime.now().isoformat(),
@@ -235,33 +239,8 @@ class InsightMonitor:
         if metrics:
             log_entry.update(metrics)
 
-        log_file_path = "logs/predictive_self_correction.json"
-        os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-
-        # Read existing logs, append new entry, and write back
-        logs = []
-        if os.path.exists(log_file_path):
-            try:
-                with open(log_file_path, 'r', encoding='utf-8') as f:
-                    # Handle empty or malformed file
-                    content = f.read()
-                    if content.strip():
-                        logs = json.loads(content)
-                    if not isinstance(logs, list):
-                        log_manager.warning(f"{log_file_path} is not a list. Re-initializing.")
-                        logs = []
-            except json.JSONDecodeError:
-                log_manager.warning(f"Could not decode JSON from {log_file_path}. Starting new log.")
-                logs = []
-        
-        logs.append(log_entry)
-        
-        try:
-            with open(log_file_path, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, indent=4)
-            log_manager.debug(f"Logged predictive self-correction data to {log_file_path}")
-        except IOError as e:
-            log_manager.error(f"Failed to write predictive self-correction log to {log_file_path}: {e}", exc_info=True)
+        # Buffered append; the event log's flusher thread writes it to a JSONL segment.
+        predictive_self_correction_log().append(log_entry)
 
 
     def forecast_anomaly(self) -> dict:
@@ -415,11 +394,13 @@ class InsightMonitor:
         log_manager.info(f"--- Simulation Complete. Final predicted risk: {final_risk:.2f} ---")
 
     def compute_causal_integrity(self, sample_size: int = 50) -> dict:
-        """Evaluate causal graph consistency by sampling events."""
-        graph = causal_graph.build_graph()
-        nodes = graph.get("nodes", [])
-        edges = graph.get("edges", [])
-        total_nodes = len(nodes)
+        """Evaluate causal graph consistency for the most recent events.
+
+        Reads the graph's incrementally maintained orphan index, so the cost depends
+        on sample_size rather than on the size of the graph.
+        """
+        stats = causal_graph.stats()
+        total_nodes = stats["total_nodes"]
         auto_action = None
         if total_nodes == 0:
             return {
@@ -427,15 +408,16 @@ class InsightMonitor:
                 "total_edges": 0,
                 "sampled": 0,
                 "success_ratio": 0.0,
+                "orphan_count": 0,
                 "missing_parent_events": [],
                 "auto_action": auto_action,
             }
-        sampled = nodes[-sample_size:]
-        failures = []
-        for node in sampled:
-            result = verify_causality(node["event_id"])
-            if not result["success"]:
-                failures.append({"event_id": node["event_id"], "missing": result["missing_parents"]})
+        sampled = causal_graph.recent_event_ids(sample_size)
+        failures = [
+            {"event_id": event_id, "missing": causal_graph.missing_parents(event_id)}
+            for event_id in sampled
+            if causal_graph.is_orphan(event_id)
+        ]
         success_ratio = 1 - (len(failures) / max(len(sampled), 1))
         if failures:
             action_stats = compute_action_stats(limit=200)
@@ -463,9 +445,10 @@ class InsightMonitor:
                 log_action({"type": "causal_auto_action", "ingest": ingest_result, "rollback": rollback_result}, success=overall_success)
         return {
             "total_nodes": total_nodes,
-            "total_edges": len(edges),
+            "total_edges": stats["total_edges"],
             "sampled": len(sampled),
             "success_ratio": round(success_ratio, 3),
+            "orphan_count": stats["orphan_count"],
             "missing_parent_events": failures[:10],
             "auto_action": auto_action,
         }
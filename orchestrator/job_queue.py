@@ -0,0 +1,228 @@
+# path: orchestrator/job_queue.py
+# version: v1.1
+"""Bounded in-process job queue for context evolution cycles.
+
+Jobs run on a fixed pool of worker threads so the API event loop is never blocked
+by a cycle. When every worker is busy and the backlog is full, ``submit`` raises
+QueueFullError (the chat API maps it to HTTP 429). Each job keeps the stage events
+reported through orchestrator.cycle_progress so clients can poll or stream them; a
+handler that reports an "error" stage fails its job even if it returns normally.
+On shutdown, jobs still waiting are cancelled rather than drained.
+"""
+
+import asyncio
+import datetime
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from modules.log_manager import log_manager
+from orchestrator.cycle_progress import reporting_to
+
+TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+# Seconds an idle worker waits before re-checking the stop flag.
+_IDLE_POLL_SECONDS = 1.0
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the job backlog is at capacity."""
+
+
+class Job:
+    def __init__(self, payload: str):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.status = "queued"
+        self.created_at = datetime.datetime.now().isoformat()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.events = []
+        self._subscribers = []  # (loop, asyncio.Queue)
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def publish(self, stage: str, data: dict = None):
+        event = {
+            "stage": stage,
+            "status": self.status,
+            "timestamp": datetime.datetime.now().isoformat(),
+            "data": data or {},
+        }
+        with self._lock:
+            event["seq"] = len(self.events)
+            self.events.append(event)
+            subscribers = list(self._subscribers)
+        for loop, events in subscribers:
+            try:
+                loop.call_soon_threadsafe(events.put_nowait, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it will be dropped on unsubscribe.
+                pass
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop):
+        """Returns (events so far, queue of later events) without missing any in between."""
+        events = asyncio.Queue()
+        with self._lock:
+            backlog = list(self.events)
+            self._subscribers.append((loop, events))
+        return backlog, events
+
+    def unsubscribe(self, events: asyncio.Queue):
+        with self._lock:
+            self._subscribers = [entry for entry in self._subscribers if entry[1] is not events]
+
+    def to_dict(self, include_events: bool = True) -> dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+        if include_events:
+            data["events"] = list(self.events)
+        return data
+
+
+class JobQueue:
+    """Fixed worker pool in front of a bounded backlog."""
+
+    def __init__(self, handler: Callable[[str], object], max_workers: int = None, max_pending: int = None,
+                 retention: int = None, name: str = "job"):
+        self.handler = handler
+        # One worker by default: raise CHAT_JOB_WORKERS only for handlers whose cycle
+        # state is request-scoped (ContextManager.request_scope()).
+        self.max_workers = max(1, max_workers or int(os.getenv("CHAT_JOB_WORKERS", "1")))
+        self.max_pending = max(1, max_pending or int(os.getenv("CHAT_JOB_QUEUE_SIZE", "16")))
+        self.retention = max(1, retention or int(os.getenv("CHAT_JOB_RETENTION", "500")))
+        self.name = name
+        self._pending = queue.Queue(maxsize=self.max_pending)
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._workers = []
+        self._running = 0
+        self._stop = threading.Event()
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+        for index in range(self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"{self.name}-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, payload: str) -> Job:
+        job = Job(payload)
+        with self._jobs_lock:
+            if self._stop.is_set():
+                raise QueueFullError("Job queue is shutting down.")
+            self._ensure_workers()
+            if self._pending.full():
+                raise QueueFullError(f"{self.max_pending} jobs are already waiting.")
+            # Publish before enqueueing so "queued" always precedes "started".
+            job.publish("queued", {"position": self._pending.qsize() + 1})
+            try:
+                self._pending.put_nowait(job)
+            except queue.Full:
+                raise QueueFullError(f"{self.max_pending} jobs are already waiting.")
+            self._jobs[job.id] = job
+            self._trim_locked()
+        return job
+
+    def _trim_locked(self):
+        # Forget the oldest finished jobs beyond the retention window.
+        excess = len(self._jobs) - self.retention
+        if excess <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._jobs_lock:
+            return self._jobs.get(job_id)
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._pending.get(timeout=_IDLE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if job is None:
+                return
+            if self._stop.is_set():
+                self._cancel(job)
+                return
+            with self._jobs_lock:
+                self._running += 1
+            job.status = "running"
+            job.started_at = datetime.datetime.now().isoformat()
+            job.publish("started")
+            errors = []
+
+            def report(stage, data):
+                if stage == "error":
+                    errors.append(data)
+                job.publish(stage, data)
+
+            try:
+                with reporting_to(report):
+                    job.result = self.handler(job.payload)
+                if errors:
+                    # The cycle caught its own exception and reported it instead of raising.
+                    job.error = str(errors[-1].get("error") or "The cycle reported an error.")
+                    job.status = "failed"
+                else:
+                    job.status = "completed"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+                log_manager.error(f"[JobQueue] {self.name} job {job.id} failed: {e}", exc_info=True)
+            finally:
+                job.finished_at = datetime.datetime.now().isoformat()
+                with self._jobs_lock:
+                    self._running -= 1
+                job.publish(job.status, {"result": job.result, "error": job.error})
+
+    def _cancel(self, job: Job):
+        job.status = "cancelled"
+        job.error = "The job queue shut down before this job started."
+        job.finished_at = datetime.datetime.now().isoformat()
+        job.publish(job.status, {"result": None, "error": job.error})
+
+    def stats(self) -> dict:
+        with self._jobs_lock:
+            return {
+                "workers": self.max_workers,
+                "running": self._running,
+                "pending": self._pending.qsize(),
+                "max_pending": self.max_pending,
+                "tracked_jobs": len(self._jobs),
+            }
+
+    def shutdown(self):
+        """Stops accepting jobs and cancels those still waiting; never blocks on a busy worker."""
+        with self._jobs_lock:
+            self._stop.set()
+        while True:
+            try:
+                job = self._pending.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                self._cancel(job)
+        for _ in self._workers:
+            try:
+                self._pending.put_nowait(None)
+            except queue.Full:
+                break  # Idle workers still see the stop flag within _IDLE_POLL_SECONDS.
+        self._workers = []
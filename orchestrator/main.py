@@ -9,24 +9,16 @@ from typing import Dict, Any, List
 from collections import namedtuple
 import argparse
 import asyncio
+import threading
 
 # Add project root to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from orchestrator.meta_contract_engine import MetaContractEngine
-from modules.alert_dispatcher import AlertDispatcher
-from orchestrator.context_manager import ContextManager
 from orchestrator.contract_registry import ContractRegistry
-from orchestrator.context_validator import ContextValidator
-from orchestrator.insight_monitor import InsightMonitor
-from orchestrator.recovery_policy_manager import RecoveryPolicyManager
-from orchestrator.feedback_loop_integration import FeedbackLoop
-from orchestrator.learner import Learner
-from orchestrator.impact_analyzer import ImpactAnalyzer
-from orchestrator.auto_repair_engine import AutoRepairEngine
+from orchestrator.meta_contract_engine import MetaContractEngine
+from backend import container
+from orchestrator.cycle_progress import report_stage
 from modules.log_manager import log_manager
-from modules.auto_fix_executor import AutoFixExecutor
-from qdrant_client import QdrantClient
 from modules.cognitive_graph_engine import CognitiveGraphEngine
 from modules.self_reasoning_loop import SelfReasoningLoop
 from modules.distributed_persona_fabric import DistributedPersonaFabric
@@ -131,6 +123,8 @@ def run_impact_analysis(target_file: str):
     print(json.dumps(result, ensure_ascii=False, indent=2))
     print(suggest_repair(result))
 
+_contract_refresh_lock = threading.Lock()
+
 # A named tuple to hold all the initialized components for the workflow.
 WorkflowComponents = namedtuple('WorkflowComponents', [
     'context_manager', 'contract_registry', 'context_validator',
@@ -139,41 +133,28 @@ WorkflowComponents = namedtuple('WorkflowComponents', [
     'meta_contract_engine' # Add MetaContractEngine here
 ])
 
-def _initialize_workflow_components(user_input: str) -> WorkflowComponents:
-    """Initializes and returns all core components for the workflow."""
-    context_manager = ContextManager(history_path="logs/context_history.json")
-    contract_registry = ContractRegistry()
-    context_validator = ContextValidator(contract_registry)
-    policy_manager = RecoveryPolicyManager()
-    insight_monitor = InsightMonitor(context_manager, policy_manager)
-    auto_fix_executor = AutoFixExecutor()
-    alert_dispatcher = AlertDispatcher()
-    
-    # v3.0: Initialize MetaContractEngine
-    meta_contract_engine = MetaContractEngine()
-    meta_contract_engine.load_contracts()
-    log_manager.info("MetaContractEngine initialized and contracts loaded.")
-
-    qdrant_client = QdrantClient(url=os.getenv("QDRANT_URL", "http://127.0.0.1:6333"))
-    learner = Learner(context_manager, qdrant_client)
-    feedback_loop = FeedbackLoop(context_manager, contract_registry, insight_monitor, policy_manager)
+def _initialize_workflow_components() -> WorkflowComponents:
+    """Returns the long-lived workflow components shared by every cycle.
 
-    # Initial Context Setup
-    context_manager.set("short_term.user_input", user_input, reason="Initial user input for cycle")
-    context_manager.set("long_term.config.qdrant_url", os.getenv("QDRANT_URL", "http://127.0.0.1:6333"), reason="Qdrant URL config")
-    log_manager.info("Initial context and managers set up.")
+    Components come from backend.container and are built once per process; per-cycle
+    state lives in ContextManager.request_scope().
+    """
+    context_manager = container.get_context_manager()
+    qdrant_url = os.getenv("QDRANT_URL", "http://127.0.0.1:6333")
+    if context_manager.get("long_term.config.qdrant_url") != qdrant_url:
+        context_manager.set("long_term.config.qdrant_url", qdrant_url, reason="Qdrant URL config")
 
     return WorkflowComponents(
         context_manager=context_manager,
-        contract_registry=contract_registry,
-        context_validator=context_validator,
-        policy_manager=policy_manager,
-        insight_monitor=insight_monitor,
-        auto_fix_executor=auto_fix_executor,
-        alert_dispatcher=alert_dispatcher,
-        learner=learner,
-        feedback_loop=feedback_loop,
-        meta_contract_engine=meta_contract_engine # Pass the instance
+        contract_registry=container.get_contract_registry(),
+        context_validator=container.get_context_validator(),
+        policy_manager=container.get_recovery_policy_manager(),
+        insight_monitor=container.get_insight_monitor(),
+        auto_fix_executor=container.get_auto_fix_executor(),
+        alert_dispatcher=container.get_alert_dispatcher(),
+        learner=container.get_learner(),
+        feedback_loop=container.get_feedback_loop(),
+        meta_contract_engine=container.get_meta_contract_engine()
     )
 
 def _handle_anomaly(anomaly: Dict[str, Any], components: WorkflowComponents, stable_snapshot_path: str, user_input: str) -> bool:
@@ -186,12 +167,12 @@ def _handle_anomaly(anomaly: Dict[str, Any], components: WorkflowComponents, sta
     # --- v2.5 Impact Analysis & Auto-Repair ---
     source_module = anomaly.get("source_module", "orchestrator/main.py")
     log_manager.info(f"--- Starting v2.5 Impact Analysis for source: {source_module} ---")
-    impact_analyzer = ImpactAnalyzer(components.context_manager, components.contract_registry)
+    impact_analyzer = container.get_impact_analyzer()
     impact_report = impact_analyzer.trace_impact(source_module)
 
     if impact_report.get("impact_score", 0) > 0.3:
         log_manager.warning(f"High impact score ({impact_report.get('impact_score'):.2f}) detected. Triggering Auto-Repair.")
-        auto_repair = AutoRepairEngine(components.context_manager)
+        auto_repair = container.get_auto_repair_engine()
         repair_result = auto_repair.apply_repair(
             strategy="soft" if impact_report.get("impact_score") < 0.6 else "rebuild",
             target=impact_report.get("affected_modules", [])
@@ -278,12 +259,12 @@ def _integrate_learning(components: WorkflowComponents, user_input: str):
 def _run_test_impact_analysis(components: WorkflowComponents):
     """Runs a test impact analysis on a successful cycle."""
     log_manager.info("--- [TEST] Running v2.5 Impact Analysis on successful cycle ---")
-    impact_analyzer_test = ImpactAnalyzer(components.context_manager, components.contract_registry)
+    impact_analyzer_test = container.get_impact_analyzer()
     impact_report_test = impact_analyzer_test.trace_impact("modules/generator.py") # Mock source
 
     if impact_report_test.get("impact_score", 0) > 0.1: # Lower threshold for test
         log_manager.info(f"[TEST] Mock high impact score detected ({impact_report_test.get('impact_score'):.2f}). Simulating repair.")
-        auto_repair_test = AutoRepairEngine(components.context_manager)
+        auto_repair_test = container.get_auto_repair_engine()
         auto_repair_test.apply_repair(
             strategy="soft", # Always use soft for tests
             target=impact_report_test.get("affected_modules", [])
@@ -297,10 +278,10 @@ def _handle_critical_exception(e: Exception, components: WorkflowComponents, sta
     
     log_manager.critical("Workflow failed! Initiating v2.5 Auto-Repair analysis...")
     source_module_on_error = "orchestrator/main.py" 
-    impact_analyzer_exc = ImpactAnalyzer(components.context_manager, components.contract_registry)
+    impact_analyzer_exc = container.get_impact_analyzer()
     impact_report_exc = impact_analyzer_exc.trace_impact(source_module_on_error)
     
-    auto_repair_exc = AutoRepairEngine(components.context_manager)
+    auto_repair_exc = container.get_auto_repair_engine()
     repair_result_exc = auto_repair_exc.apply_repair(
         strategy="soft" if impact_report_exc.get("impact_score", 0) < 0.6 else "rebuild",
         target=impact_report_exc.get("affected_modules", [])
@@ -315,51 +296,73 @@ def _handle_critical_exception(e: Exception, components: WorkflowComponents, sta
     log_manager.info("Workflow halted after critical exception and repair attempt.")
 
 
+def _refresh_contracts(meta_contract_engine: MetaContractEngine, contract_registry: ContractRegistry):
+    """Reloads contract files whose mtime changed and runs rewrite analysis on those only.
+
+    The shared ContractRegistry (read by the context validator) is refreshed before
+    and after the rewrite phase, so both edits and rewrites reach the next validation.
+    """
+    with _contract_refresh_lock:
+        contract_registry.refresh_if_changed()
+        changed = meta_contract_engine.load_contracts()
+        for module_name in changed:
+            suggestions = meta_contract_engine.analyze_and_suggest_rewrite(module_name)
+            if suggestions:
+                log_manager.info(f"Applying suggested rewrite for {module_name} based on initial analysis.")
+                meta_contract_engine.apply_rewrite(module_name, suggestions, "Initial auto-rewrite on cycle start")
+        if changed:
+            # Re-validate contracts after potential rewrites (only rewritten files are re-parsed).
+            meta_contract_engine.load_contracts()
+            contract_registry.refresh_if_changed()
+            log_manager.info(f"Contracts re-loaded after rewrite phase ({len(changed)} changed).")
+
 def run_context_evolution_cycle(user_input: str = "初期の自己評価を開始します。"):
-    """Runs the full context evolution cycle with self-healing and learning capabilities."""
+    """Runs the full context evolution cycle with self-healing and learning capabilities.
+
+    Returns the final answer, or None when the cycle was halted or rolled back.
+    """
     log_manager.info("========= Starting SSP Workflow v3.0 (Meta-Contract System) ==========")
     
-    components = _initialize_workflow_components(user_input)
+    components = _initialize_workflow_components()
     
     # v3.0: Meta-Contract Engine Integration
     log_manager.info("--- Running v3.0 Meta-Contract Analysis ---")
-    all_modules = [c.get('name') for c in components.meta_contract_engine.contracts if c.get('name')]
-    for module_name in all_modules:
-        suggestions = components.meta_contract_engine.analyze_and_suggest_rewrite(module_name)
-        if suggestions:
-            log_manager.info(f"Applying suggested rewrite for {module_name} based on initial analysis.")
-            components.meta_contract_engine.apply_rewrite(module_name, suggestions, "Initial auto-rewrite on cycle start")
-    
-    # Re-validate contracts after potential rewrites
-    components.meta_contract_engine.load_contracts()
-    log_manager.info("Contracts re-loaded after initial rewrite phase.")
+    _refresh_contracts(components.meta_contract_engine, components.contract_registry)
 
-    stable_snapshot_path = components.insight_monitor.trigger_snapshot("pre_evolution_cycle")
-    components.context_manager.set("system.last_stable_snapshot_id", stable_snapshot_path, reason="Set stable snapshot ID")
+    # The short-term layer and the per-cycle mid-term keys are private to this cycle.
+    with components.context_manager.request_scope():
+        components.context_manager.set("short_term.user_input", user_input, reason="Initial user input for cycle")
+        stable_snapshot_path = components.insight_monitor.trigger_snapshot("pre_evolution_cycle")
+        components.context_manager.set("system.last_stable_snapshot_id", stable_snapshot_path, reason="Set stable snapshot ID")
     
-    try:
-        log_manager.info("--- Running Feedback Loop ---")
-        final_answer = components.feedback_loop.run_feedback_loop(user_input)
-        components.context_manager.set("mid_term.final_answer", final_answer, reason="Final answer from feedback loop")
-        log_manager.info(f"[Orchestrator] Feedback Loop completed. Final Answer: {final_answer[:100]}...")
+        try:
+            log_manager.info("--- Running Feedback Loop ---")
+            final_answer = components.feedback_loop.run_feedback_loop(user_input)
+            components.context_manager.set("mid_term.final_answer", final_answer, reason="Final answer from feedback loop")
+            log_manager.info(f"[Orchestrator] Feedback Loop completed. Final Answer: {final_answer[:100]}...")
 
-        if anomaly := components.insight_monitor.detect_anomaly():
-            if _handle_anomaly(anomaly, components, stable_snapshot_path, user_input):
-                return  # Halt workflow if handler returns True
+            if anomaly := components.insight_monitor.detect_anomaly():
+                report_stage("anomaly", anomaly=anomaly)
+                if _handle_anomaly(anomaly, components, stable_snapshot_path, user_input):
+                    return None  # Halt workflow if handler returns True
 
-        _integrate_learning(components, user_input)
+            _integrate_learning(components, user_input)
 
-        if not components.context_validator.validate("orchestrator", components.context_manager, direction='outputs', semantic_mode=True):
-            log_manager.error("[Orchestrator] Final context validation failed. Triggering rollback.")
-            components.context_manager.rollback_to_snapshot(stable_snapshot_path)
-            components.insight_monitor.notify_recovery({"action": "rollback", "reason": "Final validation failed"})
-            return
+            if not components.context_validator.validate("orchestrator", components.context_manager, direction='outputs', semantic_mode=True):
+                log_manager.error("[Orchestrator] Final context validation failed. Triggering rollback.")
+                components.context_manager.rollback_to_snapshot(stable_snapshot_path)
+                components.insight_monitor.notify_recovery({"action": "rollback", "reason": "Final validation failed"})
+                report_stage("rollback", reason="Final validation failed")
+                return None
 
-        _run_test_impact_analysis(components)
+            _run_test_impact_analysis(components)
 
-        log_manager.info("========= SSP Workflow v3.0 (Meta-Contract System) Completed Successfully =========")
-    except Exception as e:
-        log_manager.critical(f"A critical unhandled exception occurred in the main workflow: {e}", exc_info=True)
-        _handle_critical_exception(e, components, stable_snapshot_path)
-    finally:
-        log_manager.info("========= SSP Workflow v3.0 (Meta-Contract System) Cycle Finished =========)")
+            log_manager.info("========= SSP Workflow v3.0 (Meta-Contract System) Completed Successfully =========")
+            return final_answer
+        except Exception as e:
+            log_manager.critical(f"A critical unhandled exception occurred in the main workflow: {e}", exc_info=True)
+            _handle_critical_exception(e, components, stable_snapshot_path)
+            report_stage("error", error=str(e))
+            return None
+        finally:
+            log_manager.info("========= SSP Workflow v3.0 (Meta-Contract System) Cycle Finished =========)")
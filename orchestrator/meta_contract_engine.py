@@ -13,6 +13,8 @@ class MetaContractEngine:
         self.contract_dir = os.path.join(os.getcwd(), 'contracts')
         self.log_output_dir = os.path.join(os.getcwd(), 'logs', 'meta_contracts')
         self.meta_contract_log_file = os.path.join(os.getcwd(), 'logs', 'meta_contract_log.json')
+        self._contract_files: Dict[str, tuple] = {}  # filepath -> (mtime_ns, contract)
+        self.changed_contracts: List[str] = []
 
         os.makedirs(self.log_output_dir, exist_ok=True)
         self._ensure_meta_contract_log_exists()
@@ -24,20 +26,39 @@ class MetaContractEngine:
                 json.dump([], f, indent=2, ensure_ascii=False)
             logging.info(f"Created new meta contract log file: {self.meta_contract_log_file}")
 
-    def load_contracts(self):
+    def load_contracts(self) -> List[str]:
+        """契約をロードする。mtime が変わったファイルだけを再パースし、変更された契約名を返す。"""
         logging.info(f"Loading contracts from {self.contract_dir}")
-        self.contracts = [] # 既存の契約をクリアして再ロード
-        for filename in os.listdir(self.contract_dir):
+        contracts = []
+        changed = []
+        seen = set()
+        for filename in sorted(os.listdir(self.contract_dir)):
             if filename.endswith('.yaml'):
                 filepath = os.path.join(self.contract_dir, filename)
+                seen.add(filepath)
+                mtime = os.stat(filepath).st_mtime_ns
+                cached = self._contract_files.get(filepath)
+                if cached and cached[0] == mtime:
+                    if cached[1] is not None:
+                        contracts.append(cached[1])
+                    continue
+                contract = None
                 with open(filepath, 'r', encoding='utf-8') as f:
                     try:
                         contract = yaml.safe_load(f)
-                        self.contracts.append(contract)
                         logging.info(f"Loaded contract: {contract.get('name', filename)}")
                     except yaml.YAMLError as e:
                         logging.error(f"Error loading YAML from {filepath}: {e}")
-        logging.info(f"Loaded {len(self.contracts)} base contracts.")
+                self._contract_files[filepath] = (mtime, contract)
+                if contract is not None:
+                    contracts.append(contract)
+                    changed.append(contract.get('name', filename))
+        for filepath in set(self._contract_files) - seen:
+            del self._contract_files[filepath]
+        self.contracts = contracts
+        self.changed_contracts = changed
+        logging.info(f"Loaded {len(self.contracts)} base contracts ({len(changed)} changed).")
+        return changed
 
     def get_contract(self, module_name: str) -> Dict[str, Any]:
         """